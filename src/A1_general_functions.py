@@ -81,14 +81,38 @@ def define_base_capacities(oemof_results):
     return capacities_base
 
 
-def store_result_matrix(overall_results, experiment, oemof_results):
+def initialize_result_store(overall_results, results_file):
     """
-    Storing results to vector and then result matrix for saving it in csv.
+    Creates an append-only store for the results of all simulations, with one list per
+    column of overall_results, and writes the header of the results csv.
+    Recording the results of a simulation with store_result_matrix() therefore does not
+    depend on the number of results stored before.
 
     Parameters
     ----------
     overall_results: pandas.DataFrame
-        Dataframe filled with the outcomes of the sensitivity experiment
+        Empty dataframe defining the columns of the results, see C.overall_results_title()
+
+    results_file: str
+        Path of the results csv
+
+    Returns
+    -------
+    result_store: dict of lists
+        Values of each column of the results, in the order of the simulations
+    """
+    overall_results.to_csv(results_file)
+    return {key: [] for key in overall_results.columns.values}
+
+
+def store_result_matrix(result_store, experiment, oemof_results):
+    """
+    Storing results of a simulation as new row of the result store for saving it in csv.
+
+    Parameters
+    ----------
+    result_store: dict of lists
+        Results of the sensitivity experiments, see initialize_result_store()
 
     experiment: dict
         Dictionary containing parameters of the sensitivity experiments
@@ -98,44 +122,72 @@ def store_result_matrix(overall_results, experiment, oemof_results):
 
     Returns
     -------
-    overall_results: pandas.DataFrame
-        Dataframe containing the results of the sensitivity experiments
+    result_store: dict of lists
+        Results of the sensitivity experiments, extended by the simulation
 
     """
     round_to_comma = 5
-    result_series = pd.Series()
 
-    for key in overall_results.columns.values:
-        # Check if called value is in oemof results -> Remember: check if pandas index has certain index: pd.object.index.contains(key)
+    for key in result_store:
+        # Check if called value is in oemof results
         if key in oemof_results:
-            if isinstance(oemof_results[key], str):
-                result_series = result_series.append(
-                    pd.Series([oemof_results[key]], index=[key])
-                )
-            else:
-                result_series = result_series.append(
-                    pd.Series([round(oemof_results[key], round_to_comma)], index=[key])
-                )
+            value = oemof_results[key]
         # extend by item of demand profile
         elif key == DEMAND_PROFILE:
-            result_series = result_series.append(
-                pd.Series([experiment[key]], index=[key])
-            )
+            result_store[key].append(experiment[key])
+            continue
         # Check if called value is a parameter of sensitivity_experiment_s
         elif key in experiment:
-            if isinstance(experiment[key], str):
-                result_series = result_series.append(
-                    pd.Series([experiment[key]], index=[key])
-                )
-            else:
-                result_series = result_series.append(
-                    pd.Series([round(experiment[key], round_to_comma)], index=[key])
-                )
-
-    result_series = result_series.reindex(overall_results.columns, fill_value=None)
-
-    overall_results = overall_results.append(
-        pd.Series(result_series), ignore_index=True
+            value = experiment[key]
+        else:
+            value = None
+
+        if value is None or isinstance(value, str):
+            result_store[key].append(value)
+        else:
+            result_store[key].append(round(value, round_to_comma))
+
+    return result_store
+
+
+def write_result_rows(result_store, first_row, results_file):
+    """
+    Appends the rows of the result store starting with first_row to the results csv,
+    without rewriting the results stored before.
+
+    Parameters
+    ----------
+    result_store: dict of lists
+        Results of the sensitivity experiments, see initialize_result_store()
+
+    first_row: int
+        Number of the first row not written to the csv yet
+
+    results_file: str
+        Path of the results csv
+    """
+    number_of_rows = len(next(iter(result_store.values()), []))
+    rows = pd.DataFrame(
+        {key: result_store[key][first_row:] for key in result_store},
+        columns=list(result_store.keys()),
+        index=range(first_row, number_of_rows),
     )
+    rows.to_csv(results_file, mode="a", header=False)
+    return
+
+
+def get_overall_results(result_store):
+    """
+    Returns the results of all simulations as pandas.DataFrame.
 
-    return overall_results
+    Parameters
+    ----------
+    result_store: dict of lists
+        Results of the sensitivity experiments, see initialize_result_store()
+
+    Returns
+    -------
+    overall_results: pandas.DataFrame
+        Dataframe containing the results of the sensitivity experiments
+    """
+    return pd.DataFrame(result_store, columns=list(result_store.keys()))
@@ -0,0 +1,247 @@
+"""
+Incremental re-run and resuming of the simulations of an input file.
+
+The results of each simulation are recorded in a manifest in the OUTPUT_FOLDER, next to the
+results csv, as soon as the simulation is completed. Each simulation is recorded with its name
+(case and experiment FILENAME) and a key of its case definition, parameters and timeseries
+(see G1a.get_key()) and the keys of the cases it is based on.
+
+With INCREMENTAL_RERUN, only simulations whose key is not in the manifest of the previous run
+are performed, eg. of a changed case definition, a new sensitivity value or a case based on a
+changed case. With RESUME (`--resume`), an interrupted run is continued, simulations whose name
+is in its manifest are not performed again. All other results are taken from the manifest.
+"""
+
+import os
+import json
+import hashlib
+import logging
+
+import numpy as np
+
+import src.G1a_result_cache as result_cache
+
+from src.constants import (
+    INCREMENTAL_RERUN,
+    RESUME,
+    SIMULATION_KEYS,
+    REUSED_RESULTS,
+    MANIFEST_SUFFIX,
+    OUTPUT_FOLDER,
+    OUTPUT_FILE,
+    PROJECT_SITE_NAME,
+    FILENAME,
+)
+
+
+def get_manifest_file(settings):
+    """
+    Path of the manifest of the results of settings[OUTPUT_FILE]
+    """
+    return settings[OUTPUT_FOLDER] + "/" + settings[OUTPUT_FILE] + MANIFEST_SUFFIX
+
+
+def get_simulation_name(experiment, case):
+    """
+    Name of the simulation of a case of an experiment, identifying it within a run
+    """
+    return case + experiment[FILENAME]
+
+
+def initialize_manifest(settings):
+    """
+    Loads the manifest of the previous run and starts the manifest of this run.
+    The manifest is a json file with one line per simulation, later lines
+    replace earlier lines of the same simulation. When resuming a run,
+    its manifest is continued, otherwise a new manifest is started.
+
+    Parameters
+    ----------
+    settings: dict
+        General settings of the simulation
+
+    Returns
+    -------
+    manifest: dict or None
+        Results of the previous run by simulation key ("keys") and simulation name ("names"),
+        None if neither INCREMENTAL_RERUN nor RESUME is set
+    """
+    manifest_file = get_manifest_file(settings)
+    if settings[INCREMENTAL_RERUN] is not True and settings[RESUME] is not True:
+        open(manifest_file, "w").close()
+        return None
+
+    manifest = {"keys": {}, "names": {}}
+    if os.path.isfile(manifest_file):
+        line = "\n"
+        with open(manifest_file, "r") as file:
+            for line in file:
+                try:
+                    # Results are rounded as numpy floats, like the results of a simulation
+                    entry = json.loads(line, parse_float=np.float64)
+                except json.JSONDecodeError:
+                    # Line of an interrupted run
+                    continue
+                manifest["keys"].update({entry["key"]: entry["results"]})
+                manifest["names"].update({entry["name"]: entry["results"]})
+        logging.info(
+            f"Loaded the results of {len(manifest['names'])} simulations of the previous run from {manifest_file}."
+        )
+        if settings[RESUME] is True and not line.endswith("\n"):
+            # Records of the resumed run start on a new line after an interrupted record
+            with open(manifest_file, "a") as file:
+                file.write("\n")
+    else:
+        logging.info(
+            f"No manifest of a previous run in {manifest_file}, all simulations are performed."
+        )
+
+    if settings[RESUME] is not True:
+        # The manifest of this run only includes simulations of the current input file
+        open(manifest_file, "w").close()
+    return manifest
+
+
+def get_simulation_keys(experiment, case_list, case_dependencies, case_definitions):
+    """
+    Keys of the simulations of all cases of an experiment. The key of a case includes
+    the keys of the cases it is based on, so that a change of a case changes the keys
+    of all cases based on it.
+
+    Parameters
+    ----------
+    experiment: dict
+        Sensitivity experiment including its timeseries and grid availability
+
+    case_list: list
+        Names of the simulated cases in simulation order, base cases first
+
+    case_dependencies: dict of lists
+        Cases each case is based on, see D0.get_case_dependencies()
+
+    case_definitions: dict of dicts
+        Definitions of all cases
+
+    Returns
+    -------
+    simulation_keys: dict
+        Key of each case in order of case_list
+    """
+    simulation_keys = {}
+    for case in case_list:
+        hash_object = hashlib.sha256()
+        hash_object.update(
+            result_cache.get_key(experiment, case_definitions[case]).encode()
+        )
+        for base_case in case_dependencies[case]:
+            hash_object.update(simulation_keys[base_case].encode())
+        simulation_keys.update({case: hash_object.hexdigest()})
+    return simulation_keys
+
+
+def with_reused_results(
+    sensitivity_experiment_s, manifest, case_list, case_dependencies, case_definitions
+):
+    """
+    Adds the keys of its simulations (SIMULATION_KEYS) and the results of the previous
+    run that can be reused (REUSED_RESULTS) to each sensitivity experiment. When resuming,
+    results are reused by the name of the simulation, with INCREMENTAL_RERUN by its key.
+
+    Parameters
+    ----------
+    sensitivity_experiment_s: generator
+        Yields number and settings of all sensitivity experiments, see cli.prepare_experiments()
+
+    manifest: dict or None
+        Results of the previous run, see initialize_manifest().
+        If None, no results are reused.
+
+    Other parameters see get_simulation_keys()
+
+    Yields
+    ------
+    experiment_number: int
+
+    experiment: dict
+    """
+    for experiment_number, experiment in sensitivity_experiment_s:
+        simulation_keys = get_simulation_keys(
+            experiment, case_list, case_dependencies, case_definitions
+        )
+        reused_results = {}
+        if manifest is not None:
+            for case, key in simulation_keys.items():
+                name = get_simulation_name(experiment, case)
+                if experiment[RESUME] is True and name in manifest["names"]:
+                    reused_results.update({case: manifest["names"][name]})
+                elif experiment[INCREMENTAL_RERUN] is True and key in manifest["keys"]:
+                    reused_results.update({case: manifest["keys"][key]})
+        experiment.update(
+            {SIMULATION_KEYS: simulation_keys, REUSED_RESULTS: reused_results}
+        )
+        if len(reused_results) > 0:
+            logging.info(
+                f"Taking the results of {len(reused_results)} of {len(case_list)} cases "
+                f"of project site {experiment[PROJECT_SITE_NAME]}, experiment no. {experiment_number}, "
+                f"from the previous run."
+            )
+        yield experiment_number, experiment
+
+
+def get_manifest_entry(oemof_results):
+    """
+    Scalar results of a simulation, as stored in the manifest
+
+    Parameters
+    ----------
+    oemof_results: dict
+        Results of a simulation
+
+    Returns
+    -------
+    results: dict
+        Results that are None, strings, booleans or numbers
+    """
+    results = {}
+    for key, value in oemof_results.items():
+        if isinstance(value, np.generic):
+            value = value.item()
+        if value is None or isinstance(value, (str, bool, int, float)):
+            results.update({key: value})
+    return results
+
+
+def record_simulation(experiment, case, oemof_results):
+    """
+    Appends the results of a completed simulation to the manifest of this run.
+    Results of the manifest of a resumed run are not recorded again.
+
+    Parameters
+    ----------
+    experiment: dict
+        Sensitivity experiment, including SIMULATION_KEYS and REUSED_RESULTS
+        (see with_reused_results()). Simulations that are not in SIMULATION_KEYS,
+        eg. realizations of a blackout ensemble, are not recorded.
+
+    case: str
+        Name of the simulated case
+
+    oemof_results: dict
+        Results of the simulation
+    """
+    if case not in experiment.get(SIMULATION_KEYS, {}):
+        return
+    if experiment[RESUME] is True and case in experiment[REUSED_RESULTS]:
+        return
+    with open(get_manifest_file(experiment), "a") as file:
+        file.write(
+            json.dumps(
+                {
+                    "key": experiment[SIMULATION_KEYS][case],
+                    "name": get_simulation_name(experiment, case),
+                    "results": get_manifest_entry(oemof_results),
+                }
+            )
+            + "\n"
+        )
+    return
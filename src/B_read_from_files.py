@@ -1,8 +1,11 @@
 import pandas as pd
+import numpy as np
 import logging
 import os
 import sys
 import shutil
+import json
+import hashlib
 
 from src.constants import (
     SETTINGS,
@@ -14,6 +17,7 @@ from src.constants import (
     INPUT_FOLDER_TIMESERIES,
     TIMESERIES_FILE,
     TITLE_GRID_AVAILABILITY,
+    TIMESERIES_CACHE_FOLDER,
     NECESSITY_FOR_BLACKOUT_TIMESERIES_GENERATION,
     SETTING_VALUE,
     UNIT,
@@ -59,6 +63,31 @@ from src.constants import (
     ELECTRICITY_MG_FOLDER,
     STORAGE_FOLDER,
     LP_FILES_FOLDER,
+    USE_RESULT_CACHE,
+    RESULT_CACHE_MAX_SIZE_MB,
+    REUSE_OEMOF_MODEL,
+    WARM_START,
+    PERSISTENT_SOLVER,
+    BLACKOUT_SEED,
+    BLACKOUT_ENSEMBLE_SIZE,
+    BLACKOUT_ENSEMBLE_MIN_SIZE,
+    BLACKOUT_ENSEMBLE_TOLERANCE,
+    SENSITIVITY_SAMPLING,
+    SENSITIVITY_SAMPLE_SIZE,
+    SENSITIVITY_REFINEMENT_SIZE,
+    SENSITIVITY_SAMPLING_SEED,
+    SURROGATE_MODEL,
+    SURROGATE_INITIAL_SIZE,
+    SURROGATE_BATCH_SIZE,
+    SURROGATE_TOLERANCE,
+    TYPICAL_DAYS,
+    TYPICAL_DAYS_DISPATCH,
+    ROLLING_HORIZON,
+    ROLLING_HORIZON_OVERLAP,
+    INCREMENTAL_RERUN,
+    PLAUSIBILITY_TOLERANCE,
+    SAVE_TO_BINARY_FLOWS,
+    FLOWS_FOLDER,
 )
 
 # requires xlrd
@@ -253,6 +282,40 @@ def get_settings(file, sheet_settings):
     # Translate strings 'True' and 'False' from excel sheet to True and False
     for key in settings:
         settings[key] = identify_true_false(settings[key])
+
+    # Optional settings, which do not have to be included in the excel template
+    optional_settings = {
+        USE_RESULT_CACHE: False,
+        RESULT_CACHE_MAX_SIZE_MB: 1000,
+        REUSE_OEMOF_MODEL: False,
+        WARM_START: False,
+        PERSISTENT_SOLVER: False,
+        BLACKOUT_SEED: None,
+        BLACKOUT_ENSEMBLE_SIZE: 1,
+        BLACKOUT_ENSEMBLE_MIN_SIZE: 5,
+        BLACKOUT_ENSEMBLE_TOLERANCE: 0.01,
+        SENSITIVITY_SAMPLING: None,
+        SENSITIVITY_SAMPLE_SIZE: 100,
+        SENSITIVITY_REFINEMENT_SIZE: 0,
+        SENSITIVITY_SAMPLING_SEED: None,
+        SURROGATE_MODEL: False,
+        SURROGATE_INITIAL_SIZE: 20,
+        SURROGATE_BATCH_SIZE: 10,
+        SURROGATE_TOLERANCE: 0.02,
+        TYPICAL_DAYS: None,
+        TYPICAL_DAYS_DISPATCH: False,
+        ROLLING_HORIZON: None,
+        ROLLING_HORIZON_OVERLAP: 1,
+        INCREMENTAL_RERUN: False,
+        PLAUSIBILITY_TOLERANCE: 10 ** (-6),
+        SAVE_TO_BINARY_FLOWS: False,
+    }
+    for key in optional_settings:
+        if key not in settings:
+            settings.update({key: optional_settings[key]})
+            logging.info(
+                f"Optional setting `{key}` not included in the settings, using default value {optional_settings[key]}."
+            )
     return settings
 
 
@@ -546,7 +609,9 @@ def from_file(project_site, path_from):
     -------
     """
 
-    data_set = pd.read_csv(path_from, sep=project_site[SEPARATOR])
+    data_set = read_timeseries_file(
+        path_from, project_site[SEPARATOR], project_site[TITLE_TIME]
+    )
 
     list_columns = [
         TITLE_TIME,
@@ -570,9 +635,7 @@ def from_file(project_site, path_from):
                 file_index = None
             else:
                 try:
-                    file_index = pd.DatetimeIndex(
-                        data_set[project_site[TITLE_TIME]].values
-                    )
+                    file_index = pd.DatetimeIndex(data_set[project_site[TITLE_TIME]])
                 except (KeyError):
                     column_not_existant(
                         column_item, project_site[column_item], path_from
@@ -594,7 +657,12 @@ def from_file(project_site, path_from):
             if project_site[column_item] != "None":
                 try:
                     project_site.update(
-                        {dictionary_title: data_set[project_site[column_item]]}
+                        {
+                            dictionary_title: pd.Series(
+                                data_set[project_site[column_item]],
+                                name=project_site[column_item],
+                            )
+                        }
                     )
                 except (KeyError):
                     column_not_existant(
@@ -615,6 +683,186 @@ def from_file(project_site, path_from):
     return
 
 
+def read_timeseries_file(path_from, separator, title_time):
+    """
+    Reads the columns of a timeseries csv file. The parsed timeseries are cached as
+    binary .npy files in folder TIMESERIES_CACHE_FOLDER next to the csv file and
+    loaded memory-mapped as long as the csv file does not change.
+
+    Parameters
+    ----------
+    path_from: str
+        Path to csv file corresponding to project's site
+
+    separator: str
+        Separator of the csv file
+
+    title_time: str
+        Title of the column containing the time index, "None" if there is none
+
+    Returns
+    -------
+    data_set: dict
+        Values of each numeric column of the csv as numpy.ndarray,
+        the time column (if existing) as numpy.ndarray of datetime64
+    """
+    cache_file = os.path.join(
+        os.path.dirname(path_from), TIMESERIES_CACHE_FOLDER, os.path.basename(path_from)
+    )
+    data_set = load_timeseries_cache(path_from, cache_file, separator, title_time)
+    if data_set is not None:
+        logging.debug("Timeseries of " + path_from + " loaded from binary cache.")
+        return data_set
+
+    data_frame = pd.read_csv(path_from, sep=separator)
+    numeric_columns = [
+        column
+        for column in data_frame.columns
+        if pd.api.types.is_numeric_dtype(data_frame[column])
+    ]
+    # Column-major, so that each column is contiguous in the memory-mapped file
+    values = np.asfortranarray(data_frame[numeric_columns].values, dtype=float)
+    data_set = {
+        column: values[:, number] for number, column in enumerate(numeric_columns)
+    }
+    if title_time in data_frame.columns:
+        time = pd.DatetimeIndex(data_frame[title_time].values).values
+        data_set.update({title_time: time})
+    else:
+        time = None
+
+    try:
+        store_timeseries_cache(
+            path_from, cache_file, separator, title_time, numeric_columns, values, time
+        )
+    except OSError as e:
+        logging.debug("Timeseries of " + path_from + " could not be cached: " + str(e))
+    return data_set
+
+
+def get_file_hash(path):
+    """
+    Returns the sha256 hex digest of the content of file `path`.
+    """
+    hash_object = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            hash_object.update(block)
+    return hash_object.hexdigest()
+
+
+def load_timeseries_cache(path_from, cache_file, separator, title_time):
+    """
+    Loads the cached timeseries of a csv file memory-mapped, if they are up to date.
+    The cache is valid if modification time and size of the csv file are unchanged or,
+    if only the modification time changed, its content has the same hash.
+
+    Parameters
+    ----------
+    path_from: str
+        Path to csv file
+
+    cache_file: str
+        Path of the cached files without ending
+
+    separator: str
+        Separator of the csv file
+
+    title_time: str
+        Title of the column containing the time index
+
+    Returns
+    -------
+    data_set: dict or None
+        Timeseries as in read_timeseries_file(), None if the cache is not valid
+    """
+    try:
+        with open(cache_file + ".json") as file:
+            metadata = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    stat = os.stat(path_from)
+    if (
+        metadata[SEPARATOR] != separator
+        or metadata[TITLE_TIME] != title_time
+        or metadata["size"] != stat.st_size
+    ):
+        return None
+    if metadata["mtime_ns"] != stat.st_mtime_ns:
+        if metadata["sha256"] != get_file_hash(path_from):
+            return None
+        # File was touched, but not changed
+        metadata.update({"mtime_ns": stat.st_mtime_ns})
+        with open(cache_file + ".json", "w") as file:
+            json.dump(metadata, file)
+
+    try:
+        values = np.load(cache_file + ".npy", mmap_mode="r")
+        data_set = {
+            column: values[:, number]
+            for number, column in enumerate(metadata["columns"])
+        }
+        if metadata["has_time"] is True:
+            data_set.update(
+                {title_time: np.load(cache_file + "_time.npy", mmap_mode="r")}
+            )
+    except (OSError, ValueError):
+        return None
+    return data_set
+
+
+def store_timeseries_cache(
+    path_from, cache_file, separator, title_time, columns, values, time
+):
+    """
+    Stores the parsed timeseries of a csv file as binary .npy files, see load_timeseries_cache().
+
+    Parameters
+    ----------
+    path_from: str
+        Path to csv file
+
+    cache_file: str
+        Path of the cached files without ending
+
+    separator: str
+        Separator of the csv file
+
+    title_time: str
+        Title of the column containing the time index
+
+    columns: list of str
+        Titles of the numeric columns
+
+    values: numpy.ndarray
+        Values of the numeric columns, one column per timeseries
+
+    time: numpy.ndarray or None
+        Time column as datetime64
+    """
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    # Outdated metadata is removed first, so that incomplete caches are never used
+    if os.path.isfile(cache_file + ".json"):
+        os.remove(cache_file + ".json")
+    np.save(cache_file + ".npy", values)
+    if time is not None:
+        np.save(cache_file + "_time.npy", time)
+    stat = os.stat(path_from)
+    metadata = {
+        SEPARATOR: separator,
+        TITLE_TIME: title_time,
+        "columns": columns,
+        "has_time": time is not None,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": get_file_hash(path_from),
+    }
+    with open(cache_file + ".json", "w") as file:
+        json.dump(metadata, file)
+    return
+
+
 def check_output_directory(settings, input_excel_file):
     """
     Checks if output directory allready exist. Otherwise it is created
@@ -643,6 +891,7 @@ def check_output_directory(settings, input_excel_file):
         LP_FILES_FOLDER,
         STORAGE_FOLDER,
         ELECTRICITY_MG_FOLDER,
+        FLOWS_FOLDER,
         INPUTS_FOLDER,
         OEMOF_FOLDER,
     ]
@@ -705,4 +954,7 @@ def check_output_directory(settings, input_excel_file):
         or settings[SAVE_TO_PNG_FLOWS_ELECTRICITY_MG] is True
     ):
         os.mkdir(output_folder + ELECTRICITY_MG_FOLDER)
+
+    if settings[SAVE_TO_BINARY_FLOWS] is True:
+        os.mkdir(output_folder + FLOWS_FOLDER)
     return
@@ -0,0 +1,205 @@
+"""
+Surrogate model of the results of sensitivity experiments.
+
+A Gaussian process is trained on the results of the simulated experiments of a project site
+and case, with the positions of the experiments on the grid of sensitivity values as inputs.
+It predicts the SURROGATE_PARAMETERS of the experiments that are not simulated, together
+with the uncertainty of the prediction, which decides which experiments are simulated next
+(see C.get_surrogate_experiments()).
+"""
+
+import numpy as np
+from scipy.linalg import cho_solve, solve_triangular
+
+from src.constants import (
+    LCOE,
+    RES_SHARE,
+    CAPACITY_PV_KWP,
+    CAPACITY_STORAGE_KWH,
+    POWER_STORAGE_KW,
+    CAPACITY_RECTIFIER_AC_DC_KW,
+    CAPACITY_INVERTER_KW,
+    CAPACITY_WIND_KW,
+    CAPACITY_GENSET_KW,
+    CAPACITY_PCOUPLING_KW,
+)
+
+# Results predicted for experiments that are not simulated, the uncertainty of the LCOE
+# decides which experiments are simulated
+SURROGATE_PARAMETERS = [
+    LCOE,
+    RES_SHARE,
+    CAPACITY_PV_KWP,
+    CAPACITY_STORAGE_KWH,
+    POWER_STORAGE_KW,
+    CAPACITY_RECTIFIER_AC_DC_KW,
+    CAPACITY_INVERTER_KW,
+    CAPACITY_WIND_KW,
+    CAPACITY_GENSET_KW,
+    CAPACITY_PCOUPLING_KW,
+]
+# Length scales of the kernel (positions scaled to [0, 1]), the most likely one is used
+LENGTH_SCALES = [0.05, 0.1, 0.2, 0.5, 1.0, 2.0]
+# Variance of the noise relative to the variance of the results, keeps the kernel matrix positive definite
+NOISE = 1e-6
+
+
+def kernel(positions_a, positions_b, length_scale):
+    """
+    Squared exponential kernel between two sets of positions
+
+    Parameters
+    ----------
+    positions_a: numpy.ndarray
+        Positions of shape (number of positions, number of sensitivity parameters)
+
+    positions_b: numpy.ndarray
+        Positions of shape (number of positions, number of sensitivity parameters)
+
+    length_scale: float
+
+    Returns
+    -------
+    covariance: numpy.ndarray
+        Covariance of shape (len(positions_a), len(positions_b))
+    """
+    squared_distances = (
+        (positions_a[:, np.newaxis, :] - positions_b[np.newaxis, :, :]) ** 2
+    ).sum(axis=2)
+    return np.exp(-0.5 * squared_distances / length_scale ** 2)
+
+
+def fit(positions, values):
+    """
+    Trains a Gaussian process on the results of simulated experiments. The results are
+    normalized, the length scale of the kernel is chosen by maximum likelihood from LENGTH_SCALES,
+    the variance of each result is its maximum likelihood estimate for this length scale.
+
+    Parameters
+    ----------
+    positions: numpy.ndarray
+        Positions of the simulated experiments, scaled to [0, 1]
+
+    values: numpy.ndarray
+        Results of the simulated experiments, one column per result parameter.
+        Results including NaN are not predicted.
+
+    Returns
+    -------
+    model: dict
+        Trained Gaussian process, see predict()
+    """
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values).any(axis=0)
+    mean = values[:, valid].mean(axis=0)
+    scale = values[:, valid].std(axis=0)
+    scale[scale == 0] = 1
+    normalized_values = (values[:, valid] - mean) / scale
+
+    model = None
+    for length_scale in LENGTH_SCALES:
+        covariance = kernel(positions, positions, length_scale) + NOISE * np.eye(
+            len(positions)
+        )
+        try:
+            cholesky = np.linalg.cholesky(covariance)
+        except np.linalg.LinAlgError:
+            continue
+        weights = cho_solve((cholesky, True), normalized_values)
+        variance = np.maximum(
+            (normalized_values * weights).sum(axis=0) / len(positions), NOISE
+        )
+        log_likelihood = -0.5 * len(positions) * np.sum(
+            np.log(variance)
+        ) - normalized_values.shape[1] * np.sum(np.log(np.diag(cholesky)))
+        if model is None or log_likelihood > model["log_likelihood"]:
+            model = {
+                "positions": positions,
+                "length_scale": length_scale,
+                "cholesky": cholesky,
+                "weights": weights,
+                "variance": variance,
+                "log_likelihood": log_likelihood,
+            }
+
+    model.update(
+        {"valid": valid, "mean": mean, "scale": scale, "columns": values.shape[1]}
+    )
+    return model
+
+
+def predict(model, positions):
+    """
+    Predicts results at positions with a trained Gaussian process
+
+    Parameters
+    ----------
+    model: dict
+        Trained Gaussian process, see fit()
+
+    positions: numpy.ndarray
+        Positions of the predicted experiments, scaled to [0, 1]
+
+    Returns
+    -------
+    mean: numpy.ndarray
+        Predicted results, one column per result parameter (NaN if not predicted)
+
+    standard_deviation: numpy.ndarray
+        Standard deviation of the predicted results
+    """
+    covariance = kernel(positions, model["positions"], model["length_scale"])
+    variance_reduction = solve_triangular(model["cholesky"], covariance.T, lower=True)
+    relative_variance = np.maximum(1 - (variance_reduction ** 2).sum(axis=0), 0)
+
+    mean = np.full((len(positions), model["columns"]), np.nan)
+    standard_deviation = np.full((len(positions), model["columns"]), np.nan)
+    mean[:, model["valid"]] = (
+        covariance @ model["weights"] * model["scale"] + model["mean"]
+    )
+    standard_deviation[:, model["valid"]] = (
+        np.sqrt(relative_variance[:, np.newaxis] * model["variance"]) * model["scale"]
+    )
+    return mean, standard_deviation
+
+
+def predict_unsolved(solved_positions, solved_values, unsolved_positions):
+    """
+    Predicts the SURROGATE_PARAMETERS of experiments that are not simulated from the
+    results of the simulated experiments of the same project site and case.
+
+    Parameters
+    ----------
+    solved_positions: numpy.ndarray
+        Positions of the simulated experiments, scaled to [0, 1]
+
+    solved_values: numpy.ndarray
+        Results of the simulated experiments, one column per entry of SURROGATE_PARAMETERS
+
+    unsolved_positions: numpy.ndarray
+        Positions of the experiments that are not simulated, scaled to [0, 1]
+
+    Returns
+    -------
+    mean: numpy.ndarray
+        Predicted results, one column per entry of SURROGATE_PARAMETERS
+
+    relative_uncertainty: numpy.ndarray
+        Standard deviation of the predicted LCOE relative to the LCOE,
+        infinite if the LCOE can not be predicted
+    """
+    if len(solved_positions) < 2:
+        return (
+            np.full((len(unsolved_positions), len(SURROGATE_PARAMETERS)), np.nan),
+            np.full(len(unsolved_positions), np.inf),
+        )
+
+    mean, standard_deviation = predict(
+        fit(solved_positions, solved_values), unsolved_positions
+    )
+    lcoe = SURROGATE_PARAMETERS.index(LCOE)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative_uncertainty = standard_deviation[:, lcoe] / np.abs(mean[:, lcoe])
+    relative_uncertainty[np.isnan(relative_uncertainty)] = np.inf
+    # Results can not be negative
+    return np.maximum(mean, 0), relative_uncertainty
@@ -7,13 +7,24 @@ dictonary, including filenames.
 import pandas as pd
 import logging
 import os
+import sys
 
 import itertools
+import functools
 import numpy as np
 from copy import deepcopy
 
+try:
+    # Sobol sequences are only included in scipy>=1.7
+    from scipy.stats import qmc
+except ImportError:
+    qmc = None
+
 # todo: this module should not be called here
+import src.A1_general_functions as helpers
+import src.C1_surrogate_model as surrogate
 import src.D0_process_input as process_input_parameters
+import src.E_blackouts_central_grid as central_grid
 
 from src.constants import (
     BLACKOUT_DURATION,
@@ -21,10 +32,33 @@ from src.constants import (
     BLACKOUT_FREQUENCY,
     BLACKOUT_FREQUENCY_STD_DEVIATION,
     SENSITIVITY_ALL_COMBINATIONS,
+    SENSITIVITY_SAMPLING,
+    SENSITIVITY_SAMPLE_SIZE,
+    SENSITIVITY_REFINEMENT_SIZE,
+    SENSITIVITY_SAMPLING_SEED,
+    LATIN_HYPERCUBE,
+    SOBOL,
+    SURROGATE_MODEL,
+    SURROGATE_INITIAL_SIZE,
+    SURROGATE_BATCH_SIZE,
+    SURROGATE_TOLERANCE,
+    SURROGATE_STATUS,
+    SOLVED,
+    PREDICTED,
+    WARM_START,
+    BLACKOUT_ENSEMBLE_SIZE,
+    BLACKOUT_REALIZATIONS,
+    SUFFIX_P10,
+    SUFFIX_P90,
     DEMAND_AC_SCALING_FACTOR,
     DEMAND_DC_SCALING_FACTOR,
     STORAGE_SOC_INITIAL,
     TOTAL_NUMBER_OF_EXPERIMENTS,
+    MAX_DATE_TIME_INDEX,
+    MAX_EVALUATED_DAYS,
+    TIME_START,
+    EVALUATED_DAYS,
+    TIME_FREQUENCY,
     PROJECT_SITE_NAME,
     EXPERIMENT_NAME,
     MIN,
@@ -190,8 +224,12 @@ from src.constants import (
     CONSUMPTION_FUEL_ANNUAL_KWH,
     SENSITIVITY_EXPERIMENTS_CSV,
     SIMULATION_EXPERIMENTS_CSV,
+    OUTPUT_FILE,
 )
 
+# Space-filling designs that can be drawn instead of the grid of sensitivity values
+SAMPLING_METHODS = [LATIN_HYPERCUBE, SOBOL]
+
 
 def get_blackout_experiment_name(blackout_experiment):
     """
@@ -234,6 +272,10 @@ def get(settings, parameters_constant_values, parameters_sensitivity, project_si
     """
     Get sensitivity_experiment_s for sensitivity analysis
 
+    The experiments are not created all at once, but generated one after another while they
+    are simulated. Everything depending on all experiments (their number, the longest
+    date_time_index and the title of the results) is derived from the sensitivity parameters.
+
     Parameters
     ----------
     settings: dict
@@ -250,8 +292,8 @@ def get(settings, parameters_constant_values, parameters_sensitivity, project_si
 
     Returns
     -------
-    sensitivitiy_experiment_s: dict
-        Settings for the different sensitivity experiments
+    sensitivitiy_experiment_s: generator
+        Yields number and settings of each sensitivity experiment, see process_experiments()
 
     blackout_experiment_s: dict
         Settings for the blackout experiments
@@ -262,11 +304,30 @@ def get(settings, parameters_constant_values, parameters_sensitivity, project_si
     names_sensitivities: list
         Contains parameters to be analyzed in the sensitivity experiment
 
+    refine_experiments: functools.partial or None
+        Generates additional experiments from the results of the simulated experiments,
+        see get_surrogate_experiments() (SURROGATE_MODEL) and get_refined_experiments()
+        (SENSITIVITY_SAMPLING and SENSITIVITY_REFINEMENT_SIZE > 0)
+
     """
+    sample_s = None
+    if settings[SURROGATE_MODEL] is True or uses_sampling(settings) is True:
+        (
+            universal_parameters,
+            number_of_project_sites,
+            sensitivity_array_dict,
+            _,
+        ) = all_possible(
+            settings, parameters_constant_values, parameters_sensitivity, project_sites,
+        )
+        sample_s = get_samples(settings, sensitivity_array_dict)
+        total_number_of_experiments = number_of_project_sites * len(sample_s)
+        if settings[SURROGATE_MODEL] is True:
+            universal_parameters.update({SURROGATE_STATUS: SOLVED})
 
-    if settings[SENSITIVITY_ALL_COMBINATIONS] is True:
+    elif settings[SENSITIVITY_ALL_COMBINATIONS] is True:
         (
-            sensitivitiy_experiment_s,
+            universal_parameters,
             number_of_project_sites,
             sensitivity_array_dict,
             total_number_of_experiments,
@@ -276,7 +337,7 @@ def get(settings, parameters_constant_values, parameters_sensitivity, project_si
 
     elif settings[SENSITIVITY_ALL_COMBINATIONS] is False:
         (
-            sensitivitiy_experiment_s,
+            universal_parameters,
             number_of_project_sites,
             sensitivity_array_dict,
             total_number_of_experiments,
@@ -297,39 +358,27 @@ def get(settings, parameters_constant_values, parameters_sensitivity, project_si
 
     logging.info(message[:-2])
 
-    for experiment in sensitivitiy_experiment_s:
-        test_techno_economical_parameters_complete(
-            sensitivitiy_experiment_s[experiment]
-        )
-
-        # scaling demand according to scaling factor - used for tests regarding tool application
-        sensitivitiy_experiment_s[experiment].update(
-            {
-                DEMAND_AC: sensitivitiy_experiment_s[experiment][DEMAND_AC]
-                * sensitivitiy_experiment_s[experiment][DEMAND_AC_SCALING_FACTOR]
-            }
-        )
-        sensitivitiy_experiment_s[experiment].update(
-            {
-                DEMAND_DC: sensitivitiy_experiment_s[experiment][DEMAND_DC]
-                * sensitivitiy_experiment_s[experiment][DEMAND_DC_SCALING_FACTOR]
-            }
-        )
-
-        #  Add economic values to sensitivity sensitivity_experiment_s
-        process_input_parameters.economic_values(sensitivitiy_experiment_s[experiment])
-        # Give a file item to the sensitivity_experiment_s
-        experiment_name(
-            sensitivitiy_experiment_s[experiment],
+    sensitivitiy_experiment_s = process_experiments(
+        generate_experiments(
+            settings,
             sensitivity_array_dict,
-            number_of_project_sites,
-        )
+            universal_parameters,
+            project_sites,
+            sample_s,
+        ),
+        settings,
+        parameters_sensitivity,
+        sensitivity_array_dict,
+        number_of_project_sites,
+    )
 
-        if COMMENTS not in sensitivitiy_experiment_s[experiment]:
-            sensitivitiy_experiment_s[experiment].update({COMMENTS: ""})
+    # Longest evaluated timeframe of all experiments, used for the blackout timeseries
+    max_date_time_index, max_evaluated_days = get_max_date_time_index(
+        settings, sensitivity_array_dict, universal_parameters, project_sites
+    )
+    settings.update({MAX_DATE_TIME_INDEX: max_date_time_index})
+    settings.update({MAX_EVALUATED_DAYS: max_evaluated_days})
 
-        if sensitivitiy_experiment_s[experiment][STORAGE_SOC_INITIAL] == "None":
-            sensitivitiy_experiment_s[experiment].update({STORAGE_SOC_INITIAL: None})
     #######################################################
     # Get blackout_experiment_s for sensitvitiy           #
     #######################################################
@@ -338,36 +387,6 @@ def get(settings, parameters_constant_values, parameters_sensitivity, project_si
         sensitivity_array_dict, parameters_constant_values, settings
     )
 
-    # save all Experiments with all used input data to csv
-    csv_dict = deepcopy(sensitivitiy_experiment_s)
-    # delete timeseries to make file readable
-    timeseries_names = [
-        DEMAND_AC,
-        DEMAND_DC,
-        PV_GENERATION_PER_KWP,
-        WIND_GENERATION_PER_KW,
-        GRID_AVAILABILITY,
-    ]
-    for entry in csv_dict:
-        for series in timeseries_names:
-            if series in csv_dict[entry].keys():
-                del csv_dict[entry][series]
-
-    experiments_dataframe = pd.DataFrame.from_dict(csv_dict, orient="index")
-    experiments_dataframe.to_csv(
-        os.path.join(settings[OUTPUT_FOLDER], SIMULATION_EXPERIMENTS_CSV)
-    )
-
-    for item in experiments_dataframe.columns:
-        if (item not in parameters_sensitivity.keys()) and (
-            item not in [PROJECT_SITE_NAME]
-        ):
-            experiments_dataframe = experiments_dataframe.drop(columns=item)
-
-    experiments_dataframe.to_csv(
-        os.path.join(settings[OUTPUT_FOLDER], SENSITIVITY_EXPERIMENTS_CSV)
-    )
-
     # Generate a overall title of the oemof-results DataFrame
     title_overall_results = overall_results_title(
         settings, number_of_project_sites, sensitivity_array_dict
@@ -389,12 +408,288 @@ def get(settings, parameters_constant_values, parameters_sensitivity, project_si
 
     settings.update({TOTAL_NUMBER_OF_EXPERIMENTS: total_number_of_experiments})
 
+    refine_experiments = None
+    if settings[SURROGATE_MODEL] is True:
+        refine_experiments = functools.partial(
+            get_surrogate_experiments,
+            settings,
+            parameters_sensitivity,
+            sensitivity_array_dict,
+            universal_parameters,
+            project_sites,
+            number_of_project_sites,
+        )
+    elif sample_s is not None and settings[SENSITIVITY_REFINEMENT_SIZE] > 0:
+        refine_experiments = functools.partial(
+            get_refined_experiments,
+            settings,
+            parameters_sensitivity,
+            sensitivity_array_dict,
+            universal_parameters,
+            project_sites,
+            number_of_project_sites,
+        )
+
     return (
         sensitivitiy_experiment_s,
         blackout_experiment_s,
         title_overall_results,
         names_sensitivities,
+        refine_experiments,
+    )
+
+
+def generate_experiments(
+    settings,
+    sensitivity_array_dict,
+    universal_parameters,
+    project_site_s,
+    sample_s=None,
+):
+    """
+    Generates the sensitivity experiments, either all possible combinations of the
+    sensitivity parameters, variations of single parameters around the base case
+    or the combinations drawn by get_samples().
+
+    Parameters
+    ----------
+    settings: dict
+        Contains experiment's settings
+
+    sensitivity_array_dict: dict
+        Contains element for SE and values for the corresponding sensitivities
+
+    universal_parameters: dict
+        Global settings for the simulation
+
+    project_site_s: dict
+        Parameter values for the projects_site (Inlcuding time-series demand)
+
+    sample_s: list of dicts, optional
+        Sampled combinations of sensitivity values, only used with SENSITIVITY_SAMPLING
+
+    Returns
+    -------
+    generator
+        Yields experiment number and experiment, see get_all_possible_experiments(),
+        get_combinations_around_base() and get_sample_experiments()
+    """
+    if sample_s is not None:
+        return get_sample_experiments(sample_s, universal_parameters, project_site_s)
+    elif settings[SENSITIVITY_ALL_COMBINATIONS] is True:
+        # With warm start, neighbouring experiments are simulated one after another
+        return get_all_possible_experiments(
+            sensitivity_array_dict,
+            universal_parameters,
+            project_site_s,
+            along_grid=settings[WARM_START] is True,
+        )
+    else:
+        return get_combinations_around_base(
+            sensitivity_array_dict, universal_parameters, project_site_s
+        )
+
+
+def process_experiments(
+    experiment_s,
+    settings,
+    parameters_sensitivity,
+    sensitivity_array_dict,
+    number_of_project_sites,
+):
+    """
+    Completes the parameters of each generated experiment and appends it to the
+    csv files listing all experiments (see write_experiment()).
+
+    Parameters
+    ----------
+    experiment_s: generator
+        Yields experiment number and experiment, see generate_experiments()
+
+    settings: dict
+        Contains experiment's settings
+
+    parameters_sensitivity: dict
+        Sensitivity range for the chosen element {Elem: Min, Max, Step}
+
+    sensitivity_array_dict: dict
+        Contains element for SE and values for the corresponding sensitivities
+
+    number_of_project_sites: int
+
+    Yields
+    ------
+    experiment_number: int
+
+    experiment: dict
+        Settings of the sensitivity experiment
+    """
+    columns = None
+    for experiment_number, experiment in experiment_s:
+        test_techno_economical_parameters_complete(experiment)
+
+        # Demands are scaled according to their scaling factor in D0.add_timeseries(),
+        # the timeseries of the project sites are shared by all experiments
+
+        #  Add economic values to sensitivity sensitivity_experiment_s
+        process_input_parameters.economic_values(experiment)
+        # Give a file item to the sensitivity_experiment_s
+        experiment_name(experiment, sensitivity_array_dict, number_of_project_sites)
+
+        if COMMENTS not in experiment:
+            experiment.update({COMMENTS: ""})
+
+        if experiment[STORAGE_SOC_INITIAL] == "None":
+            experiment.update({STORAGE_SOC_INITIAL: None})
+
+        columns = write_experiment(
+            settings, parameters_sensitivity, experiment_number, experiment, columns
+        )
+        yield experiment_number, experiment
+
+
+def write_experiment(
+    settings, parameters_sensitivity, experiment_number, experiment, columns=None
+):
+    """
+    Appends an experiment with all used input data to SIMULATION_EXPERIMENTS_CSV and its
+    sensitivity parameters to SENSITIVITY_EXPERIMENTS_CSV. Timeseries are not saved to
+    keep the files readable.
+
+    Parameters
+    ----------
+    settings: dict
+        Contains experiment's settings
+
+    parameters_sensitivity: dict
+        Sensitivity range for the chosen element {Elem: Min, Max, Step}
+
+    experiment_number: int
+
+    experiment: dict
+        Settings of the sensitivity experiment
+
+    columns: list, optional
+        Columns of the csv files. If None, the csv files are created with the parameters
+        of this experiment as columns, unless experiments are appended to existing files
+        (experiment_number > 1).
+
+    Returns
+    -------
+    columns: list
+        Columns of the csv files
+    """
+    # delete timeseries to make file readable
+    timeseries_names = [
+        DEMAND_AC,
+        DEMAND_DC,
+        PV_GENERATION_PER_KWP,
+        WIND_GENERATION_PER_KW,
+        GRID_AVAILABILITY,
+    ]
+    experiment_dataframe = pd.DataFrame.from_dict(
+        {
+            experiment_number: {
+                key: experiment[key]
+                for key in experiment
+                if key not in timeseries_names
+            }
+        },
+        orient="index",
+    )
+
+    if columns is None and experiment_number > 1:
+        # Experiments added after the first experiments were simulated, see get_refined_experiments()
+        columns = list(
+            pd.read_csv(
+                os.path.join(settings[OUTPUT_FOLDER], SIMULATION_EXPERIMENTS_CSV),
+                index_col=0,
+                nrows=0,
+            ).columns
+        )
+
+    if columns is None:
+        columns = list(experiment_dataframe.columns)
+        mode = "w"
+    else:
+        experiment_dataframe = experiment_dataframe.reindex(columns=columns)
+        mode = "a"
+
+    experiment_dataframe.to_csv(
+        os.path.join(settings[OUTPUT_FOLDER], SIMULATION_EXPERIMENTS_CSV),
+        mode=mode,
+        header=(mode == "w"),
+    )
+
+    sensitivity_columns = [
+        item
+        for item in columns
+        if item in parameters_sensitivity.keys() or item == PROJECT_SITE_NAME
+    ]
+    experiment_dataframe[sensitivity_columns].to_csv(
+        os.path.join(settings[OUTPUT_FOLDER], SENSITIVITY_EXPERIMENTS_CSV),
+        mode=mode,
+        header=(mode == "w"),
     )
+    return columns
+
+
+def get_max_date_time_index(
+    settings, sensitivity_array_dict, universal_parameters, project_site_s
+):
+    """
+    Determines the longest evaluated timeframe of all experiments. Only the sensitivity
+    parameters defining the timeframe are varied, so that not all experiments have to be generated.
+
+    Parameters
+    ----------
+    settings: dict
+        Contains experiment's settings
+
+    sensitivity_array_dict: dict
+        Contains element for SE and values for the corresponding sensitivities
+
+    universal_parameters: dict
+        Global settings for the simulation
+
+    project_site_s: dict
+        Parameter values for the projects_site (Inlcuding time-series demand)
+
+    Returns
+    -------
+    max_date_time_index: pandas.DatetimeIndex
+        Datetime from start until end of the longest experiment
+
+    max_evaluated_days: int
+        Number of days evaluated in the longest experiment
+    """
+    time_array_dict = {
+        key: sensitivity_array_dict[key]
+        for key in sensitivity_array_dict
+        if key in [TIME_START, EVALUATED_DAYS, TIME_FREQUENCY]
+    }
+
+    if settings[SURROGATE_MODEL] is True or uses_sampling(settings) is True:
+        # Sampled and refined experiments only take values of the grid of sensitivity values
+        time_experiment_s = get_all_possible_experiments(
+            time_array_dict, universal_parameters, project_site_s
+        )
+    else:
+        time_experiment_s = generate_experiments(
+            settings, time_array_dict, universal_parameters, project_site_s
+        )
+
+    max_date_time_index = None
+    max_evaluated_days = None
+    for _, experiment in time_experiment_s:
+        date_time_index = process_input_parameters.get_date_time_index(experiment)
+        if max_date_time_index is None or len(date_time_index) > len(
+            max_date_time_index
+        ):
+            max_date_time_index = date_time_index
+            max_evaluated_days = experiment[EVALUATED_DAYS]
+
+    return max_date_time_index, max_evaluated_days
 
 
 # Generate Exp
@@ -402,7 +697,8 @@ def all_possible(
     settings, parameters_constant_values, parameters_sensitivity, project_site_s
 ):
     """
-    Generates cases for all sensitivity experiments
+    Prepares the generation of all possible combinations of the sensitivity parameters
+    (see get_all_possible_experiments())
 
     Parameters
     ----------
@@ -420,8 +716,8 @@ def all_possible(
 
     Returns
     -------
-    sensitivity_experiment_s: dict
-        Settings for different sensitivity experiments
+    universal_parameters: dict
+        Global settings for the simulation, base scenario of the experiments
 
     number_of_project_sites: int
 
@@ -448,22 +744,12 @@ def all_possible(
         parameters_sensitivity, project_site_s
     )
 
-    project_site_dict = {PROJECT_SITE_NAME: [key for key in project_site_s.keys()]}
-    (
-        sensitivity_experiment_s,
-        total_number_of_experiments,
-    ) = get_all_possible_combinations(sensitivity_array_dict, project_site_dict)
-
-    for experiment in sensitivity_experiment_s:
-        sensitivity_experiment_s[experiment].update(deepcopy(universal_parameters))
-        sensitivity_experiment_s[experiment].update(
-            deepcopy(
-                project_site_s[sensitivity_experiment_s[experiment][PROJECT_SITE_NAME]]
-            )
-        )
+    total_number_of_experiments = number_of_project_sites * int(
+        np.prod([len(sensitivity_array_dict[key]) for key in sensitivity_array_dict])
+    )
 
     return (
-        sensitivity_experiment_s,
+        universal_parameters,
         number_of_project_sites,
         sensitivity_array_dict,
         total_number_of_experiments,
@@ -474,7 +760,8 @@ def with_base_case(
     settings, parameters_constant_values, parameters_sensitivity, project_site_s
 ):
     """
-    Generates sensitivity experiment around the base case
+    Prepares the generation of sensitivity experiments around the base case
+    (see get_combinations_around_base())
 
     Parameters
     ----------
@@ -492,8 +779,8 @@ def with_base_case(
 
     Returns
     -------
-    sensitivity_experiment_s: dict
-        Settings for different sensitivity experiments
+    universal_parameters: dict
+        Global settings for the simulation, base scenario of the experiments
 
     number_of_project_sites: int
 
@@ -513,15 +800,16 @@ def with_base_case(
         parameters_sensitivity, project_site_s
     )
 
-    (
-        sensitivity_experiment_s,
-        total_number_of_experiments,
-    ) = get_combinations_around_base(
-        sensitivity_array_dict, universal_parameters, project_site_s
+    total_number_of_experiments = len(
+        list(
+            get_variations_around_base(
+                sensitivity_array_dict, universal_parameters, project_site_s
+            )
+        )
     )
 
     return (
-        sensitivity_experiment_s,
+        universal_parameters,
         number_of_project_sites,
         sensitivity_array_dict,
         total_number_of_experiments,
@@ -761,33 +1049,117 @@ def get_all_possible_combinations(sensitivity_array_dict, name_entry_dict):
     total_number_of_experiments: int
 
     """
-    # create all possible combinations of sensitive parameters
+    sensitivity_experiment_s = dict(
+        generate_all_possible_combinations(sensitivity_array_dict, name_entry_dict)
+    )
+    total_number_of_experiments = len(sensitivity_experiment_s)
+
+    return sensitivity_experiment_s, total_number_of_experiments
+
+
+def generate_all_possible_combinations(
+    sensitivity_array_dict, name_entry_dict, along_grid=False
+):
+    """
+    Generates all possible combinations of the sensitivity parameters one after another
+
+    With along_grid, the combinations follow a serpentine path through the grid of
+    sensitivity values, so that each experiment only differs by one step of one
+    parameter from the experiment before. The direction in which a parameter is
+    passed through is reversed each time a parameter of higher order changes
+    (reflected Gray code). Entries of name_entry_dict (project sites) are then the
+    outermost dimension.
+
+    Parameters
+    ----------
+    sensitivity_array_dict: dict
+        Contains element for SE and values for the corresponding sensitivities
+
+    name_entry_dict: dict
+        Name of the projects site(s)
+
+    along_grid: bool
+        If True, combinations are generated along the grid of sensitivity values
+
+    Yields
+    ------
+    experiment_number: int
+
+    experiment: dict
+        Combination of sensitivity values
+    """
     all_parameters = {}
+    if along_grid is True:
+        all_parameters.update(deepcopy(name_entry_dict))
     for key in sensitivity_array_dict:
         all_parameters.update({key: [value for value in sensitivity_array_dict[key]]})
 
     all_parameters.update(deepcopy(name_entry_dict))
-    # create all possible combinations of sensitive parameters
     keys = [key for key in all_parameters.keys()]
     values = [all_parameters[key] for key in all_parameters.keys()]
-    all_experiments = [dict(zip(keys, v)) for v in itertools.product(*values)]
 
     number_of_experiment = 0
-    sensitivity_experiment_s = {}
-    for experiment in all_experiments:
+    for position in itertools.product(*[range(len(value)) for value in values]):
+        steps = []
+        higher_steps = 0
+        for entry, value in zip(position, values):
+            # reverse direction if the higher parameters moved an odd number of steps
+            if along_grid is True and higher_steps % 2 == 1:
+                step = len(value) - 1 - entry
+            else:
+                step = entry
+            steps.append(step)
+            higher_steps += step
         number_of_experiment += 1
-        sensitivity_experiment_s.update({number_of_experiment: deepcopy(experiment)})
+        yield number_of_experiment, {
+            key: value[step] for key, value, step in zip(keys, values, steps)
+        }
 
-    total_number_of_experiments = number_of_experiment
 
-    return sensitivity_experiment_s, total_number_of_experiments
+def get_all_possible_experiments(
+    sensitivity_array_dict, universal_parameters, project_site_s, along_grid=False
+):
+    """
+    Generates experiments for all possible combinations of the sensitivity parameters
 
+    Parameters
+    ----------
+    sensitivity_array_dict: dict
+        Contains element for SE and values for the corresponding sensitivities
 
-def get_combinations_around_base(
+    universal_parameters: dict
+        Global settings for the simulation
+
+    project_site_s: dict
+        Parameter values for the projects_site (Inlcuding time-series demand)
+
+    along_grid: bool
+        If True, experiments are generated along the grid of sensitivity values,
+        see generate_all_possible_combinations()
+
+    Yields
+    ------
+    experiment_number: int
+
+    experiment: dict
+        Settings of the sensitivity experiment
+    """
+    project_site_dict = {PROJECT_SITE_NAME: [key for key in project_site_s.keys()]}
+    for experiment_number, experiment in generate_all_possible_combinations(
+        sensitivity_array_dict, project_site_dict, along_grid
+    ):
+        experiment.update(deepcopy(universal_parameters))
+        experiment.update(
+            share_timeseries(project_site_s[experiment[PROJECT_SITE_NAME]])
+        )
+        yield experiment_number, experiment
+
+
+def get_variations_around_base(
     sensitivity_array_dict, universal_parameters, project_site_s
 ):
     """
-    Create sensitivity experiments based on the base case in universal parameters
+    Generates the variations of single sensitivity parameters around the base case
 
     Parameters
     ----------
@@ -800,30 +1172,18 @@ def get_combinations_around_base(
     project_site_s: dict
         Parameter values for the projects_site (Inlcuding time-series demand)
 
-    Returns
-    -------
-    sensitivity_experiment_s: dict
-        Settings for different sensitivity experiments
+    Yields
+    ------
+    project_site: str
+        Name of the project site
 
-    total_number_of_experiments: int
+    variation: dict
+        Parameters differing from the base case of the project site
     """
-
-    experiment_number = 0
-    sensitivity_experiment_s = {}
-
     for project_site in project_site_s:
         # if no sensitivity analysis performed (other than multiple locations)
         if len(sensitivity_array_dict.keys()) == 0:
-            experiment_number += 1
-            sensitivity_experiment_s.update(
-                {experiment_number: deepcopy(universal_parameters)}
-            )
-            sensitivity_experiment_s[experiment_number].update(
-                {PROJECT_SITE_NAME: project_site}
-            )
-            sensitivity_experiment_s[experiment_number].update(
-                deepcopy(project_site_s[project_site])
-            )
+            yield project_site, {}
         # generate cases with sensitivity parameters
         else:
             defined_base = False
@@ -842,46 +1202,679 @@ def get_combinations_around_base(
 
                     if sensitivity_array_dict[key][interval_entry] != key_value:
                         # All parameters like base case except for sensitivity parameter
-                        experiment_number += 1
-                        sensitivity_experiment_s.update(
-                            {experiment_number: deepcopy(universal_parameters)}
-                        )
-                        sensitivity_experiment_s[experiment_number].update(
-                            {PROJECT_SITE_NAME: project_site}
-                        )
-                        sensitivity_experiment_s[experiment_number].update(
-                            deepcopy(project_site_s[project_site])
-                        )
-                        # overwrite base case value by sensitivity value (only in case specific parameter is changed)
-                        sensitivity_experiment_s[experiment_number].update(
-                            {key: sensitivity_array_dict[key][interval_entry]}
-                        )
+                        yield project_site, {
+                            key: sensitivity_array_dict[key][interval_entry]
+                        }
 
                     elif (
                         sensitivity_array_dict[key][interval_entry] == key_value
                         and defined_base is False
                     ):
                         # Defining scenario only with base case values for universal parameter / specific to project site (once!)
-                        experiment_number += 1
-                        sensitivity_experiment_s.update(
-                            {experiment_number: deepcopy(universal_parameters)}
-                        )
-                        sensitivity_experiment_s[experiment_number].update(
-                            {key: key_value}
-                        )
-                        sensitivity_experiment_s[experiment_number].update(
-                            {PROJECT_SITE_NAME: project_site}
-                        )
-                        sensitivity_experiment_s[experiment_number].update(
-                            deepcopy(project_site_s[project_site])
-                        )
                         defined_base = True
-                        sensitivity_experiment_s[experiment_number].update(
-                            {COMMENTS: "Base case, "}
+                        yield project_site, {key: key_value, COMMENTS: "Base case, "}
+
+
+def get_combinations_around_base(
+    sensitivity_array_dict, universal_parameters, project_site_s
+):
+    """
+    Create sensitivity experiments based on the base case in universal parameters
+
+    Parameters
+    ----------
+    sensitivity_array_dict: dict
+        Contains element for SE and values for the corresponding sensitivities
+
+    universal_parameters: dict
+        Global settings for the simulation
+
+    project_site_s: dict
+        Parameter values for the projects_site (Inlcuding time-series demand)
+
+    Yields
+    ------
+    experiment_number: int
+
+    experiment: dict
+        Settings of the sensitivity experiment
+    """
+    experiment_number = 0
+    for project_site, variation in get_variations_around_base(
+        sensitivity_array_dict, universal_parameters, project_site_s
+    ):
+        experiment_number += 1
+        experiment = deepcopy(universal_parameters)
+        experiment.update({PROJECT_SITE_NAME: project_site})
+        experiment.update(share_timeseries(project_site_s[project_site]))
+        # overwrite base case value by sensitivity value (only in case specific parameter is changed)
+        experiment.update(variation)
+        yield experiment_number, experiment
+
+
+def uses_sampling(settings):
+    """
+    Returns True if the sensitivity experiments are drawn by a space-filling design
+    (SENSITIVITY_SAMPLING) instead of SENSITIVITY_ALL_COMBINATIONS.
+    """
+    if settings[SENSITIVITY_SAMPLING] in [None, "None", False]:
+        return False
+    elif settings[SENSITIVITY_SAMPLING] in SAMPLING_METHODS:
+        return True
+    else:
+        logging.error(
+            "Setting `"
+            + SENSITIVITY_SAMPLING
+            + "` not valid! Has to be one of "
+            + ", ".join(SAMPLING_METHODS)
+            + " or None."
+        )
+        sys.exit()
+
+
+def get_sampling_random_generator(settings):
+    """
+    Returns the random generator of the sampled experiments. If no seed is set, a random
+    seed is drawn and stored in the settings, so that the samples can be reproduced.
+
+    Parameters
+    ----------
+    settings: dict
+        Contains experiment's settings
+
+    Returns
+    -------
+    random_generator: numpy.random.Generator
+    """
+    if settings[SENSITIVITY_SAMPLING_SEED] is None:
+        settings.update({SENSITIVITY_SAMPLING_SEED: central_grid.draw_seed()})
+        logging.info(
+            "Sensitivity experiments are sampled with seed "
+            + str(settings[SENSITIVITY_SAMPLING_SEED])
+            + ", set `"
+            + SENSITIVITY_SAMPLING_SEED
+            + "` to this value to reproduce them."
+        )
+    return central_grid.get_random_generator(
+        settings[SENSITIVITY_SAMPLING_SEED], SENSITIVITY_SAMPLING
+    )
+
+
+def latin_hypercube(number_of_samples, number_of_dimensions, random_generator):
+    """
+    Draws a latin hypercube design in the unit hypercube: In each dimension, each of the
+    number_of_samples intervals of equal width contains exactly one sample.
+
+    Parameters
+    ----------
+    number_of_samples: int
+
+    number_of_dimensions: int
+
+    random_generator: numpy.random.Generator
+
+    Returns
+    -------
+    unit_samples: numpy.ndarray
+        Samples in [0, 1) of shape (number_of_samples, number_of_dimensions)
+    """
+    # Random permutation of the intervals for each dimension
+    intervals = np.argsort(
+        random_generator.random((number_of_dimensions, number_of_samples)), axis=1
+    ).T
+    return (
+        intervals + random_generator.random((number_of_samples, number_of_dimensions))
+    ) / number_of_samples
+
+
+def draw_unit_samples(
+    sampling_method, number_of_samples, number_of_dimensions, random_generator
+):
+    """
+    Draws a space-filling design in the unit hypercube
+
+    Parameters
+    ----------
+    sampling_method: str
+        LATIN_HYPERCUBE or SOBOL
+
+    number_of_samples: int
+
+    number_of_dimensions: int
+
+    random_generator: numpy.random.Generator
+
+    Returns
+    -------
+    unit_samples: numpy.ndarray
+        Samples in [0, 1) of shape (number_of_samples, number_of_dimensions)
+    """
+    if number_of_dimensions == 0:
+        return np.zeros((number_of_samples, 0))
+    if sampling_method == SOBOL:
+        if qmc is not None:
+            return qmc.Sobol(
+                number_of_dimensions, scramble=True, seed=random_generator
+            ).random(number_of_samples)
+        logging.warning(
+            "Sobol sequences require scipy>=1.7, sensitivity experiments are sampled with a latin hypercube instead."
+        )
+    return latin_hypercube(number_of_samples, number_of_dimensions, random_generator)
+
+
+def get_samples(settings, sensitivity_array_dict):
+    """
+    Draws SENSITIVITY_SAMPLE_SIZE combinations of sensitivity values with a space-filling
+    design (SENSITIVITY_SAMPLING) instead of simulating all possible combinations. With
+    SURROGATE_MODEL, SURROGATE_INITIAL_SIZE combinations are drawn to train the surrogate model,
+    with a latin hypercube if SENSITIVITY_SAMPLING is not set.
+
+    Samples are drawn in the unit hypercube and mapped to the nearest lower value of each
+    sensitivity array, so that sampled experiments lie on the same grid as the experiments
+    of SENSITIVITY_ALL_COMBINATIONS. Samples mapped to the same combination are only
+    simulated once.
+
+    Parameters
+    ----------
+    settings: dict
+        Contains experiment's settings
+
+    sensitivity_array_dict: dict
+        Contains element for SE and values for the corresponding sensitivities
+
+    Returns
+    -------
+    sample_s: list of dicts
+        Sampled combinations of sensitivity values
+    """
+    keys = [key for key in sensitivity_array_dict.keys()]
+    lengths = np.array([len(sensitivity_array_dict[key]) for key in keys], dtype=int)
+    if settings[SURROGATE_MODEL] is True:
+        number_of_samples = int(settings[SURROGATE_INITIAL_SIZE])
+    else:
+        number_of_samples = int(settings[SENSITIVITY_SAMPLE_SIZE])
+    if uses_sampling(settings) is True:
+        sampling_method = settings[SENSITIVITY_SAMPLING]
+    else:
+        sampling_method = LATIN_HYPERCUBE
+
+    unit_samples = draw_unit_samples(
+        sampling_method,
+        number_of_samples,
+        len(keys),
+        get_sampling_random_generator(settings),
+    )
+    positions = np.minimum((unit_samples * lengths).astype(int), lengths - 1)
+    # Keep the order of the design, so that the first samples cover the whole space
+    unique_positions = list(dict.fromkeys(map(tuple, positions)))
+
+    if len(unique_positions) < number_of_samples:
+        logging.info(
+            str(number_of_samples - len(unique_positions))
+            + " of "
+            + str(number_of_samples)
+            + " samples coincide with other samples on the grid of sensitivity values and are only simulated once."
+        )
+
+    return [
+        get_sample(sensitivity_array_dict, keys, position)
+        for position in unique_positions
+    ]
+
+
+def get_sample(sensitivity_array_dict, keys, position):
+    """
+    Returns the combination of sensitivity values at position (indices of the values
+    in the sensitivity arrays of keys)
+    """
+    return {
+        key: sensitivity_array_dict[key][index] for key, index in zip(keys, position)
+    }
+
+
+def get_sample_experiments(
+    sample_s, universal_parameters, project_site_s, first_experiment_number=1
+):
+    """
+    Generates experiments for each sampled combination of sensitivity values at each project site
+
+    Parameters
+    ----------
+    sample_s: list of dicts
+        Sampled combinations of sensitivity values, see get_samples()
+
+    universal_parameters: dict
+        Global settings for the simulation
+
+    project_site_s: dict
+        Parameter values for the projects_site (Inlcuding time-series demand)
+
+    first_experiment_number: int
+        Number of the first generated experiment
+
+    Returns
+    -------
+    generator
+        Yields experiment number and experiment
+    """
+    return get_site_sample_experiments(
+        [
+            (project_site, sample)
+            for sample in sample_s
+            for project_site in project_site_s
+        ],
+        universal_parameters,
+        project_site_s,
+        first_experiment_number,
+    )
+
+
+def get_site_sample_experiments(
+    site_sample_s, universal_parameters, project_site_s, first_experiment_number=1
+):
+    """
+    Generates experiments for sampled combinations of sensitivity values at single project sites
+
+    Parameters
+    ----------
+    site_sample_s: list of tuples
+        Name of the project site and combination of sensitivity values of each experiment
+
+    Other parameters and yields see get_sample_experiments().
+    """
+    experiment_number = first_experiment_number - 1
+    for project_site, sample in site_sample_s:
+        experiment_number += 1
+        experiment = deepcopy(sample)
+        experiment.update({PROJECT_SITE_NAME: project_site})
+        experiment.update(deepcopy(universal_parameters))
+        experiment.update(share_timeseries(project_site_s[project_site]))
+        yield experiment_number, experiment
+
+
+def get_grid_positions(sensitivity_array_dict, results):
+    """
+    Returns the positions of results on the grid of sensitivity values
+
+    Parameters
+    ----------
+    sensitivity_array_dict: dict
+        Contains element for SE and values for the corresponding sensitivities
+
+    results: pandas.DataFrame
+        Results including the values of the sensitivity parameters
+
+    Returns
+    -------
+    positions: numpy.ndarray
+        Index of the value of each sensitivity parameter (columns) in its sensitivity array,
+        for each result (rows)
+    """
+    positions = np.zeros((len(results), len(sensitivity_array_dict)), dtype=int)
+    for column, key in enumerate(sensitivity_array_dict.keys()):
+        positions[:, column] = np.abs(
+            np.subtract.outer(
+                results[key].astype(float).values, sensitivity_array_dict[key]
+            )
+        ).argmin(axis=1)
+    return positions
+
+
+def get_refinement_samples(sensitivity_array_dict, result_store, number_of_samples):
+    """
+    Chooses additional combinations of sensitivity values where the LCOE of the simulated
+    experiments changes the most.
+
+    Sensitivity values are scaled to [0, 1]. For each project site and case, each experiment
+    is paired with its nearest simulated neighbours, and the change of the LCOE per distance
+    is calculated. New samples are the grid points in the middle of the pairs with the
+    steepest change, which are not simulated yet.
+
+    Parameters
+    ----------
+    sensitivity_array_dict: dict
+        Contains element for SE and values for the corresponding sensitivities
+
+    result_store: dict of lists
+        Results of the simulated experiments, see A1.initialize_result_store()
+
+    number_of_samples: int
+        Maximal number of additional samples
+
+    Returns
+    -------
+    sample_s: list of dicts
+        Additional combinations of sensitivity values
+    """
+    keys = [key for key in sensitivity_array_dict.keys()]
+    lengths = np.array([len(sensitivity_array_dict[key]) for key in keys], dtype=int)
+    results = pd.DataFrame(
+        {key: result_store[key] for key in [CASE, PROJECT_SITE_NAME, LCOE] + keys}
+    )
+    results[LCOE] = pd.to_numeric(results[LCOE], errors="coerce")
+    results = results[results[LCOE].notna()].reset_index(drop=True)
+
+    positions = get_grid_positions(sensitivity_array_dict, results)
+    scaled_positions = positions / np.maximum(lengths - 1, 1)
+
+    # Change of the LCOE per distance and midpoints between all neighbouring experiments
+    candidates = []
+    number_of_neighbours = 2 * len(keys)
+    for indices in results.groupby([PROJECT_SITE_NAME, CASE]).indices.values():
+        if len(indices) < 2:
+            continue
+        distances = np.sqrt(
+            (
+                (
+                    scaled_positions[indices, np.newaxis, :]
+                    - scaled_positions[np.newaxis, indices, :]
+                )
+                ** 2
+            ).sum(axis=2)
+        )
+        lcoe = results[LCOE].values[indices]
+        for row in range(len(indices)):
+            neighbours = [
+                neighbour
+                for neighbour in np.argsort(distances[row], kind="stable")
+                if distances[row, neighbour] > 0
+            ][:number_of_neighbours]
+            for neighbour in neighbours:
+                gradient = abs(lcoe[row] - lcoe[neighbour]) / distances[row, neighbour]
+                midpoint = np.floor(
+                    (positions[indices[row]] + positions[indices[neighbour]]) / 2 + 0.5
+                ).astype(int)
+                candidates.append((gradient, tuple(midpoint)))
+
+    sampled_positions = set(map(tuple, positions))
+    new_positions = []
+    for _, position in sorted(candidates, key=lambda candidate: -candidate[0]):
+        if len(new_positions) >= number_of_samples:
+            break
+        if position not in sampled_positions:
+            sampled_positions.add(position)
+            new_positions.append(position)
+
+    return [
+        get_sample(sensitivity_array_dict, keys, position) for position in new_positions
+    ]
+
+
+def get_refined_experiments(
+    settings,
+    parameters_sensitivity,
+    sensitivity_array_dict,
+    universal_parameters,
+    project_site_s,
+    number_of_project_sites,
+    result_store,
+    refinement_round,
+):
+    """
+    Generates SENSITIVITY_REFINEMENT_SIZE additional experiments where the LCOE of the
+    sampled experiments changes the most (see get_refinement_samples()).
+    Called with the results of the sampled experiments, the other parameters are set in get().
+
+    Parameters
+    ----------
+    settings: dict
+        Contains experiment's settings, TOTAL_NUMBER_OF_EXPERIMENTS is increased
+        by the number of additional experiments
+
+    result_store: dict of lists
+        Results of the simulated experiments, see A1.initialize_result_store()
+
+    refinement_round: int
+        Number of the call, experiments are only refined once
+
+    Other parameters see get_sample_experiments() and process_experiments().
+
+    Returns
+    -------
+    sensitivitiy_experiment_s: generator or None
+        Yields number and settings of each additional experiment, see process_experiments().
+        None if the experiments were refined already.
+    """
+    if refinement_round > 1:
+        return None
+
+    sample_s = get_refinement_samples(
+        sensitivity_array_dict,
+        result_store,
+        int(settings[SENSITIVITY_REFINEMENT_SIZE]),
+    )
+    first_experiment_number = settings[TOTAL_NUMBER_OF_EXPERIMENTS] + 1
+    settings.update(
+        {
+            TOTAL_NUMBER_OF_EXPERIMENTS: settings[TOTAL_NUMBER_OF_EXPERIMENTS]
+            + len(sample_s) * number_of_project_sites
+        }
+    )
+    logging.info(
+        "Refining the sampled sensitivity experiments where the LCOE changes the most: "
+        + str(len(sample_s) * number_of_project_sites)
+        + " additional sensitivity_experiment_s will be performed for each case."
+    )
+    return process_experiments(
+        get_sample_experiments(
+            sample_s, universal_parameters, project_site_s, first_experiment_number
+        ),
+        settings,
+        parameters_sensitivity,
+        sensitivity_array_dict,
+        number_of_project_sites,
+    )
+
+
+def get_surrogate_experiments(
+    settings,
+    parameters_sensitivity,
+    sensitivity_array_dict,
+    universal_parameters,
+    project_site_s,
+    number_of_project_sites,
+    result_store,
+    refinement_round,
+):
+    """
+    Chooses the experiments simulated next with the surrogate model (SURROGATE_MODEL).
+
+    For each project site and case, a surrogate model is trained on the results of the simulated
+    experiments and predicts the results of all other combinations of sensitivity values
+    (see C1.predict_unsolved()). Up to SURROGATE_BATCH_SIZE combinations with a relative
+    uncertainty of the predicted LCOE above SURROGATE_TOLERANCE are simulated next, the most
+    uncertain first. If all predictions are certain, the predictions are added to the results
+    (see store_surrogate_predictions()) and no further experiments are simulated.
+    Called with the results of all simulated experiments, the other parameters are set in get().
+
+    Parameters
+    ----------
+    settings: dict
+        Contains experiment's settings, TOTAL_NUMBER_OF_EXPERIMENTS is increased
+        by the number of additional experiments
+
+    result_store: dict of lists
+        Results of the simulated experiments, see A1.initialize_result_store()
+
+    refinement_round: int
+        Number of the call, only used for logging
+
+    Other parameters see get_sample_experiments() and process_experiments().
+
+    Returns
+    -------
+    sensitivitiy_experiment_s: generator or None
+        Yields number and settings of each additional experiment, see process_experiments().
+        None if all predictions are certain.
+    """
+    keys = [key for key in sensitivity_array_dict.keys()]
+    lengths = np.array([len(sensitivity_array_dict[key]) for key in keys], dtype=int)
+    scale = np.maximum(lengths - 1, 1)
+    grid_positions = np.array(
+        list(itertools.product(*[range(length) for length in lengths])), dtype=int
+    ).reshape(-1, len(keys))
+
+    results = pd.DataFrame(
+        {
+            key: result_store[key]
+            for key in [CASE, PROJECT_SITE_NAME, SURROGATE_STATUS]
+            + keys
+            + surrogate.SURROGATE_PARAMETERS
+        }
+    )
+    results = results[results[SURROGATE_STATUS] == SOLVED].reset_index(drop=True)
+    positions = get_grid_positions(sensitivity_array_dict, results)
+    values = (
+        results[surrogate.SURROGATE_PARAMETERS]
+        .apply(pd.to_numeric, errors="coerce")
+        .values
+    )
+    case_s = list(dict.fromkeys(results[CASE]))
+
+    prediction_s = {}
+    uncertain_experiment_s = []
+    for project_site in project_site_s:
+        site_rows = (results[PROJECT_SITE_NAME] == project_site).values
+        solved = set(map(tuple, positions[site_rows]))
+        unsolved_positions = np.array(
+            [position for position in grid_positions if tuple(position) not in solved],
+            dtype=int,
+        ).reshape(-1, len(keys))
+        if len(unsolved_positions) == 0:
+            continue
+
+        relative_uncertainty = np.zeros(len(unsolved_positions))
+        for case in case_s:
+            rows = site_rows & (results[CASE] == case).values
+            mean, case_uncertainty = surrogate.predict_unsolved(
+                positions[rows] / scale, values[rows], unsolved_positions / scale
+            )
+            prediction_s.update({(project_site, case): (unsolved_positions, mean)})
+            relative_uncertainty = np.maximum(relative_uncertainty, case_uncertainty)
+
+        for position, uncertainty in zip(unsolved_positions, relative_uncertainty):
+            if uncertainty > settings[SURROGATE_TOLERANCE]:
+                uncertain_experiment_s.append((uncertainty, project_site, position))
+
+    if len(uncertain_experiment_s) == 0:
+        store_surrogate_predictions(
+            settings,
+            sensitivity_array_dict,
+            number_of_project_sites,
+            result_store,
+            case_s,
+            prediction_s,
+        )
+        return None
+
+    site_sample_s = [
+        (project_site, get_sample(sensitivity_array_dict, keys, position))
+        for _, project_site, position in sorted(
+            uncertain_experiment_s, key=lambda experiment: -experiment[0]
+        )[: int(settings[SURROGATE_BATCH_SIZE])]
+    ]
+    first_experiment_number = settings[TOTAL_NUMBER_OF_EXPERIMENTS] + 1
+    settings.update(
+        {
+            TOTAL_NUMBER_OF_EXPERIMENTS: settings[TOTAL_NUMBER_OF_EXPERIMENTS]
+            + len(site_sample_s)
+        }
+    )
+    logging.info(
+        "Surrogate model, round "
+        + str(refinement_round)
+        + ": Predictions of "
+        + str(len(uncertain_experiment_s))
+        + " sensitivity_experiment_s are uncertain, "
+        + str(len(site_sample_s))
+        + " of them will be performed for each case."
+    )
+    return process_experiments(
+        get_site_sample_experiments(
+            site_sample_s, universal_parameters, project_site_s, first_experiment_number
+        ),
+        settings,
+        parameters_sensitivity,
+        sensitivity_array_dict,
+        number_of_project_sites,
+    )
+
+
+def store_surrogate_predictions(
+    settings,
+    sensitivity_array_dict,
+    number_of_project_sites,
+    result_store,
+    case_s,
+    prediction_s,
+):
+    """
+    Adds the predictions of the surrogate model to the results and appends them to the results
+    csv. Predicted results are marked with SURROGATE_STATUS, only the SURROGATE_PARAMETERS
+    of C1 are predicted.
+
+    Parameters
+    ----------
+    settings: dict
+        Contains experiment's settings
+
+    sensitivity_array_dict: dict
+        Contains element for SE and values for the corresponding sensitivities
+
+    number_of_project_sites: int
+
+    result_store: dict of lists
+        Results of the simulated experiments, extended in place
+
+    case_s: list
+        Names of the simulated cases in simulation order
+
+    prediction_s: dict
+        Positions and predicted results of the experiments that are not simulated,
+        for each project site and case {(project_site, case): (positions, mean)}
+    """
+    keys = [key for key in sensitivity_array_dict.keys()]
+    first_row = len(result_store[CASE])
+    number_of_predictions = 0
+    for project_site in dict.fromkeys(
+        [project_site for (project_site, _) in prediction_s.keys()]
+    ):
+        unsolved_positions, _ = prediction_s[(project_site, case_s[0])]
+        for row, position in enumerate(unsolved_positions):
+            experiment = get_sample(sensitivity_array_dict, keys, position)
+            experiment.update(
+                {
+                    PROJECT_SITE_NAME: project_site,
+                    SURROGATE_STATUS: PREDICTED,
+                    COMMENTS: "Predicted by surrogate model",
+                }
+            )
+            experiment_name(experiment, sensitivity_array_dict, number_of_project_sites)
+            number_of_predictions += 1
+            for case in case_s:
+                _, mean = prediction_s[(project_site, case)]
+                predicted_results = {CASE: case, FILENAME: None}
+                predicted_results.update(
+                    {
+                        parameter: float(value)
+                        for parameter, value in zip(
+                            surrogate.SURROGATE_PARAMETERS, mean[row]
                         )
+                    }
+                )
+                helpers.store_result_matrix(result_store, experiment, predicted_results)
 
-    total_number_of_experiments = experiment_number
-    return sensitivity_experiment_s, total_number_of_experiments
+    helpers.write_result_rows(
+        result_store,
+        first_row,
+        settings[OUTPUT_FOLDER] + "/" + settings[OUTPUT_FILE] + ".csv",
+    )
+    logging.info(
+        "Results of "
+        + str(number_of_predictions)
+        + " sensitivity_experiment_s are predicted by the surrogate model."
+    )
+    return
 
 
 def project_site_experiments(sensitivity_experiment_s, project_sites):
@@ -910,15 +1903,53 @@ def project_site_experiments(sensitivity_experiment_s, project_sites):
         # ! do not use a key two times or in sensitivity_bounds as well, as it will be overwritten by new information
         number_of_experiments += 1
         experiment_s.update(
-            {number_of_experiments: deepcopy(sensitivity_experiment_s[experiment])}
+            {
+                number_of_experiments: share_timeseries(
+                    sensitivity_experiment_s[experiment]
+                )
+            }
         )
         experiment_s[number_of_experiments].update(
-            deepcopy(project_sites[experiment_s[experiment][PROJECT_SITE_NAME]])
+            share_timeseries(project_sites[experiment_s[experiment][PROJECT_SITE_NAME]])
         )
 
     return experiment_s, number_of_experiments
 
 
+def share_timeseries(parameters):
+    """
+    Copies the parameters of a project site or experiment, except for its timeseries.
+
+    Timeseries are not copied but referenced by all experiments of a project site.
+    They are made read-only, so that an experiment changing its timeseries in place
+    raises an error instead of changing the timeseries of all other experiments.
+
+    Parameters
+    ----------
+    parameters: dict
+        Parameters of a project site or sensitivity experiment, including timeseries
+
+    Returns
+    -------
+    shared_parameters: dict
+        Copied scalar parameters and shared timeseries
+    """
+    shared_parameters = {}
+    for key, value in parameters.items():
+        if isinstance(value, pd.Series):
+            value.values.setflags(write=False)
+            shared_parameters.update({key: value})
+        elif isinstance(value, np.ndarray):
+            value.setflags(write=False)
+            shared_parameters.update({key: value})
+        elif isinstance(value, pd.Index):
+            # pandas indices are immutable
+            shared_parameters.update({key: value})
+        else:
+            shared_parameters.update({key: deepcopy(value)})
+    return shared_parameters
+
+
 def experiment_name(experiment, sensitivity_array_dict, number_of_project_sites):
     """
     Generates names for all experiments
@@ -1389,6 +2420,25 @@ def overall_results_title(settings, number_of_project_sites, sensitivity_array_d
             sort=False,
         )
 
+    # Distribution of the results of blackout ensembles
+    if settings[BLACKOUT_ENSEMBLE_SIZE] > 1:
+        ensemble_columns = [BLACKOUT_REALIZATIONS]
+        for parameter in central_grid.ENSEMBLE_PARAMETERS:
+            ensemble_columns.extend([parameter + SUFFIX_P10, parameter + SUFFIX_P90])
+        title_overall_results = pd.concat(
+            [title_overall_results, pd.DataFrame(columns=ensemble_columns)],
+            axis=1,
+            sort=False,
+        )
+
+    # Results of the surrogate model are either simulated or predicted
+    if settings[SURROGATE_MODEL] is True:
+        title_overall_results = pd.concat(
+            [title_overall_results, pd.DataFrame(columns=[SURROGATE_STATUS])],
+            axis=1,
+            sort=False,
+        )
+
     title_overall_results = pd.concat(
         [
             title_overall_results,
@@ -12,6 +12,14 @@ import src.D1_economic_functions as economics
 from src.constants import (
     PERFORM_SIMULATION,
     BASED_ON_CASE,
+    CAPACITY_STORAGE_KWH,
+    CAPACITY_GENSET_KW,
+    CAPACITY_PV_KWP,
+    CAPACITY_PCC_CONSUMPTION_KW,
+    CAPACITY_PCC_FEEDING_KW,
+    CAPACITY_WIND_KW,
+    CAPACITY_RECTIFIER_AC_DC_KW,
+    CAPACITY_INVERTER_DC_AC_KW,
     ANNUITY_FACTOR,
     CRF,
     PV,
@@ -57,6 +65,8 @@ from src.constants import (
     WIND_GENERATION_PER_KW,
     GRID_AVAILABILITY,
     DEMAND_DC,
+    DEMAND_AC_SCALING_FACTOR,
+    DEMAND_DC_SCALING_FACTOR,
     LP_FILE_FOR_ONLY_3_TIMESTEPS,
     RECTIFIER_AC_DC_EFFICIENCY,
     INVERTER_DC_AC_EFFICIENCY,
@@ -77,6 +87,7 @@ def list_of_cases(case_definitions):
     Creates a list for the simulation order of different cases.
 
     Cases that provide the base capacities for other cases should be simulated first.
+    The order is a topological order of the case dependencies defined by get_case_dependencies().
 
     Parameters
     ----------
@@ -90,36 +101,131 @@ def list_of_cases(case_definitions):
 
     """
 
+    simulated_cases = [
+        case
+        for case in case_definitions
+        if case_definitions[case][PERFORM_SIMULATION] is True
+    ]
+
+    if len(simulated_cases) == 0:
+        logging.error(
+            f"No cases defined to be simulated. \n "
+            f"Did you set any {PERFORM_SIMULATION}=True in excel template, tab CASE_DEFINITIONS?"
+        )
+        sys.exit()
+
+    case_dependencies = get_case_dependencies(case_definitions)
+
+    logging.info(
+        "Base capacities provided by: "
+        + ", ".join(
+            [case for case in simulated_cases if len(case_dependencies[case]) == 0]
+        )
+    )
+
+    # Certain ORDER of simulation: First base capacities are optimized,
+    # then all cases of which the base cases are already in the list
     case_list = []
-    str_cases_simulated = ""
-    # Certain ORDER of simulation: First base capacities are optimized
-    for case in case_definitions:
-        if (
-            case_definitions[case][PERFORM_SIMULATION] is True
-            and case_definitions[case][BASED_ON_CASE] is False
-        ):
-            case_list.append(case)
-            str_cases_simulated += case + ", "
-
-    logging.info("Base capacities provided by: " + str_cases_simulated[:-2])
-
-    for case in case_definitions:
-        if (
-            case_definitions[case][PERFORM_SIMULATION] is True
-            and case_definitions[case][BASED_ON_CASE] is True
-        ):
-            case_list.append(case)
-            str_cases_simulated += case + ", "
-
-        if len(case_list) == 0:
+    while len(case_list) < len(simulated_cases):
+        case_list.extend(
+            [
+                case
+                for case in simulated_cases
+                if case not in case_list
+                and all(base_case in case_list for base_case in case_dependencies[case])
+            ]
+        )
+
+    logging.info("All simulated cases: " + ", ".join(case_list))
+    return case_list
+
+
+def get_case_dependencies(case_definitions):
+    """
+    Builds the dependency graph of the simulated cases.
+
+    A case depends on another case if one of its capacities refers to the name of the other case,
+    eg. CAPACITY_PV_KWP = "base_oem". The referenced case then has to be simulated first,
+    so that its optimized capacities can be used. Cases without dependencies can be simulated
+    independently of each other.
+
+    Parameters
+    ----------
+    case_definitions: dict of dicts
+        Determines the generation/storage parameters for the chosen case
+
+    Returns
+    -------
+    case_dependencies: dict of lists
+        Cases each simulated case is based on, eg. {"base_oem": [], "offgrid_fix": ["base_oem"]}
+    """
+
+    simulated_cases = [
+        case
+        for case in case_definitions
+        if case_definitions[case][PERFORM_SIMULATION] is True
+    ]
+
+    # Capacities of a case definition that can refer to another case (see F.update_dict)
+    list_base_capacities = [
+        CAPACITY_STORAGE_KWH,
+        CAPACITY_GENSET_KW,
+        CAPACITY_PV_KWP,
+        CAPACITY_PCC_CONSUMPTION_KW,
+        CAPACITY_PCC_FEEDING_KW,
+        CAPACITY_WIND_KW,
+        CAPACITY_RECTIFIER_AC_DC_KW,
+        CAPACITY_INVERTER_DC_AC_KW,
+    ]
+
+    case_dependencies = {}
+    for case in simulated_cases:
+        base_cases = []
+        for capacity in list_base_capacities:
+            entry = case_definitions[case].get(capacity, None)
+            if (
+                isinstance(entry, str)
+                and entry in case_definitions
+                and entry not in base_cases
+            ):
+                base_cases.append(entry)
+        for base_case in base_cases:
+            if base_case not in simulated_cases:
+                logging.error(
+                    f"Case {case} is based on case {base_case}, which is not simulated. \n "
+                    f"Please set {PERFORM_SIMULATION}=True for {base_case} in excel template, tab CASE_DEFINITIONS."
+                )
+                sys.exit()
+        if len(base_cases) > 0 and case_definitions[case][BASED_ON_CASE] is False:
+            logging.warning(
+                f"Case {case} refers to the capacities of {', '.join(base_cases)}, "
+                f"but {BASED_ON_CASE}=False. It is simulated after these cases nevertheless."
+            )
+        case_dependencies.update({case: base_cases})
+
+    # Check for circular references, which could never be simulated
+    resolved_cases = []
+    while len(resolved_cases) < len(simulated_cases):
+        resolvable_cases = [
+            case
+            for case in simulated_cases
+            if case not in resolved_cases
+            and all(
+                base_case in resolved_cases for base_case in case_dependencies[case]
+            )
+        ]
+        if len(resolvable_cases) == 0:
             logging.error(
-                f"No cases defined to be simulated. \n "
-                f"Did you set any {PERFORM_SIMULATION}=True in excel template, tab CASE_DEFINITIONS?"
+                "Circular references between the capacities of the cases "
+                + ", ".join(
+                    [case for case in simulated_cases if case not in resolved_cases]
+                )
+                + ". Please check tab CASE_DEFINITIONS of the excel template."
             )
             sys.exit()
+        resolved_cases.extend(resolvable_cases)
 
-    logging.info("All simulated cases: " + str_cases_simulated[:-2])
-    return case_list
+    return case_dependencies
 
 
 def economic_values(experiment):
@@ -229,337 +335,332 @@ def economic_values(experiment):
     return experiment
 
 
-def add_timeseries(experiment_s):
+def get_date_time_index(experiment):
     """
-    Update experiments and add longest date_time_index to settings
+    Adds the end of the evaluated timeframe and its date_time_index to an experiment
 
     Parameters
     ----------
-    experiment_s: dict
-        Contains different experiments
+    experiment: dict
+        Sensitivity experiment
 
     Returns
     -------
-    max_date_time_index: pandas.DatetimeIndex
+    date_time_index: pandas.DatetimeIndex
         Datetime from start until end of the experiment
-
-    max_evaluated_days: int
-        Number of days evaluated in the experiment
     """
+    experiment.update(
+        {
+            TIME_END: experiment[TIME_START]
+            + pd.DateOffset(days=experiment[EVALUATED_DAYS])
+            - pd.DateOffset(hours=1)
+        }
+    )
+    # experiment.update({'time_end': experiment['time_start']+ pd.DateOffset(hours=2)})
+    experiment.update(
+        {
+            DATE_TIME_INDEX: pd.date_range(
+                start=experiment[TIME_START],
+                end=experiment[TIME_END],
+                freq=experiment[TIME_FREQUENCY],
+            )
+        }
+    )
+    return experiment[DATE_TIME_INDEX]
 
-    entries = 0
-    longest = ""
-
-    for experiment in experiment_s:
-        experiment_s[experiment].update(
-            {
-                TIME_END: experiment_s[experiment][TIME_START]
-                + pd.DateOffset(days=experiment_s[experiment][EVALUATED_DAYS])
-                - pd.DateOffset(hours=1)
-            }
-        )
-        # experiment_s[experiment].update({'time_end': experiment_s[experiment]['time_start']+ pd.DateOffset(hours=2)})
-        experiment_s[experiment].update(
-            {
-                DATE_TIME_INDEX: pd.date_range(
-                    start=experiment_s[experiment][TIME_START],
-                    end=experiment_s[experiment][TIME_END],
-                    freq=experiment_s[experiment][TIME_FREQUENCY],
-                )
-            }
-        )
-
-        if len(experiment_s[experiment][DATE_TIME_INDEX]) > entries:
-            entries = len(experiment_s[experiment][DATE_TIME_INDEX])
-            longest = experiment
-
-    max_date_time_index = experiment_s[longest][DATE_TIME_INDEX]
-    max_evaluated_days = experiment_s[longest][EVALUATED_DAYS]
 
-    for experiment in experiment_s:
-        index = experiment_s[experiment][DATE_TIME_INDEX]
-        if experiment_s[experiment][FILE_INDEX] != None:
-            if DEMAND_AC in experiment_s[experiment]:
-                year_timeseries_in_file = (
-                    experiment_s[experiment][DEMAND_AC].index[0].year
-                )
-            else:
-                year_timeseries_in_file = (
-                    experiment_s[experiment][DEMAND_DC].index[0].year
-                )
+def add_timeseries(experiment):
+    """
+    Adds the timeseries of the evaluated timeframe to an experiment.
+    The longest date_time_index of all experiments is determined beforehand, see C.get_max_date_time_index().
 
-            if (
-                experiment_s[experiment][DATE_TIME_INDEX][0].year
-                != year_timeseries_in_file
-            ):
-                file_index = [
-                    item + pd.DateOffset(year=index[0].year) for item in index
-                ]
-                # shift to fileindex of data sets to analysed year
-                demand_ac = pd.Series(
-                    experiment_s[experiment][DEMAND_AC].values,
-                    index=experiment_s[experiment][FILE_INDEX],
-                )
-                demand_dc = pd.Series(
-                    experiment_s[experiment][DEMAND_DC].values,
-                    index=experiment_s[experiment][FILE_INDEX],
-                )
-                pv_generation_per_kWp = pd.Series(
-                    experiment_s[experiment][PV_GENERATION_PER_KWP].values,
-                    index=experiment_s[experiment][FILE_INDEX],
-                )
-                wind_generation_per_kW = pd.Series(
-                    experiment_s[experiment][WIND_GENERATION_PER_KW].values,
-                    index=experiment_s[experiment][FILE_INDEX],
-                )
-                # from provided data use only analysed timeframe
-                experiment_s[experiment].update({DEMAND_PROFILE_AC: demand_ac[index]})
-                experiment_s[experiment].update({DEMAND_PROFILE_DC: demand_dc[index]})
-                experiment_s[experiment].update(
-                    {PV_GENERATION_PER_KWP: pv_generation_per_kWp[index]}
-                )
-                experiment_s[experiment].update(
-                    {WIND_GENERATION_PER_KW: wind_generation_per_kW[index]}
-                )
+    Parameters
+    ----------
+    experiment: dict
+        Sensitivity experiment including the timeseries of its project site
 
-                if GRID_AVAILABILITY in experiment_s[experiment].keys():
-                    grid_availability = pd.Series(
-                        experiment_s[experiment][GRID_AVAILABILITY].values,
-                        index=experiment_s[experiment][FILE_INDEX],
-                    )
-                    experiment_s[experiment].update(
-                        {GRID_AVAILABILITY: grid_availability[index]}
-                    )
+    Returns
+    -------
+    """
+    get_date_time_index(experiment)
 
-            else:
-                # file index is date time index, no change necessary
-                pass
+    index = experiment[DATE_TIME_INDEX]
+    if experiment[FILE_INDEX] != None:
+        if DEMAND_AC in experiment:
+            year_timeseries_in_file = experiment[DEMAND_AC].index[0].year
+        else:
+            year_timeseries_in_file = experiment[DEMAND_DC].index[0].year
 
-        elif experiment_s[experiment][FILE_INDEX] == None:
-            # limit based on index
-            experiment_s[experiment].update(
-                {
-                    DEMAND_PROFILE_AC: pd.Series(
-                        experiment_s[experiment][DEMAND_AC][0 : len(index)].values,
-                        index=index,
-                    )
-                }
+        if experiment[DATE_TIME_INDEX][0].year != year_timeseries_in_file:
+            file_index = [item + pd.DateOffset(year=index[0].year) for item in index]
+            # shift to fileindex of data sets to analysed year
+            demand_ac = pd.Series(
+                experiment[DEMAND_AC].values, index=experiment[FILE_INDEX],
             )
-            experiment_s[experiment].update(
-                {
-                    DEMAND_PROFILE_DC: pd.Series(
-                        experiment_s[experiment][DEMAND_DC][0 : len(index)].values,
-                        index=index,
-                    )
-                }
+            demand_dc = pd.Series(
+                experiment[DEMAND_DC].values, index=experiment[FILE_INDEX],
+            )
+            pv_generation_per_kWp = pd.Series(
+                experiment[PV_GENERATION_PER_KWP].values, index=experiment[FILE_INDEX],
             )
-            experiment_s[experiment].update(
+            wind_generation_per_kW = pd.Series(
+                experiment[WIND_GENERATION_PER_KW].values, index=experiment[FILE_INDEX],
+            )
+            # from provided data use only analysed timeframe
+            experiment.update(
                 {
-                    PV_GENERATION_PER_KWP: pd.Series(
-                        experiment_s[experiment][PV_GENERATION_PER_KWP][
-                            0 : len(index)
-                        ].values,
-                        index=index,
+                    DEMAND_PROFILE_AC: scaled(
+                        demand_ac[index], experiment[DEMAND_AC_SCALING_FACTOR],
                     )
                 }
             )
-            experiment_s[experiment].update(
+            experiment.update(
                 {
-                    WIND_GENERATION_PER_KW: pd.Series(
-                        experiment_s[experiment][WIND_GENERATION_PER_KW][
-                            0 : len(index)
-                        ].values,
-                        index=index,
+                    DEMAND_PROFILE_DC: scaled(
+                        demand_dc[index], experiment[DEMAND_DC_SCALING_FACTOR],
                     )
                 }
             )
+            experiment.update({PV_GENERATION_PER_KWP: pv_generation_per_kWp[index]})
+            experiment.update({WIND_GENERATION_PER_KW: wind_generation_per_kW[index]})
 
-            if GRID_AVAILABILITY in experiment_s[experiment].keys():
-                experiment_s[experiment].update(
-                    {
-                        GRID_AVAILABILITY: pd.Series(
-                            experiment_s[experiment][GRID_AVAILABILITY][
-                                0 : len(index)
-                            ].values,
-                            index=index,
-                        )
-                    }
+            if GRID_AVAILABILITY in experiment.keys():
+                grid_availability = pd.Series(
+                    experiment[GRID_AVAILABILITY].values, index=experiment[FILE_INDEX],
                 )
+                experiment.update({GRID_AVAILABILITY: grid_availability[index]})
 
         else:
-            logging.warning(
-                f"Project site value {FILE_INDEX} neither None not non-None."
-            )
-
-        # Used for generation of lp file with only 3-timesteps = Useful to verify optimized equations
-        if experiment_s[experiment][LP_FILE_FOR_ONLY_3_TIMESTEPS] is True:
-            experiment_s[experiment].update(
-                {
-                    TIME_START: experiment_s[experiment][TIME_START]
-                    + pd.DateOffset(hours=15)
-                }
-            )
-            experiment_s[experiment].update(
-                {
-                    TIME_END: experiment_s[experiment][TIME_START]
-                    + pd.DateOffset(hours=2)
-                }
-            )
-            experiment_s[experiment].update(
-                {
-                    DATE_TIME_INDEX: pd.date_range(
-                        start=experiment_s[experiment][TIME_START],
-                        end=experiment_s[experiment][TIME_END],
-                        freq=experiment_s[experiment][TIME_FREQUENCY],
-                    )
-                }
-            )
+            # file index is date time index, no change necessary
+            pass
 
-            index = experiment_s[experiment][DATE_TIME_INDEX]
-            experiment_s[experiment].update(
-                {DEMAND_PROFILE_AC: experiment_s[experiment][DEMAND_PROFILE_AC][index]}
-            )
-            experiment_s[experiment].update(
-                {DEMAND_PROFILE_DC: experiment_s[experiment][DEMAND_PROFILE_DC][index]}
-            )
-            experiment_s[experiment].update(
-                {
-                    PV_GENERATION_PER_KWP: experiment_s[experiment][
-                        PV_GENERATION_PER_KWP
-                    ][index]
-                }
-            )
-            experiment_s[experiment].update(
-                {
-                    WIND_GENERATION_PER_KW: experiment_s[experiment][
-                        WIND_GENERATION_PER_KW
-                    ][index]
-                }
-            )
-            if GRID_AVAILABILITY in experiment_s[experiment].keys():
-                experiment_s[experiment].update(
-                    {
-                        GRID_AVAILABILITY: experiment_s[experiment][GRID_AVAILABILITY][
-                            index
-                        ]
-                    }
-                )
-
-        experiment_s[experiment].update(
+    elif experiment[FILE_INDEX] == None:
+        # limit based on index, the profiles are views on the shared timeseries unless scaled
+        experiment.update(
             {
-                ACCUMULATED_PROFILE_AC_SIDE: experiment_s[experiment][DEMAND_PROFILE_AC]
-                + experiment_s[experiment][DEMAND_PROFILE_DC]
-                / experiment_s[experiment][RECTIFIER_AC_DC_EFFICIENCY]
+                DEMAND_PROFILE_AC: scaled(
+                    pd.Series(
+                        experiment[DEMAND_AC][0 : len(index)].values, index=index,
+                    ),
+                    experiment[DEMAND_AC_SCALING_FACTOR],
+                )
             }
         )
-
-        experiment_s[experiment].update(
+        experiment.update(
             {
-                ACCUMULATED_PROFILE_DC_SIDE: experiment_s[experiment][DEMAND_PROFILE_AC]
-                / experiment_s[experiment][INVERTER_DC_AC_EFFICIENCY]
-                + experiment_s[experiment][DEMAND_PROFILE_DC]
+                DEMAND_PROFILE_DC: scaled(
+                    pd.Series(
+                        experiment[DEMAND_DC][0 : len(index)].values, index=index,
+                    ),
+                    experiment[DEMAND_DC_SCALING_FACTOR],
+                )
             }
         )
-        experiment_s[experiment].update(
+        experiment.update(
             {
-                TOTAL_DEMAND_AC: sum(experiment_s[experiment][DEMAND_PROFILE_AC]),
-                PEAK_DEMAND_AC: max(experiment_s[experiment][DEMAND_PROFILE_AC]),
-                TOTAL_DEMAND_DC: sum(experiment_s[experiment][DEMAND_PROFILE_DC]),
-                PEAK_DEMAND_DC: max(experiment_s[experiment][DEMAND_PROFILE_DC]),
-                PEAK_PV_GENERATION_PER_KWP: max(
-                    experiment_s[experiment][PV_GENERATION_PER_KWP]
-                ),
-                PEAK_WIND_GENERATION_PER_KW: max(
-                    experiment_s[experiment][WIND_GENERATION_PER_KW]
-                ),
+                PV_GENERATION_PER_KWP: pd.Series(
+                    experiment[PV_GENERATION_PER_KWP][0 : len(index)].values,
+                    index=index,
+                )
             }
         )
-
-        experiment_s[experiment].update(
+        experiment.update(
             {
-                MEAN_DEMAND_AC: experiment_s[experiment][TOTAL_DEMAND_AC]
-                / len(experiment_s[experiment][DATE_TIME_INDEX]),
-                MEAN_DEMAND_DC: experiment_s[experiment][TOTAL_DEMAND_DC]
-                / len(experiment_s[experiment][DATE_TIME_INDEX]),
+                WIND_GENERATION_PER_KW: pd.Series(
+                    experiment[WIND_GENERATION_PER_KW][0 : len(index)].values,
+                    index=index,
+                )
             }
         )
 
-        if experiment_s[experiment][MEAN_DEMAND_AC] > 0:
-            experiment_s[experiment].update(
+        if GRID_AVAILABILITY in experiment.keys():
+            experiment.update(
                 {
-                    PEAK_MEAN_DEMAND_RATIO_AC: experiment_s[experiment][PEAK_DEMAND_AC]
-                    / experiment_s[experiment][MEAN_DEMAND_AC]
+                    GRID_AVAILABILITY: pd.Series(
+                        experiment[GRID_AVAILABILITY][0 : len(index)].values,
+                        index=index,
+                    )
                 }
             )
-        else:
-            experiment_s[experiment].update({PEAK_MEAN_DEMAND_RATIO_AC: 0})
 
-        if experiment_s[experiment][MEAN_DEMAND_DC] > 0:
-            experiment_s[experiment].update(
-                {
-                    PEAK_MEAN_DEMAND_RATIO_DC: experiment_s[experiment][PEAK_DEMAND_DC]
-                    / experiment_s[experiment][MEAN_DEMAND_DC]
-                }
-            )
-        else:
-            experiment_s[experiment].update({PEAK_MEAN_DEMAND_RATIO_DC: 0})
+    else:
+        logging.warning(f"Project site value {FILE_INDEX} neither None not non-None.")
 
-        # Used for estimation of capacities using "peak demand"
-        experiment_s[experiment].update(
+    # Used for generation of lp file with only 3-timesteps = Useful to verify optimized equations
+    if experiment[LP_FILE_FOR_ONLY_3_TIMESTEPS] is True:
+        experiment.update(
+            {TIME_START: experiment[TIME_START] + pd.DateOffset(hours=15)}
+        )
+        experiment.update({TIME_END: experiment[TIME_START] + pd.DateOffset(hours=2)})
+        experiment.update(
             {
-                ABS_PEAK_DEMAND_AC_SIDE: max(
-                    experiment_s[experiment][ACCUMULATED_PROFILE_AC_SIDE]
+                DATE_TIME_INDEX: pd.date_range(
+                    start=experiment[TIME_START],
+                    end=experiment[TIME_END],
+                    freq=experiment[TIME_FREQUENCY],
                 )
             }
         )
 
-        # Warnings
-        if (
-            experiment_s[experiment][TOTAL_DEMAND_AC]
-            == 0 + experiment_s[experiment][TOTAL_DEMAND_DC]
-            == 0
-        ):
-            logging.warning(
-                "No demand in evaluated timesteps at project site "
-                + experiment_s[experiment][PROJECT_SITE_NAME]
-                + " - simulation will crash."
-            )
-        if experiment_s[experiment][PEAK_PV_GENERATION_PER_KWP] == 0:
-            logging.info(
-                "No pv generation in evaluated timesteps at project site "
-                + experiment_s[experiment][PROJECT_SITE_NAME]
-                + "."
-            )
-        if experiment_s[experiment][PEAK_WIND_GENERATION_PER_KW] == 0:
-            logging.info(
-                "No wind generation in evaluated timesteps at project site "
-                + experiment_s[experiment][PROJECT_SITE_NAME]
-                + "."
-            )
+        index = experiment[DATE_TIME_INDEX]
+        experiment.update({DEMAND_PROFILE_AC: experiment[DEMAND_PROFILE_AC][index]})
+        experiment.update({DEMAND_PROFILE_DC: experiment[DEMAND_PROFILE_DC][index]})
+        experiment.update(
+            {PV_GENERATION_PER_KWP: experiment[PV_GENERATION_PER_KWP][index]}
+        )
+        experiment.update(
+            {WIND_GENERATION_PER_KW: experiment[WIND_GENERATION_PER_KW][index]}
+        )
+        if GRID_AVAILABILITY in experiment.keys():
+            experiment.update({GRID_AVAILABILITY: experiment[GRID_AVAILABILITY][index]})
+
+    experiment.update(
+        {
+            ACCUMULATED_PROFILE_AC_SIDE: experiment[DEMAND_PROFILE_AC]
+            + experiment[DEMAND_PROFILE_DC] / experiment[RECTIFIER_AC_DC_EFFICIENCY]
+        }
+    )
+
+    experiment.update(
+        {
+            ACCUMULATED_PROFILE_DC_SIDE: experiment[DEMAND_PROFILE_AC]
+            / experiment[INVERTER_DC_AC_EFFICIENCY]
+            + experiment[DEMAND_PROFILE_DC]
+        }
+    )
+    experiment.update(
+        {
+            TOTAL_DEMAND_AC: sum(experiment[DEMAND_PROFILE_AC]),
+            PEAK_DEMAND_AC: max(experiment[DEMAND_PROFILE_AC]),
+            TOTAL_DEMAND_DC: sum(experiment[DEMAND_PROFILE_DC]),
+            PEAK_DEMAND_DC: max(experiment[DEMAND_PROFILE_DC]),
+            PEAK_PV_GENERATION_PER_KWP: max(experiment[PV_GENERATION_PER_KWP]),
+            PEAK_WIND_GENERATION_PER_KW: max(experiment[WIND_GENERATION_PER_KW]),
+        }
+    )
+
+    experiment.update(
+        {
+            MEAN_DEMAND_AC: experiment[TOTAL_DEMAND_AC]
+            / len(experiment[DATE_TIME_INDEX]),
+            MEAN_DEMAND_DC: experiment[TOTAL_DEMAND_DC]
+            / len(experiment[DATE_TIME_INDEX]),
+        }
+    )
+
+    if experiment[MEAN_DEMAND_AC] > 0:
+        experiment.update(
+            {
+                PEAK_MEAN_DEMAND_RATIO_AC: experiment[PEAK_DEMAND_AC]
+                / experiment[MEAN_DEMAND_AC]
+            }
+        )
+    else:
+        experiment.update({PEAK_MEAN_DEMAND_RATIO_AC: 0})
+
+    if experiment[MEAN_DEMAND_DC] > 0:
+        experiment.update(
+            {
+                PEAK_MEAN_DEMAND_RATIO_DC: experiment[PEAK_DEMAND_DC]
+                / experiment[MEAN_DEMAND_DC]
+            }
+        )
+    else:
+        experiment.update({PEAK_MEAN_DEMAND_RATIO_DC: 0})
+
+    # Used for estimation of capacities using "peak demand"
+    experiment.update(
+        {ABS_PEAK_DEMAND_AC_SIDE: max(experiment[ACCUMULATED_PROFILE_AC_SIDE])}
+    )
+
+    # Warnings
+    if experiment[TOTAL_DEMAND_AC] == 0 + experiment[TOTAL_DEMAND_DC] == 0:
+        logging.warning(
+            "No demand in evaluated timesteps at project site "
+            + experiment[PROJECT_SITE_NAME]
+            + " - simulation will crash."
+        )
+    if experiment[PEAK_PV_GENERATION_PER_KWP] == 0:
+        logging.info(
+            "No pv generation in evaluated timesteps at project site "
+            + experiment[PROJECT_SITE_NAME]
+            + "."
+        )
+    if experiment[PEAK_WIND_GENERATION_PER_KW] == 0:
+        logging.info(
+            "No wind generation in evaluated timesteps at project site "
+            + experiment[PROJECT_SITE_NAME]
+            + "."
+        )
+
+    return
+
+
+def scaled(series, scaling_factor):
+    """
+    Scales a demand profile according to its scaling factor - used for tests regarding tool application.
+    Unscaled profiles are returned as they are, so that they remain views on the shared timeseries
+    of the project site (see C.share_timeseries()).
+
+    Parameters
+    ----------
+    series: pandas.Series
+        Demand profile
+
+    scaling_factor: float
+        Scaling factor of the demand
+
+    Returns
+    -------
+    pandas.Series
+    """
+    if scaling_factor == 1:
+        return series
+    else:
+        return series * scaling_factor
 
-    return max_date_time_index, max_evaluated_days
 
+def without_site_timeseries(experiment):
+    """
+    Returns a shallow copy of an experiment without the timeseries of its project site.
+    After D0.add_timeseries(), simulations only use the profiles of the analysed timeframe,
+    so that the timeseries of the project site do not need to be sent to other processes.
+
+    Parameters
+    ----------
+    experiment: dict
+        Sensitivity experiment
 
-def apply_noise(experiment_s):
+    Returns
+    -------
+    dict
+    """
+    return {
+        key: value
+        for key, value in experiment.items()
+        if key not in [DEMAND_AC, DEMAND_DC, FILE_INDEX]
+    }
+
+
+def apply_noise(experiment):
     """
-    Adds white noise to demands and generations to the timeseries of each experiment.
+    Adds white noise to demands and generations to the timeseries of an experiment.
 
     #ToDo: Changes are necessary to this function. It may either be not applied currently, or it should be completely deleted.
 
     Parameters
     ----------
-    experiment_s: dict
-        Contains different experiments
+    experiment: dict
+        Sensitivity experiment
 
     Returns
     -------
 
     """
-    for experiment in experiment_s:
-        on_series(experiment_s[experiment], WHITE_NOISE_DEMAND, DEMAND_AC)
-        on_series(experiment_s[experiment], WHITE_NOISE_DEMAND, DEMAND_DC)
-        on_series(experiment_s[experiment], WHITE_NOISE_PV, PV_GENERATION_PER_KWP)
-        on_series(experiment_s[experiment], WHITE_NOISE_WIND, WIND_GENERATION_PER_KW)
+    on_series(experiment, WHITE_NOISE_DEMAND, DEMAND_AC)
+    on_series(experiment, WHITE_NOISE_DEMAND, DEMAND_DC)
+    on_series(experiment, WHITE_NOISE_PV, PV_GENERATION_PER_KWP)
+    on_series(experiment, WHITE_NOISE_WIND, WIND_GENERATION_PER_KW)
     return
 
 
@@ -583,7 +684,7 @@ def on_series(experiment, noise_name, series_name):
     """
     if experiment[noise_name] != 0:
         series_values = pd.Series(
-            randomized(experiment[noise_name], experiment[series_name]),
+            randomized(experiment[noise_name], experiment[series_name].copy()),
             index=experiment[series_name].index,
         )
         experiment.update({series_name: series_values})
@@ -0,0 +1,413 @@
+"""
+Aggregation of the evaluated timeframe to typical days.
+
+The days of the evaluated timeframe are clustered by their demand, generation and grid
+availability profiles (k-medoids). Capacities are optimized on a model of the medoids of
+the clusters, the typical days, whose costs are weighted with the number of days they
+represent. The dispatch of each day of the timeframe is the dispatch of its typical day
+(see disaggregate()), or the dispatch is simulated again on the full timeframe with the
+capacities fixed (TYPICAL_DAYS_DISPATCH, see G0.get_capacities_of_typical_days()).
+"""
+
+import logging
+import sys
+import numpy as np
+import pandas as pd
+
+from src.constants import (
+    TYPICAL_DAYS,
+    TIMESTEP_WEIGHTS,
+    DATE_TIME_INDEX,
+    TIME_START,
+    TIME_FREQUENCY,
+    DEMAND_PROFILE_AC,
+    DEMAND_PROFILE_DC,
+    PV_GENERATION_PER_KWP,
+    WIND_GENERATION_PER_KW,
+    GRID_AVAILABILITY,
+    ACCUMULATED_PROFILE_AC_SIDE,
+    TOTAL_DEMAND_AC,
+    TOTAL_DEMAND_DC,
+    CASE_NAME,
+    MAIN,
+    SEQUENCES,
+    STORAGE_FIXED_CAPACITY,
+    STORAGE_FIXED_POWER,
+    GENSET_FIXED_CAPACITY,
+    PV_FIXED_CAPACITY,
+    PCC_CONSUMPTION_FIXED_CAPACITY,
+    PCC_FEEDIN_FIXED_CAPACITY,
+    WIND_FIXED_CAPACITY,
+    RECTIFIER_AC_DC_FIXED_CAPACITY,
+    INVERTER_DC_AC_FIXED_CAPACITY,
+    CAPACITY_STORAGE_KWH,
+    POWER_STORAGE_KW,
+    CAPACITY_GENSET_KW,
+    CAPACITY_PV_KWP,
+    CAPACITY_PCOUPLING_KW,
+    CAPACITY_WIND_KW,
+    CAPACITY_RECTIFIER_AC_DC_KW,
+    CAPACITY_INVERTER_DC_AC_KW,
+    SHORTAGE_BATCH_CAPACITY,
+    SHORTAGE_BATCH_POWER,
+    GENSET_BATCH,
+    PV_BATCH,
+    PCOUPLING_BATCH,
+    WIND_BATCH,
+    RECTIFIER_AC_DC_BATCH,
+    INVERTER_DC_AC_BATCH,
+    TIMESERIES_ARRAYS,
+)
+
+# Timeseries clustered to typical days and passed to the model of the typical days
+TYPICAL_DAYS_TIMESERIES = [
+    DEMAND_PROFILE_AC,
+    DEMAND_PROFILE_DC,
+    PV_GENERATION_PER_KWP,
+    WIND_GENERATION_PER_KW,
+    GRID_AVAILABILITY,
+]
+
+# Capacities of the case definition, with the base capacities (see A1.define_base_capacities())
+# fixing them and the batches they are installed in (see F.update_dict())
+FIXED_CAPACITIES = {
+    STORAGE_FIXED_CAPACITY: (CAPACITY_STORAGE_KWH, SHORTAGE_BATCH_CAPACITY),
+    STORAGE_FIXED_POWER: (POWER_STORAGE_KW, SHORTAGE_BATCH_POWER),
+    GENSET_FIXED_CAPACITY: (CAPACITY_GENSET_KW, GENSET_BATCH),
+    PV_FIXED_CAPACITY: (CAPACITY_PV_KWP, PV_BATCH),
+    PCC_CONSUMPTION_FIXED_CAPACITY: (CAPACITY_PCOUPLING_KW, PCOUPLING_BATCH),
+    PCC_FEEDIN_FIXED_CAPACITY: (CAPACITY_PCOUPLING_KW, PCOUPLING_BATCH),
+    WIND_FIXED_CAPACITY: (CAPACITY_WIND_KW, WIND_BATCH),
+    RECTIFIER_AC_DC_FIXED_CAPACITY: (
+        CAPACITY_RECTIFIER_AC_DC_KW,
+        RECTIFIER_AC_DC_BATCH,
+    ),
+    INVERTER_DC_AC_FIXED_CAPACITY: (CAPACITY_INVERTER_DC_AC_KW, INVERTER_DC_AC_BATCH),
+}
+
+# Maximal number of iterations of the k-medoids clustering
+MAX_ITERATIONS = 100
+
+
+def uses_typical_days(experiment, case_dict):
+    """
+    Checks if the capacities of a case are optimized on typical days. This is the case if
+    TYPICAL_DAYS is set, at least one capacity is optimized and the evaluated timeframe
+    consists of more whole days than typical days.
+
+    Parameters
+    ----------
+    experiment: dict
+        Sensitivity experiment including its timeseries
+
+    case_dict: dict
+        Settings of the simulated case, see F.update_dict()
+
+    Returns
+    -------
+    bool
+    """
+    number_of_typical_days = experiment[TYPICAL_DAYS]
+    if number_of_typical_days in [None, "None", False]:
+        return False
+    if (
+        isinstance(number_of_typical_days, bool)
+        or not isinstance(number_of_typical_days, (int, float))
+        or number_of_typical_days < 1
+        or number_of_typical_days != int(number_of_typical_days)
+    ):
+        logging.error(
+            f"The setting {TYPICAL_DAYS} has to be None or a positive integer, "
+            f"but is {number_of_typical_days}."
+        )
+        sys.exit()
+
+    if not any(case_dict[name] is False for name in FIXED_CAPACITIES):
+        return False
+
+    steps_per_day = get_steps_per_day(experiment[DATE_TIME_INDEX])
+    if steps_per_day is None:
+        logging.warning(
+            f"The evaluated timeframe does not consist of whole days, "
+            f"{TYPICAL_DAYS} is ignored for case {case_dict[CASE_NAME]}."
+        )
+        return False
+    if len(experiment[DATE_TIME_INDEX]) // steps_per_day <= number_of_typical_days:
+        logging.debug(
+            f"The evaluated timeframe does not consist of more than {int(number_of_typical_days)} days, "
+            f"capacities of case {case_dict[CASE_NAME]} are optimized on the full timeframe."
+        )
+        return False
+    return True
+
+
+def get_steps_per_day(date_time_index):
+    """
+    Number of timesteps per day of a date time index
+
+    Parameters
+    ----------
+    date_time_index: pandas.DatetimeIndex
+        Evaluated timeframe with constant time frequency
+
+    Returns
+    -------
+    steps_per_day: int or None
+        None if the timeframe does not consist of whole days
+    """
+    if len(date_time_index) < 2:
+        return None
+    steps_per_day = pd.Timedelta(days=1) / (date_time_index[1] - date_time_index[0])
+    if steps_per_day != int(steps_per_day) or len(date_time_index) % steps_per_day:
+        return None
+    return int(steps_per_day)
+
+
+def get_daily_profiles(experiment, steps_per_day):
+    """
+    Daily profiles of all TYPICAL_DAYS_TIMESERIES of an experiment, each normalized to its
+    maximum, so that all timeseries are equally important for the clustering.
+
+    Parameters
+    ----------
+    experiment: dict
+        Sensitivity experiment including its timeseries
+
+    steps_per_day: int
+
+    Returns
+    -------
+    daily_profiles: numpy.ndarray
+        Profiles of shape (number of days, number of timeseries * steps_per_day)
+    """
+    daily_profiles = []
+    for name in TYPICAL_DAYS_TIMESERIES:
+        if name not in experiment:
+            continue
+        timeseries = np.asarray(experiment[name], dtype=float)
+        peak = np.abs(timeseries).max()
+        if peak > 0:
+            daily_profiles.append(timeseries.reshape(-1, steps_per_day) / peak)
+    return np.hstack(daily_profiles)
+
+
+def cluster_days(daily_profiles, number_of_typical_days, fixed_days=None):
+    """
+    Clusters days with the k-medoids algorithm. The initial medoids are the most central
+    day and then the days farthest away from all medoids, so that the clustering does not
+    depend on random numbers. Fixed days, eg. the day of peak demand, are always medoids.
+
+    Parameters
+    ----------
+    daily_profiles: numpy.ndarray
+        Profiles of shape (number of days, number of features)
+
+    number_of_typical_days: int
+
+    fixed_days: list, optional
+        Days that are always typical days
+
+    Returns
+    -------
+    typical_days: numpy.ndarray
+        Sorted days that are medoids of a cluster
+
+    cluster_of_day: numpy.ndarray
+        Position of the cluster of each day in typical_days
+    """
+    squared_norms = (daily_profiles ** 2).sum(axis=1)
+    distances = np.sqrt(
+        np.maximum(
+            squared_norms[:, np.newaxis]
+            + squared_norms[np.newaxis, :]
+            - 2 * daily_profiles @ daily_profiles.T,
+            0,
+        )
+    )
+    fixed_days = list(fixed_days or [])
+    medoids = list(fixed_days)
+    central_day = int(distances.sum(axis=1).argmin())
+    if central_day not in medoids and len(medoids) < number_of_typical_days:
+        medoids.append(central_day)
+    while len(medoids) < number_of_typical_days:
+        medoids.append(int(distances[:, medoids].min(axis=1).argmax()))
+
+    for _ in range(MAX_ITERATIONS):
+        cluster_of_day = distances[:, medoids].argmin(axis=1)
+        updated_medoids = list(fixed_days)
+        for cluster in range(len(fixed_days), len(medoids)):
+            members = np.flatnonzero(cluster_of_day == cluster)
+            if len(members) == 0:
+                # Only possible for identical days
+                updated_medoids.append(medoids[cluster])
+                continue
+            updated_medoids.append(
+                int(members[distances[np.ix_(members, members)].sum(axis=1).argmin()])
+            )
+        if updated_medoids == medoids:
+            break
+        medoids = updated_medoids
+
+    order = np.argsort(medoids)
+    position = np.empty(len(medoids), dtype=int)
+    position[order] = np.arange(len(medoids))
+    return np.asarray(medoids)[order], position[distances[:, medoids].argmin(axis=1)]
+
+
+def aggregate(experiment, case_dict):
+    """
+    Creates the experiment and case of the typical days of an experiment. The timeseries of
+    the typical days follow each other in chronological order, the variable costs of each
+    timestep are weighted with the number of days represented by its typical day
+    (TIMESTEP_WEIGHTS, see G1.build()). The day of the peak demand is always a typical day.
+
+    Energy sums of the custom constraints, ie. the renewable share and the maximal shortage,
+    weight all typical days equally.
+
+    Parameters
+    ----------
+    experiment: dict
+        Sensitivity experiment including its timeseries
+
+    case_dict: dict
+        Settings of the simulated case, see F.update_dict()
+
+    Returns
+    -------
+    aggregated_experiment: dict
+        Experiment with the timeseries of the typical days
+
+    aggregated_case_dict: dict
+        Case with the total demand of the typical days
+
+    timestep_positions: numpy.ndarray
+        Timestep of the typical days representing each timestep of the experiment
+    """
+    date_time_index = experiment[DATE_TIME_INDEX]
+    steps_per_day = get_steps_per_day(date_time_index)
+    number_of_typical_days = int(experiment[TYPICAL_DAYS])
+
+    peak_timestep = int(np.argmax(np.asarray(experiment[ACCUMULATED_PROFILE_AC_SIDE])))
+    typical_days, cluster_of_day = cluster_days(
+        get_daily_profiles(experiment, steps_per_day),
+        number_of_typical_days,
+        fixed_days=[peak_timestep // steps_per_day],
+    )
+    number_of_days = np.bincount(cluster_of_day, minlength=len(typical_days))
+    logging.info(
+        f"Optimizing capacities of case {case_dict[CASE_NAME]} on {len(typical_days)} typical days "
+        f"representing {len(cluster_of_day)} days."
+    )
+
+    typical_timesteps = (
+        typical_days[:, np.newaxis] * steps_per_day + np.arange(steps_per_day)
+    ).flatten()
+    aggregated_index = pd.date_range(
+        start=experiment[TIME_START],
+        periods=len(typical_timesteps),
+        freq=experiment[TIME_FREQUENCY],
+    )
+    hours_per_timestep = (date_time_index[1] - date_time_index[0]) / pd.Timedelta(
+        hours=1
+    )
+
+    aggregated_experiment = experiment.copy()
+    # Arrays of the timeseries of the full timeframe are not shared, see G2a.get_timeseries()
+    aggregated_experiment.pop(TIMESERIES_ARRAYS, None)
+    aggregated_experiment.update(
+        {
+            DATE_TIME_INDEX: aggregated_index,
+            TIMESTEP_WEIGHTS: np.repeat(number_of_days, steps_per_day)
+            * hours_per_timestep,
+        }
+    )
+    for name in TYPICAL_DAYS_TIMESERIES:
+        if name in experiment:
+            aggregated_experiment.update(
+                {
+                    name: pd.Series(
+                        np.asarray(experiment[name])[typical_timesteps],
+                        index=aggregated_index,
+                    )
+                }
+            )
+
+    aggregated_case_dict = case_dict.copy()
+    aggregated_case_dict.update(
+        {
+            TOTAL_DEMAND_AC: aggregated_experiment[DEMAND_PROFILE_AC].sum(),
+            TOTAL_DEMAND_DC: aggregated_experiment[DEMAND_PROFILE_DC].sum(),
+        }
+    )
+
+    timestep_positions = np.repeat(
+        cluster_of_day, steps_per_day
+    ) * steps_per_day + np.tile(np.arange(steps_per_day), len(cluster_of_day))
+    return aggregated_experiment, aggregated_case_dict, timestep_positions
+
+
+def disaggregate(micro_grid_system, experiment, timestep_positions):
+    """
+    Replaces the sequences of the results of the typical days by sequences over the evaluated
+    timeframe of the experiment, in which each day has the dispatch of its typical day.
+
+    Parameters
+    ----------
+    micro_grid_system: oemof.solph.network.EnergySystem
+        Energy system of the typical days including its results
+
+    experiment: dict
+        Sensitivity experiment including its timeseries
+
+    timestep_positions: numpy.ndarray
+        Timestep of the typical days representing each timestep of the experiment, see aggregate()
+
+    Returns
+    -------
+    micro_grid_system: oemof.solph.network.EnergySystem
+    """
+    for results in micro_grid_system.results[MAIN].values():
+        sequences = results[SEQUENCES]
+        results.update(
+            {
+                SEQUENCES: pd.DataFrame(
+                    sequences.values[timestep_positions],
+                    index=experiment[DATE_TIME_INDEX],
+                    columns=sequences.columns,
+                )
+            }
+        )
+    return micro_grid_system
+
+
+def with_fixed_capacities(experiment, case_dict, capacities):
+    """
+    Fixes the optimized capacities of a case, to simulate its dispatch. As for cases based
+    on the capacities of another case, the capacities are rounded up to their batches.
+
+    Parameters
+    ----------
+    experiment: dict
+        Sensitivity experiment
+
+    case_dict: dict
+        Settings of the simulated case, see F.update_dict()
+
+    capacities: dict
+        Optimized capacities, see A1.define_base_capacities()
+
+    Returns
+    -------
+    fixed_case_dict: dict
+        Settings of the case, in which no capacity is optimized
+    """
+    fixed_case_dict = case_dict.copy()
+    for name, (capacity, batch) in FIXED_CAPACITIES.items():
+        if case_dict[name] is False:
+            if capacities[capacity] > 0:
+                batch_size = experiment[batch]
+                fixed_capacity = round(0.5 + capacities[capacity] / batch_size)
+                fixed_case_dict.update({name: float(fixed_capacity * batch_size)})
+            else:
+                fixed_case_dict.update({name: None})
+    return fixed_case_dict
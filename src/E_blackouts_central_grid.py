@@ -2,6 +2,8 @@ import pandas as pd
 import numpy as np
 import logging
 import os.path
+import hashlib
+import numbers
 from copy import deepcopy
 
 from src.constants import (
@@ -22,8 +24,39 @@ from src.constants import (
     NATIONAL_GRID_TOTAL_BLACKOUT_DURATION,
     NATIONAL_GRID_NUMBER_OF_BLACKOUTS,
     GRID_AVAILABILITY_CSV,
+    BLACKOUT_SEED,
+    REALIZATION,
+    BLACKOUT_REALIZATIONS,
+    SUFFIX_P10,
+    SUFFIX_P90,
+    LCOE,
+    SUPPLY_RELIABILITY_KWH,
+    CAPACITY_PV_KWP,
+    CAPACITY_STORAGE_KWH,
+    POWER_STORAGE_KW,
+    CAPACITY_RECTIFIER_AC_DC_KW,
+    CAPACITY_INVERTER_DC_AC_KW,
+    CAPACITY_WIND_KW,
+    CAPACITY_GENSET_KW,
+    CAPACITY_PCOUPLING_KW,
 )
 
+# Results of blackout ensembles that are reported with their distribution (P10/P90)
+ENSEMBLE_PARAMETERS = [
+    LCOE,
+    SUPPLY_RELIABILITY_KWH,
+    CAPACITY_PV_KWP,
+    CAPACITY_STORAGE_KWH,
+    POWER_STORAGE_KW,
+    CAPACITY_RECTIFIER_AC_DC_KW,
+    CAPACITY_INVERTER_DC_AC_KW,
+    CAPACITY_WIND_KW,
+    CAPACITY_GENSET_KW,
+    CAPACITY_PCOUPLING_KW,
+]
+# Factor of the standard error for the 95 % confidence interval of the ensemble mean
+CONFIDENCE_INTERVAL_FACTOR = 1.96
+
 # Check for saved blackout scenarios/grid availability, else continue randomization of backout events
 def get_blackouts(settings, blackout_experiment_s):
     """
@@ -191,13 +224,7 @@ def oemof_extension_for_blackouts(grid_availability):
     )
     grid_reliability = 1 - total_grid_blackout_duration / len(grid_availability.index)
     # Counting blackouts for blackout results
-    number_of_blackouts = 0
-    for step in range(0, len(grid_availability.index)):
-        if grid_availability.iat[step] == 0:
-            if number_of_blackouts == 0:
-                number_of_blackouts = number_of_blackouts + 1
-            elif number_of_blackouts != 0 and grid_availability.iat[int(step - 1)] != 0:
-                number_of_blackouts = number_of_blackouts + 1
+    number_of_blackouts = int(count_blackouts(grid_availability.values))
 
     blackout_result = {
         GRID_RELIABILITY: grid_reliability,
@@ -240,6 +267,14 @@ def availability(
     timestep = 1
     experiment_count = 0
 
+    master_seed = get_master_seed(settings)
+
+    blackout_names = []
+    blackout_event_starts = []
+    blackout_event_durations = []
+    accumulated_blackout_durations = []
+
+    # Randomize blackout events of all experiments
     for experiment in blackout_experiment_s:
         experiment_count = experiment_count + 1
 
@@ -255,45 +290,40 @@ def availability(
             + " per month"
         )
 
-        number_of_blackouts = get_number_of_blackouts(
-            settings[MAX_EVALUATED_DAYS], blackout_experiment_s[experiment]
-        )
-
-        # 0-1-Series for grid availability
-        grid_availability = pd.Series(
-            [1 for i in range(0, len(date_time_index))], index=date_time_index
+        (
+            time_of_blackout_events,
+            event_durations,
+            accumulated_blackout_duration,
+        ) = randomize_blackout_events(
+            settings,
+            blackout_experiment_s[experiment],
+            timestep,
+            get_random_generator(
+                master_seed, blackout_experiment_s[experiment][EXPERIMENT_NAME]
+            ),
         )
 
-        if number_of_blackouts != 0:
-            time_of_blackout_events = get_time_of_blackout_events(
-                number_of_blackouts, date_time_index
-            )
-
-            (
-                blackout_event_durations,
-                accumulated_blackout_duration,
-            ) = get_blackout_event_durations(
-                blackout_experiment_s[experiment], timestep, number_of_blackouts
-            )
+        blackout_names.append(blackout_experiment_s[experiment][EXPERIMENT_NAME])
+        blackout_event_starts.append(time_of_blackout_events)
+        blackout_event_durations.append(event_durations)
+        accumulated_blackout_durations.append(accumulated_blackout_duration)
 
-            (
-                grid_availability,
-                overlapping_blackouts,
-                actual_number_of_blackouts,
-            ) = availability_series(
-                grid_availability,
-                time_of_blackout_events,
-                timestep,
-                blackout_event_durations,
-            )
-        else:
-            accumulated_blackout_duration = 0
-            actual_number_of_blackouts = 0
+    # 0-1-array for grid availability of all experiments, one row per experiment
+    grid_availability_matrix = availability_matrix(
+        len(date_time_index), blackout_event_starts, blackout_event_durations, timestep
+    )
+    actual_number_of_blackouts = count_blackouts(grid_availability_matrix)
+    total_grid_blackout_durations = len(date_time_index) - np.sum(
+        grid_availability_matrix, axis=1
+    )
 
-        total_grid_availability = sum(grid_availability)
-        total_grid_blackout_duration = len(date_time_index) - total_grid_availability
+    for row, blackout_name in enumerate(blackout_names):
+        total_grid_blackout_duration = int(total_grid_blackout_durations[row])
         # Making sure that grid outage duration is equal to expected accumulated blackout duration
-        if total_grid_blackout_duration != accumulated_blackout_duration:
+        if total_grid_blackout_duration != accumulated_blackout_durations[row]:
+            overlapping_blackouts = get_overlapping_blackouts(
+                blackout_event_starts[row], blackout_event_durations[row], timestep
+            )
             logging.info(
                 "Due to "
                 + str(overlapping_blackouts)
@@ -303,36 +333,290 @@ def availability(
         grid_reliability = 1 - total_grid_blackout_duration / len(date_time_index)
 
         logging.info(
-            "Grid is not operational for "
+            'Blackout experiment "'
+            + blackout_name
+            + '": Grid is not operational for '
             + str(round(total_grid_blackout_duration, 2))
             + " hours, with a reliability of "
             + str(round(grid_reliability * 100, 2))
             + " percent. \n"
         )
 
-        blackout_name = blackout_experiment_s[experiment][EXPERIMENT_NAME]
         blackout_result_s.update(
             {
                 blackout_name: {
                     GRID_RELIABILITY: grid_reliability,
                     GRID_TOTAL_BLACKOUT_DURATION: total_grid_blackout_duration,
-                    GRID_NUMBER_OF_BLACKOUTS: actual_number_of_blackouts,
+                    GRID_NUMBER_OF_BLACKOUTS: int(actual_number_of_blackouts[row]),
                 }
             }
         )
 
-        grid_availability_df = grid_availability_df.join(
-            pd.DataFrame(
-                grid_availability.values,
-                columns=[blackout_name],
-                index=grid_availability.index,
-            )
+    grid_availability_df = grid_availability_df.join(
+        pd.DataFrame(
+            grid_availability_matrix.T, columns=blackout_names, index=date_time_index,
         )
+    )
 
     return grid_availability_df
 
 
-def get_number_of_blackouts(evaluated_days, experiment):
+def get_master_seed(settings):
+    """
+    Returns the master seed of all blackout experiments. If no seed is set, a random seed
+    is drawn and stored in the settings, so that it is used for all blackout timeseries.
+
+    Parameters
+    ----------
+    settings: dict
+        Contains the initialization settings for the simulation
+
+    Returns
+    -------
+    master_seed: int
+    """
+    # Each blackout experiment has its own random generator, seeded by the master seed and
+    # its name, so that it is reproducible independently of other blackout experiments
+    if settings[BLACKOUT_SEED] is None:
+        settings.update({BLACKOUT_SEED: draw_seed()})
+        logging.info(
+            "Blackout timeseries are generated with seed "
+            + str(settings[BLACKOUT_SEED])
+            + ", set `"
+            + BLACKOUT_SEED
+            + "` to this value to reproduce them."
+        )
+    return settings[BLACKOUT_SEED]
+
+
+def draw_seed():
+    """
+    Draws a random seed, which is logged so that users can reproduce random values by
+    setting it in the input file. The seed is limited to 32 bits, as the input file
+    stores numbers as floats, which only represent integers of up to 53 bits exactly.
+
+    Returns
+    -------
+    seed: int
+    """
+    return int(np.random.SeedSequence().generate_state(1)[0])
+
+
+def randomize_blackout_events(
+    settings, blackout_experiment, timestep, random_generator
+):
+    """
+    Randomizes number, start and duration of the blackout events of a blackout experiment
+
+    Parameters
+    ----------
+    settings: dict
+        Contains the initialization settings for the simulation
+
+    blackout_experiment: dict
+        Contains the settings for the blackout experiment
+
+    timestep: int
+
+    random_generator: numpy.random.Generator
+        Random generator of the blackout experiment, see get_random_generator()
+
+    Returns
+    -------
+    time_of_blackout_events: numpy.ndarray
+        Timesteps in which the blackouts start, in chronological order
+
+    blackout_event_durations: numpy.ndarray
+        Duration of each blackout event
+
+    accumulated_blackout_duration: float
+        Sum of all blackout durations
+    """
+    number_of_blackouts = get_number_of_blackouts(
+        settings[MAX_EVALUATED_DAYS], blackout_experiment, random_generator,
+    )
+
+    if number_of_blackouts == 0:
+        return np.array([], dtype=int), np.array([]), 0
+
+    time_of_blackout_events = get_time_of_blackout_events(
+        number_of_blackouts, settings[MAX_DATE_TIME_INDEX], random_generator
+    )
+    (
+        blackout_event_durations,
+        accumulated_blackout_duration,
+    ) = get_blackout_event_durations(
+        blackout_experiment, timestep, number_of_blackouts, random_generator,
+    )
+    return (
+        time_of_blackout_events,
+        blackout_event_durations,
+        accumulated_blackout_duration,
+    )
+
+
+def get_ensemble_realizations(
+    settings,
+    blackout_experiment,
+    blackout_experiment_name,
+    first_realization,
+    number_of_realizations,
+):
+    """
+    Generates further realizations of the grid availability of a blackout experiment
+    for blackout ensembles. Realization 0 is the grid availability generated by availability().
+
+    Parameters
+    ----------
+    settings: dict
+        Contains the initialization settings for the simulation
+
+    blackout_experiment: dict
+        Contains the settings for the blackout experiment, eg. a sensitivity experiment
+
+    blackout_experiment_name: str
+        Name of the blackout experiment, see C.get_blackout_experiment_name()
+
+    first_realization: int
+        Number of the first generated realization, at least 1
+
+    number_of_realizations: int
+        Number of generated realizations
+
+    Returns
+    -------
+    grid_availability_s: list of pandas.Series
+        Grid availability of each realization (1 available, 0 not available)
+    """
+    date_time_index = settings[MAX_DATE_TIME_INDEX]
+    timestep = 1
+    master_seed = get_master_seed(settings)
+
+    blackout_event_starts = []
+    blackout_event_durations = []
+    for realization in range(
+        first_realization, first_realization + number_of_realizations
+    ):
+        (time_of_blackout_events, event_durations, _,) = randomize_blackout_events(
+            settings,
+            blackout_experiment,
+            timestep,
+            get_random_generator(
+                master_seed, blackout_experiment_name + REALIZATION + str(realization)
+            ),
+        )
+        blackout_event_starts.append(time_of_blackout_events)
+        blackout_event_durations.append(event_durations)
+
+    grid_availability_matrix = availability_matrix(
+        len(date_time_index), blackout_event_starts, blackout_event_durations, timestep
+    )
+    return [
+        pd.Series(grid_availability, index=date_time_index)
+        for grid_availability in grid_availability_matrix
+    ]
+
+
+def aggregate_ensemble_results(oemof_results_s):
+    """
+    Aggregates the results of all realizations of a blackout ensemble. Numerical results
+    are averaged, the distribution of the ENSEMBLE_PARAMETERS is reported with their
+    10th and 90th percentile.
+
+    Parameters
+    ----------
+    oemof_results_s: list of lists of dicts
+        Results of each realization, for each case
+
+    Returns
+    -------
+    ensemble_results_s: list of dicts
+        Aggregated results for each case
+    """
+    ensemble_results_s = []
+    for case_results in zip(*oemof_results_s):
+        ensemble_results = {BLACKOUT_REALIZATIONS: len(case_results)}
+        for key in case_results[0]:
+            values = [oemof_results[key] for oemof_results in case_results]
+            if all(
+                isinstance(value, numbers.Number) and not isinstance(value, bool)
+                for value in values
+            ):
+                ensemble_results.update({key: float(np.mean(values))})
+                if key in ENSEMBLE_PARAMETERS:
+                    ensemble_results.update(
+                        {
+                            key + SUFFIX_P10: float(np.percentile(values, 10)),
+                            key + SUFFIX_P90: float(np.percentile(values, 90)),
+                        }
+                    )
+            else:
+                ensemble_results.update({key: values[0]})
+        ensemble_results_s.append(ensemble_results)
+    return ensemble_results_s
+
+
+def ensemble_converged(oemof_results_s, tolerance):
+    """
+    Checks if the means of the ENSEMBLE_PARAMETERS of a blackout ensemble are stable, ie. if
+    the half-width of their 95 % confidence interval is smaller than tolerance times their mean.
+
+    Parameters
+    ----------
+    oemof_results_s: list of lists of dicts
+        Results of each realization, for each case
+
+    tolerance: float
+        Allowed half-width of the confidence interval relative to the mean
+
+    Returns
+    -------
+    converged: bool
+    """
+    if len(oemof_results_s) < 2:
+        return False
+    for case_results in zip(*oemof_results_s):
+        for key in ENSEMBLE_PARAMETERS:
+            if key not in case_results[0]:
+                continue
+            values = np.array(
+                [oemof_results[key] for oemof_results in case_results], dtype=float
+            )
+            half_width = (
+                CONFIDENCE_INTERVAL_FACTOR
+                * np.std(values, ddof=1)
+                / np.sqrt(len(values))
+            )
+            if half_width > tolerance * abs(np.mean(values)):
+                return False
+    return True
+
+
+def get_random_generator(master_seed, blackout_experiment_name):
+    """
+    Creates the random generator of a blackout experiment.
+
+    Parameters
+    ----------
+    master_seed: int
+        Seed of all blackout experiments
+
+    blackout_experiment_name: str
+        Name of the blackout experiment, see C.get_blackout_experiment_name()
+
+    Returns
+    -------
+    random_generator: numpy.random.Generator
+        Generator only depending on master seed and name of the blackout experiment
+    """
+    # Python's hash() of strings differs between processes, therefore sha256 is used
+    name_hash = int.from_bytes(
+        hashlib.sha256(blackout_experiment_name.encode()).digest()[:8], "little"
+    )
+    return np.random.default_rng(np.random.SeedSequence([int(master_seed), name_hash]))
+
+
+def get_number_of_blackouts(evaluated_days, experiment, random_generator):
     """
     Calculate the number of blackouts for an specific time range
 
@@ -343,6 +627,9 @@ def get_number_of_blackouts(evaluated_days, experiment):
     experiment: dict
         Settings for the experiment
 
+    random_generator: numpy.random.Generator
+        Random generator of the blackout experiment, see get_random_generator()
+
     Returns
     -------
     blackout_events_per_timeframe: int
@@ -350,7 +637,7 @@ def get_number_of_blackouts(evaluated_days, experiment):
 
     """
     # Calculation of expected blackouts per analysed timeframe
-    blackout_events_per_month = np.random.normal(
+    blackout_events_per_month = random_generator.normal(
         loc=experiment[BLACKOUT_FREQUENCY],  # median value: blackout duration
         scale=experiment[BLACKOUT_FREQUENCY_STD_DEVIATION]
         * experiment[BLACKOUT_FREQUENCY],  # Standard deviation
@@ -366,7 +653,9 @@ def get_number_of_blackouts(evaluated_days, experiment):
     return blackout_events_per_timeframe
 
 
-def get_time_of_blackout_events(blackout_events_per_timeframe, date_time_index):
+def get_time_of_blackout_events(
+    blackout_events_per_timeframe, date_time_index, random_generator
+):
     """
     Calculates the time for every blackout
 
@@ -378,37 +667,36 @@ def get_time_of_blackout_events(blackout_events_per_timeframe, date_time_index):
     date_time_index: pandas.DatetimeIndex
         Time index of the experiment
 
+    random_generator: numpy.random.Generator
+        Random generator of the blackout experiment, see get_random_generator()
+
     Returns
     -------
-    time_of_blackout_events: pandas.Series
-        Contains the blackouts with their respective ocurring times
+    time_of_blackout_events: numpy.ndarray
+        Timesteps (positions in date_time_index) in which the blackouts start, in chronological order
     """
 
     # Choosing blackout event starts randomly from whole duration
     # (probability set by data_time_index and blackout_events_per_timeframe)
-    time_of_blackout_events = pd.Series(
-        [1 for i in range(0, len(date_time_index))], index=date_time_index
-    ).sample(
-        n=blackout_events_per_timeframe, replace=False  # number of events
-    )  # no replacements
-    # Chronological order
-    time_of_blackout_events.sort_index(inplace=True)
+    time_of_blackout_events = np.sort(
+        random_generator.choice(
+            len(date_time_index),
+            size=blackout_events_per_timeframe,
+            replace=False,  # no replacements
+        )
+    )
 
     # Display all events
-    string_blackout_events = ""
-    for item in time_of_blackout_events.index:
-        string_blackout_events = string_blackout_events + str(item) + ", "
     logging.debug(
-        "Blackouts events occur on following dates: " + string_blackout_events[:-2]
-    )
-
-    time_of_blackout_events = time_of_blackout_events.reindex(
-        index=date_time_index, fill_value=0
+        "Blackouts events occur on following dates: "
+        + ", ".join([str(item) for item in date_time_index[time_of_blackout_events]])
     )
     return time_of_blackout_events
 
 
-def get_blackout_event_durations(experiment, timestep, number_of_blackouts):
+def get_blackout_event_durations(
+    experiment, timestep, number_of_blackouts, random_generator
+):
     """
     Calculate the lenght of every blackout
 
@@ -421,17 +709,20 @@ def get_blackout_event_durations(experiment, timestep, number_of_blackouts):
 
     number_of_blackouts:int
 
+    random_generator: numpy.random.Generator
+        Random generator of the blackout experiment, see get_random_generator()
+
     Returns
     -------
-    blackout_event_durations: dict
-        Contains information about the randomized blackouts
+    blackout_event_durations: numpy.ndarray
+        Duration of each blackout event, rounded to the timestep
 
     accumulated_blackout_duration: float
         Sum of all blackout durations
 
     """
     # Generating blackout durations for the number of events
-    blackout_event_durations = np.random.normal(
+    blackout_event_durations = random_generator.normal(
         loc=experiment[BLACKOUT_DURATION],  # median value: blackout duration
         scale=experiment[BLACKOUT_FREQUENCY_STD_DEVIATION]
         * experiment[BLACKOUT_DURATION],  # Standard deviation
@@ -444,10 +735,7 @@ def get_blackout_event_durations(experiment, timestep, number_of_blackouts):
     )
 
     # Round so that blackout durations fit simulation timestep => here, it would make sense to simulate for small timesteps
-    for item in range(0, len(blackout_event_durations)):
-        blackout_event_durations[item] = (
-            round(blackout_event_durations[item] / timestep) * timestep
-        )
+    blackout_event_durations = np.round(blackout_event_durations / timestep) * timestep
 
     accumulated_blackout_duration = float(sum(blackout_event_durations))
     logging.info(
@@ -467,15 +755,15 @@ def availability_series(
     Parameters
     ----------
     grid_availability: pandas.Series
-        Time series with availability information (1 available, 0 unavailable)
+        Time series defining the time index of the availability
 
-    time_of_blackout_events: pandas.Series
-        Contains the blackouts with their respective ocurring times
+    time_of_blackout_events: numpy.ndarray
+        Timesteps in which the blackouts start, in chronological order
 
     timestep:int
 
-    blackout_event_durations: dict
-        Contains information about the randomized blackouts
+    blackout_event_durations: numpy.ndarray
+        Duration of each blackout event
 
     Returns
     -------
@@ -487,37 +775,123 @@ def availability_series(
 
     blackout_count:int
     """
-    ## Create 0-1-series that determines grid_availability
-    blackout_started = 0
-    overlapping_blackouts = 0
-    blackout_count = 0
+    availability = availability_matrix(
+        len(grid_availability.index),
+        [time_of_blackout_events],
+        [blackout_event_durations],
+        timestep,
+    )[0]
+    grid_availability = pd.Series(availability, index=grid_availability.index)
+    overlapping_blackouts = get_overlapping_blackouts(
+        time_of_blackout_events, blackout_event_durations, timestep
+    )
+    blackout_count = int(count_blackouts(availability))
+    return grid_availability, overlapping_blackouts, blackout_count
 
-    for step in grid_availability.index:
-        if time_of_blackout_events.loc[step] == 1:
-            # Timestep analysed is a timestep, in which a blackout event starts
-            if blackout_started != 0:
-                logging.debug("A blackout event overlaps with another!")
-                overlapping_blackouts = overlapping_blackouts + 1
 
-            grid_availability.loc[step] = 0
-            blackout_started = timestep
+def availability_matrix(
+    number_of_timesteps, blackout_event_starts, blackout_event_durations, timestep=1
+):
+    """
+    Creates the 0-1-availability of the grid of many blackout experiments at once.
 
-        else:
-            if blackout_started != 0:
-                if blackout_started != blackout_event_durations[blackout_count]:
-                    # Above started blackout event continues
-                    grid_availability.loc[step] = 0
-                    blackout_started = blackout_started + timestep
-                else:
-                    # Blackoutevent reached its duration, grid is already operational in this timestep
-                    grid_availability.loc[step] = 1
-                    blackout_started = 0
-                    blackout_count = blackout_count + 1
-            else:
-                # No blackout in timestep analysed
-                grid_availability.loc[step] = 1
+    Each blackout event makes the grid unavailable from its start for its duration,
+    but at least for one timestep. Overlapping blackout events result in one longer blackout.
 
-    return grid_availability, overlapping_blackouts, blackout_count
+    Parameters
+    ----------
+    number_of_timesteps: int
+        Length of the availability timeseries
+
+    blackout_event_starts: list of numpy.ndarray
+        Timesteps in which the blackouts start, one array per experiment
+
+    blackout_event_durations: list of numpy.ndarray
+        Duration of each blackout event, one array per experiment
+
+    timestep: int
+        Length of a timestep in hours
+
+    Returns
+    -------
+    grid_availability: numpy.ndarray
+        Availability of the grid (1 available, 0 not available) with one row per experiment
+    """
+    number_of_experiments = len(blackout_event_starts)
+    # +1 at the start of each blackout event, -1 at its end
+    changes = np.zeros((number_of_experiments, number_of_timesteps + 1), dtype=int)
+    rows = np.repeat(
+        np.arange(number_of_experiments),
+        [len(starts) for starts in blackout_event_starts],
+    )
+    if len(rows) > 0:
+        starts = np.concatenate(blackout_event_starts).astype(int)
+        durations = get_blackout_timesteps(
+            np.concatenate(blackout_event_durations), timestep
+        )
+        ends = np.minimum(starts + durations, number_of_timesteps)
+        np.add.at(changes, (rows, starts), 1)
+        np.add.at(changes, (rows, ends), -1)
+    ongoing_blackout_events = np.cumsum(changes[:, :-1], axis=1)
+    return (ongoing_blackout_events == 0).astype(int)
+
+
+def get_blackout_timesteps(blackout_event_durations, timestep):
+    """
+    Returns the number of timesteps of each blackout event, at least one timestep.
+    """
+    return np.maximum(
+        np.round(np.asarray(blackout_event_durations, dtype=float) / timestep), 1
+    ).astype(int)
+
+
+def get_overlapping_blackouts(
+    time_of_blackout_events, blackout_event_durations, timestep
+):
+    """
+    Counts the blackout events starting while an earlier blackout event is not over yet.
+
+    Parameters
+    ----------
+    time_of_blackout_events: numpy.ndarray
+        Timesteps in which the blackouts start, in chronological order
+
+    blackout_event_durations: numpy.ndarray
+        Duration of each blackout event
+
+    timestep: int
+
+    Returns
+    -------
+    overlapping_blackouts: int
+    """
+    if len(time_of_blackout_events) < 2:
+        return 0
+    ends = time_of_blackout_events + get_blackout_timesteps(
+        blackout_event_durations, timestep
+    )
+    return int(np.sum(time_of_blackout_events[1:] < np.maximum.accumulate(ends)[:-1]))
+
+
+def count_blackouts(grid_availability):
+    """
+    Counts the blackouts (consecutive timesteps without grid availability).
+
+    Parameters
+    ----------
+    grid_availability: numpy.ndarray
+        Availability of the grid (1 available, 0 not available), either one timeseries
+        or one timeseries per row
+
+    Returns
+    -------
+    number_of_blackouts: int or numpy.ndarray
+        Number of blackouts, for each row if grid_availability is two-dimensional
+    """
+    blackout = np.asarray(grid_availability) == 0
+    start_of_blackout = blackout.copy()
+    start_of_blackout[..., 1:] &= ~blackout[..., :-1]
+    return np.sum(start_of_blackout, axis=-1)
 
 
 def extend_oemof_results(oemof_results, blackout_results):
@@ -10,6 +10,7 @@ new cases can easily be added.
 
 # to check for files and paths
 import os.path
+import sys
 import timeit
 
 # Logging of info
@@ -17,7 +18,11 @@ import logging
 import oemof.solph as solph
 
 # For speeding up lp_files and bus/component definition in oemof as well as processing
+import src.A1_general_functions as helpers
+import src.D2_typical_days as typical_days
 import src.G1_oemof_create_model as oemof_model
+import src.G1a_result_cache as result_cache
+import src.G1b_rolling_horizon as rolling_horizon
 import src.G2b_constraints_custom as constraints_custom
 import src.G3_oemof_evaluate as timeseries
 import src.G3a_economic_evaluation as economic_evaluation
@@ -39,6 +44,11 @@ from src.constants import (
     COMMENTS,
     BUS_ELECTRICITY_AC,
     BUS_ELECTRICITY_DC,
+    DISPLAY_META,
+    DISPLAY_MAIN,
+    DISPLAY_INVEST,
+    BASE_OEM,
+    BASE_OEM_WITH_MIN_LOADING,
     TOTAL_DEMAND_SUPPLIED_ANNUAL_KWH,
     TOTAL_DEMAND_ANNUAL_KWH,
     GRID_AVAILABILITY,
@@ -59,6 +69,10 @@ from src.constants import (
     SUPPLY_RELIABILITY_KWH,
     PREFIX_RESULTS,
     SAVE_OEMOFRESULTS,
+    USE_RESULT_CACHE,
+    REUSE_OEMOF_MODEL,
+    TYPICAL_DAYS_DISPATCH,
+    FIXED_CAPACITIES_OF_TYPICAL_DAYS,
 )
 
 # This is not really a necessary class, as the whole experiement could be given to the function, but it ensures, that
@@ -93,32 +107,102 @@ def run(experiment, case_dict):
 
     file_name = case_dict[FILENAME]
 
+    # Key of the simulation in the result cache, depending on all its inputs
+    # (for a dispatch with capacities optimized on typical days, on the unmodified case)
+    if experiment[USE_RESULT_CACHE] is True:
+        cache_key = result_cache.get_key(experiment, case_dict)
+
     # For restoring .oemof results if that is possible (speeding up computation time)
     if (
         os.path.isfile(experiment[OUTPUT_FOLDER] + "/oemof/" + file_name + ".oemof")
         and experiment[RESTORE_OEMOF_IF_EXISTENT] is True
     ):
+        micro_grid_system = oemof_model.load_oemof_results(
+            experiment[OUTPUT_FOLDER], file_name
+        )
         logging.info("Previous results of " + case_dict[CASE_NAME] + " restored.")
+        if experiment[SAVE_OEMOFRESULTS] is False:
+            os.remove(experiment[OUTPUT_FOLDER] + "/oemof/" + file_name + ".oemof")
 
-    # If .oemof results do not already exist, start oemof-process
     else:
-        # generate model
-        micro_grid_system, model = oemof_model.build(experiment, case_dict)
-        # perform simulation
-        micro_grid_system = oemof_model.simulate(
-            experiment, micro_grid_system, model, file_name
-        )
-        # store simulation results to .oemof
-        oemof_model.store_results(
-            micro_grid_system, file_name, experiment[OUTPUT_FOLDER]
+        micro_grid_system = None
+        # Restore results of a simulation with identical inputs from the result cache
+        if experiment[USE_RESULT_CACHE] is True:
+            micro_grid_system = result_cache.restore(experiment, cache_key)
+            if micro_grid_system is not None:
+                logging.info(
+                    "Results of "
+                    + case_dict[CASE_NAME]
+                    + " restored from result cache."
+                )
+                if experiment[SAVE_OEMOFRESULTS] is True:
+                    oemof_model.store_results_in_background(
+                        experiment, micro_grid_system, file_name
+                    )
+
+        # If .oemof results do not already exist, start oemof-process
+        if micro_grid_system is None:
+            # Capacities optimized on typical days are fixed for the dispatch of the full timeframe
+            typical_days_system = None
+            if uses_typical_days_dispatch(experiment, case_dict):
+                typical_days_system, case_dict = get_capacities_of_typical_days(
+                    experiment, case_dict
+                )
+            if typical_days.uses_typical_days(experiment, case_dict):
+                micro_grid_system = simulate_typical_days(experiment, case_dict)
+            elif rolling_horizon.uses_rolling_horizon(experiment, case_dict):
+                micro_grid_system = rolling_horizon.simulate(
+                    experiment, case_dict, file_name
+                )
+            else:
+                # generate model, or re-parameterize model of previous experiment
+                if experiment[REUSE_OEMOF_MODEL] is True:
+                    micro_grid_system, model = oemof_model.reuse_or_build(
+                        experiment, case_dict
+                    )
+                else:
+                    micro_grid_system, model = oemof_model.build(experiment, case_dict)
+                # perform simulation
+                micro_grid_system = oemof_model.simulate(
+                    experiment,
+                    micro_grid_system,
+                    model,
+                    file_name,
+                    case_dict[CASE_NAME],
+                )
+            if micro_grid_system is None and typical_days_system is not None:
+                logging.warning(
+                    "The dispatch of case "
+                    + case_dict[CASE_NAME]
+                    + " with the capacities optimized on typical days is infeasible, "
+                    + "the dispatch of the typical days is evaluated instead."
+                )
+                micro_grid_system = typical_days_system
+            elif micro_grid_system is None:
+                logging.error(
+                    "The optimization problem of case "
+                    + case_dict[CASE_NAME]
+                    + " is infeasible, please check its case definition and the input data."
+                )
+                sys.exit()
+            # The fixed capacities are stored with the meta results, to evaluate restored results
+            if typical_days_system is not None:
+                micro_grid_system.results[META][FIXED_CAPACITIES_OF_TYPICAL_DAYS] = {
+                    name: case_dict[name] for name in typical_days.FIXED_CAPACITIES
+                }
+            # results are evaluated in memory, storing them to .oemof does not block the evaluation
+            if experiment[USE_RESULT_CACHE] is False:
+                cache_key = None
+            oemof_model.store_results_in_background(
+                experiment, micro_grid_system, file_name, cache_key
+            )
+
+    # Restored results of a dispatch are evaluated with the capacities fixed on typical days
+    if uses_typical_days_dispatch(experiment, case_dict):
+        case_dict = get_restored_capacities_of_typical_days(
+            experiment, case_dict, micro_grid_system
         )
 
-    # it actually is not really necessary to restore just simulated results... but for consistency and to make sure that calling results is easy, this is used nevertheless
-    # load oemof results from previous or just finished simulation
-    micro_grid_system = oemof_model.load_oemof_results(
-        experiment[OUTPUT_FOLDER], file_name
-    )
-
     # output.save_network_graph(micro_grid_system, case_dict['case_name'])
     ######################
     # Processing
@@ -134,96 +218,8 @@ def run(experiment, case_dict):
         COMMENTS: experiment[COMMENTS],
     }
 
-    electricity_bus_ac = solph.views.node(results, BUS_ELECTRICITY_AC)
-
-    electricity_bus_dc = solph.views.node(results, BUS_ELECTRICITY_DC)
-
     try:
-
-        e_flows_df = timeseries.get_demand(
-            case_dict,
-            oemof_results,
-            electricity_bus_ac,
-            electricity_bus_dc,
-            experiment,
-        )
-        e_flows_df = timeseries.get_shortage(
-            case_dict,
-            oemof_results,
-            electricity_bus_ac,
-            electricity_bus_dc,
-            experiment,
-            e_flows_df,
-        )
-
-        oemof_results.update(
-            {
-                SUPPLY_RELIABILITY_KWH: oemof_results[TOTAL_DEMAND_SUPPLIED_ANNUAL_KWH]
-                / oemof_results[TOTAL_DEMAND_ANNUAL_KWH]
-            }
-        )
-
-        e_flows_df = timeseries.get_excess(
-            case_dict,
-            oemof_results,
-            electricity_bus_ac,
-            electricity_bus_dc,
-            e_flows_df,
-        )
-
-        timeseries.get_fuel(case_dict, oemof_results, results)
-        e_flows_df = timeseries.get_genset(
-            case_dict, oemof_results, electricity_bus_ac, e_flows_df
-        )
-
-        e_flows_df = timeseries.get_national_grid(
-            case_dict,
-            oemof_results,
-            results,
-            e_flows_df,
-            experiment[GRID_AVAILABILITY],
-        )
-
-        e_flows_df = timeseries.get_wind(
-            case_dict,
-            oemof_results,
-            electricity_bus_ac,
-            e_flows_df,
-            experiment[PEAK_WIND_GENERATION_PER_KW],
-        )
-
-        e_flows_df = timeseries.get_pv(
-            case_dict,
-            oemof_results,
-            electricity_bus_dc,
-            experiment,
-            e_flows_df,
-            experiment[PEAK_PV_GENERATION_PER_KWP],
-        )
-
-        e_flows_df = timeseries.get_storage(
-            case_dict, oemof_results, experiment, results, e_flows_df
-        )
-
-        e_flows_df = timeseries.get_rectifier(
-            case_dict,
-            oemof_results,
-            electricity_bus_ac,
-            electricity_bus_dc,
-            e_flows_df,
-        )
-
-        e_flows_df = timeseries.get_inverter(
-            case_dict,
-            oemof_results,
-            electricity_bus_ac,
-            electricity_bus_dc,
-            e_flows_df,
-        )
-
-        # determine renewable share of system - not of demand, but of total generation + consumption.
-        timeseries.get_res_share(case_dict, oemof_results, experiment)
-
+        e_flows_df = evaluate_flows(experiment, case_dict, oemof_results, results)
     except (KeyError):
         logging.error(
             "Optimized values for a component could not be found in simulation results. \n"
@@ -231,7 +227,7 @@ def run(experiment, case_dict):
         )
 
     # Run plausability test on energy flows
-    plausability_tests.run(oemof_results, e_flows_df)
+    plausability_tests.run(oemof_results, e_flows_df, experiment)
 
     # Run test on oemof constraints
     if case_dict[STABILITY_CONSTRAINT] is False:
@@ -248,25 +244,30 @@ def run(experiment, case_dict):
         case_dict, oemof_results, experiment, e_flows_df
     )
     constraints_custom.discharge_only_at_blackout_test(
-        case_dict, oemof_results, e_flows_df
+        case_dict, oemof_results, experiment, e_flows_df
     )
     constraints_custom.inverter_only_at_blackout_test(
-        case_dict, oemof_results, e_flows_df
+        case_dict, oemof_results, experiment, e_flows_df
     )
 
-    # Generate output (csv, png) for energy/storage flows
+    # Generate output (csv, png, binary) for energy/storage flows
     output.save_mg_flows(experiment, case_dict, e_flows_df, experiment[FILENAME])
     output.save_storage(experiment, case_dict, e_flows_df, experiment[FILENAME])
+    output.save_binary_flows(experiment, case_dict, e_flows_df, experiment[FILENAME])
 
     # print meta/main results in command window
-    if electricity_bus_ac != None:
-        output.print_oemof_meta_main_invest(
-            experiment, meta, electricity_bus_ac, case_dict[CASE_NAME]
-        )
-    if electricity_bus_dc != None:
-        output.print_oemof_meta_main_invest(
-            experiment, meta, electricity_bus_dc, case_dict[CASE_NAME]
+    if (
+        experiment[DISPLAY_META] is True
+        or experiment[DISPLAY_MAIN] is True
+        or (
+            case_dict[CASE_NAME] in [BASE_OEM, BASE_OEM_WITH_MIN_LOADING]
+            and experiment[DISPLAY_INVEST] is True
         )
+    ):
+        for bus in [BUS_ELECTRICITY_AC, BUS_ELECTRICITY_DC]:
+            output.print_oemof_meta_main_invest(
+                experiment, meta, solph.views.node(results, bus), case_dict[CASE_NAME]
+            )
 
     # Evaluate simulated systems regarding costs
     economic_evaluation.project_annuities(case_dict, oemof_results, experiment)
@@ -331,7 +332,234 @@ def run(experiment, case_dict):
     logging.debug("    Simulation of case " + case_dict[CASE_NAME] + " complete.")
     logging.debug("\n")
 
-    if experiment[SAVE_OEMOFRESULTS] is False:
-        os.remove(experiment[OUTPUT_FOLDER] + "/oemof/" + file_name + ".oemof")
-
     return oemof_results
+
+
+def evaluate_flows(experiment, case_dict, oemof_results, results):
+    """
+    Extracts the time series of all energy flows, their annual values and the
+    optimized capacities from the results of a simulation. The flows are taken from
+    the results in a single pass and collected in a preallocated array, see
+    G3.initialize_e_flows().
+
+    Parameters
+    ----------
+    experiment: dict
+        Contains general settings for the experiment
+
+    case_dict: dict
+        Contains settings for capacities and storage
+
+    oemof_results: dict
+        Results of the simulation, extended in place
+
+    results: dict
+        Main results of the oemof simulation
+
+    Returns
+    -------
+    e_flows_df: pandas.DataFrame
+        Time series of the energy flows
+    """
+    sequences, scalars = timeseries.get_flows(results)
+    e_flows = timeseries.initialize_e_flows(experiment, case_dict)
+
+    timeseries.get_demand(case_dict, oemof_results, sequences, experiment, e_flows)
+    timeseries.get_shortage(case_dict, oemof_results, sequences, experiment, e_flows)
+
+    oemof_results.update(
+        {
+            SUPPLY_RELIABILITY_KWH: oemof_results[TOTAL_DEMAND_SUPPLIED_ANNUAL_KWH]
+            / oemof_results[TOTAL_DEMAND_ANNUAL_KWH]
+        }
+    )
+
+    timeseries.get_excess(case_dict, oemof_results, sequences, e_flows)
+
+    timeseries.get_fuel(case_dict, oemof_results, sequences)
+    timeseries.get_genset(case_dict, oemof_results, sequences, scalars, e_flows)
+
+    timeseries.get_national_grid(
+        case_dict,
+        oemof_results,
+        sequences,
+        e_flows,
+        experiment[GRID_AVAILABILITY],
+    )
+
+    timeseries.get_wind(
+        case_dict,
+        oemof_results,
+        sequences,
+        scalars,
+        e_flows,
+        experiment[PEAK_WIND_GENERATION_PER_KW],
+    )
+
+    timeseries.get_pv(
+        case_dict,
+        oemof_results,
+        sequences,
+        scalars,
+        experiment,
+        e_flows,
+        experiment[PEAK_PV_GENERATION_PER_KWP],
+    )
+
+    timeseries.get_storage(
+        case_dict, oemof_results, experiment, sequences, scalars, e_flows
+    )
+
+    timeseries.get_rectifier(case_dict, oemof_results, sequences, scalars, e_flows)
+
+    timeseries.get_inverter(case_dict, oemof_results, sequences, scalars, e_flows)
+
+    # determine renewable share of system - not of demand, but of total generation + consumption.
+    timeseries.get_res_share(case_dict, oemof_results, experiment)
+
+    return timeseries.get_e_flows_df(e_flows)
+
+
+def simulate_typical_days(experiment, case_dict):
+    """
+    Optimizes the capacities of a case on the typical days of the evaluated timeframe.
+    The results are disaggregated to the full timeframe, each day having the dispatch
+    of its typical day, see D2.aggregate() and D2.disaggregate().
+
+    Parameters
+    ----------
+    experiment: dict
+        Contains general settings for the experiment
+
+    case_dict: dict
+        Contains settings for capacities and storage
+
+    Returns
+    -------
+    micro_grid_system: oemof.solph.network.EnergySystem or None
+        Energy system of the typical days with results over the full timeframe,
+        None if the problem is infeasible
+    """
+    (
+        aggregated_experiment,
+        aggregated_case_dict,
+        timestep_positions,
+    ) = typical_days.aggregate(experiment, case_dict)
+    micro_grid_system, model = oemof_model.build(
+        aggregated_experiment, aggregated_case_dict
+    )
+    micro_grid_system = oemof_model.simulate(
+        aggregated_experiment,
+        micro_grid_system,
+        model,
+        case_dict[FILENAME] + "_typical_days",
+    )
+    if micro_grid_system is None:
+        return None
+    return typical_days.disaggregate(micro_grid_system, experiment, timestep_positions)
+
+
+def uses_typical_days_dispatch(experiment, case_dict):
+    """
+    Checks if the dispatch of a case is simulated on the full timeframe with the
+    capacities optimized on typical days (TYPICAL_DAYS_DISPATCH).
+
+    Parameters
+    ----------
+    experiment: dict
+        Contains general settings for the experiment
+
+    case_dict: dict
+        Contains settings for capacities and storage
+
+    Returns
+    -------
+    bool
+    """
+    return (
+        typical_days.uses_typical_days(experiment, case_dict)
+        and experiment[TYPICAL_DAYS_DISPATCH] is True
+    )
+
+
+def get_restored_capacities_of_typical_days(experiment, case_dict, micro_grid_system):
+    """
+    Fixes the capacities of a case to the capacities optimized on typical days, which are
+    stored with the results of its dispatch. For results stored without them, the
+    capacities are optimized on typical days again.
+
+    Parameters
+    ----------
+    experiment: dict
+        Contains general settings for the experiment
+
+    case_dict: dict
+        Contains settings for capacities and storage
+
+    micro_grid_system: oemof.solph.network.EnergySystem
+        Energy system including the restored results of the dispatch
+
+    Returns
+    -------
+    fixed_case_dict: dict
+        Settings of the case with the capacities optimized on typical days
+    """
+    if FIXED_CAPACITIES_OF_TYPICAL_DAYS in micro_grid_system.results[META]:
+        fixed_case_dict = case_dict.copy()
+        fixed_case_dict.update(
+            micro_grid_system.results[META][FIXED_CAPACITIES_OF_TYPICAL_DAYS]
+        )
+        return fixed_case_dict
+    logging.warning(
+        "The restored results of case "
+        + case_dict[CASE_NAME]
+        + " do not include the capacities optimized on typical days, they are optimized again."
+    )
+    _, fixed_case_dict = get_capacities_of_typical_days(experiment, case_dict)
+    return fixed_case_dict
+
+
+def get_capacities_of_typical_days(experiment, case_dict):
+    """
+    Optimizes the capacities of a case on typical days and fixes them, so that
+    the dispatch of the full timeframe can be simulated (TYPICAL_DAYS_DISPATCH).
+
+    Parameters
+    ----------
+    experiment: dict
+        Contains general settings for the experiment
+
+    case_dict: dict
+        Contains settings for capacities and storage
+
+    Returns
+    -------
+    micro_grid_system: oemof.solph.network.EnergySystem
+        Energy system of the typical days with results over the full timeframe,
+        evaluated if the dispatch with the fixed capacities is infeasible
+
+    fixed_case_dict: dict
+        Settings of the case with the capacities optimized on typical days
+    """
+    micro_grid_system = simulate_typical_days(experiment, case_dict)
+    if micro_grid_system is None:
+        logging.error(
+            "The optimization problem of case "
+            + case_dict[CASE_NAME]
+            + " on typical days is infeasible, please check its case definition and the input data."
+        )
+        sys.exit()
+    results = micro_grid_system.results[MAIN]
+    sizing_results = {}
+    evaluate_flows(experiment, case_dict, sizing_results, results)
+    logging.info(
+        "Simulating dispatch of case "
+        + case_dict[CASE_NAME]
+        + " with the capacities optimized on typical days."
+    )
+    return (
+        micro_grid_system,
+        typical_days.with_fixed_capacities(
+            experiment, case_dict, helpers.define_base_capacities(sizing_results)
+        ),
+    )
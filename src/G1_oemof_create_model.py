@@ -1,8 +1,14 @@
 import logging
 import sys
+import numbers
+import timeit
+import threading
+import pyomo.environ as po
+from pyomo.opt import SolverFactory
 import oemof.solph as solph
 from oemof.solph import processing
 
+import src.G1a_result_cache as result_cache
 import src.G2a_oemof_busses_and_componets as generate
 import src.G2b_constraints_custom as constraints_custom
 
@@ -46,6 +52,11 @@ from src.constants import (
     SYMBOLIC_SOLVER_LABELS,
     OEMOF_FOLDER,
     CASE_DEFINITIONS,
+    WARM_START,
+    PERSISTENT_SOLVER,
+    TIME,
+    SAVE_OEMOFRESULTS,
+    TIMESTEP_WEIGHTS,
 )
 
 
@@ -54,7 +65,38 @@ def load_energysystem_lp():
     return
 
 
-def build(experiment, case_dict):
+# Models built in this process, kept to be re-parameterized: {case name: (key, micro_grid_system, model)}
+BUILT_MODELS = {}
+
+# Costs of nonconvex flows, transferred to a re-used model
+NONCONVEX_COSTS = ["startup_costs", "shutdown_costs", "activity_costs"]
+
+# Solutions of previous simulations in this process, used as warm start: {case name: [(experiment, solution)]}
+WARM_START_SOLUTIONS = {}
+# Number of solutions kept per case
+NUMBER_OF_WARM_START_SOLUTIONS = 10
+
+# Persistent solver interfaces of this process: {case name: (model, solver interface)}
+PERSISTENT_SOLVERS = {}
+# Solvers with a persistent interface in pyomo
+SOLVERS_WITH_PERSISTENT_INTERFACE = ["gurobi", "cplex"]
+# Parameters of these solvers corresponding to the cbc command line options CMDLINE_OPTION
+PERSISTENT_SOLVER_OPTIONS = {
+    "gurobi": {"ratioGap": "MIPGap", "allowedGap": "MIPGapAbs"},
+    "cplex": {
+        "ratioGap": "mip_tolerances_mipgap",
+        "allowedGap": "mip_tolerances_absmipgap",
+    },
+}
+
+# Threads storing results in the background: [(id(micro_grid_system), thread)]
+# Only the id is kept, so that energy systems are released once their results are written
+PENDING_STORES = []
+# Maximal number of results stored in the background at once, each holds an energy system
+MAX_PENDING_STORES = 2
+
+
+def build(experiment, case_dict, build_model=True):
 
     """
     Creates an implementable model for the oemof optimization with the specs. dictionaries
@@ -67,6 +109,9 @@ def build(experiment, case_dict):
     case_dict: dict
         Contains settings for capacities and storage
 
+    build_model: bool
+        If False, only the energy system is created and model is None
+
     Returns
     -------
     micro_grid_system: oemof.solph.network.EnergySystem
@@ -95,7 +140,9 @@ def build(experiment, case_dict):
 
     # ------------demand sink ac------------#
     sink_demand_ac = generate.demand_ac(
-        micro_grid_system, bus_electricity_ac, experiment[DEMAND_PROFILE_AC]
+        micro_grid_system,
+        bus_electricity_ac,
+        generate.get_timeseries(experiment, DEMAND_PROFILE_AC),
     )
 
     # ------------fuel source------------#
@@ -256,7 +303,9 @@ def build(experiment, case_dict):
 
     # ------------demand sink dc------------#
     sink_demand_dc = generate.demand_dc(
-        micro_grid_system, bus_electricity_dc, experiment[DEMAND_PROFILE_DC]
+        micro_grid_system,
+        bus_electricity_dc,
+        generate.get_timeseries(experiment, DEMAND_PROFILE_DC),
     )
 
     # ------------PV------------#
@@ -373,8 +422,17 @@ def build(experiment, case_dict):
     else:
         source_shortage = None
 
+    if build_model is False:
+        return micro_grid_system, None
+
     logging.debug("Create oemof model based on created components and busses.")
-    model = solph.Model(micro_grid_system)
+    if TIMESTEP_WEIGHTS in experiment:
+        # Timesteps of typical days represent several timesteps, see D2.aggregate()
+        model = solph.Model(
+            micro_grid_system, objective_weighting=experiment[TIMESTEP_WEIGHTS]
+        )
+    else:
+        model = solph.Model(micro_grid_system)
 
     # ------------Stability constraint------------#
     if case_dict[STABILITY_CONSTRAINT] is False:
@@ -510,7 +568,95 @@ def build(experiment, case_dict):
     return micro_grid_system, model
 
 
-def simulate(experiment, micro_grid_system, model, file_name):
+def reuse_or_build(experiment, case_dict):
+    """
+    Re-parameterizes the model previously built for the same case, if the experiments
+    only differ in cost parameters, otherwise a new model is built.
+
+    Costs only define the coefficients of the objective function. The energy system with
+    the new costs is created, its variable costs and equivalent periodical costs are
+    transferred to the flows and storages of the previous model and the objective
+    function is rebuilt. All constraints are kept, so that the expensive creation of
+    the pyomo model is skipped.
+
+    Parameters
+    ----------
+    experiment: dict
+        Contains general settings for the experiment
+
+    case_dict: dict
+        Contains settings for capacities and storage
+
+    Returns
+    -------
+    micro_grid_system: oemof.solph.network.EnergySystem
+        Energy system for oemof optimization
+
+    model: oemof.solph.models.Model
+        Model used for the oemof optimization
+    """
+    model_key = result_cache.get_key(experiment, case_dict, ignore_costs=True)
+    case_name = case_dict[CASE_NAME]
+
+    if case_name in BUILT_MODELS and BUILT_MODELS[case_name][0] == model_key:
+        logging.debug("Re-parameterize previous oemof model of case " + case_name)
+        micro_grid_system, model = BUILT_MODELS[case_name][1:]
+        # The energy system is changed, it must not be stored at the same time
+        wait_for_stored_results(micro_grid_system)
+        updated_micro_grid_system, _ = build(experiment, case_dict, build_model=False)
+        update_costs(micro_grid_system, model, updated_micro_grid_system)
+    else:
+        micro_grid_system, model = build(experiment, case_dict)
+        BUILT_MODELS.update({case_name: (model_key, micro_grid_system, model)})
+    return micro_grid_system, model
+
+
+def update_costs(micro_grid_system, model, updated_micro_grid_system):
+    """
+    Transfers the costs of an energy system with identical structure to the model and rebuilds its objective function.
+
+    Parameters
+    ----------
+    micro_grid_system: oemof.solph.network.EnergySystem
+        Energy system of the model
+
+    model: oemof.solph.models.Model
+        Previously built model
+
+    updated_micro_grid_system: oemof.solph.network.EnergySystem
+        Energy system with the same components and the updated costs
+    """
+    updated_flows = {
+        (str(source), str(target)): flow
+        for (source, target), flow in updated_micro_grid_system.flows().items()
+    }
+    for (source, target), flow in model.flows.items():
+        updated_flow = updated_flows[(str(source), str(target))]
+        flow.variable_costs = updated_flow.variable_costs
+        if flow.investment is not None:
+            flow.investment.ep_costs = updated_flow.investment.ep_costs
+        if flow.nonconvex is not None:
+            for costs in NONCONVEX_COSTS:
+                setattr(flow.nonconvex, costs, getattr(updated_flow.nonconvex, costs))
+
+    updated_nodes = {str(node): node for node in updated_micro_grid_system.nodes}
+    for node in micro_grid_system.nodes:
+        if getattr(node, "investment", None) is not None:
+            node.investment.ep_costs = updated_nodes[str(node)].investment.ep_costs
+
+    # Cost expressions (eg. investment_costs, startup_costs) are created again by the
+    # blocks when rebuilding the objective function, none of the previous costs may remain
+    for block in model.component_data_objects():
+        if hasattr(block, "_objective_expression"):
+            for expression in list(
+                block.component_objects(po.Expression, descend_into=False)
+            ):
+                block.del_component(expression)
+    model._add_objective(update=True)
+    return
+
+
+def simulate(experiment, micro_grid_system, model, file_name, case_name=None):
     """
     Simulates the optimization problem using the given model and experiment's settings
 
@@ -528,24 +674,52 @@ def simulate(experiment, micro_grid_system, model, file_name):
     file_name: str
         Name used for saving the simulation's result
 
+    case_name: str, optional
+        Name of the simulated case, required for warm starts (WARM_START)
+
     Returns
     -------
-    micro_grid_system: oemof.solph.network.EnergySystem
-        Model for the optimization with integrated results
+    micro_grid_system: oemof.solph.network.EnergySystem or None
+        Model for the optimization with integrated results, None if the problem is infeasible
 
     """
+    solve_kwargs = {
+        "tee": experiment[SOLVER_VERBOSE]
+    }  # if tee_switch is true solver messages will be displayed
+
+    if experiment[WARM_START] is True and case_name is not None:
+        if warm_start(experiment, model, case_name) is True:
+            solve_kwargs.update({"warmstart": True})
+
     logging.info("Simulating...")
-    model.solve(
-        solver=experiment[SOLVER],
-        solve_kwargs={
-            "tee": experiment[SOLVER_VERBOSE]
-        },  # if tee_switch is true solver messages will be displayed
-        cmdline_options={
-            experiment[CMDLINE_OPTION]: str(experiment[CMDLINE_OPTION_VALUE])
-        },
-    )  # ratioGap allowedGap mipgap
+    if (
+        experiment[PERSISTENT_SOLVER] is True
+        and experiment[SOLVER] in SOLVERS_WITH_PERSISTENT_INTERFACE
+    ):
+        solve_persistent(experiment, model, solve_kwargs, case_name)
+    else:
+        if experiment[PERSISTENT_SOLVER] is True:
+            logging.warning(
+                f"There is no persistent interface for solver {experiment[SOLVER]}, "
+                f"setting {PERSISTENT_SOLVER} only works with {', '.join(SOLVERS_WITH_PERSISTENT_INTERFACE)}."
+            )
+        model.solve(
+            solver=experiment[SOLVER],
+            solve_kwargs=solve_kwargs,
+            cmdline_options={
+                experiment[CMDLINE_OPTION]: str(experiment[CMDLINE_OPTION_VALUE])
+            },
+        )  # ratioGap allowedGap mipgap
     logging.debug("Problem solved")
 
+    # An infeasible problem has no solution to be stored
+    if model.solver_results.solver.termination_condition == "infeasible":
+        logging.warning("The optimization problem is infeasible.")
+        return None
+
+    if experiment[WARM_START] is True and case_name is not None:
+        store_warm_start_solution(experiment, model, case_name)
+
     if experiment["save_lp_file"] is True:
         logging.debug("Saving lp-file to folder.")
         model.write(
@@ -559,6 +733,191 @@ def simulate(experiment, micro_grid_system, model, file_name):
     return micro_grid_system
 
 
+def solve_persistent(experiment, model, solve_kwargs, case_name=None):
+    """
+    Solves the model with the persistent interface of the solver, which keeps the model
+    loaded in the solver instead of writing and reading an lp file for every simulation.
+    If the model was re-used for the case (REUSE_OEMOF_MODEL), the solver instance is
+    kept as well and only the objective function is updated.
+
+    Parameters
+    ----------
+    experiment: dict
+        Contains general settings for the experiment
+
+    model: oemof.solph.models.Model
+        Model used for the oemof optimization
+
+    solve_kwargs: dict
+        Arguments passed to the solve() method of the solver interface, eg. "tee"
+
+    case_name: str, optional
+        Name of the simulated case, the solver instance is only kept if it is provided
+
+    Returns
+    -------
+    solver_results: pyomo.opt.SolverResults
+    """
+    if case_name in PERSISTENT_SOLVERS and PERSISTENT_SOLVERS[case_name][0] is model:
+        solver = PERSISTENT_SOLVERS[case_name][1]
+        # The objective function is rebuilt when costs are updated (see update_costs())
+        solver.set_objective(model.objective)
+    else:
+        solver = SolverFactory(experiment[SOLVER] + "_persistent")
+        solver.set_instance(model)
+        if case_name is not None:
+            PERSISTENT_SOLVERS.update({case_name: (model, solver)})
+
+    solver.options.update(get_persistent_solver_options(experiment))
+
+    start = timeit.default_timer()
+    solver_results = solver.solve(**solve_kwargs)
+    duration = timeit.default_timer() - start
+
+    # Meta results are evaluated equally to solving the model with model.solve()
+    if TIME not in solver_results[SOLVER][0]:
+        solver_results.solver.time = duration
+    termination_condition = solver_results.solver.termination_condition
+    if termination_condition != "optimal":
+        logging.warning(
+            f"Optimization ended with termination condition {termination_condition}."
+        )
+    model.es.results = solver_results
+    model.solver_results = solver_results
+    return solver_results
+
+
+def get_persistent_solver_options(experiment):
+    """
+    Translates the cbc command line option CMDLINE_OPTION to the corresponding parameter
+    of the solver with a persistent interface. Options without a corresponding parameter
+    are ignored with a warning.
+
+    Parameters
+    ----------
+    experiment: dict
+        Contains general settings for the experiment
+
+    Returns
+    -------
+    options: dict
+        Parameters of the solver and their values
+    """
+    option = PERSISTENT_SOLVER_OPTIONS[experiment[SOLVER]].get(
+        experiment[CMDLINE_OPTION]
+    )
+    if option is None:
+        logging.warning(
+            f"Solver option {experiment[CMDLINE_OPTION]} is not supported for solver {experiment[SOLVER]} "
+            f"with {PERSISTENT_SOLVER}, the option is ignored. "
+            f"Supported options: {', '.join(PERSISTENT_SOLVER_OPTIONS[experiment[SOLVER]])}."
+        )
+        return {}
+    return {option: experiment[CMDLINE_OPTION_VALUE]}
+
+
+def warm_start(experiment, model, case_name):
+    """
+    Initializes the variables of the model with the solution of the most similar experiment
+    simulated before for the same case. Solvers like CBC only use the integer variables
+    as MIP start (eg. with minimal loading or batches of generators), others use all values.
+
+    Parameters
+    ----------
+    experiment: dict
+        Contains general settings for the experiment
+
+    model: oemof.solph.models.Model
+        Model used for the oemof optimization
+
+    case_name: str
+        Name of the simulated case
+
+    Returns
+    -------
+    warm_started: bool
+        True if a previous solution could be used and the solver supports warm starts
+    """
+    if case_name not in WARM_START_SOLUTIONS:
+        return False
+    # The solver version, on which warm starts depend, is only determined once it is available
+    solver = SolverFactory(experiment[SOLVER])
+    if not (solver.available(exception_flag=False) and solver.warm_start_capable()):
+        return False
+
+    distances = [
+        get_experiment_distance(experiment, solved_experiment)
+        for (solved_experiment, solution) in WARM_START_SOLUTIONS[case_name]
+    ]
+    solution = WARM_START_SOLUTIONS[case_name][distances.index(min(distances))][1]
+
+    for variable in model.component_data_objects(po.Var):
+        if variable.name in solution and variable.fixed is False:
+            variable.value = solution[variable.name]
+    logging.debug("Warm start from solution of a previous experiment.")
+    return True
+
+
+def store_warm_start_solution(experiment, model, case_name):
+    """
+    Stores the values of all variables of a solved model, to be used as warm start for following experiments.
+
+    Parameters
+    ----------
+    experiment: dict
+        Contains general settings for the experiment
+
+    model: oemof.solph.models.Model
+        Model used for the oemof optimization
+
+    case_name: str
+        Name of the simulated case
+    """
+    solution = {
+        variable.name: variable.value
+        for variable in model.component_data_objects(po.Var)
+        if variable.value is not None
+    }
+    parameters = {
+        key: experiment[key]
+        for key in experiment
+        if isinstance(experiment[key], numbers.Number)
+    }
+    solutions = WARM_START_SOLUTIONS.get(case_name, [])
+    solutions.append((parameters, solution))
+    WARM_START_SOLUTIONS.update(
+        {case_name: solutions[-NUMBER_OF_WARM_START_SOLUTIONS:]}
+    )
+    return
+
+
+def get_experiment_distance(experiment, solved_experiment):
+    """
+    Sum of the relative differences of the numerical parameters of two experiments.
+
+    Parameters
+    ----------
+    experiment: dict
+        Contains the parameters of an experiment
+
+    solved_experiment: dict
+        Contains the numerical parameters of a previously simulated experiment
+
+    Returns
+    -------
+    distance: float
+    """
+    distance = 0
+    for key in solved_experiment:
+        if key in experiment and isinstance(experiment[key], numbers.Number):
+            difference = abs(experiment[key] - solved_experiment[key])
+            if difference > 0:
+                distance += difference / max(
+                    abs(experiment[key]), abs(solved_experiment[key])
+                )
+    return distance
+
+
 def store_results(micro_grid_system, file_name, output_folder):
     """
     Stores the results of the oemof simulation to an `.oemof` file.
@@ -589,6 +948,75 @@ def store_results(micro_grid_system, file_name, output_folder):
     return micro_grid_system
 
 
+def store_results_in_background(
+    experiment, micro_grid_system, file_name, cache_key=None
+):
+    """
+    Stores the results of the oemof simulation in a background thread, so that the next
+    simulation does not have to wait for it. Results are stored to the oemof folder if
+    SAVE_OEMOFRESULTS is True and to the result cache if a cache_key is given. At most
+    MAX_PENDING_STORES results are stored at once, further stores wait for the oldest.
+
+    Parameters
+    ----------
+    experiment: dict
+        Contains general settings for the experiment
+
+    micro_grid_system: oemof.solph.network.EnergySystem
+        Energy system for oemof optimization, including results
+
+    file_name: str
+        Name used for saving the simulation's result
+
+    cache_key: str, optional
+        Key of the simulation in the result cache, see G1a.get_key()
+    """
+    if experiment[SAVE_OEMOFRESULTS] is False and cache_key is None:
+        return
+
+    # Finished stores are removed, for more than MAX_PENDING_STORES the oldest is awaited
+    PENDING_STORES[:] = [
+        (system_id, thread)
+        for (system_id, thread) in PENDING_STORES
+        if thread.is_alive()
+    ]
+    while len(PENDING_STORES) >= MAX_PENDING_STORES:
+        PENDING_STORES.pop(0)[1].join()
+
+    def store():
+        try:
+            if experiment[SAVE_OEMOFRESULTS] is True:
+                store_results(micro_grid_system, file_name, experiment[OUTPUT_FOLDER])
+                if cache_key is not None:
+                    result_cache.store(experiment, cache_key, file_name)
+            else:
+                result_cache.dump(experiment, cache_key, micro_grid_system)
+        except Exception as e:
+            logging.error(f"Results of {file_name} could not be stored: {e}")
+
+    # Threads are not daemonic, so that stores are completed before the process exits
+    thread = threading.Thread(target=store, name="store_" + file_name)
+    thread.start()
+    PENDING_STORES.append((id(micro_grid_system), thread))
+    return
+
+
+def wait_for_stored_results(micro_grid_system=None):
+    """
+    Waits until results stored in the background are written.
+
+    Parameters
+    ----------
+    micro_grid_system: oemof.solph.network.EnergySystem, optional
+        Only wait for the results of this energy system. By default, waits for all results.
+    """
+    for (system_id, thread) in list(PENDING_STORES):
+        if micro_grid_system is None or system_id == id(micro_grid_system):
+            thread.join()
+            PENDING_STORES.remove((system_id, thread))
+    return
+
+
 def load_oemof_results(output_folder, file_name):
     """
     Loads simulation results stored in an `.oemof` file.
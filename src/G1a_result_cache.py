@@ -0,0 +1,344 @@
+"""
+Content-addressed cache of oemof simulation results.
+
+Results are stored as .oemof files named by a hash of everything that defines the
+optimization problem (case definition, scalar experiment parameters and timeseries).
+Other than the restoring of results by file name (RESTORE_OEMOF_IF_EXISTENT), changed
+inputs therefore never restore outdated results. The size of the cache is limited,
+least recently used results are removed first.
+"""
+
+import os
+import shutil
+import hashlib
+import logging
+
+import numpy as np
+import pandas as pd
+import oemof.solph as solph
+
+from src.constants import (
+    OUTPUT_FOLDER,
+    OUTPUT_FILE,
+    OEMOF_FOLDER,
+    FILENAME,
+    COMMENTS,
+    DISPLAY_EXPERIMENT,
+    DISPLAY_META,
+    DISPLAY_MAIN,
+    DISPLAY_INVEST,
+    SAVE_LP_FILE,
+    SAVE_OEMOFRESULTS,
+    SAVE_TO_CSV_FLOWS_STORAGE,
+    SAVE_TO_PNG_FLOWS_STORAGE,
+    SAVE_TO_CSV_FLOWS_ELECTRICITY_MG,
+    SAVE_TO_PNG_FLOWS_ELECTRICITY_MG,
+    SAVE_TO_BINARY_FLOWS,
+    RESTORE_OEMOF_IF_EXISTENT,
+    RESTORE_BLACKOUTS_IF_EXISTENT,
+    SOLVER_VERBOSE,
+    USE_RESULT_CACHE,
+    RESULT_CACHE_MAX_SIZE_MB,
+    RESULT_CACHE_FOLDER,
+    REUSE_OEMOF_MODEL,
+    WARM_START,
+    PERSISTENT_SOLVER,
+    SENSITIVITY_SAMPLING,
+    SENSITIVITY_SAMPLE_SIZE,
+    SENSITIVITY_REFINEMENT_SIZE,
+    SENSITIVITY_SAMPLING_SEED,
+    SURROGATE_MODEL,
+    SURROGATE_INITIAL_SIZE,
+    SURROGATE_BATCH_SIZE,
+    SURROGATE_TOLERANCE,
+    SURROGATE_STATUS,
+    INCREMENTAL_RERUN,
+    RESUME,
+    SIMULATION_KEYS,
+    REUSED_RESULTS,
+    TIMESERIES_ARRAYS,
+    DEMAND_AC,
+    DEMAND_DC,
+    FILE_INDEX,
+    SUFFIX_COST_INVESTMENT,
+    SUFFIX_COST_OPEX,
+    SUFFIX_COST_ANNUITY,
+    SUFFIX_COST_CAPEX,
+    SUFFIX_COST_VAR,
+    SUFFIX_LIFETIME,
+    PRICE_FUEL,
+    FUEL_PRICE,
+    FUEL_PRICE_CHANGE_ANNUAL,
+    MAINGRID_ELECTRICITY_PRICE,
+    MAINGRID_FEEDIN_TARIFF,
+    SHORTAGE_PENALTY_COST,
+    WACC,
+    PROJECT_LIFETIME,
+    TAX,
+    ANNUITY_FACTOR,
+    CRF,
+)
+
+# Parameters only influencing the naming and output of results, not the optimization itself
+KEYS_NOT_INFLUENCING_RESULTS = [
+    OUTPUT_FOLDER,
+    OUTPUT_FILE,
+    FILENAME,
+    COMMENTS,
+    DISPLAY_EXPERIMENT,
+    DISPLAY_META,
+    DISPLAY_MAIN,
+    DISPLAY_INVEST,
+    SAVE_LP_FILE,
+    SAVE_OEMOFRESULTS,
+    SAVE_TO_CSV_FLOWS_STORAGE,
+    SAVE_TO_PNG_FLOWS_STORAGE,
+    SAVE_TO_CSV_FLOWS_ELECTRICITY_MG,
+    SAVE_TO_PNG_FLOWS_ELECTRICITY_MG,
+    SAVE_TO_BINARY_FLOWS,
+    RESTORE_OEMOF_IF_EXISTENT,
+    RESTORE_BLACKOUTS_IF_EXISTENT,
+    SOLVER_VERBOSE,
+    USE_RESULT_CACHE,
+    RESULT_CACHE_MAX_SIZE_MB,
+    REUSE_OEMOF_MODEL,
+    WARM_START,
+    PERSISTENT_SOLVER,
+    SENSITIVITY_SAMPLING,
+    SENSITIVITY_SAMPLE_SIZE,
+    SENSITIVITY_REFINEMENT_SIZE,
+    SENSITIVITY_SAMPLING_SEED,
+    SURROGATE_MODEL,
+    SURROGATE_INITIAL_SIZE,
+    SURROGATE_BATCH_SIZE,
+    SURROGATE_TOLERANCE,
+    SURROGATE_STATUS,
+    INCREMENTAL_RERUN,
+    RESUME,
+    SIMULATION_KEYS,
+    REUSED_RESULTS,
+    TIMESERIES_ARRAYS,
+    # Timeseries of the project site, simulations only use the profiles derived from them
+    DEMAND_AC,
+    DEMAND_DC,
+    FILE_INDEX,
+]
+
+# Parameters only influencing the cost coefficients of the objective function
+COST_PARAMETERS = [
+    PRICE_FUEL,
+    FUEL_PRICE,
+    FUEL_PRICE_CHANGE_ANNUAL,
+    MAINGRID_ELECTRICITY_PRICE,
+    MAINGRID_FEEDIN_TARIFF,
+    SHORTAGE_PENALTY_COST,
+    WACC,
+    PROJECT_LIFETIME,
+    TAX,
+    ANNUITY_FACTOR,
+    CRF,
+]
+COST_PARAMETER_SUFFIXES = (
+    SUFFIX_COST_INVESTMENT,
+    SUFFIX_COST_OPEX,
+    SUFFIX_COST_ANNUITY,
+    SUFFIX_COST_CAPEX,
+    SUFFIX_COST_VAR,
+    SUFFIX_LIFETIME,
+)
+
+
+def get_key(experiment, case_dict, ignore_costs=False):
+    """
+    Calculates the key of a simulation in the result cache.
+
+    Parameters
+    ----------
+    experiment: dict
+        Contains general settings, parameters and timeseries of the experiment
+
+    case_dict: dict
+        Contains settings for capacities and storage
+
+    ignore_costs: bool
+        If True, cost parameters are not included in the key. Simulations with the same key
+        then only differ in the cost coefficients of their objective function (see G1.reuse_or_build()).
+
+    Returns
+    -------
+    cache_key: str
+        Hex digest of a sha256 hash over case_dict, the scalar parameters of the experiment and its timeseries
+    """
+    hash_object = hashlib.sha256()
+    hash_object.update(("oemof.solph " + solph.__version__).encode())
+    for parameters in [case_dict, experiment]:
+        for key in sorted(parameters.keys()):
+            if key in KEYS_NOT_INFLUENCING_RESULTS:
+                pass
+            elif ignore_costs is True and is_cost_parameter(key):
+                pass
+            else:
+                hash_object.update(str(key).encode())
+                hash_value(hash_object, parameters[key])
+    return hash_object.hexdigest()
+
+
+def is_cost_parameter(key):
+    """
+    Returns True if parameter `key` only influences the cost coefficients of the objective function.
+    """
+    return key in COST_PARAMETERS or str(key).endswith(COST_PARAMETER_SUFFIXES)
+
+
+def hash_value(hash_object, value):
+    """
+    Adds a single parameter value to the hash. Timeseries are hashed by their values and index.
+
+    Parameters
+    ----------
+    hash_object: hashlib.sha256
+        Hash that is updated
+
+    value:
+        Scalar, pandas object or numpy array
+    """
+    if isinstance(value, (pd.Series, pd.DataFrame, pd.Index)):
+        hash_object.update(pd.util.hash_pandas_object(value).values.tobytes())
+    elif isinstance(value, np.ndarray):
+        hash_object.update(str(value.dtype).encode())
+        hash_object.update(np.ascontiguousarray(value).tobytes())
+    else:
+        hash_object.update(repr(value).encode())
+    return
+
+
+def get_cache_folder(experiment):
+    """
+    Returns the path of the result cache, which is created if it does not exist yet.
+    """
+    cache_folder = experiment[OUTPUT_FOLDER] + RESULT_CACHE_FOLDER
+    os.makedirs(cache_folder, exist_ok=True)
+    return cache_folder
+
+
+def restore(experiment, cache_key):
+    """
+    Loads cached results directly from the result cache.
+
+    Parameters
+    ----------
+    experiment: dict
+        Contains general settings for the experiment
+
+    cache_key: str
+        Key of the simulation, see get_key()
+
+    Returns
+    -------
+    micro_grid_system: oemof.solph.network.EnergySystem or None
+        Energy system with the cached results, None if the results were not in the cache
+    """
+    cache_folder = get_cache_folder(experiment)
+    micro_grid_system = solph.EnergySystem()
+    try:
+        micro_grid_system.restore(dpath=cache_folder, filename=cache_key + ".oemof")
+        # Update modification time, which is used as time of last usage for eviction
+        os.utime(os.path.join(cache_folder, cache_key + ".oemof"))
+    except FileNotFoundError:
+        return None
+    return micro_grid_system
+
+
+def store(experiment, cache_key, file_name):
+    """
+    Copies results from the oemof folder of the experiment to the cache
+    and evicts the least recently used results if the cache exceeds its size limit.
+
+    Parameters
+    ----------
+    experiment: dict
+        Contains general settings for the experiment
+
+    cache_key: str
+        Key of the simulation, see get_key()
+
+    file_name: str
+        Name of the .oemof file in the oemof folder
+    """
+    cache_folder = get_cache_folder(experiment)
+    # Copy to temporary file first, so that other processes never read incomplete results
+    temporary_file = os.path.join(
+        cache_folder, cache_key + "." + str(os.getpid()) + ".tmp"
+    )
+    shutil.copyfile(
+        experiment[OUTPUT_FOLDER] + OEMOF_FOLDER + "/" + file_name + ".oemof",
+        temporary_file,
+    )
+    os.replace(temporary_file, os.path.join(cache_folder, cache_key + ".oemof"))
+    logging.debug("Stored results in result cache with key " + cache_key)
+    evict(cache_folder, experiment[RESULT_CACHE_MAX_SIZE_MB])
+    return
+
+
+def dump(experiment, cache_key, micro_grid_system):
+    """
+    Stores results of a simulation that are not saved to the oemof folder directly
+    in the cache and evicts the least recently used results if the cache exceeds its size limit.
+
+    Parameters
+    ----------
+    experiment: dict
+        Contains general settings for the experiment
+
+    cache_key: str
+        Key of the simulation, see get_key()
+
+    micro_grid_system: oemof.solph.network.EnergySystem
+        Energy system including the results of the simulation
+    """
+    cache_folder = get_cache_folder(experiment)
+    # Dump to temporary file first, so that other processes never read incomplete results
+    temporary_file_name = cache_key + "." + str(os.getpid()) + ".tmp"
+    micro_grid_system.dump(dpath=cache_folder, filename=temporary_file_name)
+    os.replace(
+        os.path.join(cache_folder, temporary_file_name),
+        os.path.join(cache_folder, cache_key + ".oemof"),
+    )
+    logging.debug("Stored results in result cache with key " + cache_key)
+    evict(cache_folder, experiment[RESULT_CACHE_MAX_SIZE_MB])
+    return
+
+
+def evict(cache_folder, max_size_mb):
+    """
+    Removes the least recently used results until the cache is smaller than max_size_mb.
+
+    Parameters
+    ----------
+    cache_folder: str
+        Path of the result cache
+
+    max_size_mb: float
+        Maximum size of the result cache in MB
+    """
+    cached_files = []
+    for entry in os.scandir(cache_folder):
+        if entry.name.endswith(".oemof"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                # evicted by another process in the meantime
+                continue
+            cached_files.append((stat.st_mtime, stat.st_size, entry.path))
+
+    cache_size = sum([size for (_, size, _) in cached_files])
+    for (_, size, path) in sorted(cached_files):
+        if cache_size <= max_size_mb * 1e6:
+            break
+        try:
+            os.remove(path)
+            logging.debug("Removed least recently used results from cache: " + path)
+        except FileNotFoundError:
+            pass
+        cache_size -= size
+    return
@@ -0,0 +1,376 @@
+"""
+Rolling horizon dispatch of cases with fixed capacities.
+
+Instead of a single optimization problem over the evaluated timeframe, the dispatch is
+optimized in windows of ROLLING_HORIZON days following each other. Each window is extended
+by ROLLING_HORIZON_OVERLAP days to foresee the next window, of which only the dispatch of
+the window itself is kept. The state of charge of the storage at the end of a window is the
+initial state of charge of the next window. As only one window is in memory at a time,
+the size of the optimization problems does not depend on the length of the timeframe.
+"""
+
+import logging
+import pandas as pd
+
+import src.G1_oemof_create_model as oemof_model
+
+from src.constants import (
+    ROLLING_HORIZON,
+    ROLLING_HORIZON_OVERLAP,
+    STORAGE_BALANCED,
+    STORAGE_SOC_INITIAL,
+    STORAGE_SOC_MIN,
+    STORAGE_SOC_MAX,
+    DATE_TIME_INDEX,
+    DEMAND_PROFILE_AC,
+    DEMAND_PROFILE_DC,
+    PV_GENERATION_PER_KWP,
+    WIND_GENERATION_PER_KW,
+    GRID_AVAILABILITY,
+    ACCUMULATED_PROFILE_AC_SIDE,
+    ACCUMULATED_PROFILE_DC_SIDE,
+    TOTAL_DEMAND_AC,
+    TOTAL_DEMAND_DC,
+    CASE_NAME,
+    GENERIC_STORAGE,
+    MAIN,
+    META,
+    OBJECTIVE,
+    SOLVER,
+    TIME,
+    SEQUENCES,
+    STORAGE_FIXED_CAPACITY,
+    STORAGE_FIXED_POWER,
+    GENSET_FIXED_CAPACITY,
+    PV_FIXED_CAPACITY,
+    PCC_CONSUMPTION_FIXED_CAPACITY,
+    PCC_FEEDIN_FIXED_CAPACITY,
+    WIND_FIXED_CAPACITY,
+    RECTIFIER_AC_DC_FIXED_CAPACITY,
+    INVERTER_DC_AC_FIXED_CAPACITY,
+    TIMESERIES_ARRAYS,
+)
+
+# Timeseries of the experiment that are limited to each window
+WINDOW_TIMESERIES = [
+    DEMAND_PROFILE_AC,
+    DEMAND_PROFILE_DC,
+    PV_GENERATION_PER_KWP,
+    WIND_GENERATION_PER_KW,
+    GRID_AVAILABILITY,
+    ACCUMULATED_PROFILE_AC_SIDE,
+    ACCUMULATED_PROFILE_DC_SIDE,
+]
+
+# Capacities of a case, the dispatch is only optimized with rolling horizon if none is optimized
+CASE_CAPACITIES = [
+    STORAGE_FIXED_CAPACITY,
+    STORAGE_FIXED_POWER,
+    GENSET_FIXED_CAPACITY,
+    PV_FIXED_CAPACITY,
+    PCC_CONSUMPTION_FIXED_CAPACITY,
+    PCC_FEEDIN_FIXED_CAPACITY,
+    WIND_FIXED_CAPACITY,
+    RECTIFIER_AC_DC_FIXED_CAPACITY,
+    INVERTER_DC_AC_FIXED_CAPACITY,
+]
+
+
+def uses_rolling_horizon(experiment, case_dict):
+    """
+    Checks if the dispatch of a case is optimized with rolling horizon. This is the case if
+    ROLLING_HORIZON is set, no capacity of the case is optimized and the evaluated
+    timeframe is longer than a window.
+
+    Parameters
+    ----------
+    experiment: dict
+        Sensitivity experiment including its timeseries
+
+    case_dict: dict
+        Settings of the simulated case, see F.update_dict()
+
+    Returns
+    -------
+    bool
+    """
+    if experiment[ROLLING_HORIZON] in [None, "None", False]:
+        return False
+    if any(case_dict[name] is False for name in CASE_CAPACITIES):
+        return False
+    window_steps, _ = get_window_steps(experiment)
+    return len(experiment[DATE_TIME_INDEX]) > window_steps
+
+
+def get_window_steps(experiment):
+    """
+    Number of timesteps of a window and of its overlap with the next window
+
+    Parameters
+    ----------
+    experiment: dict
+        Sensitivity experiment including its timeseries
+
+    Returns
+    -------
+    window_steps: int
+
+    overlap_steps: int
+    """
+    date_time_index = experiment[DATE_TIME_INDEX]
+    timestep = date_time_index[1] - date_time_index[0]
+    window_steps = max(
+        int(round(pd.Timedelta(days=experiment[ROLLING_HORIZON]) / timestep)), 1
+    )
+    overlap_steps = max(
+        int(round(pd.Timedelta(days=experiment[ROLLING_HORIZON_OVERLAP]) / timestep)),
+        0,
+    )
+    return window_steps, overlap_steps
+
+
+def get_windows(number_of_timesteps, window_steps, overlap_steps):
+    """
+    Timesteps of the windows of the rolling horizon
+
+    Parameters
+    ----------
+    number_of_timesteps: int
+        Number of timesteps of the evaluated timeframe
+
+    window_steps: int
+        Number of timesteps of which the dispatch is kept
+
+    overlap_steps: int
+        Number of timesteps foreseen in addition
+
+    Returns
+    -------
+    windows: list of tuples
+        First timestep, end of the kept timesteps and end of the optimized timesteps of each window
+    """
+    windows = []
+    for start in range(0, number_of_timesteps, window_steps):
+        end_kept = min(start + window_steps, number_of_timesteps)
+        windows.append(
+            (start, end_kept, min(end_kept + overlap_steps, number_of_timesteps))
+        )
+    return windows
+
+
+def is_balanced(initial_soc, end_kept, number_of_timesteps):
+    """
+    Checks if the state of charge of the storage at the end of a window has to equal
+    its state of charge at the beginning. The first window is cyclic if there is no
+    initial state of charge, and the storage is not discharged at the end of the last
+    window. Intermediate windows are not balanced, even without overlap.
+
+    Parameters
+    ----------
+    initial_soc: float or None
+        State of charge of the storage at the beginning of the window
+
+    end_kept: int
+        End of the kept timesteps of the window, see get_windows()
+
+    number_of_timesteps: int
+        Number of timesteps of the evaluated timeframe
+
+    Returns
+    -------
+    bool
+    """
+    return initial_soc is None or end_kept == number_of_timesteps
+
+
+def get_window_experiment(experiment, case_dict, start, end, initial_soc, balanced):
+    """
+    Creates the experiment and case of a window of the rolling horizon
+
+    Parameters
+    ----------
+    experiment: dict
+        Sensitivity experiment including its timeseries
+
+    case_dict: dict
+        Settings of the simulated case, see F.update_dict()
+
+    start: int
+        First timestep of the window
+
+    end: int
+        End of the optimized timesteps of the window
+
+    initial_soc: float or None
+        State of charge of the storage at the beginning of the window
+
+    balanced: bool
+        If True, the state of charge of the storage at the end of the window is its initial state of charge
+
+    Returns
+    -------
+    window_experiment: dict
+
+    window_case_dict: dict
+        Case with the total demand of the window, limiting its shortage
+    """
+    window_experiment = experiment.copy()
+    # Arrays of the timeseries of the full timeframe are not shared, see G2a.get_timeseries()
+    window_experiment.pop(TIMESERIES_ARRAYS, None)
+    window_experiment.update(
+        {
+            DATE_TIME_INDEX: experiment[DATE_TIME_INDEX][start:end],
+            STORAGE_SOC_INITIAL: initial_soc,
+            STORAGE_BALANCED: balanced,
+        }
+    )
+    for name in WINDOW_TIMESERIES:
+        if name in experiment:
+            window_experiment.update({name: experiment[name][start:end]})
+
+    window_case_dict = case_dict.copy()
+    window_case_dict.update(
+        {
+            TOTAL_DEMAND_AC: window_experiment[DEMAND_PROFILE_AC].sum(),
+            TOTAL_DEMAND_DC: window_experiment[DEMAND_PROFILE_DC].sum(),
+        }
+    )
+    return window_experiment, window_case_dict
+
+
+def get_soc(experiment, micro_grid_system, model, timestep):
+    """
+    State of charge of the storage at the end of a timestep, limited to the
+    boundaries of the state of charge to exclude numerical deviations
+
+    Parameters
+    ----------
+    experiment: dict
+        Sensitivity experiment
+
+    micro_grid_system: oemof.solph.network.EnergySystem
+
+    model: oemof.solph.models.Model
+        Solved model
+
+    timestep: int
+
+    Returns
+    -------
+    soc: float or None
+        None if there is no storage
+    """
+    for node in micro_grid_system.nodes:
+        if str(node) == GENERIC_STORAGE:
+            storage_content = model.GenericStorageBlock.storage_content[node, timestep]
+            soc = storage_content.value / node.nominal_storage_capacity
+            return min(
+                max(soc, experiment[STORAGE_SOC_MIN]), experiment[STORAGE_SOC_MAX]
+            )
+    return None
+
+
+def get_variable_costs(model, number_of_timesteps):
+    """
+    Variable costs of the first timesteps of a solved model, as included in its objective
+
+    Parameters
+    ----------
+    model: oemof.solph.models.Model
+        Solved model
+
+    number_of_timesteps: int
+
+    Returns
+    -------
+    variable_costs: float
+    """
+    variable_costs = 0
+    for (source, target), flow in model.flows.items():
+        if flow.variable_costs[0] is not None:
+            for timestep in range(number_of_timesteps):
+                variable_costs += (
+                    model.flow[source, target, timestep].value
+                    * flow.variable_costs[timestep]
+                    * model.objective_weighting[timestep]
+                )
+    return variable_costs
+
+
+def simulate(experiment, case_dict, file_name):
+    """
+    Optimizes the dispatch of a case with fixed capacities window after window.
+    The windows are warm started from the previous window if WARM_START is set.
+
+    Parameters
+    ----------
+    experiment: dict
+        Sensitivity experiment including its timeseries
+
+    case_dict: dict
+        Settings of the simulated case, see F.update_dict()
+
+    file_name: str
+        Name used for saving the simulation's result
+
+    Returns
+    -------
+    micro_grid_system: oemof.solph.network.EnergySystem or None
+        Energy system of the first window with the results of all windows,
+        None if a window is infeasible
+    """
+    window_steps, overlap_steps = get_window_steps(experiment)
+    windows = get_windows(len(experiment[DATE_TIME_INDEX]), window_steps, overlap_steps)
+    logging.info(
+        f"Optimizing dispatch of case {case_dict[CASE_NAME]} in {len(windows)} windows of "
+        f"{experiment[ROLLING_HORIZON]} days."
+    )
+
+    initial_soc = experiment[STORAGE_SOC_INITIAL]
+    first_micro_grid_system = None
+    sequences = {}
+    objective = 0
+    solver_time = 0
+    for number, (start, end_kept, end) in enumerate(windows):
+        window_experiment, window_case_dict = get_window_experiment(
+            experiment,
+            case_dict,
+            start,
+            end,
+            initial_soc,
+            balanced=is_balanced(
+                initial_soc, end_kept, len(experiment[DATE_TIME_INDEX])
+            ),
+        )
+        micro_grid_system, model = oemof_model.build(
+            window_experiment, window_case_dict
+        )
+        micro_grid_system = oemof_model.simulate(
+            window_experiment,
+            micro_grid_system,
+            model,
+            file_name + "_window_" + str(number),
+            case_dict[CASE_NAME] + "_" + ROLLING_HORIZON,
+        )
+        if micro_grid_system is None:
+            return None
+
+        # Only the dispatch of the window itself is kept
+        for (source, target), results in micro_grid_system.results[MAIN].items():
+            sequences.setdefault((str(source), str(target)), []).append(
+                results[SEQUENCES].iloc[: end_kept - start]
+            )
+        objective += get_variable_costs(model, end_kept - start)
+        solver_time += micro_grid_system.results[META][SOLVER][TIME]
+        initial_soc = get_soc(
+            experiment, micro_grid_system, model, end_kept - start - 1
+        )
+
+        if first_micro_grid_system is None:
+            first_micro_grid_system = micro_grid_system
+
+    for (source, target), results in first_micro_grid_system.results[MAIN].items():
+        results.update({SEQUENCES: pd.concat(sequences[(str(source), str(target))])})
+    first_micro_grid_system.results[META].update({OBJECTIVE: objective})
+    first_micro_grid_system.results[META][SOLVER].update({TIME: solver_time})
+    return first_micro_grid_system
@@ -10,6 +10,7 @@ tables, tkinter
 
 import oemof.solph as solph
 import logging
+import numpy as np
 
 # Try to import matplotlib librar
 import matplotlib.pyplot as plt
@@ -57,6 +58,7 @@ from src.constants import (
     PCOUPLING_EFFICIENCY,
     GENERIC_STORAGE,
     STORAGE_SOC_INITIAL,
+    STORAGE_BALANCED,
     STORAGE_CAPACITY_COST_ANNUITY,
     STORAGE_COST_VAR,
     STORAGE_POWER_COST_ANNUITY,
@@ -79,6 +81,7 @@ from src.constants import (
     WIND_GENERATION,
     WIND_COST_ANNUITY,
     BUS_ELECTRICITY_NG_FEEDIN,
+    TIMESERIES_ARRAYS,
 )
 
 ###############################################################################
@@ -86,6 +89,40 @@ from src.constants import (
 ###############################################################################
 
 
+def get_timeseries(experiment, name):
+    """
+    Timeseries of the experiment as contiguous float64 array, which oemof indexes
+    much faster than a pandas.Series when building the model.
+
+    The arrays are converted once per experiment and kept in experiment[TIMESERIES_ARRAYS],
+    so that all cases simulated with the experiment share them. A kept array is only used as
+    long as the experiment refers to the timeseries it was converted from. Copies of an
+    experiment with other timeseries, eg. the windows of a rolling horizon or the typical
+    days of an experiment, must not share its arrays and remove TIMESERIES_ARRAYS.
+
+    Parameters
+    ----------
+    experiment: dict
+        Sensitivity experiment including its timeseries
+
+    name: str
+        Name of the timeseries, eg. PV_GENERATION_PER_KWP
+
+    Returns
+    -------
+    numpy.ndarray
+        Timeseries as array, scalars are returned as they are
+    """
+    timeseries = experiment[name]
+    timeseries_arrays = experiment.setdefault(TIMESERIES_ARRAYS, {})
+    if name not in timeseries_arrays or timeseries_arrays[name][0] is not timeseries:
+        array = np.ascontiguousarray(timeseries, dtype=np.float64)
+        if array.ndim == 0:
+            return timeseries
+        timeseries_arrays.update({name: (timeseries, array)})
+    return timeseries_arrays[name][1]
+
+
 ######## Sources ########
 def fuel(micro_grid_system, bus_fuel, experiment):
     logging.debug("Added to oemof model: source fuel")
@@ -140,7 +177,7 @@ def maingrid_consumption(micro_grid_system, experiment):
         label=SOURCE_MAINGRID_CONSUMPTION,
         outputs={
             bus_electricity_ng_consumption: solph.Flow(
-                fix=experiment[GRID_AVAILABILITY],
+                fix=get_timeseries(experiment, GRID_AVAILABILITY),
                 investment=solph.Investment(ep_costs=0),
             )
         },
@@ -170,7 +207,7 @@ def pv_fix(micro_grid_system, bus_electricity_dc, experiment, capacity_pv):
         outputs={
             bus_electricity_dc: solph.Flow(
                 label=PV_GENERATION,
-                fix=experiment[PV_GENERATION_PER_KWP],
+                fix=get_timeseries(experiment, PV_GENERATION_PER_KWP),
                 nominal_value=capacity_pv,
                 variable_costs=experiment[PV_COST_VAR],
             )
@@ -190,7 +227,7 @@ def pv_oem(micro_grid_system, bus_electricity_dc, experiment):
 
     logging.debug("Added to oemof model: pv oem")
     peak_pv_generation = experiment[PEAK_PV_GENERATION_PER_KWP]
-    pv_norm = experiment[PV_GENERATION_PER_KWP] / peak_pv_generation
+    pv_norm = get_timeseries(experiment, PV_GENERATION_PER_KWP) / peak_pv_generation
     if pv_norm.any() > 1:
         logging.warning("Error, PV generation not normalized, greater than 1")
     if pv_norm.any() < 0:
@@ -221,7 +258,7 @@ def wind_fix(micro_grid_system, bus_electricity_ac, experiment, capacity_wind):
         outputs={
             bus_electricity_ac: solph.Flow(
                 label=WIND_GENERATION,
-                fix=experiment[WIND_GENERATION_PER_KW],
+                fix=get_timeseries(experiment, WIND_GENERATION_PER_KW),
                 nominal_value=capacity_wind,
                 variable_costs=experiment[WIND_COST_VAR],
             )
@@ -235,7 +272,9 @@ def wind_fix(micro_grid_system, bus_electricity_ac, experiment, capacity_wind):
 def wind_oem(micro_grid_system, bus_electricity_ac, experiment):
     logging.debug("Added to oemof model: wind")
     peak_wind_generation = experiment[PEAK_WIND_GENERATION_PER_KW]
-    wind_norm = experiment[WIND_GENERATION_PER_KW] / peak_wind_generation
+    wind_norm = (
+        get_timeseries(experiment, WIND_GENERATION_PER_KW) / peak_wind_generation
+    )
     if wind_norm.any() > 1:
         logging.warning("Error, Wind generation not normalized, greater than 1")
     if wind_norm.any() < 0:
@@ -603,6 +642,8 @@ def storage_fix(
         min_storage_level=experiment[STORAGE_SOC_MIN],
         max_storage_level=experiment[STORAGE_SOC_MAX],
         initial_storage_level=experiment[STORAGE_SOC_INITIAL],  # in terms of SOC?
+        # not balanced in windows of the rolling horizon, see G1b.simulate()
+        balanced=experiment.get(STORAGE_BALANCED, True),
         inflow_conversion_factor=experiment[
             STORAGE_EFFICIENCY_CHARGE
         ],  # storing efficiency
@@ -740,7 +781,7 @@ def maingrid_feedin(micro_grid_system, experiment):
         label=SINK_MAINGRID_FEEDIN,
         inputs={
             bus_electricity_ng_feedin: solph.Flow(
-                fix=experiment[GRID_AVAILABILITY],
+                fix=get_timeseries(experiment, GRID_AVAILABILITY),
                 investment=solph.Investment(ep_costs=0),
             )
         },
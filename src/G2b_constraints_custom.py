@@ -2,8 +2,13 @@
 For defining custom constraints of the micro grid solutions
 """
 import pyomo.environ as po
+from pyomo.core.expr.numeric_expr import LinearExpression
 import logging
-import pandas as pd
+import numpy as np
+
+import src.G2a_oemof_busses_and_componets as generate
+import src.G3b_plausability_tests as plausability_tests
+
 from src.constants import (
     SHORTAGE_LIMIT,
     NUMBER_OF_EQUAL_GENERATORS,
@@ -46,9 +51,107 @@ from src.constants import (
     INVERTER_INPUT,
     CAPACITY_INVERTER_DC_AC_KW,
     SHORTAGE_MAX_TIMESTEP,
+    PLAUSIBILITY_TOLERANCE,
 )
 
 
+def get_flow_variables(model, source, target):
+    """
+    Variables of a flow at all timesteps, in order of model.TIMESTEPS
+    """
+    return [model.flow[source, target, t] for t in model.TIMESTEPS]
+
+
+def get_storage_content(model, case_dict, storage):
+    """
+    Variables of the storage content at all timesteps, in order of model.TIMESTEPS
+    """
+    if case_dict[STORAGE_FIXED_CAPACITY] is False:  # Storage subject to OEM
+        storage_content = model.GenericInvestmentStorageBlock.storage_content
+    else:  # Fixed storage subject to dispatch
+        storage_content = model.GenericStorageBlock.storage_content
+    return [storage_content[storage, t] for t in model.TIMESTEPS]
+
+
+def add_timestep_constraint(
+    model, name, constant, terms, timestep_terms, upper_limit=False
+):
+    """
+    Adds a linear constraint for all timesteps at once
+
+      .. math::
+            constant(t) + sum_i c_i * x_i + sum_j c_j(t) * x_j(t) >= 0
+
+    Coefficients are converted to lists once, so that the expression of each timestep is created
+    directly from its coefficients and variables, without building it term by term.
+
+    Parameters
+    ----------
+    model: oemof.solph.model
+        Model to which the constraint is added
+
+    name: str
+        Name of the constraint in the model
+
+    constant: float or numpy.ndarray
+        Constant of the constraint, per timestep if an array
+
+    terms: list of tuples
+        Coefficient and variable of terms that are the same at all timesteps, eg. capacities
+
+    timestep_terms: list of tuples
+        Coefficient (float or numpy.ndarray per timestep) and variables (list per timestep) of terms
+        that change with each timestep, eg. flows
+
+    upper_limit: bool
+        If True, the expression is limited to <= 0 instead of >= 0
+    """
+    number_of_timesteps = len(model.TIMESTEPS)
+
+    def per_timestep(values):
+        return np.broadcast_to(
+            np.asarray(values, dtype=float), number_of_timesteps
+        ).tolist()
+
+    constant = per_timestep(constant)
+    coefficients = [float(coefficient) for coefficient, variable in terms]
+    variables = [variable for coefficient, variable in terms]
+    timestep_coefficients = [
+        per_timestep(coefficient) for coefficient, variable in timestep_terms
+    ]
+    timestep_variables = [variable for coefficient, variable in timestep_terms]
+
+    def timestep_rule(model, t):
+        expr = LinearExpression(
+            constant=constant[t],
+            linear_coefs=coefficients
+            + [coefficient[t] for coefficient in timestep_coefficients],
+            linear_vars=variables + [variable[t] for variable in timestep_variables],
+        )
+        if upper_limit is True:
+            return (None, expr, 0)
+        return (0, expr, None)
+
+    model.add_component(name, po.Constraint(model.TIMESTEPS, rule=timestep_rule))
+    return model
+
+
+def get_supplied_demand_terms(
+    model, case_dict, stability_limit, sink_demand, source_shortage, el_bus
+):
+    """
+    Timestep terms of the share of the supplied demand that has to be met, see add_timestep_constraint()
+    """
+    timestep_terms = [
+        (-stability_limit, get_flow_variables(model, el_bus, sink_demand))
+    ]
+    if case_dict[ALLOW_SHORTAGE] is True:
+        timestep_terms.append(
+            (stability_limit, get_flow_variables(model, source_shortage, el_bus))
+        )
+    return timestep_terms
+
+
 def backup(
     model,
     case_dict,
@@ -62,104 +165,107 @@ def backup(
     el_bus_dc,
 ):
     stability_limit = experiment[SHORTAGE_LIMIT]
+    grid_availability = generate.get_timeseries(experiment, GRID_AVAILABILITY)
+
+    ## ------- Get demand and shortage at t ------- #
+    # todo is the shortage correct?
+    timestep_terms = get_supplied_demand_terms(
+        model, case_dict, stability_limit, sink_demand, source_shortage, el_bus_ac
+    )
+    terms = []
+    constant = np.zeros(len(model.TIMESTEPS))
+
     ## ------- Get CAP genset ------- #
-    CAP_genset = 0
     if case_dict[GENSET_FIXED_CAPACITY] != None:
         if case_dict[GENSET_FIXED_CAPACITY] is False:
             for number in range(1, case_dict[NUMBER_OF_EQUAL_GENERATORS] + 1):
-                CAP_genset += model.InvestmentFlow.invest[genset[number], el_bus_ac]
+                terms.append(
+                    (1, model.InvestmentFlow.invest[genset[number], el_bus_ac])
+                )
         elif isinstance(case_dict[GENSET_FIXED_CAPACITY], float):
             for number in range(1, case_dict[NUMBER_OF_EQUAL_GENERATORS] + 1):
-                CAP_genset += model.flows[genset[number], el_bus_ac].nominal_value
+                constant += model.flows[genset[number], el_bus_ac].nominal_value
 
-    ## ------- Get CAP PCC ------- #
-    CAP_pcc = 0
+    ##---------Grid consumption t-------#
+    # this should not be actual consumption but possible one  - like grid_availability[t]*pcc_consumption_cap
     if case_dict[PCC_CONSUMPTION_FIXED_CAPACITY] != None:
         if case_dict[PCC_CONSUMPTION_FIXED_CAPACITY] is False:
-            CAP_pcc += model.InvestmentFlow.invest[pcc_consumption, el_bus_ac]
-        elif isinstance(case_dict[PCC_CONSUMPTION_FIXED_CAPACITY], float):
-            CAP_pcc += case_dict[
-                PCC_CONSUMPTION_FIXED_CAPACITY
-            ]  # this didnt work - model.flows[pcc_consumption, el_bus_ac].nominal_value
-
-    def stability_rule_capacity(model, t):
-        expr = CAP_genset
-        ## ------- Get demand at t ------- #
-        demand = model.flow[el_bus_ac, sink_demand, t]
-        expr += -stability_limit * demand
-        ## ------- Get shortage at t------- #
-        if case_dict[ALLOW_SHORTAGE] is True:
-            shortage = model.flow[source_shortage, el_bus_ac, t]
-            # todo is this correct?
-            expr += +stability_limit * shortage
-        ##---------Grid consumption t-------#
-        # this should not be actual consumption but possible one  - like grid_availability[t]*pcc_consumption_cap
-        if case_dict[PCC_CONSUMPTION_FIXED_CAPACITY] != None:
-            expr += CAP_pcc * experiment[GRID_AVAILABILITY][t]
-
-        ## ------- Get stored capacity storage at t------- #
-        if case_dict[STORAGE_FIXED_CAPACITY] != None:
-            stored_electricity = 0
-            if case_dict[STORAGE_FIXED_CAPACITY] is False:  # Storage subject to OEM
-                stored_electricity += (
-                    model.GenericInvestmentStorageBlock.storage_content[storage, t]
-                    - experiment[STORAGE_CAPACITY_MIN]
-                    * model.GenericInvestmentStorageBlock.invest[storage]
+            timestep_terms.append(
+                (
+                    grid_availability,
+                    [model.InvestmentFlow.invest[pcc_consumption, el_bus_ac]]
+                    * len(model.TIMESTEPS),
                 )
-            elif isinstance(
-                case_dict[STORAGE_FIXED_CAPACITY], float
-            ):  # Fixed storage subject to dispatch
-                stored_electricity += (
-                    model.GenericStorageBlock.storage_content[storage, t]
-                    - experiment[STORAGE_CAPACITY_MIN] * storage.nominal_capacity
-                )
-            else:
-                logging.warning(
-                    "Error: 'storage_fixed_capacity' can only be None, False or float."
-                )
-            expr += (
-                stored_electricity
-                * experiment[STORAGE_CRATE_DISCHARGE]
-                * experiment[STORAGE_EFFICIENCY_DISCHARGE]
-                * experiment[INVERTER_DC_AC_EFFICIENCY]
             )
-        return expr >= 0
-
-    def stability_rule_power(model, t):
-        expr = CAP_genset
-        ## ------- Get demand at t ------- #
-        demand = model.flow[el_bus_ac, sink_demand, t]
-        expr += -stability_limit * demand
-        ## ------- Get shortage at t------- #
-        if case_dict[ALLOW_SHORTAGE] is True:
-            shortage = model.flow[source_shortage, el_bus_ac, t]
-            # todo is this correct?
-            expr += +stability_limit * shortage
-        ##---------Grid consumption t-------#
-        # this should not be actual consumption but possible one  - like grid_availability[t]*pcc_consumption_cap
-        if case_dict[PCC_CONSUMPTION_FIXED_CAPACITY] != None:
-            expr += CAP_pcc * experiment[GRID_AVAILABILITY][t]
-
-        ## ------- Get power of storage ------- #
-        if case_dict[STORAGE_FIXED_POWER] != None:
-            storage_power = 0
-            if case_dict[STORAGE_FIXED_CAPACITY] is False:
-                storage_power += model.InvestmentFlow.invest[storage, el_bus_dc]
-            elif isinstance(case_dict[STORAGE_FIXED_CAPACITY], float):
-                storage_power += case_dict[STORAGE_FIXED_POWER]
-            else:
-                logging.warning(
-                    "Error: 'storage_fixed_power' can only be None, False or float."
+        elif isinstance(case_dict[PCC_CONSUMPTION_FIXED_CAPACITY], float):
+            # model.flows[pcc_consumption, el_bus_ac].nominal_value did not work
+            constant += case_dict[PCC_CONSUMPTION_FIXED_CAPACITY] * grid_availability
+
+    ## ------- Get stored capacity storage at t------- #
+    capacity_constant = constant.copy()
+    capacity_terms = terms.copy()
+    capacity_timestep_terms = timestep_terms.copy()
+    if case_dict[STORAGE_FIXED_CAPACITY] != None:
+        discharge_factor = (
+            experiment[STORAGE_CRATE_DISCHARGE]
+            * experiment[STORAGE_EFFICIENCY_DISCHARGE]
+            * experiment[INVERTER_DC_AC_EFFICIENCY]
+        )
+        if case_dict[STORAGE_FIXED_CAPACITY] is False:  # Storage subject to OEM
+            capacity_terms.append(
+                (
+                    -experiment[STORAGE_CAPACITY_MIN] * discharge_factor,
+                    model.GenericInvestmentStorageBlock.invest[storage],
                 )
+            )
+        elif isinstance(
+            case_dict[STORAGE_FIXED_CAPACITY], float
+        ):  # Fixed storage subject to dispatch
+            capacity_constant -= (
+                experiment[STORAGE_CAPACITY_MIN]
+                * storage.nominal_storage_capacity
+                * discharge_factor
+            )
+        else:
+            logging.warning(
+                "Error: 'storage_fixed_capacity' can only be None, False or float."
+            )
+        if case_dict[STORAGE_FIXED_CAPACITY] is False or isinstance(
+            case_dict[STORAGE_FIXED_CAPACITY], float
+        ):
+            capacity_timestep_terms.append(
+                (discharge_factor, get_storage_content(model, case_dict, storage))
+            )
 
-            expr += storage_power * experiment[INVERTER_DC_AC_EFFICIENCY]
-        return expr >= 0
+    ## ------- Get power of storage ------- #
+    power_constant = constant.copy()
+    power_terms = terms.copy()
+    if case_dict[STORAGE_FIXED_POWER] != None:
+        if case_dict[STORAGE_FIXED_CAPACITY] is False:
+            power_terms.append(
+                (
+                    experiment[INVERTER_DC_AC_EFFICIENCY],
+                    model.InvestmentFlow.invest[storage, el_bus_dc],
+                )
+            )
+        elif isinstance(case_dict[STORAGE_FIXED_CAPACITY], float):
+            power_constant += (
+                case_dict[STORAGE_FIXED_POWER] * experiment[INVERTER_DC_AC_EFFICIENCY]
+            )
+        else:
+            logging.warning(
+                "Error: 'storage_fixed_power' can only be None, False or float."
+            )
 
-    model.stability_constraint = po.Constraint(
-        model.TIMESTEPS, rule=stability_rule_capacity
+    add_timestep_constraint(
+        model,
+        "stability_constraint",
+        capacity_constant,
+        capacity_terms,
+        capacity_timestep_terms,
     )
-    model.stability_constraint_power = po.Constraint(
-        model.TIMESTEPS, rule=stability_rule_power
+    add_timestep_constraint(
+        model, "stability_constraint_power", power_constant, power_terms, timestep_terms
     )
     return model
 
@@ -169,72 +275,33 @@ def backup_test(case_dict, oemof_results, experiment, e_flows_df):
     Testing simulation results for adherance to above defined stability criterion
     """
     if case_dict[STABILITY_CONSTRAINT] != False:
-        demand_profile = e_flows_df[DEMAND]
-
-        if STORED_CAPACITY in e_flows_df.columns:
-            stored_electricity = e_flows_df[STORED_CAPACITY]
-        else:
-            stored_electricity = pd.Series(
-                [0 for t in demand_profile.index], index=demand_profile.index
-            )
-
-        if GRID_AVAILABILITY in e_flows_df.columns:
-            pcc_capacity = (
-                oemof_results[CAPACITY_PCOUPLING_KW] * e_flows_df[GRID_AVAILABILITY]
-            )
-        else:
-            pcc_capacity = pd.Series(
-                [0 for t in demand_profile.index], index=demand_profile.index
-            )
-
+        demand_profile = plausability_tests.get_values(e_flows_df, DEMAND)
+        stored_electricity = plausability_tests.get_values(e_flows_df, STORED_CAPACITY)
+        pcc_capacity = oemof_results[
+            CAPACITY_PCOUPLING_KW
+        ] * plausability_tests.get_values(e_flows_df, GRID_AVAILABILITY)
         genset_capacity = oemof_results[CAPACITY_GENSET_KW]
 
         if case_dict[ALLOW_SHORTAGE] is True:
-            shortage = e_flows_df[DEMAND_SHORTAGE]
+            shortage = plausability_tests.get_values(e_flows_df, DEMAND_SHORTAGE)
         else:
-            shortage = pd.Series(
-                [0 for t in demand_profile.index], index=demand_profile.index
-            )
+            shortage = np.zeros(len(demand_profile))
 
-        boolean_test = [
+        deviation = (
             genset_capacity
             + (
-                stored_electricity[t]
+                stored_electricity
                 - oemof_results[CAPACITY_STORAGE_KWH] * experiment[STORAGE_CAPACITY_MIN]
             )
             * experiment[STORAGE_CRATE_DISCHARGE]
             * experiment[STORAGE_EFFICIENCY_DISCHARGE]
             * experiment[INVERTER_DC_AC_EFFICIENCY]
-            + pcc_capacity[t]
-            >= experiment[SHORTAGE_LIMIT] * (demand_profile[t] - shortage[t])
-            for t in range(0, len(demand_profile.index))
-        ]
-
-        if all(boolean_test) is True:
-            logging.debug("Stability criterion is fullfilled.")
-        else:
-            ratio = pd.Series(
-                [
-                    (
-                        genset_capacity
-                        + (
-                            stored_electricity[t]
-                            - oemof_results[CAPACITY_STORAGE_KWH]
-                            * experiment[STORAGE_CAPACITY_MIN]
-                        )
-                        * experiment[STORAGE_CRATE_DISCHARGE]
-                        * experiment[STORAGE_EFFICIENCY_DISCHARGE]
-                        * experiment[INVERTER_DC_AC_EFFICIENCY]
-                        + pcc_capacity[t]
-                        - experiment[SHORTAGE_LIMIT] * (demand_profile[t] - shortage[t])
-                    )
-                    / (experiment[PEAK_DEMAND])
-                    for t in range(0, len(demand_profile.index))
-                ],
-                index=demand_profile.index,
-            )
-            ratio_below_zero = ratio.clip_upper(0)
-            test_warning(ratio_below_zero, oemof_results, boolean_test)
+            + pcc_capacity
+            - experiment[SHORTAGE_LIMIT] * (demand_profile - shortage)
+        )
+        test_warning(
+            deviation / experiment[PEAK_DEMAND], oemof_results, experiment, e_flows_df
+        )
     else:
         pass
 
@@ -254,94 +321,89 @@ def hybrid(
 
     stability_limit = experiment[SHORTAGE_LIMIT]
 
-    def stability_rule_capacity(model, t):
-        expr = 0
-        ## ------- Get demand at t ------- #
-        demand = model.flow[el_bus_ac, sink_demand, t]
-        expr += -stability_limit * demand
-
-        ## ------- Get shortage at t------- #
-        if case_dict[ALLOW_SHORTAGE] is True:
-            shortage = model.flow[source_shortage, el_bus_ac, t]
-            expr += +stability_limit * shortage
+    ## ------- Get demand and shortage at t ------- #
+    timestep_terms = get_supplied_demand_terms(
+        model, case_dict, stability_limit, sink_demand, source_shortage, el_bus_ac
+    )
 
-        ## ------- Generation Diesel ------- #
-        if case_dict[GENSET_FIXED_CAPACITY] != None:
-            for number in range(1, case_dict[NUMBER_OF_EQUAL_GENERATORS] + 1):
-                expr += model.flow[genset[number], el_bus_ac, t]
-
-        ##---------Grid consumption t-------#
-        if case_dict[PCC_CONSUMPTION_FIXED_CAPACITY] != None:
-            expr += model.flow[pcc_consumption, el_bus_ac, t]
-
-        ## ------- Get stored capacity storage at t------- #
-        if case_dict[STORAGE_FIXED_CAPACITY] != None:
-            stored_electricity = 0
-            if case_dict[STORAGE_FIXED_CAPACITY] is False:  # Storage subject to OEM
-                stored_electricity += (
-                    model.GenericInvestmentStorageBlock.storage_content[storage, t]
-                    - experiment[STORAGE_SOC_MIN]
-                    * model.GenericInvestmentStorageBlock.invest[storage]
-                )
-            elif isinstance(
-                case_dict[STORAGE_FIXED_CAPACITY], float
-            ):  # Fixed storage subject to dispatch
-                stored_electricity += (
-                    model.GenericStorageBlock.storage_content[storage, t]
-                    - experiment[STORAGE_SOC_MIN] * storage.nominal_capacity
-                )
-            else:
-                logging.warning(
-                    "Error: 'storage_fixed_capacity' can only be None, False or float."
-                )
-            expr += (
-                stored_electricity
-                * experiment[STORAGE_CRATE_DISCHARGE]
-                * experiment[STORAGE_EFFICIENCY_DISCHARGE]
-                * experiment[INVERTER_DC_AC_EFFICIENCY]
+    ## ------- Generation Diesel ------- #
+    if case_dict[GENSET_FIXED_CAPACITY] != None:
+        for number in range(1, case_dict[NUMBER_OF_EQUAL_GENERATORS] + 1):
+            timestep_terms.append(
+                (1, get_flow_variables(model, genset[number], el_bus_ac))
             )
-        return expr >= 0
 
-    def stability_rule_power(model, t):
-        expr = 0
-        ## ------- Get demand at t ------- #
-        demand = model.flow[el_bus_ac, sink_demand, t]
-        expr += -stability_limit * demand
-
-        ## ------- Get shortage at t------- #
-        if case_dict[ALLOW_SHORTAGE] is True:
-            shortage = model.flow[source_shortage, el_bus_ac, t]
-            expr += +stability_limit * shortage
+    ##---------Grid consumption t-------#
+    if case_dict[PCC_CONSUMPTION_FIXED_CAPACITY] != None:
+        timestep_terms.append(
+            (1, get_flow_variables(model, pcc_consumption, el_bus_ac))
+        )
 
-        ## ------- Generation Diesel ------- #
-        if case_dict[GENSET_FIXED_CAPACITY] != None:
-            for number in range(1, case_dict[NUMBER_OF_EQUAL_GENERATORS] + 1):
-                expr += model.flow[genset[number], el_bus_ac, t]
-
-        ##---------Grid consumption t-------#
-        if case_dict[PCC_CONSUMPTION_FIXED_CAPACITY] != None:
-            expr += model.flow[pcc_consumption, el_bus_ac, t]
-
-        ## ------- Get power of storage ------- #
-        if case_dict[STORAGE_FIXED_POWER] != None:
-            storage_power = 0
-            if case_dict[STORAGE_FIXED_CAPACITY] is False:
-                storage_power += model.InvestmentFlow.invest[storage, el_bus_dc]
-            elif isinstance(case_dict[STORAGE_FIXED_CAPACITY], float):
-                storage_power += case_dict[STORAGE_FIXED_POWER]
-            else:
-                logging.warning(
-                    "Error: 'storage_fixed_power' can only be None, False or float."
+    ## ------- Get stored capacity storage at t------- #
+    capacity_constant = 0
+    capacity_terms = []
+    capacity_timestep_terms = timestep_terms.copy()
+    if case_dict[STORAGE_FIXED_CAPACITY] != None:
+        discharge_factor = (
+            experiment[STORAGE_CRATE_DISCHARGE]
+            * experiment[STORAGE_EFFICIENCY_DISCHARGE]
+            * experiment[INVERTER_DC_AC_EFFICIENCY]
+        )
+        if case_dict[STORAGE_FIXED_CAPACITY] is False:  # Storage subject to OEM
+            capacity_terms.append(
+                (
+                    -experiment[STORAGE_SOC_MIN] * discharge_factor,
+                    model.GenericInvestmentStorageBlock.invest[storage],
                 )
+            )
+        elif isinstance(
+            case_dict[STORAGE_FIXED_CAPACITY], float
+        ):  # Fixed storage subject to dispatch
+            capacity_constant -= (
+                experiment[STORAGE_SOC_MIN]
+                * storage.nominal_storage_capacity
+                * discharge_factor
+            )
+        else:
+            logging.warning(
+                "Error: 'storage_fixed_capacity' can only be None, False or float."
+            )
+        if case_dict[STORAGE_FIXED_CAPACITY] is False or isinstance(
+            case_dict[STORAGE_FIXED_CAPACITY], float
+        ):
+            capacity_timestep_terms.append(
+                (discharge_factor, get_storage_content(model, case_dict, storage))
+            )
 
-            expr += storage_power * experiment[INVERTER_DC_AC_EFFICIENCY]
-        return expr >= 0
+    ## ------- Get power of storage ------- #
+    power_constant = 0
+    power_terms = []
+    if case_dict[STORAGE_FIXED_POWER] != None:
+        if case_dict[STORAGE_FIXED_CAPACITY] is False:
+            power_terms.append(
+                (
+                    experiment[INVERTER_DC_AC_EFFICIENCY],
+                    model.InvestmentFlow.invest[storage, el_bus_dc],
+                )
+            )
+        elif isinstance(case_dict[STORAGE_FIXED_CAPACITY], float):
+            power_constant += (
+                case_dict[STORAGE_FIXED_POWER] * experiment[INVERTER_DC_AC_EFFICIENCY]
+            )
+        else:
+            logging.warning(
+                "Error: 'storage_fixed_power' can only be None, False or float."
+            )
 
-    model.stability_constraint_capacity = po.Constraint(
-        model.TIMESTEPS, rule=stability_rule_capacity
+    add_timestep_constraint(
+        model,
+        "stability_constraint_capacity",
+        capacity_constant,
+        capacity_terms,
+        capacity_timestep_terms,
     )
-    model.stability_constraint_power = po.Constraint(
-        model.TIMESTEPS, rule=stability_rule_power
+    add_timestep_constraint(
+        model, "stability_constraint_power", power_constant, power_terms, timestep_terms
     )
     return model
 
@@ -352,75 +414,37 @@ def hybrid_test(case_dict, oemof_results, experiment, e_flows_df):
     #todo actually this does not test the stability_share_power criterion, which includes the storage power!
     """
     if case_dict[STABILITY_CONSTRAINT] != False:
-        demand_profile = e_flows_df[DEMAND]
+        demand_profile = plausability_tests.get_values(e_flows_df, DEMAND)
 
         if case_dict[ALLOW_SHORTAGE] is True:
-            shortage = e_flows_df[DEMAND_SHORTAGE]
+            shortage = plausability_tests.get_values(e_flows_df, DEMAND_SHORTAGE)
         else:
-            shortage = pd.Series(
-                [0 for t in demand_profile.index], index=demand_profile.index
-            )
-
-        if STORED_CAPACITY in e_flows_df.columns:
-            stored_electricity = e_flows_df[STORED_CAPACITY]
-        else:
-            stored_electricity = pd.Series(
-                [0 for t in demand_profile.index], index=demand_profile.index
-            )
+            shortage = np.zeros(len(demand_profile))
 
-        if CONSUMPTION_MAIN_GRID_MG_SIDE in e_flows_df.columns:
-            pcc_consumption = e_flows_df[CONSUMPTION_MAIN_GRID_MG_SIDE]
-        else:
-            pcc_consumption = pd.Series(
-                [0 for t in demand_profile.index], index=demand_profile.index
-            )
-
-        if GENSET_GENERATION in e_flows_df.columns:
-            genset_generation = e_flows_df[GENSET_GENERATION]
-        else:
-            genset_generation = pd.Series(
-                [0 for t in demand_profile.index], index=demand_profile.index
-            )
+        stored_electricity = plausability_tests.get_values(e_flows_df, STORED_CAPACITY)
+        pcc_consumption = plausability_tests.get_values(
+            e_flows_df, CONSUMPTION_MAIN_GRID_MG_SIDE
+        )
+        genset_generation = plausability_tests.get_values(e_flows_df, GENSET_GENERATION)
 
-        boolean_test = [
-            genset_generation[t]
+        deviation = (
+            genset_generation
             + (
-                stored_electricity[t]
+                stored_electricity
                 - oemof_results[CAPACITY_STORAGE_KWH] * experiment[STORAGE_SOC_MIN]
             )
             * experiment[STORAGE_CRATE_DISCHARGE]
             * experiment[STORAGE_EFFICIENCY_DISCHARGE]
             * experiment[INVERTER_DC_AC_EFFICIENCY]
-            + pcc_consumption[t]
-            >= experiment[SHORTAGE_LIMIT] * (demand_profile[t] - shortage[t])
-            for t in range(0, len(demand_profile.index))
-        ]
-
-        if all(boolean_test) is True:
-            logging.debug("Stability criterion is fullfilled.")
-        else:
-            ratio = pd.Series(
-                [
-                    (
-                        genset_generation[t]
-                        + (
-                            stored_electricity[t]
-                            - oemof_results[CAPACITY_STORAGE_KWH]
-                            * experiment[STORAGE_SOC_MIN]
-                        )
-                        * experiment[STORAGE_CRATE_DISCHARGE]
-                        * experiment[STORAGE_EFFICIENCY_DISCHARGE]
-                        * experiment[INVERTER_DC_AC_EFFICIENCY]
-                        + pcc_consumption[t]
-                        - experiment[SHORTAGE_LIMIT] * (demand_profile[t] - shortage[t])
-                    )
-                    / (experiment[PEAK_DEMAND_AC])
-                    for t in range(0, len(demand_profile.index))
-                ],
-                index=demand_profile.index,
-            )
-            ratio_below_zero = ratio.clip(upper = 0)
-            test_warning(ratio_below_zero, oemof_results, boolean_test)
+            + pcc_consumption
+            - experiment[SHORTAGE_LIMIT] * (demand_profile - shortage)
+        )
+        test_warning(
+            deviation / experiment[PEAK_DEMAND_AC],
+            oemof_results,
+            experiment,
+            e_flows_df,
+        )
 
     else:
         pass
@@ -442,35 +466,30 @@ def usage(
 
     stability_limit = experiment[SHORTAGE_LIMIT]
 
-    def stability_rule(model, t):
-        expr = 0
-        ## ------- Get demand at t ------- #
-        demand = model.flow[el_bus, sink_demand, t]
-
-        expr += -stability_limit * demand
-
-        ## ------- Get shortage at t------- #
-        if case_dict[ALLOW_SHORTAGE] is True:
-            shortage = model.flow[source_shortage, el_bus, t]
-            expr += stability_limit * shortage
+    ## ------- Get demand and shortage at t ------- #
+    timestep_terms = get_supplied_demand_terms(
+        model, case_dict, stability_limit, sink_demand, source_shortage, el_bus
+    )
 
-        ## ------- Generation Diesel ------- #
-        if case_dict[GENSET_FIXED_CAPACITY] != None:
-            for number in range(1, case_dict[NUMBER_OF_EQUAL_GENERATORS] + 1):
-                expr += model.flow[genset[number], el_bus, t]
+    ## ------- Generation Diesel ------- #
+    if case_dict[GENSET_FIXED_CAPACITY] != None:
+        for number in range(1, case_dict[NUMBER_OF_EQUAL_GENERATORS] + 1):
+            timestep_terms.append((1, get_flow_variables(model, genset[number], el_bus)))
 
-        ##---------Grid consumption t-------#
-        if case_dict[PCC_CONSUMPTION_FIXED_CAPACITY] != None:
-            expr += model.flow[pcc_consumption, el_bus, t]
+    ##---------Grid consumption t-------#
+    if case_dict[PCC_CONSUMPTION_FIXED_CAPACITY] != None:
+        timestep_terms.append((1, get_flow_variables(model, pcc_consumption, el_bus)))
 
-        ## ------- Get discharge storage at t------- #
-        if case_dict[STORAGE_FIXED_CAPACITY] != None:
-            expr += (
-                model.flow[storage, el_bus, t] * experiment[INVERTER_DC_AC_EFFICIENCY]
+    ## ------- Get discharge storage at t------- #
+    if case_dict[STORAGE_FIXED_CAPACITY] != None:
+        timestep_terms.append(
+            (
+                experiment[INVERTER_DC_AC_EFFICIENCY],
+                get_flow_variables(model, storage, el_bus),
             )
-        return expr >= 0
+        )
 
-    model.stability_constraint = po.Constraint(model.TIMESTEPS, rule=stability_rule)
+    add_timestep_constraint(model, "stability_constraint", 0, [], timestep_terms)
 
     return model
 
@@ -480,92 +499,80 @@ def usage_test(case_dict, oemof_results, experiment, e_flows_df):
     Testing simulation results for adherance to above defined stability criterion
     """
     if case_dict[STABILITY_CONSTRAINT] != False:
-        demand_profile = e_flows_df[DEMAND]
+        demand_profile = plausability_tests.get_values(e_flows_df, DEMAND)
 
         if case_dict[ALLOW_SHORTAGE] is True:
-            shortage = e_flows_df[DEMAND_SHORTAGE]
-        else:
-            shortage = pd.Series(
-                [0 for t in demand_profile.index], index=demand_profile.index
-            )
-
-        if STORAGE_DISCHARGE in e_flows_df.columns:
-            storage_discharge = e_flows_df[STORAGE_DISCHARGE]
+            shortage = plausability_tests.get_values(e_flows_df, DEMAND_SHORTAGE)
         else:
-            storage_discharge = pd.Series(
-                [0 for t in demand_profile.index], index=demand_profile.index
-            )
-
-        if CONSUMPTION_MAIN_GRID_MG_SIDE in e_flows_df.columns:
-            pcc_feedin = e_flows_df[CONSUMPTION_MAIN_GRID_MG_SIDE]
-        else:
-            pcc_feedin = pd.Series(
-                [0 for t in demand_profile.index], index=demand_profile.index
-            )
+            shortage = np.zeros(len(demand_profile))
 
-        if GENSET_GENERATION in e_flows_df.columns:
-            genset_generation = e_flows_df[GENSET_GENERATION]
-        else:
-            genset_generation = pd.Series(
-                [0 for t in demand_profile.index], index=demand_profile.index
-            )
-
-        boolean_test = [
-            genset_generation[t]
-            + storage_discharge[t] * experiment[INVERTER_DC_AC_EFFICIENCY]
-            + pcc_feedin[t]
-            >= experiment[SHORTAGE_LIMIT] * (demand_profile[t] - shortage[t])
-            for t in range(0, len(demand_profile.index))
-        ]
+        storage_discharge = plausability_tests.get_values(e_flows_df, STORAGE_DISCHARGE)
+        pcc_feedin = plausability_tests.get_values(
+            e_flows_df, CONSUMPTION_MAIN_GRID_MG_SIDE
+        )
+        genset_generation = plausability_tests.get_values(e_flows_df, GENSET_GENERATION)
 
-        if all(boolean_test) is True:
-            logging.debug("Stability criterion is fullfilled.")
-        else:
-            ratio = pd.Series(
-                [
-                    (
-                        genset_generation[t]
-                        + storage_discharge[t] * experiment[INVERTER_DC_AC_EFFICIENCY]
-                        + pcc_feedin[t]
-                        - experiment[SHORTAGE_LIMIT] * (demand_profile[t] - shortage[t])
-                    )
-                    / (experiment[PEAK_DEMAND])
-                    for t in range(0, len(demand_profile.index))
-                ],
-                index=demand_profile.index,
-            )
-            ratio_below_zero = ratio.clip_upper(0)
-            test_warning(ratio_below_zero, oemof_results, boolean_test)
+        deviation = (
+            genset_generation
+            + storage_discharge * experiment[INVERTER_DC_AC_EFFICIENCY]
+            + pcc_feedin
+            - experiment[SHORTAGE_LIMIT] * (demand_profile - shortage)
+        )
+        test_warning(
+            deviation / experiment[PEAK_DEMAND], oemof_results, experiment, e_flows_df
+        )
     else:
         pass
 
     return
 
 
-def test_warning(ratio_below_zero, oemof_results, boolean_test):
-    if abs(ratio_below_zero.values.min()) < 10 ** (-6):
+def test_warning(ratio, oemof_results, experiment, e_flows_df):
+    """
+    Reports the timesteps at which the stability criterion is not fullfilled
+
+    Parameters
+    ----------
+    ratio: numpy.ndarray
+        Deviation from the stability criterion per timestep relative to the peak demand,
+        negative if the criterion is not fullfilled
+
+    oemof_results: dict
+        Results of the simulation, extended in place
+
+    experiment: dict
+        Includes the PLAUSIBILITY_TOLERANCE
+
+    e_flows_df: pandas.DataFrame
+        Energy flows of the simulation
+    """
+    if np.all(ratio >= 0):
+        logging.debug("Stability criterion is fullfilled.")
+        return
+    ratio_below_zero = np.minimum(ratio, 0)
+    violations = plausability_tests.get_violations(
+        ratio < -experiment[PLAUSIBILITY_TOLERANCE], e_flows_df.index
+    )
+    if violations["count"] == 0:
         logging.warning(
-            "Stability criterion is strictly not fullfilled, but deviation is less then e6."
+            f"Stability criterion is strictly not fullfilled, but deviation is less then {experiment[PLAUSIBILITY_TOLERANCE]}."
         )
     else:
         logging.warning("ATTENTION: Stability criterion NOT fullfilled!")
-        logging.warning(
-            "Number of timesteps not meeting criteria: " + str(sum(boolean_test))
-        )
         logging.warning(
             "Deviation from stability criterion: "
-            + str(ratio_below_zero.values.mean())
+            + str(ratio_below_zero.mean())
             + "(mean) / "
-            + str(ratio_below_zero.values.min())
+            + str(ratio_below_zero.min())
             + "(max)."
         )
-        oemof_results.update(
-            {
-                COMMENTS: oemof_results[COMMENTS]
-                + "Stability criterion not fullfilled (max deviation "
-                + str(round(100 * ratio_below_zero.values.min(), 4))
-                + "%). "
-            }
+        plausability_tests.report_violations(
+            oemof_results,
+            violations,
+            "Timesteps not meeting criteria",
+            "Stability criterion not fullfilled (max deviation "
+            + str(round(100 * ratio_below_zero.min(), 4))
+            + "%). ",
         )
     return
 
@@ -677,55 +684,49 @@ def share_test(case_dict, oemof_results, experiment):
 
 
 def forced_charge(model, case_dict, el_bus_dc, storage, experiment):
-    ## ------- Get CAP Storage ------- #
-    CAP_storage = 0
-    if case_dict[STORAGE_FIXED_CAPACITY] != None:
-        if case_dict[STORAGE_FIXED_CAPACITY] is False:
-            CAP_storage += model.GenericInvestmentStorageBlock.invest[storage]
-        elif isinstance(case_dict[STORAGE_FIXED_CAPACITY], float):
-            CAP_storage += storage.nominal_capacity
+    if case_dict[STORAGE_FIXED_CAPACITY] == None:
+        return model
+
+    grid_availability = generate.get_timeseries(experiment, GRID_AVAILABILITY)
 
     m = -experiment[STORAGE_CRATE_CHARGE] / (
         experiment[STORAGE_SOC_MAX] - experiment[STORAGE_SOC_MIN]
     )
 
-    n = (
-        experiment[STORAGE_CRATE_CHARGE]
-        * CAP_storage
-        * (
-            1
-            + experiment[STORAGE_SOC_MIN]
-            / (experiment[STORAGE_SOC_MAX] - experiment[STORAGE_SOC_MIN])
-        )
+    n = experiment[STORAGE_CRATE_CHARGE] * (
+        1
+        + experiment[STORAGE_SOC_MIN]
+        / (experiment[STORAGE_SOC_MAX] - experiment[STORAGE_SOC_MIN])
     )
 
-    def linear_charge(model, t):
-        ## ------- Get storaged electricity at t------- #
-        stored_electricity = 0
-        expr = 0
-        if case_dict[STORAGE_FIXED_CAPACITY] != None:
-            if case_dict[STORAGE_FIXED_CAPACITY] is False:  # Storage subject to OEM
-                stored_electricity += model.GenericInvestmentStorageBlock.storage_content[
-                    storage, t
-                ]
-            elif isinstance(
-                case_dict[STORAGE_FIXED_CAPACITY], float
-            ):  # Fixed storage subject to dispatch
-                stored_electricity += model.GenericStorageBlock.storage_content[
-                    storage, t
-                ]
-
-            # Linearization
-            expr = m * stored_electricity + n  # * 0.99
-
-            # Only apply linearization if no blackout occurs
-            expr = expr * experiment[GRID_AVAILABILITY][t]
-
-            # Actual charge
-            expr += -model.flow[el_bus_dc, storage, t]
-        return expr <= 0
-
-    model.forced_charge_linear = po.Constraint(model.TIMESTEPS, rule=linear_charge)
+    # Linearization m * stored_electricity + n * CAP_storage, only applied if no blackout occurs
+    timestep_terms = [
+        (m * grid_availability, get_storage_content(model, case_dict, storage))
+    ]
+    constant = 0
+    ## ------- Get CAP Storage ------- #
+    if case_dict[STORAGE_FIXED_CAPACITY] is False:
+        timestep_terms.append(
+            (
+                n * grid_availability,
+                [model.GenericInvestmentStorageBlock.invest[storage]]
+                * len(model.TIMESTEPS),
+            )
+        )
+    elif isinstance(case_dict[STORAGE_FIXED_CAPACITY], float):
+        constant = n * storage.nominal_storage_capacity * grid_availability
+
+    # Actual charge
+    timestep_terms.append((-1, get_flow_variables(model, el_bus_dc, storage)))
+
+    add_timestep_constraint(
+        model,
+        "forced_charge_linear",
+        constant,
+        [],
+        timestep_terms,
+        upper_limit=True,
+    )
 
     return model
 
@@ -735,108 +736,69 @@ def forced_charge_test(case_dict, oemof_results, experiment, e_flows_df):
     Testing simulation results for adherance to above defined criterion
     """
     if case_dict[FORCE_CHARGE_FROM_MAINGRID] is True:
-        boolean_test = [
-            (
-                experiment[STORAGE_CRATE_CHARGE]
-                * oemof_results[CAPACITY_STORAGE_KWH]
-                * (
-                    1
-                    + experiment[STORAGE_SOC_MIN]
-                    / (experiment[STORAGE_SOC_MAX] - experiment[STORAGE_SOC_MIN])
-                )
-                + (oemof_results[CAPACITY_STORAGE_KWH] - e_flows_df[STORED_CAPACITY][t])
+        deviation = (
+            experiment[STORAGE_CRATE_CHARGE]
+            * oemof_results[CAPACITY_STORAGE_KWH]
+            * (
+                1
+                + experiment[STORAGE_SOC_MIN]
                 / (experiment[STORAGE_SOC_MAX] - experiment[STORAGE_SOC_MIN])
             )
-            * e_flows_df[GRID_AVAILABILITY][t]
-            <= e_flows_df[STORAGE_CHARGE_DC][t]
-            for t in range(0, len(e_flows_df.index))
-        ]
+            + (
+                oemof_results[CAPACITY_STORAGE_KWH]
+                - plausability_tests.get_values(e_flows_df, STORED_CAPACITY)
+            )
+            / (experiment[STORAGE_SOC_MAX] - experiment[STORAGE_SOC_MIN])
+        ) * plausability_tests.get_values(
+            e_flows_df, GRID_AVAILABILITY
+        ) - plausability_tests.get_values(
+            e_flows_df, STORAGE_CHARGE_DC
+        )
 
-        if all(boolean_test) is True:
+        if np.all(deviation <= 0):
             logging.debug(
                 "Battery is always charged when grid availabile (linearized)."
             )
-        else:
-
-            deviation = pd.Series(
-                [
-                    (
-                        experiment[STORAGE_CRATE_CHARGE]
-                        * oemof_results[CAPACITY_STORAGE_KWH]
-                        * (
-                            1
-                            + experiment[STORAGE_SOC_MIN]
-                            / (
-                                experiment[STORAGE_SOC_MAX]
-                                - experiment[STORAGE_SOC_MIN]
-                            )
-                        )
-                        + (
-                            oemof_results[CAPACITY_STORAGE_KWH]
-                            - e_flows_df[STORED_CAPACITY][t]
-                        )
-                        / (experiment[STORAGE_SOC_MAX] - experiment[STORAGE_SOC_MIN])
-                    )
-                    * e_flows_df[GRID_AVAILABILITY][t]
-                    - e_flows_df[STORAGE_CHARGE_DC][t]
-                    for t in range(0, len(e_flows_df.index))
-                ],
-                index=e_flows_df.index,
+        elif not plausability_tests.report_violations(
+            oemof_results,
+            plausability_tests.get_violations(
+                deviation > experiment[PLAUSIBILITY_TOLERANCE], e_flows_df.index
+            ),
+            "ATTENTION: Battery charge at grid availability does not take place adequately!",
+            "Forced battery charge criterion not fullfilled. ",
+        ):
+            logging.warning(
+                f"Battery charge when grid available not as high as need be, but deviation is less then {experiment[PLAUSIBILITY_TOLERANCE]}."
             )
 
-            if max(deviation) < 10 ** (-6):
-                logging.warning(
-                    "Battery charge when grid available not as high as need be, but deviation is less then e6."
-                )
-            else:
-                logging.warning(
-                    "ATTENTION: Battery charge at grid availability does not take place adequately!"
-                )
-                oemof_results.update(
-                    {
-                        COMMENTS: oemof_results[COMMENTS]
-                        + "Forced battery charge criterion not fullfilled. "
-                    }
-                )
-
     return
 
 
 def discharge_only_at_blackout(model, case_dict, el_bus, storage, experiment):
-    grid_inavailability = 1 - experiment[GRID_AVAILABILITY]
-
-    def discharge_rule_upper(model, t):
-        expr = 0
-        stored_electricity = 0
-
-        if case_dict[STORAGE_FIXED_CAPACITY] != None:
-            # Battery discharge flow
-            expr += model.flow[storage, el_bus, t]
-            # Get stored electricity at t
-            if case_dict[STORAGE_FIXED_CAPACITY] is False:  # Storage subject to OEM
-                stored_electricity += model.GenericInvestmentStorageBlock.storage_content[
-                    storage, t
-                ]
-            elif isinstance(
-                case_dict[STORAGE_FIXED_CAPACITY], float
-            ):  # Fixed storage subject to dispatch
-                stored_electricity += model.GenericStorageBlock.storage_content[
-                    storage, t
-                ]
-
-            # force discharge to zero when grid available
-            expr += -stored_electricity * grid_inavailability[t]
-
-        return expr <= 0
-
-    model.discharge_only_at_blackout_constraint = po.Constraint(
-        model.TIMESTEPS, rule=discharge_rule_upper
+    if case_dict[STORAGE_FIXED_CAPACITY] == None:
+        return model
+
+    grid_inavailability = 1 - generate.get_timeseries(experiment, GRID_AVAILABILITY)
+
+    # Battery discharge flow, forced to zero when grid available
+    timestep_terms = [
+        (1, get_flow_variables(model, storage, el_bus)),
+        (-grid_inavailability, get_storage_content(model, case_dict, storage)),
+    ]
+
+    add_timestep_constraint(
+        model,
+        "discharge_only_at_blackout_constraint",
+        0,
+        [],
+        timestep_terms,
+        upper_limit=True,
     )
 
     return model
 
 
-def discharge_only_at_blackout_test(case_dict, oemof_results, e_flows_df):
+def discharge_only_at_blackout_test(case_dict, oemof_results, experiment, e_flows_df):
     """
     Testing simulation results for adherance to above defined criterion
     """
@@ -844,71 +806,60 @@ def discharge_only_at_blackout_test(case_dict, oemof_results, e_flows_df):
         case_dict[DISCHARGE_ONLY_WHEN_BLACKOUT] is True
         and case_dict[STORAGE_FIXED_CAPACITY] != None
     ):
-        boolean_test = [
-            e_flows_df[STORAGE_DISCHARGE_DC][t]
-            <= (1 - e_flows_df[GRID_AVAILABILITY][t]) * e_flows_df[STORED_CAPACITY][t]
-            for t in range(0, len(e_flows_df.index))
-        ]
+        deviation = plausability_tests.get_values(e_flows_df, STORAGE_DISCHARGE_DC) - (
+            1 - plausability_tests.get_values(e_flows_df, GRID_AVAILABILITY)
+        ) * plausability_tests.get_values(e_flows_df, STORED_CAPACITY)
 
-        if all(boolean_test) is True:
+        if np.all(deviation <= 0):
             logging.debug("Battery only discharged when grid unavailable.")
-        else:
-            ratio = pd.Series(
-                [
-                    (
-                        e_flows_df[STORAGE_DISCHARGE_DC][t]
-                        - (1 - e_flows_df[GRID_AVAILABILITY][t])
-                        * e_flows_df[STORED_CAPACITY][t]
-                    )
-                    for t in range(0, len(e_flows_df.index))
-                ],
-                index=e_flows_df.index,
+        elif not plausability_tests.report_violations(
+            oemof_results,
+            plausability_tests.get_violations(
+                deviation > experiment[PLAUSIBILITY_TOLERANCE], e_flows_df.index
+            ),
+            "ATTENTION: Battery charge when grid available!",
+            "Limitation of battery discharge to blackout not fullfilled. ",
+        ):
+            logging.warning(
+                f"Battery discharge when grid available, but deviation is less then {experiment[PLAUSIBILITY_TOLERANCE]}."
             )
 
-            if max(ratio) < 10 ** (-6):
-                logging.warning(
-                    "Battery discharge when grid available, but deviation is less then e6."
-                )
-            else:
-                logging.warning("ATTENTION: Battery charge when grid available!")
-                oemof_results.update(
-                    {
-                        COMMENTS: oemof_results[COMMENTS]
-                        + "Limitation of battery discharge to blackout not fullfilled. "
-                    }
-                )
-
     return
 
 
 def inverter_only_at_blackout(model, case_dict, el_bus, inverter, experiment):
-    grid_inavailability = 1 - experiment[GRID_AVAILABILITY]
-
-    ## ------- Get CAP inverter ------- #
-    CAP_inverter = 0
-    if case_dict[INVERTER_DC_AC_FIXED_CAPACITY] != None:
-        if case_dict[INVERTER_DC_AC_FIXED_CAPACITY] is False:
-            CAP_inverter += model.InvestmentFlow.invest[el_bus, inverter]
-        elif isinstance(case_dict[INVERTER_DC_AC_FIXED_CAPACITY], float):
-            CAP_inverter += model.flows[el_bus, inverter].nominal_value
-
-    def inverter_rule_upper(model, t):
-        # Inverter flow
-        expr = 0
-        if case_dict[INVERTER_DC_AC_FIXED_CAPACITY] != None:
-            expr += model.flow[el_bus, inverter, t]
-        # force discharge to zero when grid available
-        expr += -CAP_inverter * grid_inavailability[t]
-        return expr <= 0
+    if case_dict[INVERTER_DC_AC_FIXED_CAPACITY] == None:
+        return model
+
+    grid_inavailability = 1 - generate.get_timeseries(experiment, GRID_AVAILABILITY)
 
-    model.inverter_only_at_blackout = po.Constraint(
-        model.TIMESTEPS, rule=inverter_rule_upper
+    # Inverter flow
+    timestep_terms = [(1, get_flow_variables(model, el_bus, inverter))]
+    constant = 0
+    ## ------- Get CAP inverter, force inverter flow to zero when grid available ------- #
+    if case_dict[INVERTER_DC_AC_FIXED_CAPACITY] is False:
+        timestep_terms.append(
+            (
+                -grid_inavailability,
+                [model.InvestmentFlow.invest[el_bus, inverter]] * len(model.TIMESTEPS),
+            )
+        )
+    elif isinstance(case_dict[INVERTER_DC_AC_FIXED_CAPACITY], float):
+        constant = -model.flows[el_bus, inverter].nominal_value * grid_inavailability
+
+    add_timestep_constraint(
+        model,
+        "inverter_only_at_blackout",
+        constant,
+        [],
+        timestep_terms,
+        upper_limit=True,
     )
 
     return model
 
 
-def inverter_only_at_blackout_test(case_dict, oemof_results, e_flows_df):
+def inverter_only_at_blackout_test(case_dict, oemof_results, experiment, e_flows_df):
     """
     Testing simulation results for adherance to above defined criterion
     """
@@ -917,59 +868,42 @@ def inverter_only_at_blackout_test(case_dict, oemof_results, e_flows_df):
         case_dict[ENABLE_INVERTER_ONLY_AT_BLACKOUT] is True
         and case_dict[INVERTER_DC_AC_FIXED_CAPACITY] != None
     ):
-        boolean_test = [
-            e_flows_df[INVERTER_INPUT][t]
-            <= (1 - e_flows_df[GRID_AVAILABILITY][t])
+        deviation = (
+            plausability_tests.get_values(e_flows_df, INVERTER_INPUT)
+            - (1 - plausability_tests.get_values(e_flows_df, GRID_AVAILABILITY))
             * oemof_results[CAPACITY_INVERTER_DC_AC_KW]
-            for t in range(0, len(e_flows_df.index))
-        ]
+        )
 
-        if all(boolean_test) is True:
+        if np.all(deviation <= 0):
             logging.debug("Battery only discharged when grid unavailable.")
-        else:
-            ratio = pd.Series(
-                [
-                    (
-                        e_flows_df[INVERTER_INPUT][t]
-                        - (1 - e_flows_df[GRID_AVAILABILITY][t])
-                        * oemof_results[CAPACITY_INVERTER_DC_AC_KW]
-                    )
-                    for t in range(0, len(e_flows_df.index))
-                ],
-                index=e_flows_df.index,
+        elif not plausability_tests.report_violations(
+            oemof_results,
+            plausability_tests.get_violations(
+                deviation > experiment[PLAUSIBILITY_TOLERANCE], e_flows_df.index
+            ),
+            "ATTENTION: Inverter use when grid available!",
+            "Inverter use when grid available. ",
+        ):
+            logging.warning(
+                f"Inverter use when grid available, but deviation is less then {experiment[PLAUSIBILITY_TOLERANCE]}."
             )
 
-            if max(ratio) < 10 ** (-6):
-                logging.warning(
-                    "Inverter use when grid available, but deviation is less then e6."
-                )
-            else:
-                logging.warning("ATTENTION: Inverter use when grid available!")
-                oemof_results.update(
-                    {
-                        COMMENTS: oemof_results[COMMENTS]
-                        + "Inverter use when grid available. "
-                    }
-                )
-
     return
 
 
 # todo shortage constraint / stbaility constraint only relates to AC bus
 def timestep(model, case_dict, experiment, el_bus, sink_demand, source_shortage):
-    def stability_per_timestep_rule(model, t):
-        expr = 0
-        ## ------- Get demand at t ------- #
-        demand = model.flow[el_bus, sink_demand, t]
-        expr += experiment[SHORTAGE_MAX_TIMESTEP] * demand
-        ## ------- Get shortage at t------- #
-        if case_dict["allow_shortage"] is True:
-            expr += -model.flow[source_shortage, el_bus, t]
-
-        return expr >= 0
-
-    model.stability_constraint = po.Constraint(
-        model.TIMESTEPS, rule=stability_per_timestep_rule
-    )
+    ## ------- Get demand at t ------- #
+    timestep_terms = [
+        (
+            experiment[SHORTAGE_MAX_TIMESTEP],
+            get_flow_variables(model, el_bus, sink_demand),
+        )
+    ]
+    ## ------- Get shortage at t------- #
+    if case_dict["allow_shortage"] is True:
+        timestep_terms.append((-1, get_flow_variables(model, source_shortage, el_bus)))
+
+    add_timestep_constraint(model, "stability_constraint", 0, [], timestep_terms)
 
     return model
@@ -4,8 +4,8 @@ oemof, matplotlib, demandlib, pvlib
 tables, tkinter
 """
 
+import numpy as np
 import pandas as pd
-import oemof.solph as solph
 
 import logging
 
@@ -118,192 +118,277 @@ from src.constants import (
     DEMAND_AC,
     DEMAND_DC,
     GENSET_HOURS_OF_OPERATION,
+    CONSUMPTION_MAIN_GRID_UTILITY_SIDE,
+    FEED_INTO_MAIN_GRID_UTILITY_SIDE,
+    STORAGE_CONTENT,
 )
 
 
-def join_e_flows_df(timeseries, name, e_flows_df):
-    new_column = pd.DataFrame(timeseries.values, columns=[name], index=timeseries.index)
-    e_flows_df = e_flows_df.join(new_column)
-    return e_flows_df
+# Columns of the energy flows of a simulation in order of the results, see initialize_e_flows()
+E_FLOWS_COLUMNS = [
+    DEMAND,
+    DEMAND_AC,
+    DEMAND_DC,
+    DEMAND_SHORTAGE_AC,
+    DEMAND_SHORTAGE_DC,
+    DEMAND_SHORTAGE,
+    DEMAND_SUPPLIED,
+    EXCESS_GENERATION_AC,
+    EXCESS_GENERATION_DC,
+    EXCESS_GENERATION,
+    GENSET_1_GENERATION,
+    GENSET_GENERATION,
+    GRID_AVAILABILITY,
+    CONSUMPTION_MAIN_GRID_MG_SIDE,
+    CONSUMPTION_MAIN_GRID_UTILITY_SIDE,
+    FEED_INTO_MAIN_GRID_MG_SIDE,
+    FEED_INTO_MAIN_GRID_UTILITY_SIDE,
+    WIND_GENERATION,
+    PV_GENERATION_DC,
+    PV_GENERATION_AC,
+    PV_GENERATION,
+    STORAGE_CHARGE_DC,
+    STORAGE_DISCHARGE_DC,
+    STORED_CAPACITY,
+    STORAGE_CHARGE_AC,
+    STORAGE_DISCHARGE_AC,
+    STORAGE_CHARGE,
+    STORAGE_DISCHARGE,
+    STORAGE_SOC,
+    RECTIFIER_OUTPUT,
+    RECTIFIER_INPUT,
+    INVERTER_OUTPUT,
+    INVERTER_INPUT,
+]
+
+
+def get_flows(results):
+    """
+    Collects the sequences and scalars of all flows of the results in a single pass
+
+    Parameters
+    ----------
+    results: dict
+        Main results of the oemof simulation
+
+    Returns
+    -------
+    sequences: dict of numpy.ndarray
+        Sequences keyed as by solph.views.node(), eg. sequences[((SOURCE_PV, BUS_ELECTRICITY_DC), FLOW)]
+
+    scalars: dict
+        Scalars keyed as by solph.views.node(), eg. scalars[((SOURCE_PV, BUS_ELECTRICITY_DC), INVEST)]
+    """
+    sequences = {}
+    scalars = {}
+    for (source, target), result in results.items():
+        flow = (str(source), str(target))
+        for name, values in result[SEQUENCES].items():
+            sequences.update({(flow, name): values.to_numpy(dtype=float)})
+        for name, value in result[SCALARS].items():
+            scalars.update({(flow, name): value})
+    return sequences, scalars
+
+
+def initialize_e_flows(experiment, case_dict):
+    """
+    Preallocates the energy flows of a simulation, with one column per entry of E_FLOWS_COLUMNS
+    and per additional genset
+
+    Parameters
+    ----------
+    experiment: dict
+        Contains general settings for the experiment
+
+    case_dict: dict
+        Contains settings for capacities and storage
+
+    Returns
+    -------
+    e_flows: dict
+        Values of all columns ("values"), position of each column ("columns"),
+        columns with values ("filled") and the timeindex ("index")
+    """
+    columns = E_FLOWS_COLUMNS.copy()
+    position = columns.index(GENSET_1_GENERATION) + 1
+    columns[position:position] = [
+        "Genset " + str(number) + " generation"
+        for number in range(2, case_dict[NUMBER_OF_EQUAL_GENERATORS] + 1)
+    ]
+    index = experiment[DATE_TIME_INDEX]
+    return {
+        "index": index,
+        "columns": {name: position for position, name in enumerate(columns)},
+        "values": np.zeros((len(index), len(columns))),
+        "filled": np.zeros(len(columns), dtype=bool),
+    }
+
+
+def set_e_flow(e_flows, name, timeseries):
+    """
+    Sets the values of column `name` of the energy flows, returns the column
+    """
+    position = e_flows["columns"][name]
+    e_flows["values"][:, position] = timeseries
+    e_flows["filled"][position] = True
+    return e_flows["values"][:, position]
+
+
+def get_e_flows_df(e_flows):
+    """
+    Energy flows as pandas.DataFrame, including only columns with values
+
+    Parameters
+    ----------
+    e_flows: dict
+        Energy flows, see initialize_e_flows()
+
+    Returns
+    -------
+    e_flows_df: pandas.DataFrame
+    """
+    columns = [
+        name
+        for name in e_flows["columns"]
+        if e_flows["filled"][e_flows["columns"][name]]
+    ]
+    return pd.DataFrame(
+        e_flows["values"][:, e_flows["filled"]], index=e_flows["index"], columns=columns
+    )
 
 
 def annual_value(name, timeseries, oemof_results, case_dict):
-    value = sum(timeseries)
+    value = np.sum(timeseries)
     value = value * 365 / case_dict[EVALUATED_DAYS]
     oemof_results.update({name: value})
     return
 
 
-def get_demand(
-    case_dict, oemof_results, electricity_bus_ac, electricity_bus_dc, experiment
-):
+def get_demand(case_dict, oemof_results, sequences, experiment, e_flows):
     logging.debug("Evaluate flow: demand")
     # Get flow
-
-    e_flows_df = pd.DataFrame(
-        [0 for i in experiment[DATE_TIME_INDEX]],
-        columns=[DEMAND],
-        index=experiment[DATE_TIME_INDEX],
+    demand_ac = set_e_flow(
+        e_flows, DEMAND_AC, sequences[((BUS_ELECTRICITY_AC, SINK_DEMAND_AC), FLOW)]
     )
-    demand_ac = electricity_bus_ac[SEQUENCES][
-        ((BUS_ELECTRICITY_AC, SINK_DEMAND_AC), FLOW)
-    ]
-    e_flows_df = join_e_flows_df(demand_ac, DEMAND_AC, e_flows_df)
     if case_dict[EVALUATION_PERSPECTIVE] == AC_SYSTEM:
-        e_flows_df[DEMAND] += demand_ac
+        demand = demand_ac.copy()
     else:
-        e_flows_df[DEMAND] += demand_ac / experiment[INVERTER_DC_AC_EFFICIENCY]
-
-    # if case_dict['pv_fixed_capacity'] != None \
-    #        or case_dict['storage_fixed_capacity'] != None:
+        demand = demand_ac / experiment[INVERTER_DC_AC_EFFICIENCY]
 
-    demand_dc = electricity_bus_dc[SEQUENCES][
-        ((BUS_ELECTRICITY_DC, SINK_DEMAND_DC), FLOW)
-    ]
-    e_flows_df = join_e_flows_df(demand_dc, DEMAND_DC, e_flows_df)
+    demand_dc = set_e_flow(
+        e_flows, DEMAND_DC, sequences[((BUS_ELECTRICITY_DC, SINK_DEMAND_DC), FLOW)]
+    )
     if case_dict[EVALUATION_PERSPECTIVE] == AC_SYSTEM:
-        e_flows_df[DEMAND] += demand_dc / experiment[RECTIFIER_AC_DC_EFFICIENCY]
+        demand += demand_dc / experiment[RECTIFIER_AC_DC_EFFICIENCY]
     else:
-        e_flows_df[DEMAND] += demand_dc
+        demand += demand_dc
+    set_e_flow(e_flows, DEMAND, demand)
 
-    annual_value(TOTAL_DEMAND_ANNUAL_KWH, e_flows_df[DEMAND], oemof_results, case_dict)
-    oemof_results.update({DEMAND_PEAK_KW: max(e_flows_df[DEMAND])})
-    return e_flows_df
+    annual_value(TOTAL_DEMAND_ANNUAL_KWH, demand, oemof_results, case_dict)
+    oemof_results.update({DEMAND_PEAK_KW: np.max(demand)})
+    return e_flows
 
 
-def get_shortage(
-    case_dict,
-    oemof_results,
-    electricity_bus_ac,
-    electricity_bus_dc,
-    experiment,
-    e_flows_df,
-):
+def get_shortage(case_dict, oemof_results, sequences, experiment, e_flows):
     logging.debug("Evaluate flow: shortage")
 
-    # Get flow
-    shortage = pd.Series([0 for i in e_flows_df.index], index=e_flows_df.index)
-
     if case_dict[ALLOW_SHORTAGE] is True:
-        if electricity_bus_ac != None:
-
-            shortage_ac = electricity_bus_ac[SEQUENCES][
-                ((SOURCE_SHORTAGE, BUS_ELECTRICITY_AC), FLOW)
-            ]
-            annual_value(
-                TOTAL_DEMAND_SHORTAGE_AC_ANNUAL_KWH,
-                shortage_ac,
-                oemof_results,
-                case_dict,
-            )
-            e_flows_df = join_e_flows_df(shortage_ac, DEMAND_SHORTAGE_AC, e_flows_df)
-
-            if case_dict[EVALUATION_PERSPECTIVE] == AC_SYSTEM:
-                shortage += shortage_ac
-            else:
-                shortage += shortage_ac / experiment[INVERTER_DC_AC_EFFICIENCY]
-
-        if electricity_bus_dc != None:
-
-            shortage_dc = electricity_bus_dc[SEQUENCES][
-                ((SOURCE_SHORTAGE, BUS_ELECTRICITY_DC), FLOW)
-            ]
-            annual_value(
-                TOTAL_DEMAND_SHORTAGE_DC_ANNUAL_KWH,
-                shortage_dc,
-                oemof_results,
-                case_dict,
-            )
-            e_flows_df = join_e_flows_df(shortage_dc, DEMAND_SHORTAGE_DC, e_flows_df)
+        shortage_ac = set_e_flow(
+            e_flows,
+            DEMAND_SHORTAGE_AC,
+            sequences[((SOURCE_SHORTAGE, BUS_ELECTRICITY_AC), FLOW)],
+        )
+        annual_value(
+            TOTAL_DEMAND_SHORTAGE_AC_ANNUAL_KWH, shortage_ac, oemof_results, case_dict,
+        )
+        if case_dict[EVALUATION_PERSPECTIVE] == AC_SYSTEM:
+            shortage = shortage_ac.copy()
+        else:
+            shortage = shortage_ac / experiment[INVERTER_DC_AC_EFFICIENCY]
 
-            if case_dict[EVALUATION_PERSPECTIVE] == AC_SYSTEM:
-                shortage += shortage_dc / experiment[RECTIFIER_AC_DC_EFFICIENCY]
-            else:
-                shortage += shortage_dc
+        shortage_dc = set_e_flow(
+            e_flows,
+            DEMAND_SHORTAGE_DC,
+            sequences[((SOURCE_SHORTAGE, BUS_ELECTRICITY_DC), FLOW)],
+        )
+        annual_value(
+            TOTAL_DEMAND_SHORTAGE_DC_ANNUAL_KWH, shortage_dc, oemof_results, case_dict,
+        )
+        if case_dict[EVALUATION_PERSPECTIVE] == AC_SYSTEM:
+            shortage += shortage_dc / experiment[RECTIFIER_AC_DC_EFFICIENCY]
+        else:
+            shortage += shortage_dc
 
-        demand_supplied = e_flows_df[DEMAND] - shortage
+        demand_supplied = e_flows["values"][:, e_flows["columns"][DEMAND]] - shortage
         annual_value(
             TOTAL_DEMAND_SUPPLIED_ANNUAL_KWH, demand_supplied, oemof_results, case_dict,
         )
         annual_value(
             TOTAL_DEMAND_SHORTAGE_ANNUAL_KWH, shortage, oemof_results, case_dict
         )
-        e_flows_df = join_e_flows_df(shortage, DEMAND_SHORTAGE, e_flows_df)
-        e_flows_df = join_e_flows_df(demand_supplied, DEMAND_SUPPLIED, e_flows_df)
+        set_e_flow(e_flows, DEMAND_SHORTAGE, shortage)
+        set_e_flow(e_flows, DEMAND_SUPPLIED, demand_supplied)
     else:
         oemof_results.update(
             {TOTAL_DEMAND_SUPPLIED_ANNUAL_KWH: oemof_results[TOTAL_DEMAND_ANNUAL_KWH]}
         )
         oemof_results.update({TOTAL_DEMAND_SHORTAGE_ANNUAL_KWH: 0})
-    return e_flows_df
+    return e_flows
 
 
-def get_excess(
-    case_dict, oemof_results, electricity_bus_ac, electricity_bus_dc, e_flows_df
-):
+def get_excess(case_dict, oemof_results, sequences, e_flows):
     logging.debug("Evaluate excess: ")
     # Get flow
-    excess = pd.Series([0 for i in e_flows_df.index], index=e_flows_df.index)
-
-    if electricity_bus_ac != None:
-
-        excess_ac = electricity_bus_ac[SEQUENCES][
-            ((BUS_ELECTRICITY_AC, SINK_EXCESS), FLOW)
-        ]
-        excess += excess_ac
-        annual_value(
-            TOTAL_DEMAND_EXCESS_AC_ANNUAL_KWH, excess_ac, oemof_results, case_dict
-        )
-        e_flows_df = join_e_flows_df(excess_ac, EXCESS_GENERATION_AC, e_flows_df)
-
-    if electricity_bus_dc != None:
+    excess_ac = set_e_flow(
+        e_flows,
+        EXCESS_GENERATION_AC,
+        sequences[((BUS_ELECTRICITY_AC, SINK_EXCESS), FLOW)],
+    )
+    annual_value(TOTAL_DEMAND_EXCESS_AC_ANNUAL_KWH, excess_ac, oemof_results, case_dict)
 
-        excess_dc = electricity_bus_dc[SEQUENCES][
-            ((BUS_ELECTRICITY_DC, SINK_EXCESS), FLOW)
-        ]
-        excess += excess_dc
-        annual_value(
-            TOTAL_DEMAND_EXCESS_DC_ANNUAL_KWH, excess, oemof_results, case_dict
-        )  # not given as result.csv right now
-        e_flows_df = join_e_flows_df(excess_dc, EXCESS_GENERATION_DC, e_flows_df)
+    excess_dc = set_e_flow(
+        e_flows,
+        EXCESS_GENERATION_DC,
+        sequences[((BUS_ELECTRICITY_DC, SINK_EXCESS), FLOW)],
+    )
+    excess = excess_ac + excess_dc
+    annual_value(
+        TOTAL_DEMAND_EXCESS_DC_ANNUAL_KWH, excess, oemof_results, case_dict
+    )  # not given as result.csv right now
 
     annual_value(
         TOTAL_DEMAND_EXCESS_ANNUAL_KWH, excess, oemof_results, case_dict
     )  # not given as result.csv right now
-    e_flows_df = join_e_flows_df(excess, EXCESS_GENERATION, e_flows_df)
+    set_e_flow(e_flows, EXCESS_GENERATION, excess)
 
-    return e_flows_df
+    return e_flows
 
 
 def get_pv(
     case_dict,
     oemof_results,
-    electricity_bus_dc,
+    sequences,
+    scalars,
     experiment,
-    e_flows_df,
+    e_flows,
     pv_generation_max,
 ):
     logging.debug("Evaluate flow: pv")
     # Get flow
     if case_dict[PV_FIXED_CAPACITY] != None:
-        pv_gen = electricity_bus_dc[SEQUENCES][((SOURCE_PV, BUS_ELECTRICITY_DC), FLOW)]
+        pv_gen = set_e_flow(
+            e_flows,
+            PV_GENERATION_DC,
+            sequences[((SOURCE_PV, BUS_ELECTRICITY_DC), FLOW)],
+        )
         annual_value(TOTAL_PV_GENERATION_KWH, pv_gen, oemof_results, case_dict)
-        e_flows_df = join_e_flows_df(pv_gen, PV_GENERATION_DC, e_flows_df)
         if case_dict[EVALUATION_PERSPECTIVE] == AC_SYSTEM:
-            e_flows_df = join_e_flows_df(
-                pv_gen / experiment[RECTIFIER_AC_DC_EFFICIENCY],
+            pv_gen = set_e_flow(
+                e_flows,
                 PV_GENERATION_AC,
-                e_flows_df,
-            )
-
-        if case_dict[EVALUATION_PERSPECTIVE] == AC_SYSTEM:
-            e_flows_df = join_e_flows_df(
-                e_flows_df[PV_GENERATION_AC], PV_GENERATION, e_flows_df
-            )
-        else:
-            e_flows_df = join_e_flows_df(
-                e_flows_df[PV_GENERATION_DC], PV_GENERATION, e_flows_df
+                pv_gen / experiment[RECTIFIER_AC_DC_EFFICIENCY],
             )
+        set_e_flow(e_flows, PV_GENERATION, pv_gen)
     else:
         oemof_results.update({TOTAL_PV_GENERATION_KWH: 0})
 
@@ -312,18 +397,14 @@ def get_pv(
         if pv_generation_max > 1:
             oemof_results.update(
                 {
-                    CAPACITY_PV_KWP: electricity_bus_dc[SCALARS][
-                        ((SOURCE_PV, BUS_ELECTRICITY_DC), INVEST)
-                    ]
+                    CAPACITY_PV_KWP: scalars[((SOURCE_PV, BUS_ELECTRICITY_DC), INVEST)]
                     * pv_generation_max
                 }
             )
         elif pv_generation_max > 0 and pv_generation_max < 1:
             oemof_results.update(
                 {
-                    CAPACITY_PV_KWP: electricity_bus_dc[SCALARS][
-                        ((SOURCE_PV, BUS_ELECTRICITY_DC), INVEST)
-                    ]
+                    CAPACITY_PV_KWP: scalars[((SOURCE_PV, BUS_ELECTRICITY_DC), INVEST)]
                     / pv_generation_max
                 }
             )
@@ -333,25 +414,23 @@ def get_pv(
         oemof_results.update({CAPACITY_PV_KWP: case_dict[PV_FIXED_CAPACITY]})
     elif case_dict[PV_FIXED_CAPACITY] == None:
         oemof_results.update({CAPACITY_PV_KWP: 0})
-    return e_flows_df
+    return e_flows
 
 
-def get_rectifier(
-    case_dict, oemof_results, electricity_bus_ac, electricity_bus_dc, e_flows_df
-):
+def get_rectifier(case_dict, oemof_results, sequences, scalars, e_flows):
     logging.debug("Evaluate flow: rectifier")
     # Get flow
     if case_dict[RECTIFIER_AC_DC_FIXED_CAPACITY] != None:
-        rectifier_out = electricity_bus_dc[SEQUENCES][
-            ((TRANSFORMER_RECTIFIER, BUS_ELECTRICITY_DC), FLOW)
-        ]
-        e_flows_df = join_e_flows_df(rectifier_out, RECTIFIER_OUTPUT, e_flows_df)
-
-        rectifier_in = electricity_bus_ac[SEQUENCES][
-            ((BUS_ELECTRICITY_AC, TRANSFORMER_RECTIFIER), FLOW)
-        ]
-        e_flows_df = join_e_flows_df(rectifier_in, RECTIFIER_INPUT, e_flows_df)
-
+        set_e_flow(
+            e_flows,
+            RECTIFIER_OUTPUT,
+            sequences[((TRANSFORMER_RECTIFIER, BUS_ELECTRICITY_DC), FLOW)],
+        )
+        rectifier_in = set_e_flow(
+            e_flows,
+            RECTIFIER_INPUT,
+            sequences[((BUS_ELECTRICITY_AC, TRANSFORMER_RECTIFIER), FLOW)],
+        )
         annual_value(
             TOTAL_RECTIFIER_AC_DC_THROUGHPUT_KWH,
             rectifier_in,
@@ -363,7 +442,7 @@ def get_rectifier(
 
     # Get capacity
     if case_dict[RECTIFIER_AC_DC_FIXED_CAPACITY] is False:
-        rectifier_capacity = electricity_bus_ac[SCALARS][
+        rectifier_capacity = scalars[
             ((BUS_ELECTRICITY_AC, TRANSFORMER_RECTIFIER), INVEST)
         ]
         oemof_results.update({CAPACITY_RECTIFIER_AC_DC_KW: rectifier_capacity})
@@ -375,25 +454,23 @@ def get_rectifier(
 
     elif case_dict[RECTIFIER_AC_DC_FIXED_CAPACITY] == None:
         oemof_results.update({CAPACITY_RECTIFIER_AC_DC_KW: 0})
-    return e_flows_df
+    return e_flows
 
 
-def get_inverter(
-    case_dict, oemof_results, electricity_bus_ac, electricity_bus_dc, e_flows_df
-):
+def get_inverter(case_dict, oemof_results, sequences, scalars, e_flows):
     logging.debug("Evaluate flow: rectifier")
     # Get flow
     if case_dict[INVERTER_DC_AC_FIXED_CAPACITY] != None:
-        inverter_out = electricity_bus_ac[SEQUENCES][
-            ((TRANSFORMER_INVERTER_DC_AC, BUS_ELECTRICITY_AC), FLOW)
-        ]
-        e_flows_df = join_e_flows_df(inverter_out, INVERTER_OUTPUT, e_flows_df)
-
-        inverter_in = electricity_bus_dc[SEQUENCES][
-            ((BUS_ELECTRICITY_DC, TRANSFORMER_INVERTER_DC_AC), FLOW)
-        ]
-        e_flows_df = join_e_flows_df(inverter_in, INVERTER_INPUT, e_flows_df)
-
+        set_e_flow(
+            e_flows,
+            INVERTER_OUTPUT,
+            sequences[((TRANSFORMER_INVERTER_DC_AC, BUS_ELECTRICITY_AC), FLOW)],
+        )
+        inverter_in = set_e_flow(
+            e_flows,
+            INVERTER_INPUT,
+            sequences[((BUS_ELECTRICITY_DC, TRANSFORMER_INVERTER_DC_AC), FLOW)],
+        )
         annual_value(
             TOTAL_INVERTER_DC_AC_THROUGHPUT_KWH, inverter_in, oemof_results, case_dict,
         )
@@ -402,7 +479,7 @@ def get_inverter(
 
     # Get capacity
     if case_dict[INVERTER_DC_AC_FIXED_CAPACITY] is False:
-        inverter_capacity = electricity_bus_dc[SCALARS][
+        inverter_capacity = scalars[
             ((BUS_ELECTRICITY_DC, TRANSFORMER_INVERTER_DC_AC), INVEST)
         ]
         oemof_results.update({CAPACITY_INVERTER_DC_AC_KW: inverter_capacity})
@@ -414,20 +491,21 @@ def get_inverter(
 
     elif case_dict[INVERTER_DC_AC_FIXED_CAPACITY] == None:
         oemof_results.update({CAPACITY_INVERTER_DC_AC_KW: 0})
-    return e_flows_df
+    return e_flows
 
 
 def get_wind(
-    case_dict, oemof_results, electricity_bus_ac, e_flows_df, wind_generation_max
+    case_dict, oemof_results, sequences, scalars, e_flows, wind_generation_max
 ):
     logging.debug("Evaluate flow: wind")
     # Get flow
     if case_dict[WIND_FIXED_CAPACITY] != None:
-        wind_gen = electricity_bus_ac[SEQUENCES][
-            ((SOURCE_WIND, BUS_ELECTRICITY_AC), FLOW)
-        ]
+        wind_gen = set_e_flow(
+            e_flows,
+            WIND_GENERATION,
+            sequences[((SOURCE_WIND, BUS_ELECTRICITY_AC), FLOW)],
+        )
         annual_value(TOTAL_WIND_GENERATION_KWH, wind_gen, oemof_results, case_dict)
-        e_flows_df = join_e_flows_df(wind_gen, WIND_GENERATION, e_flows_df)
     else:
         oemof_results.update({TOTAL_WIND_GENERATION_KWH: 0})
 
@@ -436,7 +514,7 @@ def get_wind(
         if wind_generation_max > 1:
             oemof_results.update(
                 {
-                    CAPACITY_WIND_KW: electricity_bus_ac[SCALARS][
+                    CAPACITY_WIND_KW: scalars[
                         ((SOURCE_WIND, BUS_ELECTRICITY_AC), INVEST)
                     ]
                     * wind_generation_max
@@ -445,7 +523,7 @@ def get_wind(
         elif wind_generation_max > 0 and wind_generation_max < 1:
             oemof_results.update(
                 {
-                    CAPACITY_WIND_KW: electricity_bus_ac[SCALARS][
+                    CAPACITY_WIND_KW: scalars[
                         ((SOURCE_WIND, BUS_ELECTRICITY_AC), INVEST)
                     ]
                     / wind_generation_max
@@ -457,30 +535,31 @@ def get_wind(
         oemof_results.update({CAPACITY_WIND_KW: case_dict[WIND_FIXED_CAPACITY]})
     elif case_dict[WIND_FIXED_CAPACITY] == None:
         oemof_results.update({CAPACITY_WIND_KW: 0})
-    return e_flows_df
+    return e_flows
 
 
-def get_genset(case_dict, oemof_results, electricity_bus_ac, e_flows_df):
+def get_genset(case_dict, oemof_results, sequences, scalars, e_flows):
     logging.debug("Evaluate flow: genset")
     # Get flow
     if case_dict[GENSET_FIXED_CAPACITY] != None:
-        genset = electricity_bus_ac[SEQUENCES][
-            ((TRANSFORMER_GENSET_1, BUS_ELECTRICITY_AC), FLOW)
-        ]
-        e_flows_df = join_e_flows_df(genset, GENSET_1_GENERATION, e_flows_df)
-        total_genset = genset
+        genset = set_e_flow(
+            e_flows,
+            GENSET_1_GENERATION,
+            sequences[((TRANSFORMER_GENSET_1, BUS_ELECTRICITY_AC), FLOW)],
+        )
+        total_genset = genset.copy()
         for number in range(2, case_dict[NUMBER_OF_EQUAL_GENERATORS] + 1):
-            genset = electricity_bus_ac[SEQUENCES][
-                ((TRANSFORMER_GENSET_ + str(number), BUS_ELECTRICITY_AC), FLOW,)
-            ]
-            e_flows_df = join_e_flows_df(
-                genset, "Genset " + str(number) + " generation", e_flows_df
+            total_genset += set_e_flow(
+                e_flows,
+                "Genset " + str(number) + " generation",
+                sequences[
+                    ((TRANSFORMER_GENSET_ + str(number), BUS_ELECTRICITY_AC), FLOW)
+                ],
             )
-            total_genset += genset
         annual_value(
             TOTAL_GENSET_GENERATION_KWH, total_genset, oemof_results, case_dict
         )
-        e_flows_df = join_e_flows_df(total_genset, GENSET_GENERATION, e_flows_df)
+        set_e_flow(e_flows, GENSET_GENERATION, total_genset)
     else:
         oemof_results.update({TOTAL_GENSET_GENERATION_KWH: 0})
 
@@ -489,7 +568,7 @@ def get_genset(case_dict, oemof_results, electricity_bus_ac, e_flows_df):
         # Optimized generator capacity (sum)
         genset_capacity = 0
         for number in range(1, case_dict[NUMBER_OF_EQUAL_GENERATORS] + 1):
-            genset_capacity += electricity_bus_ac[SCALARS][
+            genset_capacity += scalars[
                 ((TRANSFORMER_GENSET_ + str(number), BUS_ELECTRICITY_AC), INVEST,)
             ]
         oemof_results.update({CAPACITY_GENSET_KW: genset_capacity})
@@ -500,10 +579,10 @@ def get_genset(case_dict, oemof_results, electricity_bus_ac, e_flows_df):
 
     # Get hours of operation:
     if case_dict[GENSET_FIXED_CAPACITY] != None:
-        get_hours_of_operation(oemof_results, case_dict, e_flows_df[GENSET_GENERATION])
+        get_hours_of_operation(oemof_results, case_dict, total_genset)
     else:
         oemof_results.update({GENSET_HOURS_OF_OPERATION: 0})
-    return e_flows_df
+    return e_flows
 
 
 def get_hours_of_operation(oemof_results, case_dict, genset_generation_total):
@@ -515,93 +594,72 @@ def get_hours_of_operation(oemof_results, case_dict, genset_generation_total):
     oemof_results: dict
         Dict of all results of the simulation
 
-    genset_generation_total: pd.Series
+    genset_generation_total: pd.Series or numpy.ndarray
         Dispatch of the gensets, aggregated
 
     Returns
     -------
     Updates oemof_results with annual value of the GENSET_HOURS_OF_OPERATION.
     """
-    operation_boolean = genset_generation_total.where(
-        genset_generation_total == 0, other=1
-    )
+    operation_boolean = (np.asarray(genset_generation_total) != 0).astype(float)
     annual_value(GENSET_HOURS_OF_OPERATION, operation_boolean, oemof_results, case_dict)
     return operation_boolean
 
 
-def get_fuel(case_dict, oemof_results, results):
+def get_fuel(case_dict, oemof_results, sequences):
     logging.debug("Evaluate flow: fuel")
     if case_dict[GENSET_FIXED_CAPACITY] != None:
-        fuel_bus = solph.views.node(results, BUS_FUEL)
-        fuel = fuel_bus[SEQUENCES][((SOURCE_FUEL, BUS_FUEL), FLOW)]
+        fuel = sequences[((SOURCE_FUEL, BUS_FUEL), FLOW)]
         annual_value(CONSUMPTION_FUEL_ANNUAL_KWH, fuel, oemof_results, case_dict)
     else:
         oemof_results.update({CONSUMPTION_FUEL_ANNUAL_KWH: 0})
     return
 
 
-def get_storage(case_dict, oemof_results, experiment, results, e_flows_df):
+def get_storage(case_dict, oemof_results, experiment, sequences, scalars, e_flows):
     logging.debug("Evaluate flow: storage")
     # Get flow
     if case_dict[STORAGE_FIXED_CAPACITY] != None:
-        storage = solph.views.node(results, GENERIC_STORAGE)
-        storage_discharge = storage[SEQUENCES][
-            ((GENERIC_STORAGE, BUS_ELECTRICITY_DC), FLOW)
-        ]
-
-        storage_charge = storage[SEQUENCES][
-            ((BUS_ELECTRICITY_DC, GENERIC_STORAGE), FLOW)
-        ]
-        stored_capacity = storage[SEQUENCES][
-            ((GENERIC_STORAGE, "None"), "storage_content")
-        ]
+        storage_charge = set_e_flow(
+            e_flows,
+            STORAGE_CHARGE_DC,
+            sequences[((BUS_ELECTRICITY_DC, GENERIC_STORAGE), FLOW)],
+        )
+        storage_discharge = set_e_flow(
+            e_flows,
+            STORAGE_DISCHARGE_DC,
+            sequences[((GENERIC_STORAGE, BUS_ELECTRICITY_DC), FLOW)],
+        )
+        stored_capacity = set_e_flow(
+            e_flows,
+            STORED_CAPACITY,
+            sequences[((GENERIC_STORAGE, "None"), STORAGE_CONTENT)],
+        )
         annual_value(
             TOTAL_STORAGE_THOUGHPUT_KWH, storage_charge, oemof_results, case_dict
         )
 
-        e_flows_df = join_e_flows_df(storage_charge, STORAGE_CHARGE_DC, e_flows_df)
-        e_flows_df = join_e_flows_df(
-            storage_discharge, STORAGE_DISCHARGE_DC, e_flows_df
-        )
-        e_flows_df = join_e_flows_df(stored_capacity, STORED_CAPACITY, e_flows_df)
-
         if case_dict[EVALUATION_PERSPECTIVE] == AC_SYSTEM:
-            e_flows_df = join_e_flows_df(
-                storage_charge / experiment[RECTIFIER_AC_DC_EFFICIENCY],
+            storage_charge = set_e_flow(
+                e_flows,
                 STORAGE_CHARGE_AC,
-                e_flows_df,
+                storage_charge / experiment[RECTIFIER_AC_DC_EFFICIENCY],
             )
-            e_flows_df = join_e_flows_df(
-                storage_discharge / experiment[INVERTER_DC_AC_EFFICIENCY],
+            storage_discharge = set_e_flow(
+                e_flows,
                 STORAGE_DISCHARGE_AC,
-                e_flows_df,
-            )
-            e_flows_df = join_e_flows_df(
-                e_flows_df[STORAGE_CHARGE_AC], STORAGE_CHARGE, e_flows_df
-            )
-            e_flows_df = join_e_flows_df(
-                e_flows_df[STORAGE_DISCHARGE_AC], STORAGE_DISCHARGE, e_flows_df
-            )
-        else:
-            e_flows_df = join_e_flows_df(
-                e_flows_df[STORAGE_CHARGE_DC], STORAGE_CHARGE, e_flows_df
-            )
-            e_flows_df = join_e_flows_df(
-                e_flows_df[STORAGE_DISCHARGE_DC], STORAGE_DISCHARGE, e_flows_df
+                storage_discharge / experiment[INVERTER_DC_AC_EFFICIENCY],
             )
+        set_e_flow(e_flows, STORAGE_CHARGE, storage_charge)
+        set_e_flow(e_flows, STORAGE_DISCHARGE, storage_discharge)
     else:
         oemof_results.update({TOTAL_STORAGE_THOUGHPUT_KWH: 0})
 
     # Get capacity
     if case_dict[STORAGE_FIXED_CAPACITY] is False:
         # Optimized storage capacity
-        storage = solph.views.node(results, GENERIC_STORAGE)
-        storage_capacity = storage[SCALARS][((GENERIC_STORAGE, "None"), INVEST)]
-
-        electricity_bus_dc = solph.views.node(results, BUS_ELECTRICITY_DC)
-        storage_power = electricity_bus_dc[SCALARS][
-            ((GENERIC_STORAGE, BUS_ELECTRICITY_DC), INVEST)
-        ]
+        storage_capacity = scalars[((GENERIC_STORAGE, "None"), INVEST)]
+        storage_power = scalars[((GENERIC_STORAGE, BUS_ELECTRICITY_DC), INVEST)]
 
         oemof_results.update(
             {CAPACITY_STORAGE_KWH: storage_capacity, POWER_STORAGE_KW: storage_power,}
@@ -620,44 +678,31 @@ def get_storage(case_dict, oemof_results, experiment, results, e_flows_df):
 
     # calculate SOC of battery:
     if oemof_results[CAPACITY_STORAGE_KWH] > 0:
-        e_flows_df = join_e_flows_df(
-            stored_capacity / oemof_results[CAPACITY_STORAGE_KWH],
-            STORAGE_SOC,
-            e_flows_df,
+        set_e_flow(
+            e_flows, STORAGE_SOC, stored_capacity / oemof_results[CAPACITY_STORAGE_KWH]
         )
     else:
-        e_flows_df = join_e_flows_df(
-            pd.Series([0 for t in e_flows_df.index], index=e_flows_df.index),
-            STORAGE_SOC,
-            e_flows_df,
-        )
+        set_e_flow(e_flows, STORAGE_SOC, 0)
 
-    return e_flows_df
+    return e_flows
 
 
-def get_national_grid(case_dict, oemof_results, results, e_flows_df, grid_availability):
+def get_national_grid(case_dict, oemof_results, sequences, e_flows, grid_availability):
     logging.debug("Evaluate flow: main grid")
-    micro_grid_bus = solph.views.node(results, BUS_ELECTRICITY_AC)
     # define grid availability
     if (
         case_dict[PCC_CONSUMPTION_FIXED_CAPACITY] != None
         or case_dict[PCC_FEEDIN_FIXED_CAPACITY] != None
     ):
-        e_flows_df = join_e_flows_df(grid_availability, GRID_AVAILABILITY, e_flows_df)
+        set_e_flow(e_flows, GRID_AVAILABILITY, grid_availability)
     else:
-        grid_availability_symbolic = pd.Series(
-            [0 for i in e_flows_df.index], index=e_flows_df.index
-        )
-        e_flows_df = join_e_flows_df(
-            grid_availability_symbolic, GRID_AVAILABILITY, e_flows_df
-        )
+        set_e_flow(e_flows, GRID_AVAILABILITY, 0)
 
     if case_dict[PCC_CONSUMPTION_FIXED_CAPACITY] != None:
-        consumption_mg_side = micro_grid_bus[SEQUENCES][
-            ((TRANSFORMER_PCC_CONSUMPTION, BUS_ELECTRICITY_AC), FLOW)
-        ]
-        e_flows_df = join_e_flows_df(
-            consumption_mg_side, CONSUMPTION_MAIN_GRID_MG_SIDE, e_flows_df
+        consumption_mg_side = set_e_flow(
+            e_flows,
+            CONSUMPTION_MAIN_GRID_MG_SIDE,
+            sequences[((TRANSFORMER_PCC_CONSUMPTION, BUS_ELECTRICITY_AC), FLOW)],
         )
         annual_value(
             CONSUMPTION_MAIN_GRID_MG_SIDE_ANNUAL_KWH,
@@ -665,16 +710,12 @@ def get_national_grid(case_dict, oemof_results, results, e_flows_df, grid_availa
             oemof_results,
             case_dict,
         )
-        bus_electricity_ng_consumption = solph.views.node(
-            results, BUS_ELECTRICITY_NG_CONSUMPTION
-        )
-        consumption_utility_side = bus_electricity_ng_consumption[SEQUENCES][
-            ((BUS_ELECTRICITY_NG_CONSUMPTION, TRANSFORMER_PCC_CONSUMPTION), FLOW,)
-        ]
-        e_flows_df = join_e_flows_df(
-            consumption_utility_side,
-            "Consumption from main grid (utility side)",
-            e_flows_df,
+        consumption_utility_side = set_e_flow(
+            e_flows,
+            CONSUMPTION_MAIN_GRID_UTILITY_SIDE,
+            sequences[
+                ((BUS_ELECTRICITY_NG_CONSUMPTION, TRANSFORMER_PCC_CONSUMPTION), FLOW,)
+            ],
         )
         annual_value(
             CONSUMPTION_MAIN_GRID_UTILITY_SIDE_ANNUAL_KWH,
@@ -705,11 +746,10 @@ def get_national_grid(case_dict, oemof_results, results, e_flows_df, grid_availa
         oemof_results.update({AUTONOMY_FACTOR: 0})
 
     if case_dict[PCC_FEEDIN_FIXED_CAPACITY] != None:
-        feedin_mg_side = micro_grid_bus[SEQUENCES][
-            ((BUS_ELECTRICITY_AC, TRANSFORMER_PCC_FEEDIN), FLOW)
-        ]
-        e_flows_df = join_e_flows_df(
-            feedin_mg_side, FEED_INTO_MAIN_GRID_MG_SIDE, e_flows_df
+        feedin_mg_side = set_e_flow(
+            e_flows,
+            FEED_INTO_MAIN_GRID_MG_SIDE,
+            sequences[((BUS_ELECTRICITY_AC, TRANSFORMER_PCC_FEEDIN), FLOW)],
         )
         annual_value(
             FEEDIN_MAIN_GRID_MG_SIDE_ANNUAL_KWH,
@@ -718,12 +758,10 @@ def get_national_grid(case_dict, oemof_results, results, e_flows_df, grid_availa
             case_dict,
         )
 
-        bus_electricity_ng_feedin = solph.views.node(results, BUS_ELECTRICITY_NG_FEEDIN)
-        feedin_utility_side = bus_electricity_ng_feedin[SEQUENCES][
-            ((TRANSFORMER_PCC_FEEDIN, BUS_ELECTRICITY_NG_FEEDIN), FLOW)
-        ]
-        e_flows_df = join_e_flows_df(
-            feedin_utility_side, "Feed into main grid (utility side)", e_flows_df
+        feedin_utility_side = set_e_flow(
+            e_flows,
+            FEED_INTO_MAIN_GRID_UTILITY_SIDE,
+            sequences[((TRANSFORMER_PCC_FEEDIN, BUS_ELECTRICITY_NG_FEEDIN), FLOW)],
         )
         annual_value(
             FEEDIN_MAIN_GRID_UTILITY_SIDE_ANNUAL_KWH,
@@ -746,12 +784,12 @@ def get_national_grid(case_dict, oemof_results, results, e_flows_df, grid_availa
     ):
         pcc_cap = []
         if case_dict[PCC_CONSUMPTION_FIXED_CAPACITY] is False:
-            pcc_cap.append(consumption_utility_side.max())
+            pcc_cap.append(np.max(consumption_utility_side))
         elif isinstance(case_dict[PCC_CONSUMPTION_FIXED_CAPACITY], float):
             pcc_cap.append(case_dict[PCC_CONSUMPTION_FIXED_CAPACITY])
 
         if case_dict[PCC_FEEDIN_FIXED_CAPACITY] is False:
-            pcc_cap.append(feedin_utility_side.max())
+            pcc_cap.append(np.max(feedin_utility_side))
         elif isinstance(case_dict[PCC_FEEDIN_FIXED_CAPACITY], float):
             pcc_cap.append(case_dict[PCC_FEEDIN_FIXED_CAPACITY])
 
@@ -784,7 +822,7 @@ def get_national_grid(case_dict, oemof_results, results, e_flows_df, grid_availa
         {TOTAL_PCOUPLING_THROUGHPUT_KWH: total_pcoupling_throughput_kWh}
     )
 
-    return e_flows_df
+    return e_flows
 
 
 def get_res_share(case_dict, oemof_results, experiment):
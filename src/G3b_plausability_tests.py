@@ -1,4 +1,5 @@
 import logging
+import numpy as np
 
 from src.constants import (
     STORAGE_DISCHARGE,
@@ -11,7 +12,8 @@ from src.constants import (
     FEED_INTO_MAIN_GRID,
     GRID_AVAILABILITY,
     EXCESS_ELECTRICITY,
-    CAPACITY_PCC,
+    CAPACITY_PCOUPLING_KW,
+    PLAUSIBILITY_TOLERANCE,
 )
 
 """
@@ -31,10 +33,83 @@ e_flows_df can include columns with titles...
 'Excess generation'
 'PV generation'
 'Grid availability'
+
+Each test evaluates all timesteps at once with a boolean mask of the timesteps violating it.
+Flows are considered as zero if their absolute value is not larger than the PLAUSIBILITY_TOLERANCE.
 """
 
+# Number of offending timestamps reported per failed test
+REPORTED_TIMESTAMPS = 5
+
+
+def get_values(e_flows_df, column):
+    """
+    Values of a column of the energy flows as numpy.ndarray, zeros if the column does not exist
+    """
+    if column in e_flows_df.columns:
+        return e_flows_df[column].to_numpy(dtype=float)
+    return np.zeros(len(e_flows_df.index))
+
+
+def get_violations(mask, index):
+    """
+    Describes the timesteps at which a test is violated
+
+    Parameters
+    ----------
+    mask: numpy.ndarray of bool
+        True for each timestep violating the test
+
+    index: pandas.DatetimeIndex
+        Timesteps of the mask
+
+    Returns
+    -------
+    violations: dict
+        Number of violating timesteps ("count") and the first REPORTED_TIMESTAMPS of them ("timestamps")
+    """
+    return {
+        "count": int(np.count_nonzero(mask)),
+        "timestamps": [
+            str(timestamp) for timestamp in index[mask][:REPORTED_TIMESTAMPS]
+        ],
+    }
+
+
+def report_violations(oemof_results, violations, message, comment):
+    """
+    Logs a warning with number and first timestamps of the violations of a failed test and adds
+    the comment to the COMMENTS of the oemof_results. Nothing is reported if there are no violations.
+
+    Parameters
+    ----------
+    oemof_results: dict
+        Results of the simulation, extended in place
+
+    violations: dict
+        See get_violations()
+
+    message: str
+        Logged warning
+
+    comment: str
+        Comment added to the results
 
-def run(oemof_results, e_flows_df):
+    Returns
+    -------
+    bool
+        True if the test is violated
+    """
+    if violations["count"] == 0:
+        return False
+    logging.warning(
+        f"{message} ({violations['count']} timesteps, first at {', '.join(violations['timestamps'])})"
+    )
+    oemof_results.update({COMMENTS: oemof_results[COMMENTS] + comment})
+    return True
+
+
+def run(oemof_results, e_flows_df, experiment):
     """
     Checking oemof calculations for plausability. The most obvious errors should be identified this way.
     Ideally, not a single error should be displayed or added to the oemof comments.
@@ -47,256 +122,143 @@ def run(oemof_results, e_flows_df):
     - excess <-> shortage
     - excess <-> feedin > pcc cap and excess <-> grid availability
     """
-    charge_discharge(oemof_results, e_flows_df)
-    demand_supply_shortage(oemof_results, e_flows_df)
-    feedin_consumption(oemof_results, e_flows_df)
-    gridavailability_consumption(oemof_results, e_flows_df)
-    gridavailability_feedin(oemof_results, e_flows_df)
-    excess_shortage(oemof_results, e_flows_df)
-    excess_feedin(oemof_results, e_flows_df)
+    tolerance = experiment[PLAUSIBILITY_TOLERANCE]
+    charge_discharge(oemof_results, e_flows_df, tolerance)
+    demand_supply_shortage(oemof_results, e_flows_df, tolerance)
+    feedin_consumption(oemof_results, e_flows_df, tolerance)
+    gridavailability_consumption(oemof_results, e_flows_df, tolerance)
+    gridavailability_feedin(oemof_results, e_flows_df, tolerance)
+    excess_shortage(oemof_results, e_flows_df, tolerance)
+    excess_feedin(oemof_results, e_flows_df, tolerance)
     return
 
 
-def charge_discharge(oemof_results, e_flows_df):
+def charge_discharge(oemof_results, e_flows_df, tolerance):
     logging.debug("Plausibility test: Charge/Discharge")
     if STORAGE_DISCHARGE in e_flows_df.columns and STORAGE_CHARGE in e_flows_df.columns:
-        boolean = True
-
-        test = [
-            (
-                e_flows_df[STORAGE_DISCHARGE][t] != 0
-                and e_flows_df[STORAGE_CHARGE][t] == 0
-            )
-            for t in e_flows_df.index
-        ]
-
-        if any(test) is False:
-            boolean = False
-
-        if boolean is False:
-            logging.warning(
-                "PLAUSABILITY TEST FAILED: Charge and discharge of batteries at the same time!"
-            )
-            oemof_results.update(
-                {
-                    COMMENTS: oemof_results[COMMENTS]
-                    + "Charge and discharge of batteries at the same time. "
-                }
-            )
+        mask = (np.abs(get_values(e_flows_df, STORAGE_DISCHARGE)) > tolerance) & (
+            np.abs(get_values(e_flows_df, STORAGE_CHARGE)) > tolerance
+        )
+        report_violations(
+            oemof_results,
+            get_violations(mask, e_flows_df.index),
+            "PLAUSABILITY TEST FAILED: Charge and discharge of batteries at the same time!",
+            "Charge and discharge of batteries at the same time. ",
+        )
     return
 
 
-def demand_supply_shortage(oemof_results, e_flows_df):
+def demand_supply_shortage(oemof_results, e_flows_df, tolerance):
     logging.debug("Plausibility test: Demand/Supply/Shortage")
     if (
         (DEMAND_SUPPLIED in e_flows_df.columns)
         and (DEMAND in e_flows_df.columns)
         and (DEMAND_SHORTAGE in e_flows_df.columns)
     ):
-
-        boolean = True
-
-        test = [
-            (
-                (
-                    e_flows_df[DEMAND_SUPPLIED][t] == e_flows_df[DEMAND][t]
-                    and e_flows_df[DEMAND_SHORTAGE][t] == 0
-                )
-                or (
-                    (
-                        e_flows_df[DEMAND_SUPPLIED][t] != e_flows_df[DEMAND][t]
-                        and e_flows_df[DEMAND_SHORTAGE][t] != 0
-                    )
-                )
+        not_supplied = (
+            np.abs(
+                get_values(e_flows_df, DEMAND_SUPPLIED) - get_values(e_flows_df, DEMAND)
             )
-            for t in e_flows_df.index
-        ]
-
-        if any(test) is False:
-            boolean = False
-
-        if boolean is False:
-            logging.warning(
-                "PLAUSABILITY TEST FAILED: Demand not fully supplied but no shortage!"
-            )
-            oemof_results.update(
-                {
-                    COMMENTS: oemof_results[COMMENTS]
-                    + "Demand not fully supplied but no shortage. "
-                }
-            )
-
+            > tolerance
+        )
+        shortage = np.abs(get_values(e_flows_df, DEMAND_SHORTAGE)) > tolerance
+        report_violations(
+            oemof_results,
+            get_violations(not_supplied != shortage, e_flows_df.index),
+            "PLAUSABILITY TEST FAILED: Demand not fully supplied but no shortage!",
+            "Demand not fully supplied but no shortage. ",
+        )
     return
 
 
-def feedin_consumption(oemof_results, e_flows_df):
+def feedin_consumption(oemof_results, e_flows_df, tolerance):
     logging.debug("Plausibility test: Feedin/Consumption")
     if (CONSUMPTION_FROM_MAIN_GRID in e_flows_df.columns) and (
         FEED_INTO_MAIN_GRID in e_flows_df.columns
     ):
-
-        boolean = True
-
-        test = [
-            (
-                e_flows_df[CONSUMPTION_FROM_MAIN_GRID][t] != 0
-                and e_flows_df[FEED_INTO_MAIN_GRID][t] != 0
-            )
-            for t in e_flows_df.index
-        ]
-
-        if any(test) is False:
-            boolean = False
-
-        if boolean is False:
-            logging.warning(
-                "PLAUSABILITY TEST FAILED: Feedin to and consumption from national grid at the same time!"
-            )
-            oemof_results.update(
-                {
-                    COMMENTS: oemof_results[COMMENTS]
-                    + "Feedin to and consumption from national grid at the same time. "
-                }
-            )
-
+        mask = (
+            np.abs(get_values(e_flows_df, CONSUMPTION_FROM_MAIN_GRID)) > tolerance
+        ) & (np.abs(get_values(e_flows_df, FEED_INTO_MAIN_GRID)) > tolerance)
+        report_violations(
+            oemof_results,
+            get_violations(mask, e_flows_df.index),
+            "PLAUSABILITY TEST FAILED: Feedin to and consumption from national grid at the same time!",
+            "Feedin to and consumption from national grid at the same time. ",
+        )
     return
 
 
-def gridavailability_feedin(oemof_results, e_flows_df):
+def gridavailability_feedin(oemof_results, e_flows_df, tolerance):
     logging.debug("Plausibility test: Grid availability/Feedin")
-    if (CONSUMPTION_FROM_MAIN_GRID in e_flows_df.columns) and (
-        FEED_INTO_MAIN_GRID in e_flows_df.columns
+    if (FEED_INTO_MAIN_GRID in e_flows_df.columns) and (
+        GRID_AVAILABILITY in e_flows_df.columns
     ):
-
-        boolean = True
-
-        test = [
-            (
-                e_flows_df[FEED_INTO_MAIN_GRID][t] != 0
-                and e_flows_df[GRID_AVAILABILITY][t] == 0
-            )
-            for t in e_flows_df.index
-        ]
-
-        if any(test) is False:
-            boolean = False
-
-        if boolean is False:
-            logging.warning(
-                "PLAUSABILITY TEST FAILED: Feedin to national grid during blackout!"
-            )
-            oemof_results.update(
-                {
-                    COMMENTS: oemof_results[COMMENTS]
-                    + "Feedin to national grid during blackout. "
-                }
-            )
-
+        mask = (np.abs(get_values(e_flows_df, FEED_INTO_MAIN_GRID)) > tolerance) & (
+            get_values(e_flows_df, GRID_AVAILABILITY) == 0
+        )
+        report_violations(
+            oemof_results,
+            get_violations(mask, e_flows_df.index),
+            "PLAUSABILITY TEST FAILED: Feedin to national grid during blackout!",
+            "Feedin to national grid during blackout. ",
+        )
     return
 
 
-def gridavailability_consumption(oemof_results, e_flows_df):
+def gridavailability_consumption(oemof_results, e_flows_df, tolerance):
     logging.debug("Plausibility test: Grid availability consumption")
     if (CONSUMPTION_FROM_MAIN_GRID in e_flows_df.columns) and (
         GRID_AVAILABILITY in e_flows_df.columns
     ):
-
-        boolean = True
-
-        test = [
-            (
-                e_flows_df[CONSUMPTION_FROM_MAIN_GRID][t] != 0
-                and e_flows_df[GRID_AVAILABILITY][t] == 0
-            )
-            for t in e_flows_df.index
-        ]
-
-        if any(test) is False:
-            boolean = False
-
-        if boolean is False:
-            logging.warning(
-                "PLAUSABILITY TEST FAILED: Consumption from national grid during blackout!"
-            )
-            oemof_results.update(
-                {
-                    COMMENTS: oemof_results[COMMENTS]
-                    + "Consumption from national grid during blackout. "
-                }
-            )
-
+        mask = (
+            np.abs(get_values(e_flows_df, CONSUMPTION_FROM_MAIN_GRID)) > tolerance
+        ) & (get_values(e_flows_df, GRID_AVAILABILITY) == 0)
+        report_violations(
+            oemof_results,
+            get_violations(mask, e_flows_df.index),
+            "PLAUSABILITY TEST FAILED: Consumption from national grid during blackout!",
+            "Consumption from national grid during blackout. ",
+        )
     return
 
 
-def excess_shortage(oemof_results, e_flows_df):
+def excess_shortage(oemof_results, e_flows_df, tolerance):
     logging.debug("Plausibility test: Excess/shortage")
     if (EXCESS_ELECTRICITY in e_flows_df.columns) and (
         DEMAND_SHORTAGE in e_flows_df.columns
     ):
-
-        boolean = True
-
-        test = [
-            (
-                e_flows_df[EXCESS_ELECTRICITY][t] != 0
-                and e_flows_df[DEMAND_SHORTAGE][t] != 0
-            )
-            for t in e_flows_df.index
-        ]
-
-        if any(test) is False:
-            boolean = False
-
-        if boolean is False:
-            logging.warning(
-                "PLAUSABILITY TEST FAILED: Excess and shortage at the same time!"
-            )
-            oemof_results.update(
-                {
-                    COMMENTS: oemof_results[COMMENTS]
-                    + "Excess and shortage at the same time. "
-                }
-            )
-
+        mask = (np.abs(get_values(e_flows_df, EXCESS_ELECTRICITY)) > tolerance) & (
+            np.abs(get_values(e_flows_df, DEMAND_SHORTAGE)) > tolerance
+        )
+        report_violations(
+            oemof_results,
+            get_violations(mask, e_flows_df.index),
+            "PLAUSABILITY TEST FAILED: Excess and shortage at the same time!",
+            "Excess and shortage at the same time. ",
+        )
     return
 
 
-def excess_feedin(oemof_results, e_flows_df):
+def excess_feedin(oemof_results, e_flows_df, tolerance):
     logging.debug("Plausibility test: Excess/Feedin")
     if (
         (EXCESS_ELECTRICITY in e_flows_df.columns)
         and (GRID_AVAILABILITY in e_flows_df.columns)
         and (FEED_INTO_MAIN_GRID in e_flows_df.columns)
     ):
-
-        boolean = True
-
-        test = [
-            (
-                (
-                    (e_flows_df[EXCESS_ELECTRICITY][t] != 0)
-                    and (
-                        e_flows_df[FEED_INTO_MAIN_GRID][t]
-                        != oemof_results[CAPACITY_PCC][t]
-                    )
-                )  # actual item!
-                or (
-                    (e_flows_df[EXCESS_ELECTRICITY][t] != 0)
-                    and (e_flows_df[GRID_AVAILABILITY][t] == 0)
-                )
+        # Excess is only plausible during blackouts or if the feedin is at the PCC capacity
+        mask = (
+            (np.abs(get_values(e_flows_df, EXCESS_ELECTRICITY)) > tolerance)
+            & (get_values(e_flows_df, GRID_AVAILABILITY) != 0)
+            & (
+                get_values(e_flows_df, FEED_INTO_MAIN_GRID)
+                < oemof_results[CAPACITY_PCOUPLING_KW] - tolerance
             )
-            for t in e_flows_df.index
-        ]
-
-        if any(test) is False:
-            boolean = False
-
-        if boolean is False:
-            logging.warning(
-                "PLAUSABILITY TEST FAILED: Excess while feedin to national grid not maximal (PCC capacity)!"
-            )
-            oemof_results.update(
-                {COMMENTS: oemof_results[COMMENTS] + "Excess while feedin not maximal."}
-            )
-
+        )
+        report_violations(
+            oemof_results,
+            get_violations(mask, e_flows_df.index),
+            "PLAUSABILITY TEST FAILED: Excess while feedin to national grid not maximal (PCC capacity)!",
+            "Excess while feedin not maximal. ",
+        )
     return
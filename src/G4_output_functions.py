@@ -11,6 +11,8 @@ import logging
 import networkx as nx
 import oemof.network.graph as graph
 
+import src.G4a_flow_store as flow_store
+
 from src.constants import (
     DISPLAY_META,
     DISPLAY_MAIN,
@@ -64,6 +66,7 @@ from src.constants import (
     SUFFIX_STORAGE_CSV,
     SUFFIX_STORAGE_PNG,
     SUFFIX_STORAGE_4DAYS_PNG,
+    SAVE_TO_BINARY_FLOWS,
 )
 
 
@@ -85,8 +88,19 @@ def print_oemof_meta_main_invest(experiment, meta, electricity_bus, case_name):
     return
 
 
-def save_mg_flows(experiment, case_dict, e_flows_df, filename):
-    logging.debug("Saving flows MG.")
+def get_mg_flows(e_flows_df):
+    """
+    Flows of the electricity buses as saved and plotted, flows out of the buses are negative
+
+    Parameters
+    ----------
+    e_flows_df: pandas.DataFrame
+        Energy flows of the simulation, see G0.evaluate_flows()
+
+    Returns
+    -------
+    mg_flows: pandas.DataFrame
+    """
     flows_connected_to_electricity_mg_bus = [
         DEMAND_AC,
         DEMAND_DC,
@@ -122,19 +136,6 @@ def save_mg_flows(experiment, case_dict, e_flows_df, filename):
         FEED_INTO_MAIN_GRID_MG_SIDE,
     ]
 
-    droplist = [
-        DEMAND_AC,
-        DEMAND_DC,
-        DEMAND_SHORTAGE_AC,
-        DEMAND_SHORTAGE_DC,
-        PV_GENERATION_AC,
-        PV_GENERATION_DC,
-        STORAGE_DISCHARGE_AC,
-        STORAGE_DISCHARGE_DC,
-        STORAGE_CHARGE_AC,
-        STORAGE_CHARGE_DC,
-    ]
-
     mg_flows = pd.DataFrame(
         e_flows_df[DEMAND].values, columns=[DEMAND], index=e_flows_df[DEMAND].index,
     )
@@ -177,6 +178,25 @@ def save_mg_flows(experiment, case_dict, e_flows_df, filename):
                     )
 
                 mg_flows = mg_flows.join(new_column)
+    return mg_flows
+
+
+def save_mg_flows(experiment, case_dict, e_flows_df, filename):
+    logging.debug("Saving flows MG.")
+    droplist = [
+        DEMAND_AC,
+        DEMAND_DC,
+        DEMAND_SHORTAGE_AC,
+        DEMAND_SHORTAGE_DC,
+        PV_GENERATION_AC,
+        PV_GENERATION_DC,
+        STORAGE_DISCHARGE_AC,
+        STORAGE_DISCHARGE_DC,
+        STORAGE_CHARGE_AC,
+        STORAGE_CHARGE_DC,
+    ]
+
+    mg_flows = get_mg_flows(e_flows_df)
 
     if experiment[SAVE_TO_CSV_FLOWS_ELECTRICITY_MG] is True:
         mg_flows.to_csv(
@@ -395,6 +415,38 @@ def save_storage(experiment, case_dict, e_flows_df, filename):
     return
 
 
+def save_binary_flows(experiment, case_dict, e_flows_df, filename):
+    """
+    Buffers the flows of the electricity buses and the stored capacity of the storage
+    to be written as a binary dataset in the background, see G4a.write_in_background().
+    The dataset is named like the csv files of the flows.
+
+    Parameters
+    ----------
+    experiment: dict
+        Contains general settings for the experiment
+
+    case_dict: dict
+        Settings of the simulated case
+
+    e_flows_df: pandas.DataFrame
+        Energy flows of the simulation, see G0.evaluate_flows()
+
+    filename: str
+        Name of the experiment
+    """
+    if experiment[SAVE_TO_BINARY_FLOWS] is not True:
+        return
+    logging.debug("Saving binary flows.")
+    flows = get_mg_flows(e_flows_df)
+    if case_dict[STORAGE_FIXED_CAPACITY] != None:
+        flows[STORED_CAPACITY] = e_flows_df[STORED_CAPACITY].values
+    flow_store.write_in_background(
+        experiment[OUTPUT_FOLDER], case_dict[CASE_NAME] + filename, flows
+    )
+    return
+
+
 def save_network_graph(energysystem, case_name):
     logging.debug("Generate networkx diagram")
     energysystem_graph = graph.create_nx_graph(energysystem)
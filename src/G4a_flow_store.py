@@ -0,0 +1,245 @@
+"""
+Binary store of the energy flows of each simulation.
+
+With SAVE_TO_BINARY_FLOWS, the flows of the electricity buses and the storage of each case
+and experiment are stored as one dataset in the folder FLOWS_FOLDER of the output folder,
+in addition to or instead of the csv files of G4. A dataset consists of a .npy file with
+the flows as float32, one row per flow so that each flow is contiguous on disk, and a
+.json file with the names of the flows and the timestamps. Datasets are buffered and
+written by a background thread, so that the next simulation does not have to wait for them.
+
+Datasets are read with load_flows(), which only reads the requested flows and timesteps
+from the memory-mapped .npy file.
+"""
+
+import os
+import json
+import queue
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.constants import FLOWS_FOLDER
+
+# Data type of the stored flows
+FLOW_DTYPE = np.float32
+# Number of datasets buffered before a simulation waits for the background thread
+BUFFER_SIZE = 16
+
+# Datasets waiting to be written: (output_folder, dataset, values, metadata)
+PENDING_DATASETS = queue.Queue(maxsize=BUFFER_SIZE)
+# Thread writing the pending datasets, if any: [thread]
+WRITER_THREAD = []
+WRITER_LOCK = threading.Lock()
+
+
+def get_file_path(output_folder, dataset):
+    """
+    Path of a dataset in the flows folder, without file extension
+    """
+    return os.path.join(output_folder + FLOWS_FOLDER, dataset)
+
+
+def get_index_metadata(index):
+    """
+    Description of the timestamps of a dataset as stored in its .json file.
+    Regular timestamps are described by start, frequency and number of periods.
+
+    Parameters
+    ----------
+    index: pandas.DatetimeIndex
+
+    Returns
+    -------
+    index_metadata: dict
+    """
+    freq = index.freq
+    if freq is None and len(index) >= 3:
+        freq = pd.infer_freq(index)
+    if freq is not None:
+        return {
+            "start": str(index[0]),
+            "freq": pd.tseries.frequencies.to_offset(freq).freqstr,
+            "periods": len(index),
+        }
+    return {"timestamps": [str(timestamp) for timestamp in index]}
+
+
+def get_index(index_metadata):
+    """
+    Timestamps of a dataset, see get_index_metadata()
+
+    Returns
+    -------
+    index: pandas.DatetimeIndex
+    """
+    if "timestamps" in index_metadata:
+        return pd.DatetimeIndex(index_metadata["timestamps"])
+    return pd.date_range(
+        start=index_metadata["start"],
+        freq=index_metadata["freq"],
+        periods=index_metadata["periods"],
+    )
+
+
+def write(output_folder, dataset, values, metadata):
+    """
+    Writes a dataset to the flows folder. Both files are written to temporary files
+    first, the .json file is replaced last, so that only complete datasets are read.
+
+    Parameters
+    ----------
+    output_folder: str
+        Path to the output folder
+
+    dataset: str
+        Name of the dataset
+
+    values: numpy.ndarray
+        Flows, one row per flow
+
+    metadata: dict
+        Names of the flows ("columns") and description of the timestamps ("index")
+    """
+    file_path = get_file_path(output_folder, dataset)
+    temporary_file_path = file_path + "." + str(os.getpid()) + ".tmp"
+    with open(temporary_file_path, "wb") as file:
+        np.save(file, values)
+    os.replace(temporary_file_path, file_path + ".npy")
+    with open(temporary_file_path, "w") as file:
+        json.dump(metadata, file)
+    os.replace(temporary_file_path, file_path + ".json")
+    logging.debug("Stored flows in " + file_path + ".npy")
+    return
+
+
+def write_pending_datasets():
+    """
+    Writes pending datasets until none is left, run by the background thread
+    """
+    while True:
+        with WRITER_LOCK:
+            try:
+                output_folder, dataset, values, metadata = PENDING_DATASETS.get_nowait()
+            except queue.Empty:
+                WRITER_THREAD.clear()
+                return
+        try:
+            write(output_folder, dataset, values, metadata)
+        except Exception as e:
+            logging.error(f"Flows of {dataset} could not be stored: {e}")
+
+
+def write_in_background(output_folder, dataset, flows):
+    """
+    Buffers the flows of a simulation to be written by a background thread. If BUFFER_SIZE
+    datasets are pending, waits until the background thread has written one of them.
+
+    Parameters
+    ----------
+    output_folder: str
+        Path to the output folder
+
+    dataset: str
+        Name of the dataset, eg. case name and experiment FILENAME
+
+    flows: pandas.DataFrame
+        Flows of the simulation, one column per flow
+    """
+    # Converted before buffering, so that the buffer does not refer to the flows of the simulation
+    values = np.ascontiguousarray(flows.values.T, dtype=FLOW_DTYPE)
+    metadata = {
+        "columns": [str(column) for column in flows.columns],
+        "index": get_index_metadata(flows.index),
+    }
+    PENDING_DATASETS.put((output_folder, dataset, values, metadata))
+    with WRITER_LOCK:
+        if len(WRITER_THREAD) == 0:
+            # Threads are not daemonic, so that datasets are written before the process exits
+            thread = threading.Thread(target=write_pending_datasets, name="write_flows")
+            thread.start()
+            WRITER_THREAD.append(thread)
+    return
+
+
+def wait_for_written_flows():
+    """
+    Waits until all buffered datasets are written.
+    """
+    while True:
+        with WRITER_LOCK:
+            if len(WRITER_THREAD) == 0:
+                return
+            thread = WRITER_THREAD[0]
+        thread.join()
+
+
+def get_datasets(output_folder):
+    """
+    Names of all datasets in the flows folder
+
+    Parameters
+    ----------
+    output_folder: str
+        Path to the output folder
+
+    Returns
+    -------
+    datasets: list of str
+    """
+    return sorted(
+        file[: -len(".json")]
+        for file in os.listdir(output_folder + FLOWS_FOLDER)
+        if file.endswith(".json")
+    )
+
+
+def load_flows(output_folder, dataset, columns=None, start=None, end=None):
+    """
+    Loads flows of a dataset. Only the requested flows and timesteps are read from disk.
+
+    Parameters
+    ----------
+    output_folder: str
+        Path to the output folder
+
+    dataset: str
+        Name of the dataset, see get_datasets()
+
+    columns: list of str, optional
+        Names of the loaded flows. By default, all flows are loaded.
+
+    start: str or pandas.Timestamp, optional
+        First loaded timestamp, by default the first timestamp of the dataset
+
+    end: str or pandas.Timestamp, optional
+        Last loaded timestamp (included), by default the last timestamp of the dataset
+
+    Returns
+    -------
+    flows: pandas.DataFrame
+        Flows as float32, one column per flow
+    """
+    file_path = get_file_path(output_folder, dataset)
+    with open(file_path + ".json", "r") as file:
+        metadata = json.load(file)
+
+    if columns is None:
+        columns = metadata["columns"]
+    missing_columns = [
+        column for column in columns if column not in metadata["columns"]
+    ]
+    if len(missing_columns) > 0:
+        raise KeyError(f"Flows {missing_columns} are not included in {dataset}.")
+
+    index = get_index(metadata["index"])
+    timesteps = index.slice_indexer(start, end)
+    values = np.load(file_path + ".npy", mmap_mode="r")
+    rows = [metadata["columns"].index(column) for column in columns]
+    return pd.DataFrame(
+        np.array(values[rows, timesteps]).T,
+        index=index[timesteps],
+        columns=columns,
+    )
@@ -8,27 +8,29 @@ For efficient iterations? https://docs.python.org/2/library/itertools.html
 import pprint as pp
 import os, sys
 import shutil
+import argparse
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from oemof.tools import logger
 import logging
 
 import src.A1_general_functions as helpers
+import src.A2_incremental_rerun as incremental_rerun
 import src.B_read_from_files as excel_template
 import src.C_sensitivity_experiments as generate_sensitvitiy_experiments
 import src.D0_process_input as process_input
 import src.E_blackouts_central_grid as central_grid
 import src.F_case_definitions as cases
 import src.G0_oemof_simulate as oemof_simulate
+import src.G1_oemof_create_model as oemof_model
+import src.G4a_flow_store as flow_store
 import src.H0_multicriteria_analysis as multicriteria_analysis
 
 from src.constants import (
     INPUT_TEMPLATE_EXCEL_XLSX,
     TOTAL_NUMBER_OF_EXPERIMENTS,
-    MAX_DATE_TIME_INDEX,
-    MAX_EVALUATED_DAYS,
     NECESSITY_FOR_BLACKOUT_TIMESERIES_GENERATION,
     GRID_AVAILABILITY,
     PROJECT_SITE_NAME,
-    BASED_ON_CASE,
     CASE_NAME,
     OUTPUT_FOLDER,
     EVALUATION_TIME,
@@ -39,10 +41,60 @@ from src.constants import (
     DISPLAY_EXPERIMENT,
     PERFORM_MULTICRITERIA_ANALYSIS,
     OUTPUT_FILE,
+    FILENAME,
+    BLACKOUT_ENSEMBLE_SIZE,
+    BLACKOUT_ENSEMBLE_MIN_SIZE,
+    BLACKOUT_ENSEMBLE_TOLERANCE,
+    REALIZATION,
+    SURROGATE_MODEL,
+    SURROGATE_STATUS,
+    SOLVED,
+    REUSED_RESULTS,
+    SIMULATION_KEYS,
+    RESUME,
+    TIMESERIES_ARRAYS,
 )
 
 
-def main(input_file=None):
+def get_command_line_arguments(argv=None):
+    """
+    Parses the arguments Offgridders is called with in the terminal
+
+    python3 Offgridders.py PATH/file.xlsx --workers N --resume
+
+    Parameters
+    ----------
+    argv: list of str, optional
+        Arguments to parse, if None sys.argv is used
+
+    Returns
+    -------
+    arguments: argparse.Namespace
+        Contains `input_file` (None if not provided), `workers` and `resume`
+    """
+    parser = argparse.ArgumentParser(
+        prog="Offgridders", description="Simulator for electricity supplied systems"
+    )
+    parser.add_argument(
+        "input_file", nargs="?", default=None, help="Path to input excel file"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes the sensitivity experiments are distributed to",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run, simulations recorded in its manifest are not performed again",
+    )
+    # Unknown arguments are ignored, eg. when called through pytest
+    arguments, _ = parser.parse_known_args(argv)
+    return arguments
+
+
+def main(input_file=None, workers=None, resume=None):
     r"""
     Starts Offgridders simulations.
 
@@ -50,6 +102,15 @@ def main(input_file=None):
     -----------------
     input_file : str, optional
         Path to input excel file
+
+    workers : int, optional
+        Number of processes the sensitivity experiments are distributed to.
+        Cases within one experiment are always simulated in sequence, as they
+        can be based on each other. Default: `--workers` from terminal, else 1.
+
+    resume : bool, optional
+        Continue an interrupted run, taking the results of its completed simulations from
+        its manifest (see A2.initialize_manifest()). Default: `--resume` from terminal.
     """
     # Logging
     logger.define_logging(
@@ -69,16 +130,22 @@ def main(input_file=None):
     # python3 A_main_script.py PATH/file.xlsx
     ###############################################################################
 
+    arguments = get_command_line_arguments()
+    if workers is None:
+        workers = arguments.workers
+    if resume is None:
+        resume = arguments.resume
+
     # For compatibility issues: If no key for input file is provided, use generic one input_excel_file
     if input_file is not None:
         input_excel_file = input_file
-    elif len(sys.argv) >= 2:
+    elif arguments.input_file is not None:
         test_name_legth = len("tests/tests.py")
-        if sys.argv[1][-test_name_legth:] == "tests/tests.py":
+        if arguments.input_file[-test_name_legth:] == "tests/tests.py":
             input_excel_file = os.path.join("..", "tests", "inputs", "pytest_test.xlsx")
         else:
             # Own key mentioned for input file
-            input_excel_file = str(sys.argv[1])
+            input_excel_file = str(arguments.input_file)
     else:
         # generic input file
         input_excel_file = INPUT_TEMPLATE_EXCEL_XLSX
@@ -98,13 +165,18 @@ def main(input_file=None):
         case_definitions,
         multicriteria_data,
     ) = excel_template.process_excel_file(input_excel_file)
+    settings.update({RESUME: resume})
 
     # ---- Define all sensitivity_experiment_s, define result parameters ----------#
+    # Experiments are generated one after another while they are simulated,       #
+    # results are defined by the sensitivity parameters                           #
+    # -----------------------------------------------------------------------------#
     (
         sensitivity_experiment_s,
         blackout_experiment_s,
         overall_results,
         names_sensitivities,
+        refine_experiments,
     ) = generate_sensitvitiy_experiments.get(
         settings, parameters_constant_values, parameters_sensitivity, project_site_s
     )
@@ -114,6 +186,13 @@ def main(input_file=None):
     ###############################################################################
     # -------- Generate list of cases analysed in simulation ----------------------#
     case_list = process_input.list_of_cases(case_definitions)
+    # Results are recorded column-wise and appended to the results csv
+    result_store = helpers.initialize_result_store(
+        overall_results, settings[OUTPUT_FOLDER] + "/" + settings[OUTPUT_FILE] + ".csv"
+    )
+    case_dependencies = process_input.get_case_dependencies(case_definitions)
+    # Results of the previous run, reused for unchanged or already completed simulations
+    manifest = incremental_rerun.initialize_manifest(settings)
 
     logging.info(
         "With these cases, a total of "
@@ -121,43 +200,164 @@ def main(input_file=None):
         + " simulations will be performed. \n"
     )
 
-    # ----------------- Extend sensitivity_experiment_s----------------------------#
-    # with demand, pv_generation_per_kWp, wind_generation_per_kW                  #
-    # -----------------------------------------------------------------------------#
-    # Adapt timeseries of experiments according to evaluated days
-    max_date_time_index, max_evaluated_days = process_input.add_timeseries(
-        sensitivity_experiment_s
-    )
-    settings.update({MAX_DATE_TIME_INDEX: max_date_time_index})
-    settings.update({MAX_EVALUATED_DAYS: max_evaluated_days})
-
-    # -----------Apply noise to timeseries of each experiment --------------------#
-    # This results in unique timeseries for each experiment! For comparability    #
-    # it would be better to apply noise to each project site. However, if noise   #
-    # is subject to sensitivity analysis, this is not possible. To have the same  #
-    # noisy timeseries at a project site, noise has to be included in csv data!   #
-    # -----------------------------------------------------------------------------#
-    # todo test and optionally delete noise function
-    process_input.apply_noise(sensitivity_experiment_s)  # Applies white noise
-
     # Calculation of grid_availability with randomized blackouts
+    sensitivity_grid_availability = None
     if settings[NECESSITY_FOR_BLACKOUT_TIMESERIES_GENERATION] is True:
         sensitivity_grid_availability, blackout_results = central_grid.get_blackouts(
             settings, blackout_experiment_s
         )
 
-    # ---------------------------- Base case OEM ----------------------------------#
-    # Based on demand, pv generation and subjected to sensitivity analysis SOEM   #
+    # ----------------- Extend sensitivity_experiment_s----------------------------#
+    # with demand, pv_generation_per_kWp, wind_generation_per_kW and grid         #
+    # availability, each experiment when it is generated                          #
     # -----------------------------------------------------------------------------#
-    # import all scripts necessary for loop
-    experiment_count = 0
-    total_number_of_simulations = settings[TOTAL_NUMBER_OF_EXPERIMENTS] * len(case_list)
+    # Experiments with randomized grid availability, simulated as blackout ensembles
+    experiments_with_blackout_ensembles = []
+    sensitivity_experiment_s = incremental_rerun.with_reused_results(
+        prepare_experiments(
+            sensitivity_experiment_s,
+            sensitivity_grid_availability,
+            experiments_with_blackout_ensembles,
+            settings,
+        ),
+        manifest,
+        case_list,
+        case_dependencies,
+        case_definitions,
+    )
+
+    ###############################################################################
+    # Simulations of all experiments                                              #
+    # Experiments are independent of each other and can be run in parallel, a     #
+    # case is simulated as soon as all cases it is based on are simulated         #
+    ###############################################################################
+    result_store = simulate_experiments(
+        workers,
+        sensitivity_experiment_s,
+        experiments_with_blackout_ensembles,
+        case_list,
+        case_dependencies,
+        case_definitions,
+        result_store,
+        settings,
+    )
+
+    # ------------- Refinement of sampled sensitivity experiments ----------------#
+    # Additional experiments chosen from the results of the simulated experiments, #
+    # see C.get_surrogate_experiments() and C.get_refined_experiments()           #
+    # -----------------------------------------------------------------------------#
+    refinement_round = 0
+    while refine_experiments is not None:
+        refinement_round += 1
+        additional_experiment_s = refine_experiments(result_store, refinement_round)
+        if additional_experiment_s is None:
+            break
+        sensitivity_experiment_s = incremental_rerun.with_reused_results(
+            prepare_experiments(
+                additional_experiment_s,
+                sensitivity_grid_availability,
+                experiments_with_blackout_ensembles,
+                settings,
+            ),
+            manifest,
+            case_list,
+            case_dependencies,
+            case_definitions,
+        )
+        result_store = simulate_experiments(
+            workers,
+            sensitivity_experiment_s,
+            experiments_with_blackout_ensembles,
+            case_list,
+            case_dependencies,
+            case_definitions,
+            result_store,
+            settings,
+        )
+
+    overall_results = helpers.get_overall_results(result_store)
+
+    # display all results
+    output_names = [PROJECT_SITE_NAME, CASE]
+    output_names.extend(names_sensitivities)
+    output_names.extend([LCOE, RES_SHARE])
+    logging.info(
+        '\n Simulation complete. Resulting parameters saved in "results.csv". \n Overview over results:'
+    )
+    pp.pprint(overall_results[output_names])
+
+    # Calculate multicriteria analysis
+    if settings[PERFORM_MULTICRITERIA_ANALYSIS] is True:
+        logging.info("Performing multicriteria analysis")
+        if settings[SURROGATE_MODEL] is True:
+            # Predictions of the surrogate model do not include all evaluated parameters
+            overall_results = overall_results[
+                overall_results[SURROGATE_STATUS] == SOLVED
+            ].reset_index(drop=True)
+        multicriteria_analysis.main_analysis(
+            overall_results, multicriteria_data, settings
+        )
+        logging.info("Multicriteria analysis was successfully performed")
+
+    logging.shutdown()
+    path_from = os.path.abspath("./micro_grid_design_logfile.log")
+    path_to = os.path.abspath(
+        os.path.join(settings[OUTPUT_FOLDER], MICRO_GRID_DESIGN_LOGFILE_LOG)
+    )
+    shutil.move(path_from, path_to)
+
+    print(
+        "\n Warnings or errors might have occurred. \n"
+        + "Please check terminal output or saved log-file to make sure they do not influence your simulation results."
+    )
+    return 1
+
+
+def prepare_experiments(
+    sensitivity_experiment_s,
+    sensitivity_grid_availability,
+    experiments_with_blackout_ensembles,
+    settings,
+):
+    """
+    Extends each sensitivity experiment with the timeseries of its evaluated timeframe
+    and its grid availability, one experiment after another as they are generated.
+
+    Parameters
+    ----------
+    sensitivity_experiment_s: generator
+        Yields number and settings of each sensitivity experiment, see C.get()
+
+    sensitivity_grid_availability: dict or None
+        Randomized grid availability of each blackout experiment, see E.get_blackouts()
 
-    for experiment in sensitivity_experiment_s:
+    experiments_with_blackout_ensembles: list
+        Numbers of the experiments simulated as blackout ensembles, extended in place
 
-        capacities_oem = {}
+    settings: dict
+        General settings of the simulation
 
-        if GRID_AVAILABILITY in sensitivity_experiment_s[experiment].keys():
+    Yields
+    ------
+    experiment_number: int
+
+    experiment: dict
+        Sensitivity experiment including its timeseries and grid availability
+    """
+    for experiment_number, experiment in sensitivity_experiment_s:
+        # Adapt timeseries of experiments according to evaluated days
+        process_input.add_timeseries(experiment)
+
+        # -----------Apply noise to timeseries of each experiment --------------------#
+        # This results in unique timeseries for each experiment! For comparability    #
+        # it would be better to apply noise to each project site. However, if noise   #
+        # is subject to sensitivity analysis, this is not possible. To have the same  #
+        # noisy timeseries at a project site, noise has to be included in csv data!   #
+        # -----------------------------------------------------------------------------#
+        # todo test and optionally delete noise function
+        process_input.apply_noise(experiment)  # Applies white noise
+
+        if GRID_AVAILABILITY in experiment.keys():
             logging.debug(
                 "Using grid availability as included in timeseries file of project location."
             )
@@ -168,136 +368,786 @@ def main(input_file=None):
                 "Using grid availability timeseries that was randomly generated."
             )
             blackout_experiment_name = generate_sensitvitiy_experiments.get_blackout_experiment_name(
-                sensitivity_experiment_s[experiment]
+                experiment
             )
-            sensitivity_experiment_s[experiment].update(
+            experiment.update(
                 {
                     GRID_AVAILABILITY: sensitivity_grid_availability[
                         blackout_experiment_name
                     ]
                 }
             )
+            if settings[BLACKOUT_ENSEMBLE_SIZE] > 1:
+                experiments_with_blackout_ensembles.append(experiment_number)
 
-        ###############################################################################
-        # Simulations of all cases                                                    #
-        # first the ones defining base capacities, then the others                    #
-        ###############################################################################
-        for specific_case in case_list:
-            # --------get case definition for specific loop------------------------------#
-            experiment_case_dict = cases.update_dict(
-                capacities_oem,
+        yield experiment_number, experiment
+
+
+def simulate_experiments(
+    workers,
+    sensitivity_experiment_s,
+    experiments_with_blackout_ensembles,
+    case_list,
+    case_dependencies,
+    case_definitions,
+    result_store,
+    settings,
+):
+    """
+    Simulates all cases of all sensitivity experiments, as blackout ensembles
+    (see simulate_blackout_ensembles()), in a process pool (see simulate_in_process_pool())
+    or one after another. Results are appended to the results already in result_store.
+
+    Parameters
+    ----------
+    workers: int
+        Number of processes
+
+    sensitivity_experiment_s: generator
+        Yields number and settings of all sensitivity experiments, see prepare_experiments()
+
+    experiments_with_blackout_ensembles: list
+        Numbers of the sensitivity experiments simulated as blackout ensembles
+
+    case_list: list
+        Names of the simulated cases in simulation order
+
+    case_dependencies: dict of lists
+        Cases each case is based on, see D0.get_case_dependencies()
+
+    case_definitions: dict of dicts
+        Definitions of all cases
+
+    result_store: dict of lists
+        Results of the simulations so far, see A1.initialize_result_store()
+
+    settings: dict
+        General settings of the simulation
+
+    Returns
+    -------
+    result_store: dict of lists
+        Results of all simulations
+    """
+    total_number_of_simulations = settings[TOTAL_NUMBER_OF_EXPERIMENTS] * len(case_list)
+
+    if (
+        settings[NECESSITY_FOR_BLACKOUT_TIMESERIES_GENERATION] is True
+        and settings[BLACKOUT_ENSEMBLE_SIZE] > 1
+    ):
+        result_store = simulate_blackout_ensembles(
+            workers,
+            sensitivity_experiment_s,
+            experiments_with_blackout_ensembles,
+            case_list,
+            case_definitions,
+            result_store,
+            total_number_of_simulations,
+            settings,
+        )
+    elif workers > 1:
+        logging.info(
+            "Distributing simulations to a pool of " + str(workers) + " processes."
+        )
+        result_store = simulate_in_process_pool(
+            workers,
+            sensitivity_experiment_s,
+            case_list,
+            case_dependencies,
+            case_definitions,
+            result_store,
+            total_number_of_simulations,
+            settings,
+        )
+    else:
+        experiment_count = len(result_store[CASE])
+        for experiment_number, experiment in sensitivity_experiment_s:
+            oemof_results_s = simulate_experiment(
+                experiment,
+                case_list,
+                case_definitions,
+                experiment_count,
+                total_number_of_simulations,
+            )
+            result_store, experiment_count = store_experiment_results(
+                result_store,
+                experiment,
+                oemof_results_s,
+                experiment_count,
+                total_number_of_simulations,
+                settings,
+            )
+
+    # .oemof results and binary flows are stored in the background
+    oemof_model.wait_for_stored_results()
+    flow_store.wait_for_written_flows()
+    return result_store
+
+
+def simulate_experiment(
+    experiment,
+    case_list,
+    case_definitions,
+    experiment_count,
+    total_number_of_simulations,
+):
+    """
+    Simulates all cases of a single sensitivity experiment one after another.
+    As cases can be based on the capacities optimized in other cases (capacities_oem),
+    they are simulated in order of case_list. Cases with results of the previous run
+    (REUSED_RESULTS, see A2.with_reused_results()) are not simulated again.
+
+    Parameters
+    ----------
+    experiment: dict
+        Sensitivity experiment including its timeseries and grid availability
+
+    case_list: list
+        Names of the cases to be simulated, base cases first
+
+    case_definitions: dict of dicts
+        Definitions of all cases
+
+    experiment_count: int
+        Number of simulations performed before this experiment, only used for logging
+
+    total_number_of_simulations: int
+        Total number of simulations, only used for logging
+
+    Returns
+    -------
+    oemof_results_s: list of dicts
+        Results of the simulations in order of case_list,
+        extended by the blackout characteristics
+    """
+    capacities_oem = {}
+    oemof_results_s = []
+
+    reused_results = experiment.get(REUSED_RESULTS, {})
+
+    for specific_case in case_list:
+        experiment_count = experiment_count + 1
+        if specific_case in reused_results:
+            oemof_results = reused_results[specific_case]
+        else:
+            oemof_results = simulate_case(
+                experiment,
                 case_definitions[specific_case],
-                sensitivity_experiment_s[experiment],
+                capacities_oem,
+                experiment_count,
+                total_number_of_simulations,
             )
+        incremental_rerun.record_simulation(experiment, specific_case, oemof_results)
+        # Extend base capacities for cases utilizing these values, only valid for specific experiment
+        capacities_oem.update(
+            {specific_case: helpers.define_base_capacities(oemof_results)}
+        )
+        oemof_results_s.append(oemof_results)
 
-            ###############################################################################
-            # Creating, simulating and storing micro grid energy systems with oemof       #
-            # According to parameters set beforehand                                      #
-            ###############################################################################
-            experiment_count = experiment_count + 1
-            logging.info(
-                "Starting simulation of case "
-                + specific_case
-                + ", "
-                + "project site "
-                + sensitivity_experiment_s[experiment][PROJECT_SITE_NAME]
-                + ", "
-                + "experiment no. "
-                + str(experiment_count)
-                + "/"
-                + str(total_number_of_simulations)
-                + "..."
+    return oemof_results_s
+
+
+def simulate_case(
+    experiment,
+    case_definition,
+    capacities_oem,
+    simulation_number,
+    total_number_of_simulations,
+):
+    """
+    Simulates a single case of a sensitivity experiment. The case and experiment
+    do not share any data with other simulations, so that this function can be
+    executed in a separate process.
+
+    Parameters
+    ----------
+    experiment: dict
+        Sensitivity experiment including its timeseries and grid availability
+
+    case_definition: dict
+        Definition of the simulated case
+
+    capacities_oem: dict
+        Base capacities of (at least) all cases the simulated case is based on
+
+    simulation_number: int
+        Number of the simulation, only used for logging
+
+    total_number_of_simulations: int
+        Total number of simulations, only used for logging
+
+    Returns
+    -------
+    oemof_results: dict
+        Results of the simulation, extended by the blackout characteristics
+    """
+    # --------get case definition for specific loop------------------------------#
+    experiment_case_dict = cases.update_dict(
+        capacities_oem, case_definition, experiment,
+    )
+
+    ###############################################################################
+    # Creating, simulating and storing micro grid energy systems with oemof       #
+    # According to parameters set beforehand                                      #
+    ###############################################################################
+    logging.info(
+        "Starting simulation of case "
+        + case_definition[CASE_NAME]
+        + ", "
+        + "project site "
+        + experiment[PROJECT_SITE_NAME]
+        + ", "
+        + "experiment no. "
+        + str(simulation_number)
+        + "/"
+        + str(total_number_of_simulations)
+        + "..."
+    )
+
+    # Run simulation, evaluate results
+    oemof_results = oemof_simulate.run(experiment, experiment_case_dict)
+
+    # Extend oemof_results by blackout characteristics
+    # (the grid availability is always included in the experiment at this point)
+    blackout_result = central_grid.oemof_extension_for_blackouts(
+        experiment[GRID_AVAILABILITY]
+    )
+    oemof_results = central_grid.extend_oemof_results(oemof_results, blackout_result)
+    return oemof_results
+
+
+def simulate_blackout_ensembles(
+    workers,
+    sensitivity_experiment_s,
+    experiments_with_blackout_ensembles,
+    case_list,
+    case_definitions,
+    result_store,
+    total_number_of_simulations,
+    settings,
+):
+    """
+    Simulates all sensitivity experiments, experiments with randomized grid availability
+    as blackout ensembles (see simulate_blackout_ensemble()). With more than one worker,
+    the realizations of an ensemble are simulated in a process pool.
+
+    Parameters
+    ----------
+    workers: int
+        Number of processes
+
+    sensitivity_experiment_s: generator
+        Yields number and settings of all sensitivity experiments, including their grid availability,
+        see prepare_experiments()
+
+    experiments_with_blackout_ensembles: list
+        Numbers of the sensitivity experiments simulated as blackout ensembles
+
+    case_list: list
+        Names of the simulated cases in simulation order
+
+    case_definitions: dict of dicts
+        Definitions of all cases
+
+    result_store: dict of lists
+        Results of the simulations so far, see A1.initialize_result_store()
+
+    total_number_of_simulations: int
+        Total number of simulations, only used for logging
+
+    settings: dict
+        General settings of the simulation
+
+    Returns
+    -------
+    result_store: dict of lists
+        Results of all simulations, with mean and distribution of the blackout ensembles
+    """
+    experiment_count = len(result_store[CASE])
+    executor = None
+    if workers > 1:
+        logging.info(
+            "Distributing blackout realizations to a pool of "
+            + str(workers)
+            + " processes."
+        )
+        executor = ProcessPoolExecutor(max_workers=workers)
+
+    try:
+        for experiment_number, experiment in sensitivity_experiment_s:
+            reused_results = experiment.get(REUSED_RESULTS, {})
+            if experiment_number in experiments_with_blackout_ensembles and all(
+                case in reused_results for case in case_list
+            ):
+                # Results of an ensemble are only reused if no case changed
+                oemof_results_s = [reused_results[case] for case in case_list]
+            elif experiment_number in experiments_with_blackout_ensembles:
+                oemof_results_s = simulate_blackout_ensemble(
+                    experiment,
+                    case_list,
+                    case_definitions,
+                    experiment_count,
+                    total_number_of_simulations,
+                    settings,
+                    executor,
+                    workers,
+                )
+            else:
+                oemof_results_s = simulate_experiment(
+                    experiment,
+                    case_list,
+                    case_definitions,
+                    experiment_count,
+                    total_number_of_simulations,
+                )
+            if experiment_number in experiments_with_blackout_ensembles:
+                for case, oemof_results in zip(case_list, oemof_results_s):
+                    incremental_rerun.record_simulation(experiment, case, oemof_results)
+            result_store, experiment_count = store_experiment_results(
+                result_store,
+                experiment,
+                oemof_results_s,
+                experiment_count,
+                total_number_of_simulations,
+                settings,
+            )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return result_store
+
+
+def simulate_blackout_ensemble(
+    experiment,
+    case_list,
+    case_definitions,
+    experiment_count,
+    total_number_of_simulations,
+    settings,
+    executor=None,
+    workers=1,
+):
+    """
+    Simulates all cases of a sensitivity experiment for several realizations of its randomized
+    grid availability (Monte Carlo blackout ensemble). Realizations are simulated in batches,
+    until BLACKOUT_ENSEMBLE_SIZE realizations are simulated or, after at least
+    BLACKOUT_ENSEMBLE_MIN_SIZE realizations, the mean of the ensemble is stable
+    (see E.ensemble_converged()).
+
+    Parameters
+    ----------
+    experiment: dict
+        Sensitivity experiment including its timeseries and grid availability (realization 0)
+
+    case_list: list
+        Names of the cases to be simulated, base cases first
+
+    case_definitions: dict of dicts
+        Definitions of all cases
+
+    experiment_count: int
+        Number of simulations performed before this experiment, only used for logging
+
+    total_number_of_simulations: int
+        Total number of simulations, only used for logging
+
+    settings: dict
+        General settings of the simulation
+
+    executor: concurrent.futures.ProcessPoolExecutor, optional
+        Process pool the realizations of a batch are distributed to
+
+    workers: int
+        Number of processes of the executor, realizations simulated in one batch
+
+    Returns
+    -------
+    oemof_results_s: list of dicts
+        Aggregated results of the ensemble in order of case_list, see E.aggregate_ensemble_results()
+    """
+    ensemble_size = int(settings[BLACKOUT_ENSEMBLE_SIZE])
+    min_ensemble_size = min(int(settings[BLACKOUT_ENSEMBLE_MIN_SIZE]), ensemble_size)
+    batch_size = workers if executor is not None else 1
+    blackout_experiment_name = generate_sensitvitiy_experiments.get_blackout_experiment_name(
+        experiment
+    )
+
+    realization_results_s = []
+    number_of_realizations = 0
+    while number_of_realizations < ensemble_size:
+        # Simulate at least the minimal ensemble size before checking convergence
+        number_in_batch = min(
+            max(batch_size, min_ensemble_size - number_of_realizations),
+            ensemble_size - number_of_realizations,
+        )
+        grid_availability_s = []
+        if number_of_realizations == 0:
+            grid_availability_s.append(experiment[GRID_AVAILABILITY])
+        grid_availability_s.extend(
+            central_grid.get_ensemble_realizations(
+                settings,
+                experiment,
+                blackout_experiment_name,
+                number_of_realizations + len(grid_availability_s),
+                number_in_batch - len(grid_availability_s),
+            )
+        )
+
+        realization_experiment_s = []
+        for grid_availability in grid_availability_s:
+            realization_experiment = experiment.copy()
+            # Arrays of the timeseries are not shared between realizations, see G2a.get_timeseries()
+            realization_experiment.pop(TIMESERIES_ARRAYS, None)
+            realization_experiment.update(
+                {
+                    GRID_AVAILABILITY: grid_availability,
+                    FILENAME: experiment[FILENAME]
+                    + REALIZATION
+                    + str(number_of_realizations + len(realization_experiment_s)),
+                    # Reused and recorded results are the aggregated results of an ensemble
+                    REUSED_RESULTS: {},
+                    SIMULATION_KEYS: {},
+                }
             )
+            realization_experiment_s.append(realization_experiment)
+
+        if executor is not None:
+            futures = [
+                executor.submit(
+                    simulate_experiment,
+                    process_input.without_site_timeseries(realization_experiment),
+                    case_list,
+                    case_definitions,
+                    experiment_count,
+                    total_number_of_simulations,
+                )
+                for realization_experiment in realization_experiment_s
+            ]
+            realization_results_s.extend([future.result() for future in futures])
+        else:
+            for realization_experiment in realization_experiment_s:
+                realization_results_s.append(
+                    simulate_experiment(
+                        realization_experiment,
+                        case_list,
+                        case_definitions,
+                        experiment_count,
+                        total_number_of_simulations,
+                    )
+                )
+        number_of_realizations = len(realization_results_s)
 
-            # Run simulation, evaluate results
-            oemof_results = oemof_simulate.run(
-                sensitivity_experiment_s[experiment], experiment_case_dict
+        if (
+            number_of_realizations >= min_ensemble_size
+            and central_grid.ensemble_converged(
+                realization_results_s, settings[BLACKOUT_ENSEMBLE_TOLERANCE]
+            )
+        ):
+            logging.info(
+                "Results of blackout ensemble converged after "
+                + str(number_of_realizations)
+                + " realizations."
             )
+            break
+
+    return central_grid.aggregate_ensemble_results(realization_results_s)
+
+
+def simulate_in_process_pool(
+    workers,
+    sensitivity_experiment_s,
+    case_list,
+    case_dependencies,
+    case_definitions,
+    result_store,
+    total_number_of_simulations,
+    settings,
+):
+    """
+    Schedules the simulations of all cases of all experiments to a pool of processes.
+
+    Each case is submitted as soon as all cases it is based on (case_dependencies)
+    are simulated for the same experiment, so that eg. dispatch cases based on the
+    same OEM case are simulated at the same time. New experiments are only generated
+    when fewer simulations than workers are pending. The results of an experiment are
+    stored once all its cases are simulated, in order of the experiments, so that the
+    overall results do not depend on which process finished first.
+    Cases with results of the previous run (REUSED_RESULTS) are not submitted.
+
+    Parameters
+    ----------
+    workers: int
+        Number of processes
+
+    sensitivity_experiment_s: generator
+        Yields number and settings of all sensitivity experiments, see prepare_experiments()
+
+    case_list: list
+        Names of the simulated cases in simulation order
+
+    case_dependencies: dict of lists
+        Cases each case is based on, see D0.get_case_dependencies()
+
+    case_definitions: dict of dicts
+        Definitions of all cases
+
+    result_store: dict of lists
+        Results of the simulations so far, see A1.initialize_result_store()
 
-            # Extend base capacities for cases utilizing these values, only valid for specific experiment
-            if case_definitions[specific_case][BASED_ON_CASE] == False:
+    total_number_of_simulations: int
+        Total number of simulations
+
+    settings: dict
+        General settings of the simulation
+
+    Returns
+    -------
+    result_store: dict of lists
+        Results of all simulations
+    """
+    # Experiments that are generated, but whose results are not stored yet
+    experiment_s = {}
+    capacities_oem = {}
+    oemof_results_s = {}
+    futures = {}
+    experiment_count = len(result_store[CASE])
+    generated_all_experiments = False
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            while len(futures) < workers and generated_all_experiments is False:
+                try:
+                    experiment_number, experiment = next(sensitivity_experiment_s)
+                except StopIteration:
+                    generated_all_experiments = True
+                    break
+                experiment_s.update({experiment_number: experiment})
+                reused_results = experiment.get(REUSED_RESULTS, {})
                 capacities_oem.update(
                     {
-                        experiment_case_dict[CASE_NAME]: helpers.define_base_capacities(
-                            oemof_results
-                        )
+                        experiment_number: {
+                            case: helpers.define_base_capacities(reused_results[case])
+                            for case in reused_results
+                        }
                     }
                 )
+                oemof_results_s.update({experiment_number: reused_results.copy()})
+                for case in reused_results:
+                    incremental_rerun.record_simulation(
+                        experiment, case, reused_results[case]
+                    )
+                submit_ready_cases(
+                    executor,
+                    futures,
+                    experiment_number,
+                    experiment_s,
+                    case_list,
+                    case_dependencies,
+                    case_definitions,
+                    capacities_oem,
+                    total_number_of_simulations,
+                )
+                if len(oemof_results_s[experiment_number]) == len(case_list):
+                    # Results are all reused, they are stored before generating more experiments
+                    break
 
-            # Extend oemof_results by blackout characteristics
-            if GRID_AVAILABILITY in sensitivity_experiment_s[experiment].keys():
-                blackout_result = central_grid.oemof_extension_for_blackouts(
-                    sensitivity_experiment_s[experiment][GRID_AVAILABILITY]
+            if len(futures) > 0:
+                done, _ = wait(futures.keys(), return_when=FIRST_COMPLETED)
+            else:
+                # All cases of the generated experiments are reused
+                done = []
+            for future in done:
+                experiment_number, specific_case = futures.pop(future)
+                oemof_results = future.result()
+                incremental_rerun.record_simulation(
+                    experiment_s[experiment_number], specific_case, oemof_results
                 )
-                oemof_results = central_grid.extend_oemof_results(
-                    oemof_results, blackout_result
+                oemof_results_s[experiment_number].update(
+                    {specific_case: oemof_results}
                 )
-            else:  # one might check for settings['necessity_for_blackout_timeseries_generation']==True here, but I think its unnecessary
-                oemof_results = central_grid.extend_oemof_results(
-                    oemof_results, blackout_results[blackout_experiment_name]
+                # Extend base capacities for cases utilizing these values, only valid for specific experiment
+                capacities_oem[experiment_number].update(
+                    {specific_case: helpers.define_base_capacities(oemof_results)}
+                )
+                submit_ready_cases(
+                    executor,
+                    futures,
+                    experiment_number,
+                    experiment_s,
+                    case_list,
+                    case_dependencies,
+                    case_definitions,
+                    capacities_oem,
+                    total_number_of_simulations,
                 )
 
-            # Extend overall results dataframe with simulation results
-            overall_results = helpers.store_result_matrix(
-                overall_results, sensitivity_experiment_s[experiment], oemof_results
-            )
-            # Writing DataFrame with all results to csv file
-            overall_results.to_csv(
-                sensitivity_experiment_s[experiment][OUTPUT_FOLDER]
-                + "/"
-                + sensitivity_experiment_s[experiment][OUTPUT_FILE]
-                + ".csv"
-            )  # moved from below
-
-            # Estimating simulation time left - more precise for greater number of simulations
-            logging.info(
-                "    Estimated simulation time left: "
-                + str(
-                    round(
-                        sum(overall_results[EVALUATION_TIME][:])
-                        * (total_number_of_simulations - experiment_count)
-                        / experiment_count
-                        / 60,
-                        1,
-                    )
+            # Store all completed experiments, keeping the order of the experiments
+            while len(experiment_s) > 0:
+                experiment_number = min(experiment_s.keys())
+                if len(oemof_results_s[experiment_number]) < len(case_list):
+                    break
+                result_store, experiment_count = store_experiment_results(
+                    result_store,
+                    experiment_s.pop(experiment_number),
+                    [oemof_results_s[experiment_number][case] for case in case_list],
+                    experiment_count,
+                    total_number_of_simulations,
+                    settings,
                 )
-                + " minutes."
+                del capacities_oem[experiment_number]
+                del oemof_results_s[experiment_number]
+
+            if len(futures) == 0 and generated_all_experiments is True:
+                break
+
+    return result_store
+
+
+def submit_ready_cases(
+    executor,
+    futures,
+    experiment_number,
+    experiment_s,
+    case_list,
+    case_dependencies,
+    case_definitions,
+    capacities_oem,
+    total_number_of_simulations,
+):
+    """
+    Submits all cases of an experiment to the process pool that are not submitted yet
+    and of which all base cases are already simulated.
+
+    Parameters
+    ----------
+    executor: concurrent.futures.ProcessPoolExecutor
+        Process pool
+
+    futures: dict
+        Submitted, not yet processed simulations {future: (experiment_number, case)}, extended in place
+
+    experiment_number: int
+        Number of the experiment in experiment_s
+
+    experiment_s: dict
+        Generated experiments whose results are not stored yet {experiment_number: experiment}
+
+    Other parameters see simulate_in_process_pool(), capacities_oem contains the
+    base capacities of all simulated cases per experiment.
+
+    Returns
+    -------
+    Nothing, futures is extended.
+    """
+    submitted_cases = [
+        case for (entry, case) in futures.values() if entry == experiment_number
+    ]
+    for specific_case in case_list:
+        if (
+            specific_case not in capacities_oem[experiment_number]
+            and specific_case not in submitted_cases
+            and all(
+                base_case in capacities_oem[experiment_number]
+                for base_case in case_dependencies[specific_case]
+            )
+        ):
+            simulation_number = (
+                (experiment_number - 1) * len(case_list)
+                + case_list.index(specific_case)
+                + 1
+            )
+            future = executor.submit(
+                simulate_case,
+                process_input.without_site_timeseries(experiment_s[experiment_number]),
+                case_definitions[specific_case],
+                {
+                    base_case: capacities_oem[experiment_number][base_case]
+                    for base_case in case_dependencies[specific_case]
+                },
+                simulation_number,
+                total_number_of_simulations,
             )
-            print("\n")
+            futures.update({future: (experiment_number, specific_case)})
+    return
 
-        if settings[DISPLAY_EXPERIMENT] is True:
-            logging.info("The experiment with following parameters has been analysed:")
-            pp.pprint(sensitivity_experiment_s[experiment])
 
-    # display all results
-    output_names = [PROJECT_SITE_NAME, CASE]
-    output_names.extend(names_sensitivities)
-    output_names.extend([LCOE, RES_SHARE])
-    logging.info(
-        '\n Simulation complete. Resulting parameters saved in "results.csv". \n Overview over results:'
-    )
-    pp.pprint(overall_results[output_names])
+def store_experiment_results(
+    result_store,
+    experiment,
+    oemof_results_s,
+    experiment_count,
+    total_number_of_simulations,
+    settings,
+):
+    """
+    Adds the results of all cases of an experiment to the result store and
+    appends them to the results csv.
 
-    # Calculate multicriteria analysis
-    if settings[PERFORM_MULTICRITERIA_ANALYSIS] is True:
-        logging.info("Performing multicriteria analysis")
-        multicriteria_analysis.main_analysis(
-            overall_results, multicriteria_data, settings
+    Parameters
+    ----------
+    result_store: dict of lists
+        Results of all experiments simulated so far, see A1.initialize_result_store()
+
+    experiment: dict
+        Sensitivity experiment the results belong to
+
+    oemof_results_s: list of dicts
+        Results of the cases of the experiment, as returned by simulate_experiment()
+
+    experiment_count: int
+        Number of simulations stored before this experiment
+
+    total_number_of_simulations: int
+        Total number of simulations
+
+    settings: dict
+        General settings of the simulation
+
+    Returns
+    -------
+    result_store: dict of lists
+        Results extended by the experiment
+
+    experiment_count: int
+        Number of simulations stored including this experiment
+    """
+    first_row = experiment_count
+    for oemof_results in oemof_results_s:
+        # Extend result store with simulation results
+        result_store = helpers.store_result_matrix(
+            result_store, experiment, oemof_results
         )
-        logging.info("Multicriteria analysis was successfully performed")
+        experiment_count = experiment_count + 1
 
-    logging.shutdown()
-    path_from = os.path.abspath("./micro_grid_design_logfile.log")
-    path_to = os.path.abspath(
-        os.path.join(settings[OUTPUT_FOLDER], MICRO_GRID_DESIGN_LOGFILE_LOG)
+    # Appending results of the experiment to csv file
+    helpers.write_result_rows(
+        result_store,
+        first_row,
+        experiment[OUTPUT_FOLDER] + "/" + experiment[OUTPUT_FILE] + ".csv",
     )
-    shutil.move(path_from, path_to)
 
-    print(
-        "\n Warnings or errors might have occurred. \n"
-        + "Please check terminal output or saved log-file to make sure they do not influence your simulation results."
+    # Estimating simulation time left - more precise for greater number of simulations
+    logging.info(
+        "    Estimated simulation time left: "
+        + str(
+            round(
+                sum(result_store[EVALUATION_TIME])
+                * (total_number_of_simulations - experiment_count)
+                / experiment_count
+                / 60,
+                1,
+            )
+        )
+        + " minutes."
     )
-    return 1
+    print("\n")
+
+    if settings[DISPLAY_EXPERIMENT] is True:
+        logging.info("The experiment with following parameters has been analysed:")
+        pp.pprint(experiment)
+
+    return result_store, experiment_count
 
 
 if __name__ == "__main__":
@@ -18,6 +18,13 @@ CAPACITY_RECTIFIER_AC_DC_KW = "capacity_rectifier_ac_dc_kW"
 CAPACITY_INVERTER_DC_AC_KW = "capacity_inverter_dc_ac_kW"
 DEMAND_PROFILE = "demand_profile"
 
+# A2_incremental_rerun
+INCREMENTAL_RERUN = "incremental_rerun"
+SIMULATION_KEYS = "simulation_keys"
+REUSED_RESULTS = "reused_results"
+RESUME = "resume"
+MANIFEST_SUFFIX = "_manifest.jsonl"
+
 # B_READ_FROM_FILES
 SETTINGS = "settings"
 INPUT_CONSTANT = "input_constant"
@@ -28,6 +35,7 @@ MULTICRITERIA_DATA = "multicriteria_data"
 INPUT_FOLDER_TIMESERIES = "input_folder_timeseries"
 TIMESERIES_FILE = "timeseries_file"
 TITLE_GRID_AVAILABILITY = "title_grid_availability"
+TIMESERIES_CACHE_FOLDER = ".timeseries_cache"
 NECESSITY_FOR_BLACKOUT_TIMESERIES_GENERATION = (
     "necessity_for_blackout_timeseries_generation"
 )
@@ -82,6 +90,12 @@ BLACKOUT_DURATION_STD_DEVIATION = "blackout_duration_std_deviation"
 BLACKOUT_FREQUENCY = "blackout_frequency"
 BLACKOUT_FREQUENCY_STD_DEVIATION = "blackout_frequency_std_deviation"
 SENSITIVITY_ALL_COMBINATIONS = "sensitivity_all_combinations"
+SENSITIVITY_SAMPLING = "sensitivity_sampling"
+SENSITIVITY_SAMPLE_SIZE = "sensitivity_sample_size"
+SENSITIVITY_REFINEMENT_SIZE = "sensitivity_refinement_size"
+SENSITIVITY_SAMPLING_SEED = "sensitivity_sampling_seed"
+LATIN_HYPERCUBE = "latin_hypercube"
+SOBOL = "sobol"
 DEMAND_AC_SCALING_FACTOR = "demand_ac_scaling_factor"
 DEMAND_DC_SCALING_FACTOR = "demand_dc_scaling_factor"
 STORAGE_SOC_INITIAL = "storage_soc_initial"
@@ -239,6 +253,15 @@ TOTAL_EXCESS_ANNUAL_KWH = "total_excess_annual_kWh"
 SENSITIVITY_EXPERIMENTS_CSV = "sensitivity_experiments.csv"
 SIMULATION_EXPERIMENTS_CSV = "simulation_experiments.csv"
 
+# C1_surrogate_model
+SURROGATE_MODEL = "surrogate_model"
+SURROGATE_INITIAL_SIZE = "surrogate_initial_size"
+SURROGATE_BATCH_SIZE = "surrogate_batch_size"
+SURROGATE_TOLERANCE = "surrogate_tolerance"
+SURROGATE_STATUS = "surrogate_status"
+SOLVED = "solved"
+PREDICTED = "predicted"
+
 # D0_process_input
 PERFORM_SIMULATION = "perform_simulation"
 BASED_ON_CASE = "based_on_case"
@@ -284,6 +307,12 @@ SUFFIX_COST_ANNUITY = "_cost_annuity"
 SUFFIX_COST_CAPEX = "_cost_capex"
 
 
+# D2_typical_days
+TYPICAL_DAYS = "typical_days"
+TYPICAL_DAYS_DISPATCH = "typical_days_dispatch"
+TIMESTEP_WEIGHTS = "timestep_weights"
+FIXED_CAPACITIES_OF_TYPICAL_DAYS = "fixed_capacities_of_typical_days"
+
 # E_blackouts_central_grid
 TIMESTEP = "timestep"
 MAX_DATE_TIME_INDEX = "max_date_time_index"
@@ -291,6 +320,14 @@ GRID_TOTAL_BLACKOUT_DURATION = "grid_total_blackout_duration"
 GRID_NUMBER_OF_BLACKOUTS = "grid_number_of_blackouts"
 GRID_RELIABILITY = "grid_reliability"
 MAX_EVALUATED_DAYS = "max_evaluated_days"
+BLACKOUT_SEED = "blackout_seed"
+BLACKOUT_ENSEMBLE_SIZE = "blackout_ensemble_size"
+BLACKOUT_ENSEMBLE_MIN_SIZE = "blackout_ensemble_min_size"
+BLACKOUT_ENSEMBLE_TOLERANCE = "blackout_ensemble_tolerance"
+BLACKOUT_REALIZATIONS = "blackout_realizations"
+REALIZATION = "_realization_"
+SUFFIX_P10 = "_p10"
+SUFFIX_P90 = "_p90"
 
 GRID_AVAILABILITY_CSV = "grid_availability.csv"
 
@@ -340,6 +377,19 @@ CMDLINE_OPTION = "cmdline_option"
 CMDLINE_OPTION_VALUE = "cmdline_option_value"
 SYMBOLIC_SOLVER_LABELS = "symbolic_solver_labels"
 OEMOF = "/oemof"
+REUSE_OEMOF_MODEL = "reuse_oemof_model"
+WARM_START = "warm_start"
+PERSISTENT_SOLVER = "persistent_solver"
+
+# G1a_result_cache
+USE_RESULT_CACHE = "use_result_cache"
+RESULT_CACHE_MAX_SIZE_MB = "result_cache_max_size_mb"
+RESULT_CACHE_FOLDER = "/result_cache"
+
+# G1b_rolling_horizon
+ROLLING_HORIZON = "rolling_horizon"
+ROLLING_HORIZON_OVERLAP = "rolling_horizon_overlap"
+STORAGE_BALANCED = "storage_balanced"
 
 # G2a_oemof_busses_and_components
 SOURCE_FUEL = "source_fuel"
@@ -368,6 +418,7 @@ SINK_DEMAND_AC = "sink_demand_ac"
 SINK_DEMAND_DC = "sink_demand_dc"
 SINK_MAINGRID_FEEDIN = "sink_maingrid_feedin"
 SINK_MAINGRID_FEEDIN_SYMBOLIC = "source_maingrid_feedin_symbolic"
+TIMESERIES_ARRAYS = "timeseries_arrays"
 
 # G2b
 STORAGE_CAPACITY_MIN = "storage_capacity_min"
@@ -426,6 +477,9 @@ FEEDIN_MAIN_GRID_UTILITY_SIDE_ANNUAL_KWH = "feedin_main_grid_utility_side_annual
 TOTAL_PCOUPLING_THROUGHPUT_KWH = "total_pcoupling_throughput_kWh"
 DEMAND_AC = "Demand AC"
 DEMAND_DC = "Demand DC"
+CONSUMPTION_MAIN_GRID_UTILITY_SIDE = "Consumption from main grid (utility side)"
+FEED_INTO_MAIN_GRID_UTILITY_SIDE = "Feed into main grid (utility side)"
+STORAGE_CONTENT = "storage_content"
 
 # G3a
 WIND_COST_ANNUITY = "wind_cost_annuity"
@@ -451,6 +505,7 @@ CONSUMPTION_FROM_MAIN_GRID = "Consumption from main grid"
 FEED_INTO_MAIN_GRID = "Feed into main grid"
 EXCESS_ELECTRICITY = "Excess electricity"
 CAPACITY_PCC = "capacity pcc"
+PLAUSIBILITY_TOLERANCE = "plausibility_tolerance"
 
 # G4
 DISPLAY_META = "display_meta"
@@ -467,6 +522,10 @@ SUFFIX_STORAGE_CSV = "_storage.csv"
 SUFFIX_STORAGE_PNG = "_storage.png"
 SUFFIX_STORAGE_4DAYS_PNG = "_storage_4days.png"
 
+# G4a_flow_store
+SAVE_TO_BINARY_FLOWS = "save_to_binary_flows"
+FLOWS_FOLDER = "/flows"
+
 # H0
 CAPACITIES = "capacities"
 EVALUATIONS = "evaluations"
@@ -0,0 +1,45 @@
+import pandas as pd
+import src.A1_general_functions as A1
+
+from src.constants import (
+    CASE,
+    LCOE,
+    PV_COST_INVESTMENT,
+    DEMAND_PROFILE,
+)
+
+OVERALL_RESULTS = pd.DataFrame(columns=[CASE, PV_COST_INVESTMENT, DEMAND_PROFILE, LCOE])
+EXPERIMENT = {PV_COST_INVESTMENT: 1000.123456, DEMAND_PROFILE: "demand"}
+
+
+def test_store_result_matrix(tmpdir):
+    result_store = A1.initialize_result_store(
+        OVERALL_RESULTS, str(tmpdir.join("results.csv"))
+    )
+    result_store = A1.store_result_matrix(
+        result_store, EXPERIMENT, {CASE: "base_oem", LCOE: 0.123456}
+    )
+    result_store = A1.store_result_matrix(result_store, EXPERIMENT, {CASE: "other"})
+    exp = {
+        CASE: ["base_oem", "other"],
+        PV_COST_INVESTMENT: [1000.12346, 1000.12346],
+        DEMAND_PROFILE: ["demand", "demand"],
+        LCOE: [0.12346, None],
+    }
+    assert (
+        result_store == exp
+    ), f"The result store should be {exp}, but is {result_store}."
+
+
+def test_write_result_rows_appends_to_csv(tmpdir):
+    results_file = str(tmpdir.join("results.csv"))
+    result_store = A1.initialize_result_store(OVERALL_RESULTS, results_file)
+    for case in ["case_a", "case_b", "case_c"]:
+        result_store = A1.store_result_matrix(
+            result_store, EXPERIMENT, {CASE: case, LCOE: 0.1}
+        )
+        A1.write_result_rows(result_store, len(result_store[CASE]) - 1, results_file)
+    results = pd.read_csv(results_file, index_col=0, float_precision="round_trip")
+    assert (
+        results.to_dict("list") == result_store
+    ), f"The results csv should contain all stored rows once, but contains {results}."
@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+import src.A2_incremental_rerun as A2
+
+from src.constants import (
+    INCREMENTAL_RERUN,
+    RESUME,
+    REUSED_RESULTS,
+    OUTPUT_FOLDER,
+    OUTPUT_FILE,
+    PROJECT_SITE_NAME,
+    FILENAME,
+    CASE,
+    CASE_NAME,
+    CAPACITY_PV_KWP,
+    PV_COST_INVESTMENT,
+    DEMAND_PROFILE_AC,
+)
+
+EXPERIMENT = {
+    PROJECT_SITE_NAME: "site",
+    FILENAME: "_s_pv_cost_investment_1000",
+    PV_COST_INVESTMENT: 1000,
+    DEMAND_PROFILE_AC: pd.Series(
+        [1.0, 2.0, 3.0], index=pd.date_range("2020-01-01", periods=3, freq="H")
+    ),
+}
+CASE_LIST = ["base_oem", "offgrid_fix", "oem_grid_tied"]
+CASE_DEPENDENCIES = {"base_oem": [], "offgrid_fix": ["base_oem"], "oem_grid_tied": []}
+CASE_DEFINITIONS = {
+    "base_oem": {CASE_NAME: "base_oem", CAPACITY_PV_KWP: "oem"},
+    "offgrid_fix": {CASE_NAME: "offgrid_fix", CAPACITY_PV_KWP: "base_oem"},
+    "oem_grid_tied": {CASE_NAME: "oem_grid_tied", CAPACITY_PV_KWP: "oem"},
+}
+
+
+def changed_case_definitions(case, capacity):
+    case_definitions = {
+        name: CASE_DEFINITIONS[name].copy() for name in CASE_DEFINITIONS
+    }
+    case_definitions[case].update({CAPACITY_PV_KWP: capacity})
+    return case_definitions
+
+
+def test_get_simulation_keys_changed_base_case():
+    keys = A2.get_simulation_keys(
+        EXPERIMENT, CASE_LIST, CASE_DEPENDENCIES, CASE_DEFINITIONS
+    )
+    changed_keys = A2.get_simulation_keys(
+        EXPERIMENT,
+        CASE_LIST,
+        CASE_DEPENDENCIES,
+        changed_case_definitions("base_oem", 10),
+    )
+    assert (
+        keys["base_oem"] != changed_keys["base_oem"]
+        and keys["offgrid_fix"] != changed_keys["offgrid_fix"]
+    ), f"The keys of a changed case and of the cases based on it should change."
+    assert (
+        keys["oem_grid_tied"] == changed_keys["oem_grid_tied"]
+    ), f"The key of a case independent of the changed case should not change."
+
+
+def test_get_simulation_keys_changed_experiment():
+    experiment = EXPERIMENT.copy()
+    experiment.update({PV_COST_INVESTMENT: 1200})
+    keys = A2.get_simulation_keys(
+        EXPERIMENT, CASE_LIST, CASE_DEPENDENCIES, CASE_DEFINITIONS
+    )
+    changed_keys = A2.get_simulation_keys(
+        experiment, CASE_LIST, CASE_DEPENDENCIES, CASE_DEFINITIONS
+    )
+    assert all(
+        keys[case] != changed_keys[case] for case in CASE_LIST
+    ), f"The keys of all cases of a changed experiment should change."
+
+
+def settings_of_run(tmpdir, incremental_rerun=False, resume=False):
+    return {
+        INCREMENTAL_RERUN: incremental_rerun,
+        RESUME: resume,
+        OUTPUT_FOLDER: str(tmpdir),
+        OUTPUT_FILE: "results",
+    }
+
+
+def start_run(settings, case_definitions=CASE_DEFINITIONS):
+    """Starts a run with a single experiment, returns the experiment with its reused results"""
+    experiment = EXPERIMENT.copy()
+    experiment.update(settings)
+    manifest = A2.initialize_manifest(settings)
+    [(_, experiment)] = list(
+        A2.with_reused_results(
+            iter([(1, experiment)]),
+            manifest,
+            CASE_LIST,
+            CASE_DEPENDENCIES,
+            case_definitions,
+        )
+    )
+    return experiment
+
+
+def record_cases(experiment, cases):
+    for case in cases:
+        oemof_results = {
+            CASE: case,
+            CAPACITY_PV_KWP: np.float64(CASE_LIST.index(case)),
+            "flows": pd.Series([1.0]),
+        }
+        A2.record_simulation(experiment, case, oemof_results)
+
+
+def test_initialize_manifest_not_set(tmpdir):
+    assert (
+        A2.initialize_manifest(settings_of_run(tmpdir)) is None
+    ), f"Without {INCREMENTAL_RERUN} or {RESUME}, no manifest should be loaded."
+
+
+def test_reuse_results_of_previous_run(tmpdir):
+    # First run simulates all cases
+    experiment = start_run(settings_of_run(tmpdir, incremental_rerun=True))
+    assert (
+        experiment[REUSED_RESULTS] == {}
+    ), f"Without a previous run, no results should be reused."
+    record_cases(experiment, CASE_LIST)
+
+    # Second run with a changed base case
+    experiment = start_run(
+        settings_of_run(tmpdir, incremental_rerun=True),
+        changed_case_definitions("base_oem", 10),
+    )
+    assert list(experiment[REUSED_RESULTS].keys()) == [
+        "oem_grid_tied"
+    ], f"Only the case independent of the changed case should be reused, not {list(experiment[REUSED_RESULTS].keys())}."
+    assert experiment[REUSED_RESULTS]["oem_grid_tied"] == {
+        CASE: "oem_grid_tied",
+        CAPACITY_PV_KWP: 2,
+    }, f"Only the scalar results of a case should be reused."
+    assert A2.initialize_manifest(settings_of_run(tmpdir, incremental_rerun=True)) == {
+        "keys": {},
+        "names": {},
+    }, f"The manifest of a run should only include its own simulations."
+
+
+def test_resume_interrupted_run(tmpdir):
+    experiment = start_run(settings_of_run(tmpdir))
+    record_cases(experiment, CASE_LIST[:2])
+    # Record interrupted while writing
+    with open(A2.get_manifest_file(experiment), "a") as file:
+        file.write('{"key": "interrupted')
+
+    experiment = start_run(settings_of_run(tmpdir, resume=True))
+    assert (
+        list(experiment[REUSED_RESULTS].keys()) == CASE_LIST[:2]
+    ), f"The completed cases {CASE_LIST[:2]} should be resumed, not {list(experiment[REUSED_RESULTS].keys())}."
+    record_cases(experiment, CASE_LIST)
+
+    experiment = start_run(settings_of_run(tmpdir, resume=True))
+    assert (
+        list(experiment[REUSED_RESULTS].keys()) == CASE_LIST
+    ), f"All cases should be completed after resuming, not only {list(experiment[REUSED_RESULTS].keys())}."
+    with open(A2.get_manifest_file(experiment), "r") as file:
+        number_of_lines = len(file.readlines())
+    assert (
+        number_of_lines == len(CASE_LIST) + 1
+    ), f"Each simulation should be recorded once, besides the interrupted record, not in {number_of_lines} lines."
@@ -0,0 +1,47 @@
+import os
+import numpy as np
+import src.B_read_from_files as B
+
+CSV = "time;Demand;SolarGen\n2020-01-01 00:00;1.0;0.0\n2020-01-01 01:00;2.0;0.5\n"
+
+
+def write_csv(tmpdir, content=CSV):
+    path = str(tmpdir.join("site.csv"))
+    with open(path, "w") as file:
+        file.write(content)
+    return path
+
+
+def test_read_timeseries_file_from_cache(tmpdir):
+    path = write_csv(tmpdir)
+    parsed = B.read_timeseries_file(path, ";", "time")
+    cached = B.read_timeseries_file(path, ";", "time")
+    assert isinstance(
+        cached["Demand"], np.memmap
+    ), f"Timeseries should be loaded memory-mapped from the cache."
+    for column in ["time", "Demand", "SolarGen"]:
+        assert np.array_equal(
+            parsed[column], cached[column]
+        ), f"Cached timeseries {column} should equal the parsed timeseries."
+
+
+def test_read_timeseries_file_changed_csv(tmpdir):
+    path = write_csv(tmpdir)
+    B.read_timeseries_file(path, ";", "time")
+    write_csv(tmpdir, CSV.replace("2.0", "3.0"))
+    # make sure the modification time changes
+    os.utime(path, ns=(0, 0))
+    data_set = B.read_timeseries_file(path, ";", "time")
+    assert np.array_equal(
+        data_set["Demand"], [1.0, 3.0]
+    ), f"Changes of the csv file should not be ignored, but demand is {data_set['Demand']}."
+
+
+def test_read_timeseries_file_touched_csv(tmpdir):
+    path = write_csv(tmpdir)
+    B.read_timeseries_file(path, ";", "time")
+    os.utime(path, ns=(0, 0))
+    data_set = B.read_timeseries_file(path, ";", "time")
+    assert isinstance(
+        data_set["Demand"], np.memmap
+    ), f"The cache should be used if only the modification time of the csv changed."
@@ -0,0 +1,51 @@
+import numpy as np
+import src.C1_surrogate_model as C1
+
+
+POSITIONS = np.linspace(0, 1, 6)[:, np.newaxis]
+VALUES = np.column_stack([np.sin(3 * POSITIONS[:, 0]) + 2, POSITIONS[:, 0]])
+
+
+def test_predict_reproduces_simulated_results():
+    mean, standard_deviation = C1.predict(C1.fit(POSITIONS, VALUES), POSITIONS)
+    assert np.allclose(
+        mean, VALUES, atol=0.01
+    ), f"Results of simulated experiments should be reproduced, but {mean} are predicted instead of {VALUES}."
+    assert np.all(
+        standard_deviation < 1e-2
+    ), f"Predictions of simulated experiments should be certain."
+
+
+def test_predict_between_simulated_results():
+    positions = np.array([[0.1], [0.5]])
+    mean, _ = C1.predict(C1.fit(POSITIONS, VALUES), positions)
+    expected = np.sin(3 * positions[:, 0]) + 2
+    assert np.allclose(
+        mean[:, 0], expected, atol=0.01
+    ), f"Smooth results should be interpolated as {expected}, but {mean[:, 0]} are predicted."
+
+
+def test_predict_uncertainty_increases_with_distance():
+    positions = np.array([[1.1], [1.5], [3.0]])
+    _, standard_deviation = C1.predict(C1.fit(POSITIONS, VALUES), positions)
+    assert np.all(
+        np.diff(standard_deviation[:, 0]) > 0
+    ), f"Predictions further away from simulated experiments should be more uncertain, but standard deviations are {standard_deviation[:, 0]}."
+
+
+def test_predict_results_including_nan_not_predicted():
+    values = VALUES.copy()
+    values[2, 1] = np.nan
+    mean, _ = C1.predict(C1.fit(POSITIONS, values), np.array([[0.5]]))
+    assert np.isnan(mean[0, 1]), f"Results including NaN should not be predicted."
+    assert not np.isnan(mean[0, 0]), f"Other results should still be predicted."
+
+
+def test_predict_unsolved_single_result_uncertain():
+    values = np.ones((1, len(C1.SURROGATE_PARAMETERS)))
+    _, relative_uncertainty = C1.predict_unsolved(
+        np.array([[0.0]]), values, np.array([[0.5], [1.0]])
+    )
+    assert np.all(
+        np.isinf(relative_uncertainty)
+    ), f"Predictions based on a single simulated experiment should be uncertain."
@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+import pytest
+import src.C_sensitivity_experiments as C
+
+from src.constants import (
+    PROJECT_SITE_NAME,
+    PV_COST_INVESTMENT,
+    WACC,
+    DEMAND_AC,
+    CASE,
+    LCOE,
+    SENSITIVITY_SAMPLING,
+    SENSITIVITY_SAMPLE_SIZE,
+    SENSITIVITY_SAMPLING_SEED,
+    LATIN_HYPERCUBE,
+    SURROGATE_MODEL,
+)
+
+
+def test_generate_all_possible_combinations_along_grid_neighbours_simulated_one_after_another():
+    sensitivity_array_dict = {
+        PV_COST_INVESTMENT: np.arange(1000, 1300, 100),
+        WACC: np.arange(0.05, 0.25, 0.1),
+    }
+    ordered_experiment_s = dict(
+        C.generate_all_possible_combinations(
+            sensitivity_array_dict, {PROJECT_SITE_NAME: ["site_1"]}, along_grid=True
+        )
+    )
+    assert sorted(ordered_experiment_s.keys()) == list(
+        range(1, 7)
+    ), f"Experiments should be numbered from 1 to 6."
+    for number in range(1, len(ordered_experiment_s)):
+        steps = 0
+        for key in sensitivity_array_dict:
+            difference = abs(
+                ordered_experiment_s[number + 1][key]
+                - ordered_experiment_s[number][key]
+            )
+            step = sensitivity_array_dict[key][1] - sensitivity_array_dict[key][0]
+            steps += round(difference / step)
+        assert (
+            steps == 1
+        ), f"Experiments {number} and {number + 1} should differ by a single step of a single parameter, but differ by {steps} steps."
+
+
+def test_generate_all_possible_combinations_along_grid_same_combinations():
+    sensitivity_array_dict = {
+        PV_COST_INVESTMENT: np.arange(1000, 1300, 100),
+        WACC: np.arange(0.05, 0.25, 0.1),
+    }
+    name_entry_dict = {PROJECT_SITE_NAME: ["site_1", "site_2"]}
+    combinations = [
+        tuple(sorted(experiment.items()))
+        for _, experiment in C.generate_all_possible_combinations(
+            sensitivity_array_dict, name_entry_dict
+        )
+    ]
+    combinations_along_grid = [
+        tuple(sorted(experiment.items()))
+        for _, experiment in C.generate_all_possible_combinations(
+            sensitivity_array_dict, name_entry_dict, along_grid=True
+        )
+    ]
+    assert len(combinations) == 12, f"There should be 12 combinations."
+    assert sorted(combinations) == sorted(
+        combinations_along_grid
+    ), f"Ordering the combinations along the grid should not change them."
+
+
+def test_get_combinations_around_base_generated_on_demand():
+    sensitivity_array_dict = {
+        PV_COST_INVESTMENT: np.array([1000, 1100, 1200]),
+        WACC: np.array([0.05, 0.15]),
+    }
+    universal_parameters = {PV_COST_INVESTMENT: 1100, WACC: 0.05}
+    project_site_s = {"site_1": {DEMAND_AC: pd.Series([1.0, 2.0])}}
+    experiment_s = C.get_combinations_around_base(
+        sensitivity_array_dict, universal_parameters, project_site_s
+    )
+    experiment_number, experiment = next(experiment_s)
+    assert (
+        experiment_number == 1 and experiment[PV_COST_INVESTMENT] == 1000
+    ), f"The first experiment should vary {PV_COST_INVESTMENT} to 1000."
+    remaining_experiment_s = [entry for entry in experiment_s]
+    assert (
+        len(remaining_experiment_s) == 3
+    ), f"There should be four experiments including the base case, but there are {len(remaining_experiment_s) + 1}."
+
+
+def test_share_timeseries_references_timeseries_of_project_site():
+    project_site = {DEMAND_AC: pd.Series([1.0, 2.0, 3.0]), WACC: [0.05]}
+    experiment_1 = C.share_timeseries(project_site)
+    experiment_2 = C.share_timeseries(project_site)
+    assert (
+        experiment_1[DEMAND_AC] is experiment_2[DEMAND_AC]
+    ), f"All experiments should reference the same timeseries of the project site."
+    assert (
+        experiment_1[WACC] is not project_site[WACC]
+    ), f"Parameters other than timeseries should be copied."
+
+
+def test_share_timeseries_read_only():
+    experiment = C.share_timeseries({DEMAND_AC: pd.Series([1.0, 2.0, 3.0])})
+    with pytest.raises(ValueError):
+        experiment[DEMAND_AC][0] = 5.0
+
+
+def test_latin_hypercube_one_sample_per_interval():
+    unit_samples = C.latin_hypercube(10, 3, np.random.default_rng(1))
+    assert unit_samples.shape == (10, 3), f"10 samples of 3 parameters should be drawn."
+    for dimension in range(3):
+        intervals = sorted((unit_samples[:, dimension] * 10).astype(int))
+        assert intervals == list(
+            range(10)
+        ), f"Each interval should contain exactly one sample, but samples are in intervals {intervals}."
+
+
+def test_get_samples_on_grid_without_duplicates():
+    sensitivity_array_dict = {
+        PV_COST_INVESTMENT: np.arange(1000, 1300, 100),
+        WACC: np.array([0.05]),
+    }
+    settings = {
+        SENSITIVITY_SAMPLING: LATIN_HYPERCUBE,
+        SENSITIVITY_SAMPLE_SIZE: 10,
+        SENSITIVITY_SAMPLING_SEED: 1,
+        SURROGATE_MODEL: False,
+    }
+    sample_s = C.get_samples(settings, sensitivity_array_dict)
+    values = sorted(sample[PV_COST_INVESTMENT] for sample in sample_s)
+    assert values == [
+        1000,
+        1100,
+        1200,
+    ], f"Samples should take each value of the grid once, but take {values}."
+    assert all(
+        sample[WACC] == 0.05 for sample in sample_s
+    ), f"Parameters with a single value should always take this value."
+
+
+def test_logged_sampling_seed_reproduces_samples():
+    sensitivity_array_dict = {
+        PV_COST_INVESTMENT: np.arange(1000, 2000, 10),
+        WACC: np.arange(0.05, 0.15, 0.001),
+    }
+    settings = {
+        SENSITIVITY_SAMPLING: LATIN_HYPERCUBE,
+        SENSITIVITY_SAMPLE_SIZE: 10,
+        SENSITIVITY_SAMPLING_SEED: None,
+        SURROGATE_MODEL: False,
+    }
+    sample_s = C.get_samples(settings, sensitivity_array_dict)
+    # The input file stores the seed as float
+    settings.update(
+        {SENSITIVITY_SAMPLING_SEED: float(settings[SENSITIVITY_SAMPLING_SEED])}
+    )
+    exp = C.get_samples(settings, sensitivity_array_dict)
+    assert (
+        sample_s == exp
+    ), f"The drawn seed, read from the input file as float, should reproduce the samples."
+
+
+def test_get_refinement_samples_where_lcoe_changes_most():
+    sensitivity_array_dict = {
+        PV_COST_INVESTMENT: np.arange(1000, 1900, 100),
+        WACC: np.array([0.05, 0.15]),
+    }
+    pv_cost_investment = [1000, 1400, 1800, 1000, 1400, 1800]
+    result_store = {
+        CASE: ["base_oem"] * 6,
+        PROJECT_SITE_NAME: ["site_1"] * 6,
+        PV_COST_INVESTMENT: pv_cost_investment,
+        WACC: [0.05, 0.05, 0.05, 0.15, 0.15, 0.15],
+        # LCOE only changes steeply between 1400 and 1800
+        LCOE: [0.30, 0.31, 0.60, 0.30, 0.31, 0.60],
+    }
+    sample_s = C.get_refinement_samples(sensitivity_array_dict, result_store, 2)
+    values = sorted((sample[PV_COST_INVESTMENT], sample[WACC]) for sample in sample_s)
+    assert values == [
+        (1600, 0.05),
+        (1600, 0.15),
+    ], f"New samples should be between 1400 and 1800, but are {values}."
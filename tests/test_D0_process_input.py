@@ -0,0 +1,122 @@
+import pytest
+import numpy as np
+import pandas as pd
+import src.D0_process_input as D0
+
+from src.constants import (
+    PERFORM_SIMULATION,
+    BASED_ON_CASE,
+    CAPACITY_STORAGE_KWH,
+    CAPACITY_GENSET_KW,
+    CAPACITY_PV_KWP,
+    CAPACITY_PCC_CONSUMPTION_KW,
+    CAPACITY_PCC_FEEDING_KW,
+    CAPACITY_WIND_KW,
+    CAPACITY_RECTIFIER_AC_DC_KW,
+    CAPACITY_INVERTER_DC_AC_KW,
+    OEM,
+    PEAK_DEMAND,
+    DEMAND_AC,
+    DEMAND_DC,
+    FILE_INDEX,
+    DEMAND_PROFILE_AC,
+)
+
+
+def case_definition(capacity, based_on_case, perform_simulation=True):
+    return {
+        PERFORM_SIMULATION: perform_simulation,
+        BASED_ON_CASE: based_on_case,
+        CAPACITY_STORAGE_KWH: capacity,
+        CAPACITY_GENSET_KW: PEAK_DEMAND,
+        CAPACITY_PV_KWP: capacity,
+        CAPACITY_PCC_CONSUMPTION_KW: None,
+        CAPACITY_PCC_FEEDING_KW: None,
+        CAPACITY_WIND_KW: 0,
+        CAPACITY_RECTIFIER_AC_DC_KW: capacity,
+        CAPACITY_INVERTER_DC_AC_KW: capacity,
+    }
+
+
+CASE_DEFINITIONS = {
+    "dispatch_a": case_definition("base_oem", True),
+    "base_oem": case_definition(OEM, False),
+    "dispatch_b": case_definition("base_oem", True),
+    "dispatch_of_a": case_definition("dispatch_a", True),
+    "not_simulated": case_definition(OEM, False, perform_simulation=False),
+}
+
+
+def test_get_case_dependencies():
+    case_dependencies = D0.get_case_dependencies(CASE_DEFINITIONS)
+    exp = {
+        "dispatch_a": ["base_oem"],
+        "base_oem": [],
+        "dispatch_b": ["base_oem"],
+        "dispatch_of_a": ["dispatch_a"],
+    }
+    assert (
+        case_dependencies == exp
+    ), f"The case dependencies should be {exp}, but are {case_dependencies}."
+
+
+def test_list_of_cases_base_cases_first():
+    case_list = D0.list_of_cases(CASE_DEFINITIONS)
+    exp = ["base_oem", "dispatch_a", "dispatch_b", "dispatch_of_a"]
+    assert (
+        case_list == exp
+    ), f"Cases should be simulated in order {exp}, but the order is {case_list}."
+
+
+def test_get_case_dependencies_circular_reference_exits():
+    case_definitions = {
+        "case_a": case_definition("case_b", True),
+        "case_b": case_definition("case_a", True),
+    }
+    with pytest.raises(SystemExit):
+        D0.get_case_dependencies(case_definitions)
+
+
+def test_get_case_dependencies_base_case_not_simulated_exits():
+    case_definitions = {
+        "case_a": case_definition("not_simulated", True),
+        "not_simulated": case_definition(OEM, False, perform_simulation=False),
+    }
+    with pytest.raises(SystemExit):
+        D0.get_case_dependencies(case_definitions)
+
+
+def test_scaled_unscaled_profile_not_copied():
+    demand = pd.Series([1.0, 2.0, 3.0])
+    assert (
+        D0.scaled(demand, 1) is demand
+    ), f"Unscaled demand profiles should not be copied."
+
+
+def test_scaled():
+    demand = pd.Series([1.0, 2.0, 3.0])
+    scaled_demand = D0.scaled(demand, 2)
+    assert list(scaled_demand) == [
+        2.0,
+        4.0,
+        6.0,
+    ], f"The demand should be scaled to [2.0, 4.0, 6.0], but is {list(scaled_demand)}."
+    assert list(demand) == [
+        1.0,
+        2.0,
+        3.0,
+    ], f"Scaling should not change the timeseries of the project site."
+
+
+def test_without_site_timeseries():
+    experiment = {
+        DEMAND_AC: pd.Series(np.zeros(8760)),
+        DEMAND_DC: pd.Series(np.zeros(8760)),
+        FILE_INDEX: None,
+        DEMAND_PROFILE_AC: pd.Series(np.zeros(24)),
+    }
+    keys = list(D0.without_site_timeseries(experiment).keys())
+    assert keys == [
+        DEMAND_PROFILE_AC
+    ], f"Only {[DEMAND_PROFILE_AC]} should be kept, but {keys} are."
+    assert DEMAND_AC in experiment, f"The experiment itself should not be changed."
@@ -0,0 +1,193 @@
+import pytest
+import numpy as np
+import pandas as pd
+import oemof.solph as solph
+import src.D2_typical_days as D2
+import src.G0_oemof_simulate as G0
+
+from src.constants import (
+    TYPICAL_DAYS,
+    TIMESTEP_WEIGHTS,
+    DATE_TIME_INDEX,
+    TIME_START,
+    TIME_FREQUENCY,
+    DEMAND_PROFILE_AC,
+    DEMAND_PROFILE_DC,
+    PV_GENERATION_PER_KWP,
+    WIND_GENERATION_PER_KW,
+    GRID_AVAILABILITY,
+    ACCUMULATED_PROFILE_AC_SIDE,
+    TOTAL_DEMAND_AC,
+    CASE_NAME,
+    PV_FIXED_CAPACITY,
+    GENSET_FIXED_CAPACITY,
+    STORAGE_FIXED_CAPACITY,
+    CAPACITY_PV_KWP,
+    CAPACITY_STORAGE_KWH,
+    PV_BATCH,
+    META,
+    FIXED_CAPACITIES_OF_TYPICAL_DAYS,
+)
+
+# Days 0, 2 and 4 are equal, days 1 and 3 are equal, day 5 has the peak demand
+DAILY_DEMAND = [1, 2, 1, 2, 1, 3]
+
+
+def experiment_of_days(daily_demand, steps_per_day=24):
+    index = pd.date_range(
+        "2018-01-01", periods=len(daily_demand) * steps_per_day, freq="H"
+    )
+    demand = pd.Series(np.repeat(daily_demand, steps_per_day), index=index)
+    return {
+        TYPICAL_DAYS: 3,
+        DATE_TIME_INDEX: index,
+        TIME_START: index[0],
+        TIME_FREQUENCY: "H",
+        DEMAND_PROFILE_AC: demand,
+        DEMAND_PROFILE_DC: demand * 0,
+        PV_GENERATION_PER_KWP: pd.Series(np.zeros(len(index)), index=index),
+        WIND_GENERATION_PER_KW: pd.Series(np.zeros(len(index)), index=index),
+        GRID_AVAILABILITY: pd.Series(np.ones(len(index)), index=index),
+        ACCUMULATED_PROFILE_AC_SIDE: demand,
+    }
+
+
+CASE_DICT = {
+    CASE_NAME: "oem",
+    PV_FIXED_CAPACITY: False,
+    GENSET_FIXED_CAPACITY: False,
+    STORAGE_FIXED_CAPACITY: None,
+}
+for name in D2.FIXED_CAPACITIES:
+    CASE_DICT.setdefault(name, None)
+
+
+def test_get_steps_per_day():
+    index = pd.date_range("2018-01-01", periods=96 * 2, freq="15min")
+    steps_per_day = D2.get_steps_per_day(index)
+    assert (
+        steps_per_day == 96
+    ), f"A day of 15 minute timesteps should have 96 steps, but has {steps_per_day}."
+    assert (
+        D2.get_steps_per_day(index[:-1]) is None
+    ), f"A timeframe of incomplete days should not be aggregated."
+
+
+def test_cluster_days_groups_equal_days():
+    daily_profiles = np.array(DAILY_DEMAND, dtype=float)[:, np.newaxis]
+    typical_days, cluster_of_day = D2.cluster_days(daily_profiles, 3, fixed_days=[5])
+    assert list(typical_days) == [
+        0,
+        1,
+        5,
+    ], f"The first day of each group should be a typical day, but typical days are {list(typical_days)}."
+    assert list(cluster_of_day) == [
+        0,
+        1,
+        0,
+        1,
+        0,
+        2,
+    ], f"Equal days should be represented by the same typical day, but clusters are {list(cluster_of_day)}."
+
+
+def test_cluster_days_keeps_fixed_days():
+    daily_profiles = np.array(DAILY_DEMAND, dtype=float)[:, np.newaxis]
+    typical_days, _ = D2.cluster_days(daily_profiles, 1, fixed_days=[3])
+    assert list(typical_days) == [
+        3
+    ], f"Fixed days should always be typical days, but typical days are {list(typical_days)}."
+
+
+def test_aggregate_weights_represent_all_days():
+    experiment = experiment_of_days(DAILY_DEMAND)
+    aggregated_experiment, aggregated_case_dict, timestep_positions = D2.aggregate(
+        experiment, CASE_DICT
+    )
+    assert (
+        len(aggregated_experiment[DATE_TIME_INDEX]) == 3 * 24
+    ), f"The model of 3 typical days should have {3 * 24} timesteps."
+    assert (
+        aggregated_experiment[TIMESTEP_WEIGHTS].sum() == 6 * 24
+    ), f"The weights of the typical days should represent all {6 * 24} timesteps."
+    total_demand = (
+        aggregated_experiment[DEMAND_PROFILE_AC].values
+        * aggregated_experiment[TIMESTEP_WEIGHTS]
+    ).sum()
+    assert total_demand == experiment[DEMAND_PROFILE_AC].sum(), (
+        f"The weighted demand of the typical days should be the demand of the timeframe "
+        f"{experiment[DEMAND_PROFILE_AC].sum()}, but is {total_demand}."
+    )
+    assert aggregated_case_dict[TOTAL_DEMAND_AC] == 6 * 24, (
+        f"The total demand of the case should be the demand of the typical days {6 * 24}, "
+        f"but is {aggregated_case_dict[TOTAL_DEMAND_AC]}."
+    )
+    assert np.array_equal(
+        aggregated_experiment[DEMAND_PROFILE_AC].values[timestep_positions],
+        experiment[DEMAND_PROFILE_AC].values,
+    ), f"Each timestep should be represented by the same timestep of its typical day."
+    assert (
+        DATE_TIME_INDEX in experiment and len(experiment[DATE_TIME_INDEX]) == 6 * 24
+    ), f"The experiment itself should not be changed."
+
+
+def test_uses_typical_days_only_with_optimized_capacities():
+    experiment = experiment_of_days(DAILY_DEMAND)
+    assert D2.uses_typical_days(
+        experiment, CASE_DICT
+    ), f"Capacities should be optimized on typical days."
+    dispatch_case_dict = dict(CASE_DICT, **{PV_FIXED_CAPACITY: 10.0})
+    dispatch_case_dict.update({GENSET_FIXED_CAPACITY: 10.0})
+    assert not D2.uses_typical_days(
+        experiment, dispatch_case_dict
+    ), f"The dispatch of fixed capacities should not be simulated on typical days."
+    experiment.update({TYPICAL_DAYS: 6})
+    assert not D2.uses_typical_days(
+        experiment, CASE_DICT
+    ), f"A timeframe with as many days as typical days should not be aggregated."
+
+
+def test_uses_typical_days_invalid_number_exits():
+    experiment = experiment_of_days(DAILY_DEMAND)
+    experiment.update({TYPICAL_DAYS: 2.5})
+    with pytest.raises(SystemExit):
+        D2.uses_typical_days(experiment, CASE_DICT)
+
+
+def test_with_fixed_capacities_rounded_to_batches():
+    capacities = {name: 0 for name, _ in D2.FIXED_CAPACITIES.values()}
+    capacities.update({CAPACITY_PV_KWP: 10.2, CAPACITY_STORAGE_KWH: 5.0})
+    experiment = {batch: 1 for _, batch in D2.FIXED_CAPACITIES.values()}
+    experiment.update({PV_BATCH: 5})
+    fixed_case_dict = D2.with_fixed_capacities(experiment, CASE_DICT, capacities)
+    assert (
+        fixed_case_dict[PV_FIXED_CAPACITY] == 15.0
+    ), f"Optimized capacities should be rounded up to their batch, but pv capacity is {fixed_case_dict[PV_FIXED_CAPACITY]}."
+    assert (
+        fixed_case_dict[GENSET_FIXED_CAPACITY] is None
+    ), f"Components without capacity should not be included in the dispatch."
+    assert (
+        fixed_case_dict[STORAGE_FIXED_CAPACITY] is None
+    ), f"Capacities not optimized in the case should not be changed."
+
+
+def test_restored_results_are_evaluated_with_capacities_of_typical_days():
+    experiment = experiment_of_days(DAILY_DEMAND)
+    fixed_capacities = {name: None for name in D2.FIXED_CAPACITIES}
+    fixed_capacities.update({PV_FIXED_CAPACITY: 15.0})
+    micro_grid_system = solph.EnergySystem()
+    micro_grid_system.results = {
+        META: {FIXED_CAPACITIES_OF_TYPICAL_DAYS: fixed_capacities}
+    }
+    fixed_case_dict = G0.get_restored_capacities_of_typical_days(
+        experiment, CASE_DICT, micro_grid_system
+    )
+    assert (
+        fixed_case_dict[PV_FIXED_CAPACITY] == 15.0
+    ), f"The capacities stored with the results should be fixed, but pv capacity is {fixed_case_dict[PV_FIXED_CAPACITY]}."
+    assert not D2.uses_typical_days(
+        experiment, fixed_case_dict
+    ), f"No capacity should be optimized on typical days again."
+    assert (
+        CASE_DICT[PV_FIXED_CAPACITY] is False
+    ), f"The case itself should not be changed."
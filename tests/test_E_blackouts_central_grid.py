@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+import src.E_blackouts_central_grid as E
+
+from src.constants import (
+    MAX_DATE_TIME_INDEX,
+    MAX_EVALUATED_DAYS,
+    BLACKOUT_SEED,
+    BLACKOUT_DURATION,
+    BLACKOUT_FREQUENCY,
+    BLACKOUT_FREQUENCY_STD_DEVIATION,
+    BLACKOUT_REALIZATIONS,
+    CASE,
+    LCOE,
+    SUFFIX_P10,
+    SUFFIX_P90,
+    GRID_RELIABILITY,
+    GRID_TOTAL_BLACKOUT_DURATION,
+    GRID_NUMBER_OF_BLACKOUTS,
+)
+
+
+def test_availability_matrix():
+    grid_availability = E.availability_matrix(
+        10,
+        [np.array([1, 3, 8]), np.array([], dtype=int)],
+        [np.array([1.0, 2.0, 5.0]), np.array([])],
+    )
+    exp = np.array([[1, 0, 1, 0, 0, 1, 1, 1, 0, 0], [1] * 10])
+    assert np.array_equal(
+        grid_availability, exp
+    ), f"The grid availability should be {exp}, but is {grid_availability}."
+
+
+def test_availability_matrix_overlapping_blackouts():
+    grid_availability = E.availability_matrix(
+        8, [np.array([0, 2, 3])], [np.array([4.0, 1.0, 3.0])]
+    )
+    exp = np.array([[0, 0, 0, 0, 0, 0, 1, 1]])
+    assert np.array_equal(
+        grid_availability, exp
+    ), f"Overlapping blackouts should result in one blackout {exp}, but the availability is {grid_availability}."
+
+
+def test_availability_matrix_blackout_lasts_at_least_one_timestep():
+    grid_availability = E.availability_matrix(4, [np.array([1])], [np.array([0.2])])
+    exp = np.array([[1, 0, 1, 1]])
+    assert np.array_equal(
+        grid_availability, exp
+    ), f"A blackout event should last at least one timestep, but the availability is {grid_availability}."
+
+
+def test_get_overlapping_blackouts():
+    overlapping_blackouts = E.get_overlapping_blackouts(
+        np.array([0, 2, 3, 7]), np.array([4.0, 1.0, 3.0, 1.0]), 1
+    )
+    assert (
+        overlapping_blackouts == 2
+    ), f"Two blackout events start during another one, not {overlapping_blackouts}."
+
+
+def test_count_blackouts():
+    number_of_blackouts = E.count_blackouts(
+        np.array([[0, 0, 1, 0, 1, 1], [1, 1, 1, 1, 1, 0]])
+    )
+    assert np.array_equal(
+        number_of_blackouts, [2, 1]
+    ), f"The number of blackouts should be [2, 1], but is {number_of_blackouts}."
+
+
+def test_oemof_extension_for_blackouts():
+    blackout_result = E.oemof_extension_for_blackouts(
+        pd.Series([0, 1, 1, 0, 0, 1, 1, 1, 0, 1])
+    )
+    exp = {
+        GRID_RELIABILITY: 0.6,
+        GRID_TOTAL_BLACKOUT_DURATION: 4,
+        GRID_NUMBER_OF_BLACKOUTS: 3,
+    }
+    assert (
+        blackout_result == exp
+    ), f"The blackout results should be {exp}, but are {blackout_result}."
+
+
+def test_get_random_generator_reproducible():
+    random_values = E.get_random_generator(42, "blackout_experiment").normal(size=5)
+    exp = E.get_random_generator(42, "blackout_experiment").normal(size=5)
+    assert np.array_equal(
+        random_values, exp
+    ), f"Equal seed and experiment name should result in the same random values."
+
+
+def test_get_random_generator_depends_on_experiment_name():
+    random_values = E.get_random_generator(42, "blackout_experiment_a").normal(size=5)
+    other = E.get_random_generator(42, "blackout_experiment_b").normal(size=5)
+    assert not np.array_equal(
+        random_values, other
+    ), f"Blackout experiments should not have the same random values."
+
+
+SETTINGS = {
+    MAX_DATE_TIME_INDEX: pd.date_range("2020-01-01", periods=24 * 30, freq="H"),
+    MAX_EVALUATED_DAYS: 30,
+    BLACKOUT_SEED: 42,
+}
+BLACKOUT_EXPERIMENT = {
+    BLACKOUT_DURATION: 3,
+    BLACKOUT_FREQUENCY: 5,
+    BLACKOUT_FREQUENCY_STD_DEVIATION: 0.2,
+}
+
+
+def test_get_ensemble_realizations_reproducible():
+    realizations = E.get_ensemble_realizations(
+        SETTINGS, BLACKOUT_EXPERIMENT, "blackout_experiment", 1, 3
+    )
+    exp = E.get_ensemble_realizations(
+        SETTINGS, BLACKOUT_EXPERIMENT, "blackout_experiment", 2, 1
+    )
+    assert realizations[1].equals(
+        exp[0]
+    ), f"A realization should not depend on the other realizations generated."
+    assert not realizations[0].equals(
+        realizations[1]
+    ), f"Realizations of a blackout ensemble should differ."
+
+
+def test_logged_seed_reproduces_realizations():
+    settings = dict(SETTINGS, **{BLACKOUT_SEED: None})
+    realizations = E.get_ensemble_realizations(
+        settings, BLACKOUT_EXPERIMENT, "blackout_experiment", 1, 2
+    )
+    # The input file stores the seed as float
+    settings.update({BLACKOUT_SEED: float(settings[BLACKOUT_SEED])})
+    exp = E.get_ensemble_realizations(
+        settings, BLACKOUT_EXPERIMENT, "blackout_experiment", 1, 2
+    )
+    for realization, exp_realization in zip(realizations, exp):
+        assert realization.equals(
+            exp_realization
+        ), f"The drawn seed, read from the input file as float, should reproduce the grid availability."
+
+
+def test_aggregate_ensemble_results():
+    oemof_results_s = [[{CASE: "case", LCOE: float(lcoe)}] for lcoe in range(1, 11)]
+    ensemble_results = E.aggregate_ensemble_results(oemof_results_s)[0]
+    exp = {
+        BLACKOUT_REALIZATIONS: 10,
+        CASE: "case",
+        LCOE: 5.5,
+        LCOE + SUFFIX_P10: 1.9,
+        LCOE + SUFFIX_P90: 9.1,
+    }
+    assert (
+        ensemble_results == exp
+    ), f"The aggregated results should be {exp}, but are {ensemble_results}."
+
+
+def test_ensemble_converged():
+    stable = [[{LCOE: 0.3 + 0.0001 * number}] for number in range(5)]
+    unstable = [[{LCOE: 0.3 + 0.1 * number}] for number in range(5)]
+    assert (
+        E.ensemble_converged(stable, 0.01) is True
+    ), f"An ensemble with a narrow confidence interval should be converged."
+    assert (
+        E.ensemble_converged(unstable, 0.01) is False
+    ), f"An ensemble with a wide confidence interval should not be converged."
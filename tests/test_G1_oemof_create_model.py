@@ -0,0 +1,306 @@
+import os
+import gc
+import weakref
+import pandas as pd
+import pyomo.environ as po
+import oemof.solph as solph
+from pytest import approx
+from pyomo.opt import SolverFactory
+from pyomo.solvers.plugins.solvers.persistent_solver import PersistentSolver
+import src.B_read_from_files as B
+import src.C_sensitivity_experiments as C
+import src.E_blackouts_central_grid as E
+import src.F_case_definitions as F
+import src.G1_oemof_create_model as G1
+import src.cli as cli
+
+from src.constants import (
+    MAIN,
+    META,
+    OBJECTIVE,
+    SCALARS,
+    PV_COST_INVESTMENT,
+    NECESSITY_FOR_BLACKOUT_TIMESERIES_GENERATION,
+    SOLVER,
+    CMDLINE_OPTION,
+    CMDLINE_OPTION_VALUE,
+    SAVE_OEMOFRESULTS,
+    OUTPUT_FOLDER,
+    OEMOF_FOLDER,
+)
+
+# Case of the test input file in which all capacities are optimized
+CASE = "pv-diesel-mg"
+
+
+def get_experiments_of_test_input():
+    """
+    Sensitivity experiments of the test input file including their timeseries,
+    and the definition of CASE for each experiment
+    """
+    (
+        settings,
+        parameters_constant_values,
+        parameters_sensitivity,
+        project_site_s,
+        case_definitions,
+        _,
+    ) = B.process_excel_file(os.path.join("tests", "inputs", "pytest_test.xlsx"))
+    sensitivity_experiment_s, blackout_experiment_s, *_ = C.get(
+        settings, parameters_constant_values, parameters_sensitivity, project_site_s
+    )
+    sensitivity_grid_availability = None
+    if settings[NECESSITY_FOR_BLACKOUT_TIMESERIES_GENERATION] is True:
+        sensitivity_grid_availability, _ = E.get_blackouts(
+            settings, blackout_experiment_s
+        )
+    experiment_s = [
+        experiment
+        for _, experiment in cli.prepare_experiments(
+            sensitivity_experiment_s, sensitivity_grid_availability, [], settings
+        )
+    ]
+    case_dict_s = [
+        F.update_dict({}, case_definitions[CASE], experiment)
+        for experiment in experiment_s
+    ]
+    return experiment_s, case_dict_s
+
+
+def get_capacities(micro_grid_system):
+    """
+    Optimized capacities of all flows and storages with investment
+    """
+    return {
+        (str(source), str(target)): results[SCALARS]["invest"]
+        for (source, target), results in micro_grid_system.results[MAIN].items()
+        if "invest" in results[SCALARS]
+    }
+
+
+def get_energy_system(startup_costs, variable_costs=1):
+    """
+    Generator with startup costs that supplies a demand, which requires two startups
+    """
+    micro_grid_system = solph.EnergySystem(
+        timeindex=pd.date_range("2020-01-01", periods=4, freq="H")
+    )
+    bus = solph.Bus(label="bus")
+    genset = solph.Source(
+        label="genset",
+        outputs={
+            bus: solph.Flow(
+                nominal_value=10,
+                min=0.2,
+                variable_costs=variable_costs,
+                nonconvex=solph.NonConvex(startup_costs=startup_costs),
+            )
+        },
+    )
+    demand = solph.Sink(
+        label="demand", inputs={bus: solph.Flow(fix=[0, 5, 0, 5], nominal_value=1)}
+    )
+    micro_grid_system.add(bus, genset, demand)
+    return micro_grid_system
+
+
+def test_solvers_with_persistent_interface():
+    for solver in G1.SOLVERS_WITH_PERSISTENT_INTERFACE:
+        solver_interface = SolverFactory(solver + "_persistent")
+        assert isinstance(
+            solver_interface, PersistentSolver
+        ), f"Pyomo does not provide a persistent interface for solver {solver}."
+
+
+def get_cbc_as_persistent_solver():
+    """
+    Stands in for the persistent interface of a solver that is not installed, it records
+    the options and the calls of solve_persistent() and solves the instance with cbc
+    """
+    solver = SolverFactory("cbc")
+    solver.instance = None
+    solver.calls = []
+
+    def set_instance(model):
+        solver.instance = model
+        solver.calls.append("set_instance")
+
+    def set_objective(objective):
+        solver.calls.append("set_objective")
+
+    def solve(**solve_kwargs):
+        return SolverFactory("cbc").solve(solver.instance, **solve_kwargs)
+
+    solver.set_instance = set_instance
+    solver.set_objective = set_objective
+    solver.solve = solve
+    return solver
+
+
+def test_persistent_solver_options():
+    for solver in G1.SOLVERS_WITH_PERSISTENT_INTERFACE:
+        options = G1.get_persistent_solver_options(
+            {SOLVER: solver, CMDLINE_OPTION: "ratioGap", CMDLINE_OPTION_VALUE: 0.01}
+        )
+        assert options == {
+            G1.PERSISTENT_SOLVER_OPTIONS[solver]["ratioGap"]: 0.01
+        }, f"The relative gap of cbc should be passed to {solver} as its own parameter, but the options are {options}."
+
+
+def test_persistent_solver_options_ignores_unknown_option():
+    options = G1.get_persistent_solver_options(
+        {SOLVER: "gurobi", CMDLINE_OPTION: "seconds", CMDLINE_OPTION_VALUE: 60}
+    )
+    assert (
+        options == {}
+    ), f"A cbc option unknown to gurobi should be ignored, but the options are {options}."
+
+
+def test_solve_persistent(monkeypatch):
+    solver = get_cbc_as_persistent_solver()
+    monkeypatch.setattr(G1, "SolverFactory", lambda solver_name: solver)
+    experiment = {SOLVER: "gurobi", CMDLINE_OPTION: "ratioGap", CMDLINE_OPTION_VALUE: 0}
+    model = solph.Model(get_energy_system(startup_costs=100))
+    G1.PERSISTENT_SOLVERS.clear()
+    G1.solve_persistent(experiment, model, {}, "case")
+    G1.solve_persistent(experiment, model, {}, "case")
+    G1.PERSISTENT_SOLVERS.clear()
+    assert solver.calls == [
+        "set_instance",
+        "set_objective",
+    ], f"The solver instance should be kept for the second solve of the case, but the calls are {solver.calls}."
+    assert solver.options == {
+        "MIPGap": 0
+    }, f"Only the gurobi parameter of the relative gap should be set, but the options are {solver.options}."
+
+    fresh_model = solph.Model(get_energy_system(startup_costs=100))
+    fresh_model.solve(solver="cbc")
+    assert po.value(model.objective) == approx(
+        po.value(fresh_model.objective)
+    ), f"The model solved with the persistent interface should find the optimum ({po.value(fresh_model.objective)}), but found {po.value(model.objective)}."
+
+
+def test_update_costs_of_nonconvex_flow():
+    micro_grid_system = get_energy_system(startup_costs=100)
+    model = solph.Model(micro_grid_system)
+    G1.update_costs(micro_grid_system, model, get_energy_system(startup_costs=200))
+    model.solve(solver="cbc")
+
+    fresh_model = solph.Model(get_energy_system(startup_costs=200))
+    fresh_model.solve(solver="cbc")
+    assert po.value(model.objective) == approx(
+        po.value(fresh_model.objective)
+    ), f"The objective of the re-used model should include the updated startup costs (objective {po.value(fresh_model.objective)}), but is {po.value(model.objective)}."
+
+
+def test_reuse_or_build_equals_fresh_build():
+    experiment_s, case_dict_s = get_experiments_of_test_input()
+    assert (
+        experiment_s[0][PV_COST_INVESTMENT] != experiment_s[1][PV_COST_INVESTMENT]
+    ), f"The experiments of the test input file should differ in their costs."
+
+    G1.BUILT_MODELS.clear()
+    first_micro_grid_system, first_model = G1.reuse_or_build(
+        experiment_s[0], case_dict_s[0]
+    )
+    G1.simulate(experiment_s[0], first_micro_grid_system, first_model, "first")
+    micro_grid_system, model = G1.reuse_or_build(experiment_s[1], case_dict_s[1])
+    assert (
+        model is first_model
+    ), f"The model of the first experiment should be re-used for an experiment only differing in costs."
+    micro_grid_system = G1.simulate(experiment_s[1], micro_grid_system, model, "reused")
+
+    fresh_micro_grid_system, fresh_model = G1.build(experiment_s[1], case_dict_s[1])
+    fresh_micro_grid_system = G1.simulate(
+        experiment_s[1], fresh_micro_grid_system, fresh_model, "fresh"
+    )
+    G1.BUILT_MODELS.clear()
+
+    assert micro_grid_system.results[META][OBJECTIVE] == approx(
+        fresh_micro_grid_system.results[META][OBJECTIVE]
+    ), f"The objective of the re-used model ({micro_grid_system.results[META][OBJECTIVE]}) should equal the objective of a new model ({fresh_micro_grid_system.results[META][OBJECTIVE]})."
+    capacities = get_capacities(micro_grid_system)
+    fresh_capacities = get_capacities(fresh_micro_grid_system)
+    for flow, capacity in fresh_capacities.items():
+        assert capacities[flow] == approx(
+            capacity, abs=1e-6
+        ), f"The capacity of {flow} of the re-used model ({capacities[flow]}) should equal the capacity of a new model ({capacity})."
+
+
+def test_warm_start_from_nearest_solved_experiment():
+    G1.WARM_START_SOLUTIONS.clear()
+    for value in [1, 2]:
+        model = solph.Model(get_energy_system(startup_costs=100))
+        for variable in model.component_data_objects(po.Var):
+            variable.value = value
+        G1.store_warm_start_solution({"parameter": value}, model, "case")
+
+    model = solph.Model(get_energy_system(startup_costs=100))
+    warm_started = G1.warm_start({"parameter": 1.8, SOLVER: "cbc"}, model, "case")
+    G1.WARM_START_SOLUTIONS.clear()
+    assert warm_started is True, f"CBC should be warm started."
+    values = {
+        variable.value
+        for variable in model.component_data_objects(po.Var)
+        if variable.fixed is False
+    }
+    assert values == {
+        2
+    }, f"The variables should be initialized with the solution of the nearest experiment (2), but are {values}."
+
+
+def test_warm_started_solve_equals_cold_solve():
+    model = solph.Model(get_energy_system(startup_costs=100))
+    model.solve(solver="cbc")
+    G1.WARM_START_SOLUTIONS.clear()
+    G1.store_warm_start_solution({"parameter": 1}, model, "case")
+
+    warm_model = solph.Model(get_energy_system(startup_costs=100))
+    assert G1.warm_start({"parameter": 1, SOLVER: "cbc"}, warm_model, "case") is True
+    G1.WARM_START_SOLUTIONS.clear()
+    warm_model.solve(solver="cbc", solve_kwargs={"warmstart": True})
+    assert po.value(warm_model.objective) == approx(
+        po.value(model.objective)
+    ), f"A warm started solve should find the optimum ({po.value(model.objective)}), but found {po.value(warm_model.objective)}."
+
+
+def store_results_of_energy_systems(tmpdir, number_of_systems):
+    """
+    Stores the (empty) results of new energy systems in the background to tmpdir
+    """
+    os.mkdir(str(tmpdir) + OEMOF_FOLDER)
+    experiment = {SAVE_OEMOFRESULTS: True, OUTPUT_FOLDER: str(tmpdir)}
+    for number in range(number_of_systems):
+        micro_grid_system = get_energy_system(startup_costs=100)
+        micro_grid_system.results = {}
+        G1.store_results_in_background(
+            experiment, micro_grid_system, "system_" + str(number)
+        )
+    return micro_grid_system
+
+
+def test_stored_system_is_released(tmpdir):
+    micro_grid_system = store_results_of_energy_systems(tmpdir, 1)
+    stored_system = weakref.ref(micro_grid_system)
+    del micro_grid_system
+    for (_, thread) in G1.PENDING_STORES:
+        thread.join()
+    gc.collect()
+    assert (
+        stored_system() is None
+    ), f"The energy system should be released once its results are written."
+    G1.wait_for_stored_results()
+    assert G1.PENDING_STORES == []
+
+
+def test_number_of_pending_stores_is_bounded(tmpdir):
+    store_results_of_energy_systems(tmpdir, G1.MAX_PENDING_STORES + 3)
+    assert (
+        len(G1.PENDING_STORES) <= G1.MAX_PENDING_STORES
+    ), f"At most {G1.MAX_PENDING_STORES} results should be stored at once, but {len(G1.PENDING_STORES)} are pending."
+    G1.wait_for_stored_results()
+    stored_files = sorted(os.listdir(str(tmpdir) + OEMOF_FOLDER))
+    assert stored_files == [
+        "system_" + str(number) + ".oemof"
+        for number in range(G1.MAX_PENDING_STORES + 3)
+    ], f"The results of all energy systems should be stored, but the stored files are {stored_files}."
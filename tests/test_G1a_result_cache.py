@@ -0,0 +1,108 @@
+import os
+import time
+import pandas as pd
+import oemof.solph as solph
+import src.G1a_result_cache as G1a
+
+from src.constants import (
+    OUTPUT_FOLDER,
+    RESULT_CACHE_MAX_SIZE_MB,
+    MAIN,
+    FILENAME,
+    CASE_NAME,
+    DEMAND_PROFILE_AC,
+    PV_COST_INVESTMENT,
+)
+
+EXPERIMENT = {
+    FILENAME: "_experiment_1",
+    PV_COST_INVESTMENT: 1000,
+    DEMAND_PROFILE_AC: pd.Series(
+        [1.0, 2.0, 3.0], index=pd.date_range("2020-01-01", periods=3, freq="H")
+    ),
+}
+CASE_DICT = {CASE_NAME: "base_oem", FILENAME: "base_oem_experiment_1"}
+
+
+def test_get_key_identical_inputs():
+    key = G1a.get_key(EXPERIMENT, CASE_DICT)
+    experiment = EXPERIMENT.copy()
+    experiment.update({DEMAND_PROFILE_AC: EXPERIMENT[DEMAND_PROFILE_AC].copy()})
+    assert key == G1a.get_key(
+        experiment, CASE_DICT.copy()
+    ), f"Identical inputs should result in the same cache key."
+
+
+def test_get_key_independent_of_file_name():
+    experiment = EXPERIMENT.copy()
+    experiment.update({FILENAME: "_experiment_2"})
+    assert G1a.get_key(EXPERIMENT, CASE_DICT) == G1a.get_key(
+        experiment, CASE_DICT
+    ), f"The name of an experiment should not change its cache key."
+
+
+def test_get_key_changed_scalar():
+    experiment = EXPERIMENT.copy()
+    experiment.update({PV_COST_INVESTMENT: 1001})
+    assert G1a.get_key(EXPERIMENT, CASE_DICT) != G1a.get_key(
+        experiment, CASE_DICT
+    ), f"A changed parameter should result in a new cache key."
+
+
+def test_get_key_changed_timeseries():
+    experiment = EXPERIMENT.copy()
+    demand = EXPERIMENT[DEMAND_PROFILE_AC].copy()
+    demand[1] = 2.5
+    experiment.update({DEMAND_PROFILE_AC: demand})
+    assert G1a.get_key(EXPERIMENT, CASE_DICT) != G1a.get_key(
+        experiment, CASE_DICT
+    ), f"A changed timeseries should result in a new cache key."
+
+
+def test_evict_least_recently_used(tmpdir):
+    for number in range(3):
+        path = os.path.join(tmpdir, str(number) + ".oemof")
+        with open(path, "wb") as file:
+            file.write(b"0" * 1000)
+        os.utime(path, (time.time() + number, time.time() + number))
+    # use first file, so that the second one is the least recently used
+    os.utime(os.path.join(tmpdir, "0.oemof"), (time.time() + 5, time.time() + 5))
+    G1a.evict(str(tmpdir), 0.0025)
+    remaining = sorted(os.listdir(tmpdir))
+    assert remaining == [
+        "0.oemof",
+        "2.oemof",
+    ], f"Only the least recently used file should have been removed, but {remaining} remain."
+
+
+def test_get_key_ignore_costs():
+    experiment = EXPERIMENT.copy()
+    experiment.update({PV_COST_INVESTMENT: 1001})
+    assert G1a.get_key(EXPERIMENT, CASE_DICT, ignore_costs=True) == G1a.get_key(
+        experiment, CASE_DICT, ignore_costs=True
+    ), f"Changed costs should not change the key if costs are ignored."
+
+
+def test_is_cost_parameter():
+    assert G1a.is_cost_parameter(PV_COST_INVESTMENT) is True
+    assert (
+        G1a.is_cost_parameter(DEMAND_PROFILE_AC) is False
+    ), f"A timeseries is not a cost parameter."
+
+
+def test_dump_and_restore(tmpdir):
+    experiment = {OUTPUT_FOLDER: str(tmpdir), RESULT_CACHE_MAX_SIZE_MB: 1}
+    micro_grid_system = solph.EnergySystem()
+    micro_grid_system.results = {MAIN: {"flow": 1.0}}
+    G1a.dump(experiment, "key", micro_grid_system)
+    restored = G1a.restore(experiment, "key")
+    assert restored.results[MAIN] == {
+        "flow": 1.0
+    }, f"Results dumped to the cache should be restored, but {restored.results[MAIN]} were restored."
+
+
+def test_restore_not_in_cache(tmpdir):
+    experiment = {OUTPUT_FOLDER: str(tmpdir), RESULT_CACHE_MAX_SIZE_MB: 1}
+    assert (
+        G1a.restore(experiment, "missing_key") is None
+    ), f"Nothing should be restored for keys that are not in the cache."
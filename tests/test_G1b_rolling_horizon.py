@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+import src.G1b_rolling_horizon as G1b
+import src.G2a_oemof_busses_and_componets as G2a
+
+from src.constants import (
+    ROLLING_HORIZON,
+    ROLLING_HORIZON_OVERLAP,
+    STORAGE_BALANCED,
+    STORAGE_SOC_INITIAL,
+    DATE_TIME_INDEX,
+    DEMAND_PROFILE_AC,
+    DEMAND_PROFILE_DC,
+    PV_GENERATION_PER_KWP,
+    TOTAL_DEMAND_AC,
+    TOTAL_DEMAND_DC,
+    CASE_NAME,
+    PV_FIXED_CAPACITY,
+    TIMESERIES_ARRAYS,
+)
+
+
+def experiment_of_days(days, rolling_horizon=2, overlap=1):
+    index = pd.date_range("2018-01-01", periods=days * 24, freq="H")
+    demand = pd.Series(np.arange(len(index)), index=index, dtype=float)
+    return {
+        ROLLING_HORIZON: rolling_horizon,
+        ROLLING_HORIZON_OVERLAP: overlap,
+        STORAGE_SOC_INITIAL: None,
+        DATE_TIME_INDEX: index,
+        DEMAND_PROFILE_AC: demand,
+        DEMAND_PROFILE_DC: demand * 0,
+        PV_GENERATION_PER_KWP: pd.Series(np.ones(len(index)), index=index),
+    }
+
+
+CASE_DICT = {CASE_NAME: "dispatch"}
+for name in G1b.CASE_CAPACITIES:
+    CASE_DICT.update({name: None})
+
+
+def test_get_windows():
+    windows = G1b.get_windows(7, 3, 1)
+    assert windows == [
+        (0, 3, 4),
+        (3, 6, 7),
+        (6, 7, 7),
+    ], f"Windows of 7 timesteps, 3 kept and 1 overlapping timestep are {windows}"
+
+
+def test_get_windows_cover_timeframe_once():
+    windows = G1b.get_windows(100, 24, 12)
+    kept = [step for start, end_kept, end in windows for step in range(start, end_kept)]
+    assert kept == list(
+        range(100)
+    ), f"The kept timesteps of the windows do not cover each timestep exactly once."
+
+
+def test_is_balanced_only_last_window_without_overlap():
+    windows = G1b.get_windows(504, 168, 0)
+    balanced = [G1b.is_balanced(0.5, end_kept, 504) for start, end_kept, end in windows]
+    assert balanced == [
+        False,
+        False,
+        True,
+    ], f"Only the last window should be balanced, but windows are balanced {balanced}."
+    assert G1b.is_balanced(
+        None, 168, 504
+    ), f"A window without initial state of charge should be cyclic."
+
+
+def test_get_window_steps():
+    window_steps, overlap_steps = G1b.get_window_steps(experiment_of_days(7, 2, 0.5))
+    assert (window_steps, overlap_steps) == (
+        48,
+        12,
+    ), f"Windows of 2 days with an overlap of 0.5 days have {window_steps} and {overlap_steps} hourly timesteps instead of 48 and 12."
+
+
+def test_get_window_experiment():
+    experiment = experiment_of_days(7)
+    window_experiment, window_case_dict = G1b.get_window_experiment(
+        experiment, CASE_DICT, 24, 72, 0.6, False
+    )
+    assert window_experiment[DATE_TIME_INDEX].equals(
+        experiment[DATE_TIME_INDEX][24:72]
+    ), f"The timeframe of the window is not limited to its timesteps."
+    assert window_experiment[DEMAND_PROFILE_AC].equals(
+        experiment[DEMAND_PROFILE_AC][24:72]
+    ), f"The demand of the window is not limited to its timesteps."
+    assert (
+        window_experiment[STORAGE_SOC_INITIAL] == 0.6
+        and window_experiment[STORAGE_BALANCED] is False
+    ), f"The storage of the window has an initial SOC of {window_experiment[STORAGE_SOC_INITIAL]} and is balanced {window_experiment[STORAGE_BALANCED]}."
+    assert window_case_dict[TOTAL_DEMAND_AC] == sum(
+        range(24, 72)
+    ), f"The total demand of the window is {window_case_dict[TOTAL_DEMAND_AC]}."
+    assert (
+        experiment[STORAGE_SOC_INITIAL] is None and TOTAL_DEMAND_AC not in CASE_DICT
+    ), f"The experiment or case were changed by creating a window."
+
+
+def test_window_experiment_does_not_share_timeseries_arrays():
+    experiment = experiment_of_days(7)
+    G2a.get_timeseries(experiment, DEMAND_PROFILE_AC)
+    window_experiment, _ = G1b.get_window_experiment(
+        experiment, CASE_DICT, 24, 72, 0.6, False
+    )
+    window_demand = G2a.get_timeseries(window_experiment, DEMAND_PROFILE_AC)
+    assert (
+        len(window_demand) == 48
+    ), f"The demand of the window should have 48 timesteps, but has {len(window_demand)}."
+    assert (
+        len(experiment[TIMESERIES_ARRAYS][DEMAND_PROFILE_AC][1]) == 7 * 24
+    ), f"The array of the demand of the experiment should not be replaced by the array of the window."
+
+
+def test_uses_rolling_horizon():
+    assert (
+        G1b.uses_rolling_horizon(experiment_of_days(7), CASE_DICT) is True
+    ), f"The dispatch of a case with fixed capacities is not optimized with rolling horizon."
+    assert (
+        G1b.uses_rolling_horizon(experiment_of_days(7, rolling_horizon=None), CASE_DICT)
+        is False
+    ), f"Rolling horizon is used although it is not set."
+    assert (
+        G1b.uses_rolling_horizon(experiment_of_days(2), CASE_DICT) is False
+    ), f"Rolling horizon is used although the timeframe is not longer than a window."
+    case_dict = CASE_DICT.copy()
+    case_dict.update({PV_FIXED_CAPACITY: False})
+    assert (
+        G1b.uses_rolling_horizon(experiment_of_days(7), case_dict) is False
+    ), f"Rolling horizon is used although a capacity is optimized."
@@ -0,0 +1,37 @@
+import pandas as pd
+import numpy as np
+
+import src.G2a_oemof_busses_and_componets as G2a
+from src.constants import GRID_AVAILABILITY, PV_GENERATION_PER_KWP
+
+
+def test_get_timeseries_converted_once():
+    experiment = {PV_GENERATION_PER_KWP: pd.Series([0, 0.5, 1])}
+    timeseries = G2a.get_timeseries(experiment, PV_GENERATION_PER_KWP)
+    assert isinstance(
+        timeseries, np.ndarray
+    ), f"The timeseries should be converted to a numpy.ndarray, but is of type {type(timeseries)}."
+    assert (
+        timeseries.dtype == np.float64 and timeseries.flags["C_CONTIGUOUS"]
+    ), f"The timeseries should be a contiguous float64 array."
+    assert (
+        G2a.get_timeseries(experiment, PV_GENERATION_PER_KWP) is timeseries
+    ), f"The timeseries should only be converted once per experiment."
+
+
+def test_get_timeseries_changed_timeseries():
+    experiment = {GRID_AVAILABILITY: pd.Series([1, 1, 1])}
+    G2a.get_timeseries(experiment, GRID_AVAILABILITY)
+    window_experiment = experiment.copy()
+    window_experiment.update({GRID_AVAILABILITY: experiment[GRID_AVAILABILITY][1:]})
+    timeseries = G2a.get_timeseries(window_experiment, GRID_AVAILABILITY)
+    assert (
+        len(timeseries) == 2
+    ), f"The timeseries should be converted again after it changed, but has the length of the previous timeseries ({len(timeseries)})."
+
+
+def test_get_timeseries_scalar():
+    experiment = {GRID_AVAILABILITY: 1}
+    assert (
+        G2a.get_timeseries(experiment, GRID_AVAILABILITY) == 1
+    ), f"A scalar should be returned as it is."
@@ -0,0 +1,55 @@
+import numpy as np
+import pyomo.environ as po
+
+import src.G2b_constraints_custom as G2b
+
+
+def get_model(number_of_timesteps):
+    model = po.ConcreteModel()
+    model.TIMESTEPS = po.Set(initialize=range(number_of_timesteps), ordered=True)
+    model.capacity = po.Var()
+    model.flow = po.Var(model.TIMESTEPS)
+    return model
+
+
+def test_add_timestep_constraint():
+    model = get_model(3)
+    G2b.add_timestep_constraint(
+        model,
+        "test_constraint",
+        np.array([1, 2, 3]),
+        [(2, model.capacity)],
+        [(np.array([0, 1, 0.5]), [model.flow[t] for t in model.TIMESTEPS])],
+    )
+    constraint = model.test_constraint
+    assert (
+        len(constraint) == 3
+    ), f"One constraint per timestep (3) is expected, but {len(constraint)} were added."
+    model.capacity.value = 1
+    for t, flow in enumerate([4, 5, 6]):
+        model.flow[t].value = flow
+    exp = [1 + 2 + 0, 2 + 2 + 5, 3 + 2 + 3]
+    for t in model.TIMESTEPS:
+        assert (
+            po.value(constraint[t].body) == exp[t]
+        ), f"The expression of timestep {t} should be {exp[t]}, but is {po.value(constraint[t].body)}."
+        assert (
+            constraint[t].lower == 0 and constraint[t].upper is None
+        ), f"The expression of timestep {t} should be limited to >= 0."
+
+
+def test_add_timestep_constraint_upper_limit():
+    model = get_model(2)
+    G2b.add_timestep_constraint(
+        model,
+        "test_constraint",
+        0,
+        [],
+        [(-1, [model.flow[t] for t in model.TIMESTEPS])],
+        upper_limit=True,
+    )
+    for t in model.TIMESTEPS:
+        assert (
+            model.test_constraint[t].lower is None
+            and model.test_constraint[t].upper == 0
+        ), f"The expression of timestep {t} should be limited to <= 0."
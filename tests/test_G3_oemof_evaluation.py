@@ -1,9 +1,22 @@
 import pandas as pd
 import numpy as np
-from pandas.util.testing import assert_series_equal
 
 import src.G3_oemof_evaluate as G3
-from src.constants import EVALUATED_DAYS, GENSET_HOURS_OF_OPERATION
+from src.constants import (
+    EVALUATED_DAYS,
+    GENSET_HOURS_OF_OPERATION,
+    DATE_TIME_INDEX,
+    NUMBER_OF_EQUAL_GENERATORS,
+    SEQUENCES,
+    SCALARS,
+    FLOW,
+    INVEST,
+    SOURCE_PV,
+    BUS_ELECTRICITY_DC,
+    DEMAND,
+    GENSET_1_GENERATION,
+    GENSET_GENERATION,
+)
 
 
 def test_get_hours_of_operation():
@@ -13,16 +26,71 @@ def test_get_hours_of_operation():
     operation_boolean = G3.get_hours_of_operation(
         oemof_results, case_dict, genset_generation
     )
-    exp = pd.Series([0, 0, 0, 1, 1])
+    exp = np.array([0, 0, 0, 1, 1], dtype=np.float64)
     assert (
         operation_boolean.sum() == 2
     ), f"It was expected that the number of operation hours in the evaluated timeframe was 2, but it is {operation_boolean.sum()}."
-    assert_series_equal(
-        genset_generation.astype(np.float64), exp(np.float64), check_names=False,
-    ), f"The operational hours pd.Series should be the same when calculated with the function to the expected series."
+    assert np.array_equal(
+        operation_boolean, exp
+    ), f"The operational hours should be {exp} when calculated with the function, but are {operation_boolean}."
     assert (
         GENSET_HOURS_OF_OPERATION in oemof_results
     ), f"Parameter {GENSET_HOURS_OF_OPERATION} is not in the oemof_results, but was expected."
     assert oemof_results[GENSET_HOURS_OF_OPERATION] == 2 * (
         365 / 5
     ), f"Parameter {GENSET_HOURS_OF_OPERATION} is not of expected annual value {2*365/5}, but {oemof_results[GENSET_HOURS_OF_OPERATION]}."
+
+
+def test_get_flows():
+    index = pd.date_range("2020-01-01", periods=3, freq="H")
+    results = {
+        (SOURCE_PV, BUS_ELECTRICITY_DC): {
+            SEQUENCES: pd.DataFrame({FLOW: [0, 1, 2]}, index=index),
+            SCALARS: pd.Series({INVEST: 5.0}),
+        }
+    }
+    sequences, scalars = G3.get_flows(results)
+    flow = sequences[((SOURCE_PV, BUS_ELECTRICITY_DC), FLOW)]
+    assert isinstance(
+        flow, np.ndarray
+    ), f"The sequences of a flow should be a numpy.ndarray, but are of type {type(flow)}."
+    assert np.array_equal(
+        flow, [0, 1, 2]
+    ), f"The sequence of the flow should be [0, 1, 2], but is {flow}."
+    assert (
+        scalars[((SOURCE_PV, BUS_ELECTRICITY_DC), INVEST)] == 5
+    ), f"The invested capacity should be 5, but is {scalars[((SOURCE_PV, BUS_ELECTRICITY_DC), INVEST)]}."
+
+
+def test_get_e_flows_df():
+    index = pd.date_range("2020-01-01", periods=3, freq="H")
+    e_flows = G3.initialize_e_flows(
+        {DATE_TIME_INDEX: index}, {NUMBER_OF_EQUAL_GENERATORS: 2}
+    )
+    G3.set_e_flow(e_flows, GENSET_GENERATION, [2, 2, 2])
+    G3.set_e_flow(e_flows, "Genset 2 generation", [1, 1, 1])
+    G3.set_e_flow(e_flows, GENSET_1_GENERATION, [1, 1, 1])
+    G3.set_e_flow(e_flows, DEMAND, [1, 2, 3])
+    e_flows_df = G3.get_e_flows_df(e_flows)
+    exp = [DEMAND, GENSET_1_GENERATION, "Genset 2 generation", GENSET_GENERATION]
+    assert (
+        list(e_flows_df.columns) == exp
+    ), f"The columns of the energy flows should be {exp} in this order, but are {list(e_flows_df.columns)}."
+    assert (
+        e_flows_df.index == index
+    ).all(), f"The index of the energy flows should be the evaluated timeframe."
+    assert e_flows_df[DEMAND].tolist() == [
+        1,
+        2,
+        3,
+    ], f"The demand should be [1, 2, 3], but is {e_flows_df[DEMAND].tolist()}."
+
+
+def test_annual_value():
+    oemof_results = {}
+    G3.annual_value(
+        DEMAND, np.array([1.0, 2.0, 3.0]), oemof_results, {EVALUATED_DAYS: 73}
+    )
+    assert (
+        oemof_results[DEMAND] == 30
+    ), f"The annual value should be 6 * 365 / 73 = 30, but is {oemof_results[DEMAND]}."
@@ -0,0 +1,100 @@
+import pandas as pd
+import numpy as np
+
+import src.G3b_plausability_tests as G3b
+import src.G2b_constraints_custom as G2b
+from src.constants import (
+    COMMENTS,
+    STORAGE_CHARGE,
+    STORAGE_DISCHARGE,
+    DEMAND,
+    DEMAND_SUPPLIED,
+    DEMAND_SHORTAGE,
+    PLAUSIBILITY_TOLERANCE,
+    STABILITY_CONSTRAINT,
+    ALLOW_SHORTAGE,
+    INVERTER_DC_AC_EFFICIENCY,
+    SHORTAGE_LIMIT,
+    PEAK_DEMAND,
+    GENSET_GENERATION,
+)
+
+INDEX = pd.date_range("2020-01-01", periods=4, freq="H")
+
+
+def test_get_violations():
+    violations = G3b.get_violations(np.array([False, True, False, True]), INDEX)
+    assert (
+        violations["count"] == 2
+    ), f"Two timesteps violate the test, but {violations['count']} are counted."
+    assert violations["timestamps"] == [
+        str(INDEX[1]),
+        str(INDEX[3]),
+    ], f"The violating timestamps should be {[str(INDEX[1]), str(INDEX[3])]}, but are {violations['timestamps']}."
+
+
+def test_get_violations_limited_number_of_timestamps():
+    index = pd.date_range("2020-01-01", periods=2 * G3b.REPORTED_TIMESTAMPS, freq="H")
+    violations = G3b.get_violations(np.ones(len(index), dtype=bool), index)
+    assert violations["count"] == len(
+        index
+    ), f"All {len(index)} timesteps violate the test, but {violations['count']} are counted."
+    assert (
+        len(violations["timestamps"]) == G3b.REPORTED_TIMESTAMPS
+    ), f"Only the first {G3b.REPORTED_TIMESTAMPS} timestamps should be reported, but {len(violations['timestamps'])} are."
+
+
+def test_charge_discharge_with_tolerance():
+    e_flows_df = pd.DataFrame(
+        {STORAGE_CHARGE: [1, 0, 10 ** (-8), 1], STORAGE_DISCHARGE: [0, 1, 1, 1]},
+        index=INDEX,
+    )
+    oemof_results = {COMMENTS: ""}
+    G3b.charge_discharge(oemof_results, e_flows_df, 10 ** (-6))
+    assert (
+        oemof_results[COMMENTS]
+        == "Charge and discharge of batteries at the same time. "
+    ), f"The charge and discharge at the last timestep should be commented, but the comment is '{oemof_results[COMMENTS]}'."
+
+
+def test_run_plausible_flows():
+    e_flows_df = pd.DataFrame(
+        {
+            STORAGE_CHARGE: [1, 0, 0, 0],
+            STORAGE_DISCHARGE: [0, 1, 0, 0],
+            DEMAND: [2, 2, 2, 2],
+            DEMAND_SUPPLIED: [2, 1, 2, 2],
+            DEMAND_SHORTAGE: [0, 1, 0, 0],
+        },
+        index=INDEX,
+    )
+    oemof_results = {COMMENTS: ""}
+    G3b.run(oemof_results, e_flows_df, {PLAUSIBILITY_TOLERANCE: 10 ** (-6)})
+    assert (
+        oemof_results[COMMENTS] == ""
+    ), f"Plausible energy flows should not be commented, but the comment is '{oemof_results[COMMENTS]}'."
+
+
+def test_usage_test():
+    e_flows_df = pd.DataFrame(
+        {DEMAND: [1, 1, 1, 1], GENSET_GENERATION: [1, 0.4, 1, 0.5]}, index=INDEX
+    )
+    case_dict = {STABILITY_CONSTRAINT: True, ALLOW_SHORTAGE: False}
+    experiment = {
+        INVERTER_DC_AC_EFFICIENCY: 1,
+        SHORTAGE_LIMIT: 0.5,
+        PEAK_DEMAND: 1,
+        PLAUSIBILITY_TOLERANCE: 10 ** (-6),
+    }
+    oemof_results = {COMMENTS: ""}
+    G2b.usage_test(case_dict, oemof_results, experiment, e_flows_df)
+    assert (
+        "Stability criterion not fullfilled" in oemof_results[COMMENTS]
+    ), f"The genset generation at the second timestep does not meet the stability criterion, but the comment is '{oemof_results[COMMENTS]}'."
+
+    experiment.update({PLAUSIBILITY_TOLERANCE: 0.2})
+    oemof_results = {COMMENTS: ""}
+    G2b.usage_test(case_dict, oemof_results, experiment, e_flows_df)
+    assert (
+        oemof_results[COMMENTS] == ""
+    ), f"Deviations within the tolerance should not be commented, but the comment is '{oemof_results[COMMENTS]}'."
@@ -0,0 +1,62 @@
+import os
+import pytest
+import numpy as np
+import pandas as pd
+
+import src.G4a_flow_store as G4a
+from src.constants import FLOWS_FOLDER
+
+FLOWS = pd.DataFrame(
+    {"Demand": [1.0, 2.0, 3.0, 4.0], "PV generation": [0.5, 0.25, 0.0, 1.5]},
+    index=pd.date_range("2020-01-01", periods=4, freq="H"),
+)
+
+
+def write_flows(tmpdir, dataset, flows=FLOWS):
+    os.mkdir(str(tmpdir) + FLOWS_FOLDER)
+    G4a.write_in_background(str(tmpdir), dataset, flows)
+    G4a.wait_for_written_flows()
+
+
+def test_write_in_background_and_load_flows(tmpdir):
+    write_flows(tmpdir, "base_oem_s1")
+    assert G4a.get_datasets(str(tmpdir)) == [
+        "base_oem_s1"
+    ], f"The written dataset should be listed, but the datasets are {G4a.get_datasets(str(tmpdir))}."
+    flows = G4a.load_flows(str(tmpdir), "base_oem_s1")
+    assert (
+        flows.dtypes == np.float32
+    ).all(), f"Flows should be loaded as float32, but are {flows.dtypes.tolist()}."
+    pd.testing.assert_frame_equal(flows, FLOWS.astype(np.float32), check_freq=False)
+
+
+def test_load_flows_subset(tmpdir):
+    write_flows(tmpdir, "base_oem_s1")
+    flows = G4a.load_flows(
+        str(tmpdir),
+        "base_oem_s1",
+        columns=["PV generation"],
+        start="2020-01-01 01:00",
+        end="2020-01-01 02:00",
+    )
+    pd.testing.assert_frame_equal(
+        flows, FLOWS[["PV generation"]][1:3].astype(np.float32), check_freq=False
+    )
+
+
+def test_load_flows_irregular_index(tmpdir):
+    flows = FLOWS.copy()
+    flows.index = pd.DatetimeIndex(
+        ["2020-01-01 00:00", "2020-01-01 01:00", "2020-01-03 00:00", "2020-01-03 01:00"]
+    )
+    write_flows(tmpdir, "base_oem_s1", flows)
+    loaded_flows = G4a.load_flows(str(tmpdir), "base_oem_s1", start="2020-01-02")
+    assert loaded_flows.index.equals(
+        flows.index[2:]
+    ), f"Irregular timestamps should be restored, but the loaded timestamps are {loaded_flows.index}."
+
+
+def test_load_flows_missing_column(tmpdir):
+    write_flows(tmpdir, "base_oem_s1")
+    with pytest.raises(KeyError):
+        G4a.load_flows(str(tmpdir), "base_oem_s1", columns=["Wind generation"])
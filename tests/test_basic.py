@@ -1,7 +1,7 @@
 import pytest
 import os
 
-from ..src.cli import main
+from ..src.cli import main, get_command_line_arguments
 
 
 def test_execution_not_terminated():
@@ -9,6 +9,25 @@ def test_execution_not_terminated():
     assert answer == 1, f"Simulation with default inputs terminated."
 
 
+def test_execution_with_workers_not_terminated():
+    answer = main(
+        input_file=os.path.join("tests", "inputs", "pytest_test.xlsx"), workers=2
+    )
+    assert answer == 1, f"Simulation with a pool of workers terminated."
+
+
+def test_get_command_line_arguments():
+    arguments = get_command_line_arguments(["inputs/file.xlsx", "--workers", "3"])
+    assert arguments.input_file == "inputs/file.xlsx"
+    assert arguments.workers == 3, f"Number of workers not parsed from terminal."
+
+
+def test_get_command_line_arguments_default_workers():
+    arguments = get_command_line_arguments([])
+    assert arguments.input_file is None
+    assert arguments.workers == 1, f"Default number of workers should be 1."
+
+
 """
 def test_blacks_main():
     # Testing code formatting in main folder